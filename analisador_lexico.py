@@ -1,5 +1,9 @@
-from tabulate import tabulate
 import reprlib
+import contextlib
+import io
+import re
+
+import saidas
 
 # Palavras reservadas
 palavras_reservadas = {
@@ -139,30 +143,67 @@ class Token:
         self.coluna = coluna
 
 
-def analisar_lexema(codigo_fonte):
+def analisar_lexema(codigo_fonte, jobs=1, vetorizado=None):
+    """
+    Analisa o código-fonte e devolve (lista_tokens, tabela_simbolos).
+
+    Com jobs > 1 e um arquivo grande, o texto é dividido em quebras de
+    linha seguras (fora de comentários e literais) e os trechos são
+    analisados em processos separados; o resultado é idêntico ao serial.
+
+    vetorizado: None usa a pré-varredura NumPy (varredura_vetorizada) em
+    fontes grandes quando o NumPy está instalado; True a usa sempre que
+    possível; False fica no caminho puro Python. O resultado é o mesmo.
+    """
+    if jobs > 1 and len(codigo_fonte) >= TAMANHO_MINIMO_PARALELO:
+        cortes = pontos_de_corte(codigo_fonte, jobs)
+        if len(cortes) > 2:
+            return _analisar_em_trechos(codigo_fonte, cortes, jobs, vetorizado)
+    return _analisar_trecho(codigo_fonte, 1, _limites(codigo_fonte, vetorizado))
+
+
+# abaixo disso o import do NumPy e os arrays custam mais do que os saltos economizam
+TAMANHO_MINIMO_VETORIZADO = 256 * 1024
+
+
+def _limites(codigo_fonte, vetorizado):
+    """Limites da pré-varredura NumPy, ou None para o caminho puro Python."""
+    if vetorizado is False or (vetorizado is None and len(codigo_fonte) < TAMANHO_MINIMO_VETORIZADO):
+        return None
+    # importado aqui: fontes pequenas não pagam o import do NumPy
+    import varredura_vetorizada
+    if not varredura_vetorizada.HAVE_NUMPY:
+        return None
+    return varredura_vetorizada.pre_varredura(codigo_fonte)
+
+
+def _analisar_trecho(codigo_fonte, linha_inicial=1, limites=None):
     tabela_simbolos = {}
     lista_tokens = []
     ponteiro = 0
     tamanho_codigo = len(codigo_fonte)
 
-    linha = 1
+    linha = linha_inicial
     coluna = 1
 
     def atualiza_pos(inicio, fim, linha_atual, coluna_atual):
         """Atualiza linha/coluna com base nos caracteres consumidos entre [inicio, fim)."""
-        for ch in codigo_fonte[inicio:fim]:
-            if ch == "\n":
-                linha_atual += 1
-                coluna_atual = 1
-            else:
-                coluna_atual += 1
-        return linha_atual, coluna_atual
+        quebras = codigo_fonte.count("\n", inicio, fim)
+        if not quebras:
+            return linha_atual, coluna_atual + (fim - inicio)
+        return linha_atual + quebras, fim - codigo_fonte.rfind("\n", inicio, fim)
 
     while ponteiro < tamanho_codigo:
         caractere_atual = codigo_fonte[ponteiro]
 
         # 1. Espaços em branco
         if caractere_atual.isspace():
+            if limites is not None:
+                fim = limites.branco.get(ponteiro)
+                if fim is not None:
+                    linha, coluna = atualiza_pos(ponteiro, fim, linha, coluna)
+                    ponteiro = fim
+                    continue
             if caractere_atual == "\n":
                 linha += 1
                 coluna = 1
@@ -184,6 +225,8 @@ def analisar_lexema(codigo_fonte):
                 inicio = ponteiro
                 linha_tok = linha
                 coluna_tok = coluna
+                if limites is not None:
+                    ponteiro = limites.fim_linha(ponteiro)
                 while ponteiro < tamanho_codigo and codigo_fonte[ponteiro] != "\n":
                     ponteiro += 1
                 lexema = codigo_fonte[inicio:ponteiro]
@@ -194,6 +237,8 @@ def analisar_lexema(codigo_fonte):
         # 2. Comentário de linha //
         if codigo_fonte.startswith("//", ponteiro):
             inicio = ponteiro
+            if limites is not None:
+                ponteiro = limites.fim_linha(ponteiro)
             while ponteiro < tamanho_codigo and codigo_fonte[ponteiro] != "\n":
                 ponteiro += 1
             linha, coluna = atualiza_pos(inicio, ponteiro, linha, coluna)
@@ -203,6 +248,8 @@ def analisar_lexema(codigo_fonte):
         if codigo_fonte.startswith("/*", ponteiro):
             inicio = ponteiro
             ponteiro += 2
+            if limites is not None:
+                ponteiro = limites.fecha_comentario(ponteiro)
             while ponteiro < tamanho_codigo and not codigo_fonte.startswith("*/", ponteiro):
                 ponteiro += 1
 
@@ -211,10 +258,10 @@ def analisar_lexema(codigo_fonte):
                 linha, coluna = atualiza_pos(inicio, ponteiro, linha, coluna)
                 continue
             else:
-                print(f"Erro léxico: comentário de bloco não fechado @ {linha_tok}:{coluna_tok}")
                 lexema = "/*...EOF"
                 linha_tok = linha
                 coluna_tok = coluna
+                print(f"Erro léxico: comentário de bloco não fechado @ {linha_tok}:{coluna_tok}")
                 lista_tokens.append(Token("ERROR", lexema, linha_tok, coluna_tok))
                 break
 
@@ -223,13 +270,15 @@ def analisar_lexema(codigo_fonte):
             inicio = ponteiro
             linha_tok = linha
             coluna_tok = coluna
-            lexema = ""
+            if limites is not None:
+                ponteiro = limites.palavra.get(ponteiro, ponteiro)
             while (
                 ponteiro < tamanho_codigo
                 and (codigo_fonte[ponteiro].isalnum() or codigo_fonte[ponteiro] == "_")
             ):
-                lexema += codigo_fonte[ponteiro]
                 ponteiro += 1
+            # fatiar no fim evita concatenar caractere a caractere
+            lexema = codigo_fonte[inicio:ponteiro]
 
             if lexema in palavras_reservadas:
                 token_tipo = palavras_reservadas[lexema]
@@ -248,21 +297,22 @@ def analisar_lexema(codigo_fonte):
             coluna_tok = coluna
 
             ponteiro += 1
-            lexema = '"'
             fechado = False
+            if limites is not None:
+                # pula direto para o '"' ou '\n' não escapado que encerra a string
+                ponteiro = limites.parada_string(ponteiro)
             while ponteiro < tamanho_codigo:
                 ch = codigo_fonte[ponteiro]
-                lexema += ch
                 ponteiro += 1
                 if ch == "\\":
                     if ponteiro < tamanho_codigo:
-                        lexema += codigo_fonte[ponteiro]
                         ponteiro += 1
                 elif ch == '"':
                     fechado = True
                     break
                 elif ch == "\n":
                     break
+            lexema = codigo_fonte[inicio:ponteiro]
             linha, coluna = atualiza_pos(inicio, ponteiro, linha, coluna)
             if fechado:
                 lista_tokens.append(Token("TEXTO", lexema, linha_tok, coluna_tok))
@@ -309,11 +359,11 @@ def analisar_lexema(codigo_fonte):
             linha_tok = linha
             coluna_tok = coluna
 
-            lexema = ""
             is_float = False
 
+            if limites is not None:
+                ponteiro = limites.digitos.get(ponteiro, ponteiro)
             while ponteiro < tamanho_codigo and codigo_fonte[ponteiro].isdigit():
-                lexema += codigo_fonte[ponteiro]
                 ponteiro += 1
 
             # vírgula como decimal -> erro
@@ -322,16 +372,16 @@ def analisar_lexema(codigo_fonte):
                 and codigo_fonte[ponteiro] == ","
                 and codigo_fonte[ponteiro + 1].isdigit()
             ):
-                err_inicio = inicio
-                err_lex = lexema + ","
                 ponteiro += 1
+                if limites is not None:
+                    ponteiro = limites.digitos.get(ponteiro, ponteiro)
                 while (
                     ponteiro < tamanho_codigo
                     and codigo_fonte[ponteiro].isdigit()
                 ):
-                    err_lex += codigo_fonte[ponteiro]
                     ponteiro += 1
-                linha, coluna = atualiza_pos(err_inicio, ponteiro, linha, coluna)
+                err_lex = codigo_fonte[inicio:ponteiro]
+                linha, coluna = atualiza_pos(inicio, ponteiro, linha, coluna)
                 print(f"Erro léxico: uso de vírgula como separador decimal (3,14) @ {linha_tok}:{coluna_tok}")
                 print(f"Lexema de erro: {repr(err_lex)}")
                 lista_tokens.append(Token("ERROR", err_lex, linha_tok, coluna_tok))
@@ -340,14 +390,14 @@ def analisar_lexema(codigo_fonte):
             # ponto decimal (float)
             if ponteiro < tamanho_codigo and codigo_fonte[ponteiro] == ".":
                 is_float = True
-                lexema += "."
                 ponteiro += 1
                 if ponteiro < tamanho_codigo and codigo_fonte[ponteiro].isdigit():
+                    if limites is not None:
+                        ponteiro = limites.digitos.get(ponteiro, ponteiro)
                     while (
                         ponteiro < tamanho_codigo
                         and codigo_fonte[ponteiro].isdigit()
                     ):
-                        lexema += codigo_fonte[ponteiro]
                         ponteiro += 1
 
             # identificador começando por número -> erro
@@ -355,19 +405,28 @@ def analisar_lexema(codigo_fonte):
                 ponteiro < tamanho_codigo
                 and (codigo_fonte[ponteiro].isalpha() or codigo_fonte[ponteiro] == "_")
             ):
+                if limites is not None:
+                    ponteiro = limites.palavra.get(ponteiro, ponteiro)
                 while (
                     ponteiro < tamanho_codigo
                     and (codigo_fonte[ponteiro].isalnum() or codigo_fonte[ponteiro] == "_")
                 ):
-                    lexema += codigo_fonte[ponteiro]
                     ponteiro += 1
+                lexema = codigo_fonte[inicio:ponteiro]
                 linha, coluna = atualiza_pos(inicio, ponteiro, linha, coluna)
                 print(f"Erro léxico: identificador não pode começar com número @ {linha_tok}:{coluna_tok}")
                 print(f"Lexema de erro: {repr(lexema)}")
                 lista_tokens.append(Token("ERROR", lexema, linha_tok, coluna_tok))
             else:
+                lexema = codigo_fonte[inicio:ponteiro]
                 linha, coluna = atualiza_pos(inicio, ponteiro, linha, coluna)
-                atributo = float(lexema) if is_float else int(lexema)
+                try:
+                    atributo = float(lexema) if is_float else int(lexema)
+                except ValueError:
+                    # int() recusa mais de sys.get_int_max_str_digits() dígitos
+                    print(f"Erro léxico: constante inteira grande demais @ {linha_tok}:{coluna_tok}")
+                    lista_tokens.append(Token("ERROR", lexema, linha_tok, coluna_tok))
+                    continue
                 lista_tokens.append(Token("NUM", lexema, linha_tok, coluna_tok, atributo))
             continue
 
@@ -410,11 +469,11 @@ def analisar_lexema(codigo_fonte):
             continue
 
         # 9. Erro léxico genérico
-        print(f"Erro léxico: caractere inválido '{caractere_atual}' @ {linha_tok}:{coluna_tok}")
-        print(f"Lexema de erro: {repr(caractere_atual)}")
         inicio = ponteiro
         linha_tok = linha
         coluna_tok = coluna
+        print(f"Erro léxico: caractere inválido '{caractere_atual}' @ {linha_tok}:{coluna_tok}")
+        print(f"Lexema de erro: {repr(caractere_atual)}")
         ponteiro += 1
         linha, coluna = atualiza_pos(inicio, ponteiro, linha, coluna)
         lista_tokens.append(Token("ERROR", caractere_atual, linha_tok, coluna_tok))
@@ -425,6 +484,136 @@ def analisar_lexema(codigo_fonte):
     return lista_tokens, tabela_simbolos
 
 
+# -----------------------------------------------
+# Análise léxica paralela de um único arquivo
+# -----------------------------------------------
+
+# abaixo disso o custo de subir processos supera o ganho
+TAMANHO_MINIMO_PARALELO = 256 * 1024
+TRECHOS_POR_PROCESSO = 4
+
+_RE_PRE_SCAN = re.compile(r"[\n\"'/#]")
+
+
+def quebras_seguras(codigo_fonte):
+    """
+    Pré-varredura rápida: posições de '\n' que o léxico consumiria como
+    espaço em branco, isto é, fora de comentários /* */, de strings e de
+    literais de caractere. Reproduz exatamente as regras de consumo do
+    léxico para esses casos (inclusive os não terminados).
+    """
+    seguras = []
+    n = len(codigo_fonte)
+    inicio_linha = 0
+    p = 0
+    busca = _RE_PRE_SCAN.search
+    while True:
+        m = busca(codigo_fonte, p)
+        if m is None:
+            return seguras
+        p = m.start()
+        ch = codigo_fonte[p]
+        if ch == "\n":
+            seguras.append(p)
+            inicio_linha = p + 1
+            p += 1
+        elif ch == "/":
+            prox = codigo_fonte[p + 1:p + 2]
+            if prox == "*":
+                fim = codigo_fonte.find("*/", p + 2)
+                if fim < 0:
+                    return seguras  # comentário não fechado: o léxico para aqui
+                p = fim + 2
+            elif prox == "/":
+                fim = codigo_fonte.find("\n", p)
+                p = n if fim < 0 else fim
+            else:
+                p += 1
+        elif ch == "#":
+            if codigo_fonte[inicio_linha:p].strip(" \t") == "":
+                fim = codigo_fonte.find("\n", p)
+                p = n if fim < 0 else fim
+            else:
+                p += 1
+        elif ch == '"':
+            p += 1
+            while p < n:
+                c = codigo_fonte[p]
+                p += 1
+                if c == "\\":
+                    p += 1
+                elif c == '"':
+                    break
+                elif c == "\n":
+                    # string não terminada consome a quebra de linha
+                    inicio_linha = p
+                    break
+        else:  # "'"
+            p += 1
+            if p < n:
+                c = codigo_fonte[p]
+                p += 1
+                if c == "\\":
+                    p += 1
+            if p < n and codigo_fonte[p] == "'":
+                p += 1
+        if p > n:
+            p = n
+        # o que foi consumido pode ter atravessado linhas
+        k = codigo_fonte.rfind("\n", inicio_linha, p)
+        if k >= 0:
+            inicio_linha = k + 1
+
+
+def pontos_de_corte(codigo_fonte, jobs):
+    """Offsets [0, ..., len] que dividem o texto em trechos seguros."""
+    n = len(codigo_fonte)
+    n_trechos = jobs * TRECHOS_POR_PROCESSO
+    alvo = n // n_trechos
+    cortes = [0]
+    proximo = alvo
+    for q in quebras_seguras(codigo_fonte):
+        if q + 1 >= proximo and q + 1 < n:
+            cortes.append(q + 1)
+            proximo = q + 1 + alvo
+    cortes.append(n)
+    return cortes
+
+
+def _analisar_trecho_isolado(args):
+    trecho, linha_inicial, vetorizado = args
+    # as mensagens de erro voltam como texto para saírem na ordem do arquivo
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        tokens, tabela = _analisar_trecho(trecho, linha_inicial, _limites(trecho, vetorizado))
+    return tokens, tabela, buf.getvalue()
+
+
+def _analisar_em_trechos(codigo_fonte, cortes, jobs, vetorizado=None):
+    from concurrent.futures import ProcessPoolExecutor
+
+    tarefas = []
+    linha = 1
+    for a, b in zip(cortes, cortes[1:]):
+        tarefas.append((codigo_fonte[a:b], linha, vetorizado))
+        linha += codigo_fonte.count("\n", a, b)
+
+    lista_tokens = []
+    tabela_simbolos = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        resultados = list(pool.map(_analisar_trecho_isolado, tarefas))
+    for k, (tokens, tabela, mensagens) in enumerate(resultados):
+        if mensagens:
+            print(mensagens, end="")
+        # só o EOF do último trecho é o EOF do arquivo
+        if k < len(resultados) - 1:
+            tokens.pop()
+        lista_tokens.extend(tokens)
+        for nome, qtd in tabela.items():
+            tabela_simbolos[nome] = tabela_simbolos.get(nome, 0) + qtd
+    return lista_tokens, tabela_simbolos
+
+
 def categoria_do_token(tok: Token) -> str:
     if tok.lexema in palavras_reservadas:
         return "Palavra reservada"
@@ -435,7 +624,8 @@ def categoria_do_token(tok: Token) -> str:
     return categorias.get(tok.tipo, "Outro")
 
 
-def imprimir_tokens(lista_tokens):
+def imprimir_tokens(lista_tokens, formato="github"):
+    """'formato' é uma tabela de saidas.py (github, texto, json)."""
     if not lista_tokens:
         print("Nenhum token encontrado.")
         return
@@ -443,18 +633,13 @@ def imprimir_tokens(lista_tokens):
         [t.tipo, categoria_do_token(t), t.lexema, t.atributo, t.linha, t.coluna]
         for t in lista_tokens
     ]
-    print(
-        tabulate(
-            rows,
-            headers=["Token", "Categoria", "Lexema", "Atributo", "Linha", "Coluna"],
-            tablefmt="github",
-        )
-    )
+    tabela = saidas.tabela(formato)
+    print(tabela(rows, ["Token", "Categoria", "Lexema", "Atributo", "Linha", "Coluna"]))
 
 
-def imprimir_simbolos(tabela_simbolos):
+def imprimir_simbolos(tabela_simbolos, formato="github"):
     if not tabela_simbolos:
         print("Nenhum identificador encontrado na tabela de símbolos.")
         return
     rows = [[k, v] for k, v in sorted(tabela_simbolos.items())]
-    print(tabulate(rows, headers=["ID", "Ocorrências"], tablefmt="github"))
\ No newline at end of file
+    print(saidas.tabela(formato)(rows, ["ID", "Ocorrências"]))
\ No newline at end of file
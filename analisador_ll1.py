@@ -0,0 +1,731 @@
+"""
+Parser LL(1) dirigido por tabela, gerado a partir de uma gramática
+declarativa dos comandos de mini-C.
+
+A gramática (GRAMATICA_MINIC) é escrita uma vez só; gerar_tabela()
+calcula FIRST/FOLLOW, monta a tabela preditiva indexada por tipos de
+token inteiros e deriva os conjuntos de sincronização de cada
+não-terminal. ParserLL1 percorre essa tabela com uma pilha explícita e
+produz os mesmos nós de AST do parser descendente recursivo.
+
+Expressões continuam com o parser de precedência de Parser (parse_E):
+na gramática elas aparecem como símbolos externos, com FIRST declarado.
+
+Em arquivos corretos a AST é a mesma do Parser. Com erros, a
+recuperação é outra e os diagnósticos podem diferir:
+
+- terminal faltando: reporta e segue como se ele estivesse lá, onde o
+  Parser pula até ';', '}' ou EOF. Em "if (x > 0 {" o bloco do if é
+  mantido, e o Parser perde o bloco e ainda reporta um segundo erro no
+  '}' (ex3_wrong.c);
+- depois de um erro só volta a reportar quando algum token casa, então
+  erros em cascata do Parser podem não aparecer;
+- sem alternativa para o token, a mensagem vem do não-terminal: no EOF
+  dentro de um bloco sai "Esperado comando ou '}'" em vez de "Esperado
+  '}'" (ex4_wrong.c), e um token que não continua um comando sai como
+  "Esperado ';'" em vez do erro de expressão (ex5_wrong.c).
+
+O primeiro erro de cada arquivo sai na mesma posição nos dois parsers.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
+
+from analisador_sintatico import (
+    Parser, Token, Program, Block, VarDecl, FuncDef, Assign, If, While,
+    Return, BinOp, Var, Num,
+)
+
+EPSILON = "ε"
+
+# Cada não-terminal tem suas alternativas; '@acao' diz como montar o valor
+# a partir dos valores dos símbolos do lado direito (tokens para
+# terminais). Alternativas sem ação devolvem o primeiro valor.
+GRAMATICA_MINIC = """
+Programa    -> Itens EOF                                   @programa
+Itens       -> Item PontoOpc Itens                         @acumula
+             | ε                                           @vazio
+Item        -> Tipo ID ItemResto                           @item_tipado
+             | StmtSemTipo
+ItemResto   -> LPAREN Params RPAREN Bloco                  @assinatura
+             | Init
+PontoOpc    -> SEMI                                        @nada
+             | ε                                           @nada
+
+Tipo        -> INT | FLOAT | CHAR | DOUBLE | STRING | VOID
+TipoNaoVoid -> INT | FLOAT | CHAR | DOUBLE | STRING
+
+Params      -> VOID ParamsVoid                             @params_void
+             | TipoNaoVoid ID MaisParams                   @params
+             | ε                                           @vazio
+ParamsVoid  -> ID MaisParams                               @lista
+             | ε                                           @nada
+MaisParams  -> COMMA Tipo ID MaisParams                    @mais_params
+             | ε                                           @vazio
+
+Bloco       -> LBRACE Stmts RBRACE                         @bloco
+             | Stmt
+Stmts       -> Stmt PontoOpc Stmts                         @acumula
+             | ε                                           @vazio
+
+Stmt        -> Tipo ID Init                                @decl
+             | StmtSemTipo
+StmtSemTipo -> IF LPAREN E RPAREN Bloco Senao              @se
+             | WHILE LPAREN E RPAREN Bloco                 @enquanto
+             | DO Bloco WHILE LPAREN E RPAREN              @faca
+             | FOR LPAREN ForInit SEMI ForCond SEMI ForPasso RPAREN Bloco  @para
+             | RETURN RetVal                               @retorno
+             | ID IdResto                                  @stmt_id
+             | ExprSemId
+             | PP_DIRECTIVE                                @nada
+Senao       -> ELSE Bloco                                  @segundo
+             | ε                                           @nada
+RetVal      -> E
+             | ε                                           @nada
+Init        -> EQUAL E                                     @segundo
+             | ε                                           @nada
+IdResto     -> EQUAL E                                     @atribuicao
+             | RestoExprId
+
+ForInit     -> Tipo ID Init                                @decl
+             | ID IdResto                                  @stmt_id
+             | ε                                           @nada
+ForCond     -> E
+             | ε                                           @nada
+ForPasso    -> ID IdResto                                  @stmt_id
+             | ε                                           @nada
+"""
+
+OPERADORES_BINARIOS = {
+    "OR", "AND", "EQ", "NE", "LT", "LE", "GT", "GE",
+    "PLUS", "MINUS", "TIMES", "DIVIDE", "MOD",
+}
+
+
+def _expr(p: "ParserLL1") -> Any:
+    return p.parse_E()
+
+
+def _resto_expr_id(p: "ParserLL1") -> Any:
+    # o ID já foi consumido como terminal; a expressão recomeça nele
+    p.i -= 1
+    return p.parse_E()
+
+
+# Símbolos externos: nome -> (FIRST, anulável, função que faz o parse)
+EXTERNOS_MINIC: Dict[str, Tuple[Set[str], bool, Callable[[Any], Any]]] = {
+    "E": ({"NUM", "TEXTO", "CHAR_LITERAL", "ID", "LPAREN"}, False, _expr),
+    "ExprSemId": ({"NUM", "TEXTO", "CHAR_LITERAL", "LPAREN"}, False, _expr),
+    "RestoExprId": ({"LPAREN", "LBRACK"} | OPERADORES_BINARIOS, True, _resto_expr_id),
+}
+
+# Descrição usada na mensagem quando nenhuma alternativa casa
+DESCRICOES = {
+    "Tipo": "tipo (int, float, char, ...)",
+    "TipoNaoVoid": "tipo de parâmetro",
+    "Params": "tipo de parâmetro ou ')'",
+    "Bloco": "'{' ou comando",
+    "Stmt": "comando",
+    "StmtSemTipo": "comando",
+    "Item": "declaração, função ou comando",
+    "Itens": "declaração, função ou comando",
+    "Stmts": "comando ou '}'",
+}
+
+
+# -----------------------------------------------
+# Gramática e FIRST/FOLLOW
+# -----------------------------------------------
+
+@dataclass
+class Producao:
+    cabeca: str
+    corpo: List[str]          # vazio = ε
+    acao: str = "primeiro"
+
+    def __str__(self) -> str:
+        return f"{self.cabeca} -> {' '.join(self.corpo) or EPSILON}"
+
+
+@dataclass
+class Gramatica:
+    producoes: List[Producao]
+    externos: Dict[str, Tuple[Set[str], bool, Callable[[Any], Any]]]
+    inicial: str
+    nao_terminais: List[str] = field(default_factory=list)
+    terminais: List[str] = field(default_factory=list)
+    anulaveis: Set[str] = field(default_factory=set)
+    first: Dict[str, Set[str]] = field(default_factory=dict)
+    follow: Dict[str, Set[str]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        for p in self.producoes:
+            if p.cabeca not in self.nao_terminais:
+                self.nao_terminais.append(p.cabeca)
+        vistos: Set[str] = set()
+        for p in self.producoes:
+            for s in p.corpo:
+                if s not in self.nao_terminais and s not in self.externos and s not in vistos:
+                    vistos.add(s)
+                    self.terminais.append(s)
+        for f, _, _ in self.externos.values():
+            for t in sorted(f - vistos):
+                vistos.add(t)
+                self.terminais.append(t)
+        self._calcula_first()
+        self._calcula_follow()
+
+    def eh_terminal(self, s: str) -> bool:
+        return s not in self.nao_terminais and s not in self.externos
+
+    def first_seq(self, seq: List[str]) -> Tuple[Set[str], bool]:
+        """FIRST de uma sequência e se ela deriva ε."""
+        out: Set[str] = set()
+        for s in seq:
+            if self.eh_terminal(s):
+                out.add(s)
+                return out, False
+            out |= self.first[s]
+            if s not in self.anulaveis:
+                return out, False
+        return out, True
+
+    def _calcula_first(self):
+        for nome, (f, anulavel, _) in self.externos.items():
+            self.first[nome] = set(f)
+            if anulavel:
+                self.anulaveis.add(nome)
+        for a in self.nao_terminais:
+            self.first[a] = set()
+        mudou = True
+        while mudou:
+            mudou = False
+            for p in self.producoes:
+                f, anulavel = self.first_seq(p.corpo)
+                alvo = self.first[p.cabeca]
+                if not f <= alvo:
+                    alvo |= f
+                    mudou = True
+                if anulavel and p.cabeca not in self.anulaveis:
+                    self.anulaveis.add(p.cabeca)
+                    mudou = True
+
+    def _calcula_follow(self):
+        for a in list(self.nao_terminais) + list(self.externos):
+            self.follow[a] = set()
+        mudou = True
+        while mudou:
+            mudou = False
+            for p in self.producoes:
+                for k, s in enumerate(p.corpo):
+                    if self.eh_terminal(s):
+                        continue
+                    f, anulavel = self.first_seq(p.corpo[k + 1:])
+                    if anulavel:
+                        f = f | self.follow[p.cabeca]
+                    if not f <= self.follow[s]:
+                        self.follow[s] |= f
+                        mudou = True
+
+
+def ler_gramatica(texto: str, externos, inicial: Optional[str] = None) -> Gramatica:
+    producoes: List[Producao] = []
+    cabeca = None
+    for linha in texto.splitlines():
+        linha = linha.strip()
+        if not linha:
+            continue
+        if "->" in linha:
+            cabeca, linha = (x.strip() for x in linha.split("->", 1))
+        elif linha.startswith("|"):
+            linha = linha[1:].strip()
+        else:
+            raise ValueError(f"linha de gramática inválida: {linha!r}")
+        if cabeca is None:
+            raise ValueError(f"alternativa sem não-terminal: {linha!r}")
+        acao = "primeiro"
+        if "@" in linha:
+            linha, acao = (x.strip() for x in linha.split("@", 1))
+        # "A | B | C" na mesma linha vira uma produção por alternativa
+        for alt in linha.split("|"):
+            corpo = [s for s in alt.split() if s != EPSILON]
+            producoes.append(Producao(cabeca, corpo, acao))
+    return Gramatica(producoes, externos, inicial or producoes[0].cabeca)
+
+
+# -----------------------------------------------
+# Tabela preditiva
+# -----------------------------------------------
+
+@dataclass
+class TabelaLL1:
+    """
+    Tudo em inteiros. Símbolos: [0, T) terminais, [T, T+N) não-terminais,
+    [T+N, T+N+X) externos; BASE_REDUCAO + p marca o fim da produção p.
+    """
+    gramatica: Gramatica
+    tipos: Dict[str, int]               # tipo de token -> inteiro
+    outro: int                          # tipos que a gramática não usa
+    linhas: List[List[int]]             # linhas[nt][tipo] -> produção ou -1
+    corpos: List[Tuple[int, ...]]       # corpo de cada produção, invertido
+    repasse: List[bool]                 # 'A -> X' sem ação: o valor de X é o de A
+    consome: List[bool]                 # corpo começa por terminal (já casado na escolha)
+    acoes: List[Callable[[Any, List[Any]], Any]]
+    externos: List[Callable[[Any], Any]]
+    sincronizacao: List[FrozenSet[int]] # por não-terminal
+    conflitos: List[str]
+    base_reducao: int
+
+    @property
+    def n_terminais(self) -> int:
+        return len(self.gramatica.terminais) + 1
+
+    def simbolo(self, s: int) -> str:
+        g = self.gramatica
+        T, N = self.n_terminais, len(g.nao_terminais)
+        if s < T:
+            return g.terminais[s] if s < len(g.terminais) else "OUTRO"
+        if s < T + N:
+            return g.nao_terminais[s - T]
+        if s < self.base_reducao:
+            return list(g.externos)[s - T - N]
+        return f"<{g.producoes[s - self.base_reducao]}>"
+
+    def dump(self) -> str:
+        g = self.gramatica
+        out = []
+        for a in g.nao_terminais:
+            out.append(f"{a}:")
+            out.append(f"  FIRST  = {{{', '.join(sorted(g.first[a]))}}}")
+            out.append(f"  FOLLOW = {{{', '.join(sorted(g.follow[a]))}}}")
+            linha = self.linhas[g.nao_terminais.index(a)]
+            por_prod: Dict[int, List[str]] = {}
+            for k, p in enumerate(linha):
+                if p >= 0:
+                    por_prod.setdefault(p, []).append(self.simbolo(k))
+            for p, ts in sorted(por_prod.items()):
+                out.append(f"  {', '.join(sorted(ts))}  =>  {g.producoes[p]}")
+        if self.conflitos:
+            out.append("conflitos (resolvidos pela primeira produção):")
+            out.extend(f"  {c}" for c in self.conflitos)
+        return "\n".join(out)
+
+
+def gerar_tabela(g: Gramatica, acoes: Dict[str, Callable[[Any, List[Any]], Any]]) -> TabelaLL1:
+    tipos = {t: k for k, t in enumerate(g.terminais)}
+    outro = len(g.terminais)
+    T = outro + 1
+    idx_nt = {a: T + k for k, a in enumerate(g.nao_terminais)}
+    N = len(g.nao_terminais)
+    idx_ext = {e: T + N + k for k, e in enumerate(g.externos)}
+    base = T + N + len(g.externos)
+
+    def codigo(s: str) -> int:
+        if s in idx_nt:
+            return idx_nt[s]
+        if s in idx_ext:
+            return idx_ext[s]
+        return tipos[s]
+
+    linhas = [[-1] * T for _ in range(N)]
+    conflitos: List[str] = []
+    for k, p in enumerate(g.producoes):
+        f, anulavel = g.first_seq(p.corpo)
+        if anulavel:
+            f = f | g.follow[p.cabeca]
+        linha = linhas[idx_nt[p.cabeca] - T]
+        for t in sorted(f):
+            atual = linha[tipos[t]]
+            if atual < 0:
+                linha[tipos[t]] = k
+            elif atual != k:
+                conflitos.append(f"{p.cabeca} com {t}: '{g.producoes[atual]}' vence '{p}'")
+
+    faltando = sorted({p.acao for p in g.producoes} - set(acoes))
+    if faltando:
+        raise ValueError(f"ações não definidas: {', '.join(faltando)}")
+
+    sinc_base = {"SEMI", "RBRACE", "EOF"}
+    sincronizacao = [
+        frozenset(tipos[t] for t in (g.first[a] | g.follow[a] | sinc_base) if t in tipos)
+        for a in g.nao_terminais
+    ]
+    return TabelaLL1(
+        gramatica=g,
+        tipos=tipos,
+        outro=outro,
+        linhas=linhas,
+        corpos=[tuple(codigo(s) for s in reversed(p.corpo)) for p in g.producoes],
+        repasse=[len(p.corpo) == 1 and p.acao == "primeiro" for p in g.producoes],
+        consome=[bool(p.corpo) and g.eh_terminal(p.corpo[0]) for p in g.producoes],
+        acoes=[acoes[p.acao] for p in g.producoes],
+        externos=[fn for _, _, fn in g.externos.values()],
+        sincronizacao=sincronizacao,
+        conflitos=conflitos,
+        base_reducao=base,
+    )
+
+
+# -----------------------------------------------
+# Ações semânticas (vals = valores do lado direito, em ordem)
+# -----------------------------------------------
+
+@dataclass
+class _Assinatura:
+    params: List[VarDecl]
+    body: Any
+
+
+@dataclass
+class _Atribuicao:
+    value: Any
+
+
+def _param(tipo: Token, ident: Optional[Token]) -> Optional[VarDecl]:
+    if ident is None:
+        return None
+    return VarDecl(tipo.lex, Var(ident.lex, ident.line, ident.col), None, tipo.line, tipo.col)
+
+
+def _fecha_params(primeiro: Optional[VarDecl], resto: Optional[List[VarDecl]]) -> List[VarDecl]:
+    lista = resto if resto is not None else []
+    if primeiro is not None:
+        lista.append(primeiro)
+    lista.reverse()
+    return lista
+
+
+def _acumula(p, v):
+    # recursão à direita: o último item reduz primeiro, então a lista sai
+    # invertida (append é O(1)); quem consome a lista desinverte
+    lista = v[-1] if v[-1] is not None else []
+    if v[0] is not None:
+        lista.append(v[0])
+    return lista
+
+
+def _programa(p, v):
+    itens = v[0] or []
+    itens.reverse()
+    return Program(itens)
+
+
+def _bloco(p, v):
+    _, stmts, rb = v
+    stmts = stmts or []
+    stmts.reverse()
+    line = rb.line if rb else (stmts[0].line if stmts else 0)
+    col = rb.col if rb else (stmts[0].col if stmts else 0)
+    return Block(stmts, line, col)
+
+
+def _item_tipado(p, v):
+    tipo, ident, resto = v
+    if ident is None or tipo is None:
+        return None
+    if isinstance(resto, _Assinatura):
+        return FuncDef(tipo.lex, ident.lex, resto.params, resto.body, tipo.line, tipo.col)
+    return VarDecl(tipo.lex, Var(ident.lex, ident.line, ident.col), resto, tipo.line, tipo.col)
+
+
+def _decl(p, v):
+    tipo, ident, init = v
+    if ident is None or tipo is None:
+        return None
+    return VarDecl(tipo.lex, Var(ident.lex, ident.line, ident.col), init, tipo.line, tipo.col)
+
+
+def _params_void(p, v):
+    void, resto = v
+    if resto is None:
+        return []  # 'void)': nenhum parâmetro
+    ident, mais = resto
+    return _fecha_params(_param(void, ident), mais)
+
+
+def _params(p, v):
+    tipo, ident, mais = v
+    return _fecha_params(_param(tipo, ident), mais)
+
+
+def _mais_params(p, v):
+    _, tipo, ident, mais = v
+    lista = mais if mais is not None else []
+    par = _param(tipo, ident) if tipo is not None else None
+    if par is not None:
+        lista.append(par)
+    return lista
+
+
+def _se(p, v):
+    iftok, _, test, _, then, otherwise = v
+    return If(test, then, otherwise, iftok.line, iftok.col)
+
+
+def _enquanto(p, v):
+    wt, _, test, _, body = v
+    return While(test, body, wt.line, wt.col)
+
+
+def _como_lista(s: Any) -> List[Any]:
+    if isinstance(s, Block):
+        return list(s.body)
+    return [s] if s is not None else []
+
+
+# Variável da primeira volta do do-while; identificadores com '__' no
+# início são reservados à implementação em C, então não colidem com o
+# programa. Cada do-while declara a sua num bloco próprio.
+PRIMEIRA_VOLTA = "__primeira_volta"
+
+
+def _faca(p, v):
+    # do C while (E)  ==>  { int f = 1; while (f || E) { f = 0; C } }
+    # C aparece uma vez só (copiá-lo dobraria a árvore a cada do-while
+    # aninhado) e continua um comando inteiro: as declarações do bloco
+    # de C não ficam visíveis para E.
+    dt, body, _, _, test, _ = v
+    line, col = dt.line, dt.col
+
+    def primeira() -> Var:
+        return Var(PRIMEIRA_VOLTA, line, col)
+
+    corpo = [Assign(primeira(), Num(0, line, col), line, col)]
+    if body is not None:
+        corpo.append(body)
+    laco = While(BinOp(primeira(), "||", test, line, col), Block(corpo, line, col), line, col)
+    decl = VarDecl("int", primeira(), Num(1, line, col), line, col)
+    return Block([decl, laco], line, col)
+
+
+def _para(p, v):
+    # for (I; C; P) S  ==>  { I  while (C) { S P } }
+    ft, _, init, _, cond, _, passo, _, body = v
+    if cond is None:
+        cond = Num(1, ft.line, ft.col)
+    corpo = _como_lista(body) + ([passo] if passo is not None else [])
+    line = getattr(body, "line", ft.line)
+    col = getattr(body, "col", ft.col)
+    laco = While(cond, Block(corpo, line, col), ft.line, ft.col)
+    if init is None:
+        return laco
+    return Block([init, laco], ft.line, ft.col)
+
+
+def _retorno(p, v):
+    rt, val = v
+    return Return(val, rt.line, rt.col)
+
+
+def _stmt_id(p, v):
+    ident, resto = v
+    if isinstance(resto, _Atribuicao):
+        return Assign(Var(ident.lex, ident.line, ident.col), resto.value, ident.line, ident.col)
+    return resto
+
+
+ACOES_MINIC: Dict[str, Callable[[Any, List[Any]], Any]] = {
+    "primeiro": lambda p, v: v[0] if v else None,
+    "segundo": lambda p, v: v[1],
+    "nada": lambda p, v: None,
+    "vazio": lambda p, v: [],
+    "lista": lambda p, v: v,
+    "acumula": _acumula,
+    "programa": _programa,
+    "bloco": _bloco,
+    "item_tipado": _item_tipado,
+    "assinatura": lambda p, v: _Assinatura(v[1] or [], v[3]),
+    "decl": _decl,
+    "params_void": _params_void,
+    "params": _params,
+    "mais_params": _mais_params,
+    "se": _se,
+    "enquanto": _enquanto,
+    "faca": _faca,
+    "para": _para,
+    "retorno": _retorno,
+    "atribuicao": lambda p, v: _Atribuicao(v[1]),
+    "stmt_id": _stmt_id,
+}
+
+GRAMATICA = ler_gramatica(GRAMATICA_MINIC, EXTERNOS_MINIC)
+TABELA = gerar_tabela(GRAMATICA, ACOES_MINIC)
+
+
+# -----------------------------------------------
+# Driver
+# -----------------------------------------------
+
+class ParserLL1(Parser):
+    """
+    Parser preditivo: um laço só, com pilha de símbolos e pilha de
+    valores. Ao expandir um não-terminal empilha-se um marcador de
+    redução; quando ele sai da pilha, a ação da produção recebe os
+    valores produzidos desde a expansão.
+    """
+
+    def __init__(self, tokens: List[Token], hash_consing: bool = False, tabela: TabelaLL1 = TABELA,
+                 prazo=None):
+        super().__init__(tokens, hash_consing=hash_consing, prazo=prazo)
+        self.tabela = tabela
+        get = tabela.tipos.get
+        outro = tabela.outro
+        self.kinds = [get(t.type, outro) for t in tokens]
+
+    def parse_program(self, jobs: int = 1) -> Tuple[Program, List[str]]:
+        # jobs é aceito por compatibilidade com Parser; o parse é serial
+        itens = self._percorre(guardar=True)
+        while True:
+            try:
+                next(itens)
+            except StopIteration as fim:
+                return fim.value, self.errors
+
+    def iter_top_level(self) -> Iterator[Tuple[Optional[Any], List[str]]]:
+        """
+        Como Parser.iter_top_level: (item, erros) de cada item de topo
+        assim que a tabela termina de reduzi-lo. Os itens não ficam na
+        pilha de valores depois de entregues, então só o maior item
+        precisa caber na memória.
+        """
+        yield from self._percorre(guardar=False)
+
+    def _percorre(self, guardar: bool) -> Iterator[Tuple[Optional[Any], List[str]]]:
+        """
+        O driver da tabela. Gera (item, erros) a cada item de topo pronto
+        e devolve (no StopIteration) o Program, que só tem os itens se
+        guardar=True.
+        """
+        tab = self.tabela
+        g = tab.gramatica
+        T = tab.n_terminais
+        TN = T + len(g.nao_terminais)
+        base = tab.base_reducao
+        linhas, corpos, acoes, externos = tab.linhas, tab.corpos, tab.acoes, tab.externos
+        repasse, consome = tab.repasse, tab.consome
+        restos = [c[:-1] for c in corpos]
+        kinds, tokens = self.kinds, self.tokens
+        eof = tab.tipos["EOF"]
+        # Itens -> Item PontoOpc Itens: ao expandir o Itens de dentro, o
+        # item anterior já foi reduzido e está em valores[-2]
+        itens_nt = T + g.nao_terminais.index("Itens")
+        n_itens = 0
+        n_erros = len(self.errors)
+
+        # linhas indexadas direto pelo código do símbolo
+        linhas = [None] * T + linhas
+        pilha = [T + g.nao_terminais.index(g.inicial)]
+        alturas: List[int] = []
+        valores: List[Any] = []
+        i = self.i  # cópia local; volta para self.i em volta de chamadas
+        while pilha:
+            s = pilha.pop()
+            k = kinds[i]
+            if s < T:
+                if s == k:
+                    valores.append(tokens[i])
+                    if k != eof:
+                        i += 1
+                    self.in_panic = False
+                else:
+                    self.i = i
+                    self._erro_terminal(s)
+                    valores.append(None)
+            elif s < TN:
+                if s == itens_nt:
+                    if n_itens:
+                        item = valores[-2]
+                        if self.prazo is not None:
+                            self.prazo.conferir_item(item)
+                        if item is not None or len(self.errors) > n_erros:
+                            self.i = i
+                            yield item, self.errors[n_erros:]
+                            n_erros = len(self.errors)
+                        if not guardar:
+                            valores[-2] = None   # _acumula ignora None
+                    n_itens += 1
+                p = linhas[s][k]
+                if p < 0:
+                    self.i = i
+                    p = self._recupera(s - T)
+                    i = self.i
+                    if p < 0:
+                        valores.append(None)
+                        continue
+                corpo = corpos[p]
+                if not corpo:
+                    # ε: a ação roda já, sem marcador de redução
+                    valores.append(acoes[p](self, []))
+                elif consome[p]:
+                    # a tabela só escolheu p porque o token atual é o
+                    # primeiro símbolo do corpo: consome sem empilhá-lo
+                    tok = tokens[i]
+                    i += 1
+                    self.in_panic = False
+                    if len(corpo) == 1:
+                        valores.append(tok if repasse[p] else acoes[p](self, [tok]))
+                    else:
+                        pilha.append(base + p)
+                        alturas.append(len(valores))
+                        valores.append(tok)
+                        pilha.extend(restos[p])
+                elif repasse[p]:
+                    pilha.append(corpo[0])
+                else:
+                    pilha.append(base + p)
+                    alturas.append(len(valores))
+                    pilha.extend(corpo)
+            elif s < base:
+                self.i = i
+                valores.append(externos[s - TN](self))
+                i = self.i
+            else:
+                h = alturas.pop()
+                vals = valores[h:]
+                del valores[h:]
+                valores.append(acoes[s - base](self, vals))
+
+        self.i = i
+        if len(self.errors) > n_erros:
+            yield None, self.errors[n_erros:]
+        return valores[0]
+
+    # ---------- erros ----------
+    def _reporta(self, msg: str):
+        # depois de um erro, só volta a reportar quando algum token casar
+        if not self.in_panic:
+            self.report(msg, self.cur())
+        self.in_panic = True
+
+    def _erro_terminal(self, s: int):
+        # terminal ausente: reporta e segue como se tivesse sido inserido
+        self._reporta(f"Esperado {self.human_token(self.tabela.simbolo(s))}")
+
+    def _recupera(self, nt: int) -> int:
+        """
+        Nenhuma alternativa para o token atual: pula tokens até um do
+        conjunto de sincronização do não-terminal. Devolve a produção a
+        usar, ou -1 para desistir dele.
+        """
+        tab = self.tabela
+        nome = tab.gramatica.nao_terminais[nt]
+        esperado = DESCRICOES.get(nome)
+        if esperado is None:
+            esperado = ", ".join(self.human_token(t) for t in sorted(tab.gramatica.first[nome]))
+        self._reporta(f"Esperado {esperado}")
+        if self.prazo is not None:
+            self.prazo.verificar()
+        sinc = tab.sincronizacao[nt]
+        kinds = self.kinds
+        fim = len(kinds) - 1
+        while self.i < fim and kinds[self.i] not in sinc:
+            self.i += 1
+        p = tab.linhas[nt][kinds[self.i]]
+        if p < 0 and self.i < fim and self.cur().type in {"SEMI", "RBRACE"}:
+            # como em synchronize(): consome o ';' ou '}' e desiste do símbolo
+            self.i += 1
+        return p
+
+
+if __name__ == "__main__":
+    print(TABELA.dump())
@@ -1,7 +1,9 @@
 from __future__ import annotations
-from dataclasses import dataclass, is_dataclass
-from typing import List, Optional, Any, Tuple, Dict
+from dataclasses import dataclass, fields, is_dataclass
+from typing import List, Optional, Any, Tuple, Dict, Iterator
+import importlib.util
 import os
+import weakref
 
 # IMPORTA o léxico
 #from analisador_lexico import analisar_lexema, Token as LexToken
@@ -39,11 +41,9 @@ def tokens_from_lexer(lista_lex) -> List[Token]:
 # -----------------------------------------------
 # Visualizador de AST genérico (gera PNG)
 # -----------------------------------------------
-try:
-    import matplotlib.pyplot as plt
-    HAVE_MPL = True
-except Exception:
-    HAVE_MPL = False
+# Só procura o matplotlib: importar o pyplot custa centenas de ms e fica
+# para o primeiro draw_tree (ver saidas.py).
+HAVE_MPL = importlib.util.find_spec("matplotlib") is not None
 
 NodeLike = Any
 
@@ -81,6 +81,8 @@ def node_label(n: NodeLike) -> str:
         return "Text"
     if tname == "CharLit":
         return "Char"
+    if tname == "NoVisao":
+        return n.rotulo
     return tname
 
 
@@ -120,6 +122,8 @@ def children(n: NodeLike) -> List[NodeLike]:
         return [getattr(n, "target", None), getattr(n, "index", None)]
     if tname == "BinOp":
         return [getattr(n, "left", None), getattr(n, "right", None)]
+    if tname == "NoVisao":
+        return list(n.filhos)
 
     # fallback genérico para dataclasses
     if is_dataclass(n):
@@ -138,51 +142,57 @@ def children(n: NodeLike) -> List[NodeLike]:
 
 
 # -------------------------------------------------
-# Layout recursivo (retorna posicoes e largura)
+# Layout (retorna posicoes e largura)
 # -------------------------------------------------
 
 def _compute_layout(
     n: NodeLike, x0=0.0, y0=0.0, y_spacing=1.6
 ) -> Tuple[Dict[int, Tuple[float, float]], float]:
-    ch = [c for c in children(n) if c is not None]
-    if not ch:
-        return ({id(n): (x0, y0)}, 1.0)
+    # Duas passadas iterativas: larguras em pós-ordem e posições de cima
+    # para baixo. Cada nó é posicionado uma única vez (deslocar subárvores
+    # já posicionadas era O(n * profundidade)) e cadeias longas de BinOp
+    # não estouram a recursão.
+    larguras: Dict[int, float] = {}
+    filhos: Dict[int, List[NodeLike]] = {}
+    pilha: List[Tuple[NodeLike, bool]] = [(n, False)]
+    while pilha:
+        no, visitado = pilha.pop()
+        if visitado:
+            ch = filhos[id(no)]
+            if ch:
+                larguras[id(no)] = sum(larguras[id(c)] for c in ch) + (len(ch) - 1) * 0.8
+            else:
+                larguras[id(no)] = 1.0
+        else:
+            ch = [c for c in children(no) if c is not None]
+            filhos[id(no)] = ch
+            pilha.append((no, True))
+            pilha.extend((c, False) for c in ch)
 
     pos: Dict[int, Tuple[float, float]] = {}
-    widths: List[float] = []
-    subs: List[NodeLike] = []
-
-    for c in ch:
-        subpos, w = _compute_layout(c, 0, 0, y_spacing)
-        pos.update(subpos)
-        widths.append(w)
-        subs.append(c)
+    abertos: List[Tuple[NodeLike, float, float]] = [(n, x0, y0)]
+    while abertos:
+        no, x, y = abertos.pop()
+        pos[id(no)] = (x, y)
+        cur_x = x - larguras[id(no)] / 2.0
+        for c in filhos[id(no)]:
+            w = larguras[id(c)]
+            abertos.append((c, cur_x + w / 2.0, y - y_spacing))
+            cur_x += w + 0.8
 
-    total_w = sum(widths) + (len(widths) - 1) * 0.8
-    cur_x = x0 - total_w / 2.0
-
-    def shift(node: NodeLike, dx: float, dy: float):
-        x, y = pos[id(node)]
-        pos[id(node)] = (x + dx, y + dy)
-        for cc in children(node):
-            if cc is not None:
-                shift(cc, dx, dy)
-
-    for c, w in zip(subs, widths):
-        cx = cur_x + w / 2.0
-        shift(c, cx, y0 - y_spacing)
-        cur_x += w + 0.8
-
-    pos[id(n)] = (x0, y0)
-    return pos, total_w
+    return pos, larguras[id(n)]
 
 
 # -----------------------------------------
 # Função principal: salva a árvore em PNG
 # -----------------------------------------
 
-def draw_tree(root: NodeLike, filename: str, figsize=(10, 7), dpi: int = 160):
-    pos, _ = _compute_layout(root, 0.0, 0.0)
+def draw_tree(root: NodeLike, filename: str, figsize=(10, 7), dpi: int = 160, pos=None):
+    # 'pos' permite reaproveitar um layout já calculado (_compute_layout)
+    import matplotlib.pyplot as plt
+
+    if pos is None:
+        pos, _ = _compute_layout(root, 0.0, 0.0)
 
     fig, ax = plt.subplots(figsize=figsize)
     ax.set_axis_off()
@@ -198,7 +208,11 @@ def draw_tree(root: NodeLike, filename: str, figsize=(10, 7), dpi: int = 160):
 
     def draw_nodes(node: NodeLike):
         x, y = pos[id(node)]
-        bbox = dict(boxstyle="round,pad=0.3", fc="white", ec="black", lw=1)
+        if getattr(node, "resumo", False):
+            # nó-resumo (ver renderizacao.colapsar)
+            bbox = dict(boxstyle="round,pad=0.3", fc="#eeeeee", ec="gray", lw=1, ls="--")
+        else:
+            bbox = dict(boxstyle="round,pad=0.3", fc="white", ec="black", lw=1)
         ax.text(
             x,
             y,
@@ -311,7 +325,7 @@ class Var:
 
 @dataclass
 class Num:
-    value: float
+    value: Any              # int ('7') ou float ('7.0', '1e3'), como escrito no fonte
     line: int
     col: int
 
@@ -327,16 +341,90 @@ class CharLit:
     line: int
     col: int
 
+def valor_literal(lexema: str) -> Any:
+    """Valor de uma constante NUM: int sem ponto nem expoente, senão float."""
+    try:
+        return int(lexema)
+    except ValueError:
+        return float(lexema)
+
+
 # Conjunto de sincronização (recuperação de erros)
 SYNC_SET = {"SEMI", "RBRACE", "EOF"}
 
 
+# -----------------------------------------------
+# Hash-consing de expressões
+# Nós de expressão sem efeito colateral e estruturalmente iguais passam a
+# ser a mesma instância. Cada Parser tem a sua tabela: um nó canônico
+# guarda o line/col de onde apareceu primeiro, e isso só faz sentido
+# dentro do mesmo arquivo. A tabela é fraca, então um nó canônico some
+# junto com a última árvore que o usa.
+# -----------------------------------------------
+def _chave_intern(n: Any, tabela: weakref.WeakValueDictionary) -> Optional[tuple]:
+    tipo = type(n)
+    if tipo is Var or tipo is TextLit or tipo is CharLit:
+        return (tipo, n.name if tipo is Var else n.value)
+    if tipo is Num:
+        return (tipo, type(n.value), n.value)
+    if tipo is BinOp:
+        if _canonico(n.left, tabela) and _canonico(n.right, tabela):
+            return (tipo, id(n.left), n.op, id(n.right))
+        return None
+    if tipo is Index:
+        if _canonico(n.target, tabela) and _canonico(n.index, tabela):
+            return (tipo, id(n.target), id(n.index))
+        return None
+    # Call e statements têm efeito colateral (ou identidade própria)
+    return None
+
+
+def _canonico(n: Any, tabela: weakref.WeakValueDictionary) -> bool:
+    # id() de um filho canônico é uma chave estável: o pai canônico o
+    # mantém vivo enquanto a entrada existir na tabela
+    k = _chave_intern(n, tabela)
+    return k is not None and tabela.get(k) is n
+
+
 class Parser:
-    def __init__(self, tokens: List[Token]):
+    def __init__(self, tokens: List[Token], hash_consing: bool = False, prazo=None):
         self.tokens = tokens
         self.i = 0
         self.errors: List[str] = []
         self.in_panic = False
+        # Com hash_consing=True, Var/Num/TextLit/CharLit/BinOp/Index iguais
+        # são compartilhados (a AST vira um DAG e igualdade vira 'is').
+        # O line/col do nó canônico é o da primeira ocorrência no arquivo
+        # (cada Parser tem a sua tabela de canônicos); todas as ocorrências
+        # ficam em self.posicoes[id(no)], que perde a entrada quando o nó
+        # canônico morre (o id pode ser reaproveitado por outro nó). draw_tree
+        # espera uma árvore, então não use este modo para gerar o PNG.
+        self.hash_consing = hash_consing
+        self.tabela_intern: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self.posicoes: Dict[int, List[Tuple[int, int]]] = {}
+        # limites.Prazo do arquivo: conferido a cada item de topo e a cada
+        # recuperação de erro (levanta limites.LimiteExcedido)
+        self.prazo = prazo
+
+    def intern(self, node: Any, inicio: Optional[Token] = None) -> Any:
+        """
+        Devolve a instância canônica de 'node' (ou o próprio nó fora do
+        modo hash-consing). 'inicio' é o primeiro token da ocorrência,
+        usado na tabela de posições quando os filhos já são compartilhados.
+        """
+        if not self.hash_consing:
+            return node
+        k = _chave_intern(node, self.tabela_intern)
+        if k is None:
+            return node
+        canon = self.tabela_intern.get(k)
+        if canon is None:
+            self.tabela_intern[k] = node
+            canon = node
+            weakref.finalize(node, self.posicoes.pop, id(node), None)
+        pos = (inicio.line, inicio.col) if inicio is not None else (node.line, node.col)
+        self.posicoes.setdefault(id(canon), []).append(pos)
+        return canon
 
     # ---------- utilidades de fluxo ----------
     def cur(self) -> Token:
@@ -419,6 +507,8 @@ class Parser:
         return None
 
     def synchronize(self):
+        if self.prazo is not None:
+            self.prazo.verificar()
 
         # modo pânico: avança até um sincronizador; se estiver em ';' ou '}', consome
         while self.cur().type not in SYNC_SET:
@@ -428,13 +518,48 @@ class Parser:
             self.i += 1
 
     # ---------- entrada principal ----------
-    def parse_program(self) -> Tuple[Program, List[str]]:
+    def parse_program(self, jobs: int = 1) -> Tuple[Program, List[str]]:
         """
         Program ::= (Stmt (';' Stmt)*)* EOF
         (na prática: vamos lendo Stmt até EOF,
         consumindo ';' quando existir)
+
+        Com jobs > 1, arquivos grandes são divididos entre itens de topo
+        e cada grupo é analisado em outro processo (ver parse_paralelo).
+        A partir do primeiro grupo com erro a análise continua serial,
+        para a recuperação de erros ser a mesma do parse serial.
+        """
+        if (
+            jobs > 1
+            and self.i == 0
+            and not self.hash_consing
+            and len(self.tokens) >= MIN_TOKENS_PARALELO
+        ):
+            grupos = dividir_itens_topo(self.tokens, jobs * GRUPOS_POR_PROCESSO)
+            if grupos is not None and len(grupos) > 1:
+                body, retomar = parse_paralelo(self.tokens, grupos, jobs)
+                if self.prazo is not None:
+                    # os processos não conferem o prazo
+                    for item in body:
+                        self.prazo.conferir_item(item)
+                if retomar is None:
+                    self.i = len(self.tokens) - 1
+                    return Program(body), self.errors
+                self.i = retomar
+                body.extend(s for s, _ in self.iter_top_level() if s is not None)
+                return Program(body), self.errors
+
+        body = [s for s, _ in self.iter_top_level() if s is not None]
+        return Program(body), self.errors
+
+    def iter_top_level(self) -> Iterator[Tuple[Optional[Any], List[str]]]:
+        """
+        Gera (item, erros) para cada item de topo (FuncDef, VarDecl ou
+        statement) assim que ele termina, com os erros reportados durante
+        ele. Um item perdido na recuperação de erros sai como (None, erros).
+        Quem consome um item por vez e o descarta segura na memória só o
+        maior item, não a AST do arquivo; self.errors continua acumulando.
         """
-        body: List[Any] = []
         while self.cur().type != "EOF":
 
             # Ignora diretivas de pré-processamento no topo
@@ -442,14 +567,16 @@ class Parser:
                 self.i += 1
                 continue
 
+            n_erros = len(self.errors)
             s = self.parse_top_level()
-            if s is not None:
-                body.append(s)
+            if self.prazo is not None:
+                self.prazo.conferir_item(s)
 
             # consome ';' opcional entre statements
             self.match("SEMI")
 
-        return Program(body), self.errors
+            if s is not None or len(self.errors) > n_erros:
+                yield s, self.errors[n_erros:]
     
     # ------------ Decide entre função e declaração global --------
     def parse_top_level(self) -> Optional[Any]:
@@ -647,34 +774,37 @@ class Parser:
         return self.parse_or()
 
     def parse_or(self):
+        t0 = self.cur()
         left = self.parse_and()
         while self.match("OR"):
             op = "||"
             right = self.parse_and()
-            left = BinOp(
+            left = self.intern(BinOp(
                 left,
                 op,
                 right,
                 left.line if hasattr(left, "line") else self.cur().line,
                 getattr(left, "col", self.cur().col),
-            )
+            ), t0)
         return left
 
     def parse_and(self):
+        t0 = self.cur()
         left = self.parse_equality()
         while self.match("AND"):
             op = "&&"
             right = self.parse_equality()
-            left = BinOp(
+            left = self.intern(BinOp(
                 left,
                 op,
                 right,
                 left.line if hasattr(left, "line") else self.cur().line,
                 getattr(left, "col", self.cur().col),
-            )
+            ), t0)
         return left
 
     def parse_equality(self):
+        t0 = self.cur()
         left = self.parse_rel()
         while self.cur().type in {"EQ", "NE"}:
             if self.match("EQ"):
@@ -683,16 +813,17 @@ class Parser:
                 self.consume("NE")
                 op = "!="
             right = self.parse_rel()
-            left = BinOp(
+            left = self.intern(BinOp(
                 left,
                 op,
                 right,
                 left.line if hasattr(left, "line") else self.cur().line,
                 getattr(left, "col", self.cur().col),
-            )
+            ), t0)
         return left
 
     def parse_rel(self):
+        t0 = self.cur()
         left = self.parse_add()
         while self.cur().type in {"LT", "LE", "GT", "GE"}:
             if self.match("LT"):
@@ -705,16 +836,17 @@ class Parser:
                 self.consume("GE")
                 op = ">="
             right = self.parse_add()
-            left = BinOp(
+            left = self.intern(BinOp(
                 left,
                 op,
                 right,
                 left.line if hasattr(left, "line") else self.cur().line,
                 getattr(left, "col", self.cur().col),
-            )
+            ), t0)
         return left
 
     def parse_add(self):
+        t0 = self.cur()
         left = self.parse_mul()
         while self.cur().type in {"PLUS", "MINUS"}:
             if self.match("PLUS"):
@@ -723,16 +855,17 @@ class Parser:
                 self.consume("MINUS")
                 op = "-"
             right = self.parse_mul()
-            left = BinOp(
+            left = self.intern(BinOp(
                 left,
                 op,
                 right,
                 left.line if hasattr(left, "line") else self.cur().line,
                 getattr(left, "col", self.cur().col),
-            )
+            ), t0)
         return left
 
     def parse_mul(self):
+        t0 = self.cur()
         left = self.parse_postfix()
         while self.cur().type in {"TIMES", "DIVIDE", "MOD"}:
             if self.match("TIMES"):
@@ -743,16 +876,17 @@ class Parser:
                 self.consume("MOD")
                 op = "%"
             right = self.parse_postfix()
-            left = BinOp(
+            left = self.intern(BinOp(
                 left,
                 op,
                 right,
                 left.line if hasattr(left, "line") else self.cur().line,
                 getattr(left, "col", self.cur().col),
-            )
+            ), t0)
         return left
 
     def parse_postfix(self):
+        t0 = self.cur()
         node = self.parse_primary()
 
         # Pós-fixos encadeáveis: chamada e indexação
@@ -773,7 +907,7 @@ class Parser:
                 rb = self.expect("RBRACK", "Esperado ']'")
                 line = node.line if hasattr(node, "line") else (rb.line if rb else 0)
                 col = node.col if hasattr(node, "col") else (rb.col if rb else 0)
-                node = Index(node, idx, line, col)
+                node = self.intern(Index(node, idx, line, col), t0)
                 continue
             break
         return node
@@ -781,13 +915,13 @@ class Parser:
     def parse_primary(self):
         t = self.cur()
         if self.match("NUM"):
-            return Num(float(t.lex), t.line, t.col)
+            return self.intern(Num(valor_literal(t.lex), t.line, t.col))
         if self.match("TEXTO"):
-            return TextLit(t.lex, t.line, t.col)
+            return self.intern(TextLit(t.lex, t.line, t.col))
         if self.match("CHAR_LITERAL"):
-            return CharLit(t.lex, t.line, t.col)
+            return self.intern(CharLit(t.lex, t.line, t.col))
         if self.match("ID"):
-            return Var(t.lex, t.line, t.col)
+            return self.intern(Var(t.lex, t.line, t.col))
         if self.match("LPAREN"):
             e = self.parse_E()
             self.expect("RPAREN", "Esperado ')'")
@@ -799,4 +933,173 @@ class Parser:
         )
         self.synchronize()
         # retorna um nó fictício para seguir
-        return Num(0.0, t.line, t.col)
+        return Num(0, t.line, t.col)
+
+
+# -----------------------------------------------
+# Parse paralelo de itens de topo
+# -----------------------------------------------
+
+MIN_TOKENS_PARALELO = 20000
+GRUPOS_POR_PROCESSO = 4
+
+
+def _inicios_de_funcao(tokens: List[Token]) -> Optional[List[Tuple[int, int]]]:
+    """
+    Pré-varredura com balanceamento de chaves: intervalos [a, b) de cada
+    FuncDef de topo ('tipo ID (' ... '{' ... '}'). Devolve None se as
+    chaves não fecham ou se alguma função não tem corpo entre chaves,
+    casos em que a recuperação de erros pode atravessar itens.
+    """
+    tipos = {"INT", "FLOAT", "CHAR", "DOUBLE", "STRING", "VOID"}
+    intervalos: List[Tuple[int, int]] = []
+    n = len(tokens)
+    i = 0
+    while i < n and tokens[i].type != "EOF":
+        t = tokens[i].type
+        if t == "LBRACE" or t == "RBRACE":
+            # chave solta no topo: deixa o parser serial lidar com ela
+            return None
+        if t in tipos and i + 2 < n and tokens[i + 1].type == "ID" and tokens[i + 2].type == "LPAREN":
+            j = i + 3
+            parens = 1
+            while j < n and parens > 0 and tokens[j].type not in ("EOF", "LBRACE", "RBRACE"):
+                if tokens[j].type == "LPAREN":
+                    parens += 1
+                elif tokens[j].type == "RPAREN":
+                    parens -= 1
+                j += 1
+            if parens != 0 or j >= n or tokens[j].type != "LBRACE":
+                return None
+            depth = 0
+            while j < n:
+                tj = tokens[j].type
+                if tj == "LBRACE":
+                    depth += 1
+                elif tj == "RBRACE":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                elif tj == "EOF":
+                    return None
+                j += 1
+            intervalos.append((i, j + 1))
+            i = j + 1
+            continue
+        i += 1
+    return intervalos
+
+
+def dividir_itens_topo(tokens: List[Token], n_grupos: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Agrupa itens de topo consecutivos em até n_grupos intervalos [a, b)
+    de tamanho parecido. Cortes só acontecem logo depois de uma função.
+    """
+    funcoes = _inicios_de_funcao(tokens)
+    if not funcoes:
+        return None
+    fim = len(tokens) - 1  # o EOF não entra em nenhum grupo
+    alvo = max(1, fim // n_grupos)
+    grupos: List[Tuple[int, int]] = []
+    inicio = 0
+    for _, b in funcoes:
+        if b - inicio >= alvo:
+            grupos.append((inicio, b))
+            inicio = b
+    if inicio < fim:
+        grupos.append((inicio, fim))
+    return grupos
+
+
+# Nós voltam dos processos como tuplas aninhadas (classe, campos...):
+# serializar tuplas é bem mais barato que serializar dataclasses.
+_CLASSES_AST = [
+    Program, Block, VarDecl, FuncDef, Assign, If, While, Return,
+    Call, Index, BinOp, Var, Num, TextLit, CharLit,
+]
+_INDICE_CLASSE = {c: k for k, c in enumerate(_CLASSES_AST)}
+_CAMPOS_AST = [[f.name for f in fields(c)] for c in _CLASSES_AST]
+
+
+def _empacota(n: Any) -> Any:
+    k = _INDICE_CLASSE.get(type(n))
+    if k is not None:
+        return (k,) + tuple(_empacota(getattr(n, f)) for f in _CAMPOS_AST[k])
+    if isinstance(n, list):
+        return [_empacota(x) for x in n]
+    return n
+
+
+def _desempacota(x: Any) -> Any:
+    if type(x) is tuple:
+        return _CLASSES_AST[x[0]](*[_desempacota(v) for v in x[1:]])
+    if type(x) is list:
+        return [_desempacota(v) for v in x]
+    return x
+
+
+_TOKENS_DO_PROCESSO: List[Token] = []
+
+
+def _recebe_tokens(tokens: List[Token]):
+    # com o método 'fork' a lista é herdada do pai sem serialização
+    global _TOKENS_DO_PROCESSO
+    _TOKENS_DO_PROCESSO = tokens
+
+
+_BLOCO_DO_PROCESSO = None
+
+
+def _anexa_bloco(nome: str):
+    # tokens num bloco de memória compartilhada: cada processo lê só o seu grupo.
+    # O bloco fica aberto até o processo acabar (quem o remove é o dono).
+    global _TOKENS_DO_PROCESSO, _BLOCO_DO_PROCESSO
+    from tokens_compartilhados import BlocoTokens
+    _BLOCO_DO_PROCESSO = BlocoTokens.abrir(nome)
+    _TOKENS_DO_PROCESSO = _BLOCO_DO_PROCESSO.tokens()
+
+
+def _parse_grupo(intervalo: Tuple[int, int]) -> Tuple[List[Any], List[str]]:
+    a, b = intervalo
+    tokens = _TOKENS_DO_PROCESSO
+    prox = tokens[b]
+    # EOF sintético na posição do primeiro token do grupo seguinte
+    grupo = tokens[a:b] + [Token("EOF", "", prox.line, prox.col)]
+    program, errors = Parser(grupo).parse_program()
+    return _empacota(program.body), errors
+
+
+def parse_paralelo(
+    tokens: List[Token], grupos: List[Tuple[int, int]], jobs: int
+) -> Tuple[List[Any], Optional[int]]:
+    """
+    Analisa cada grupo num processo e devolve (itens, retomar): os itens
+    de topo dos grupos, na ordem do fonte, até o primeiro grupo com erro,
+    e o índice do token onde esse grupo começa (None se nenhum teve
+    erro). Dali em diante quem chama analisa serialmente: no parse
+    serial o modo pânico pode consumir o '}' da função e seguir pelo
+    item seguinte, e dentro do grupo ele pararia no EOF sintético; sem
+    erros, a análise de um grupo é a mesma do parse serial.
+
+    Se os tokens vêm de um bloco de memória compartilhada
+    (tokens_compartilhados), os processos abrem o bloco pelo nome em vez
+    de receber a lista.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    body: List[Any] = []
+    nome_bloco = getattr(tokens, "nome_bloco", None)
+    if nome_bloco is not None:
+        inicializador, args = _anexa_bloco, (nome_bloco,)
+    else:
+        inicializador, args = _recebe_tokens, (tokens,)
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=inicializador, initargs=args
+    ) as pool:
+        for (a, _), (corpo, errs) in zip(grupos, pool.map(_parse_grupo, grupos)):
+            if errs:
+                # os grupos seguintes não servem mais
+                pool.shutdown(wait=True, cancel_futures=True)
+                return body, a
+            body.extend(_desempacota(corpo))
+    return body, None
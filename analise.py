@@ -0,0 +1,46 @@
+from __future__ import annotations
+import contextlib
+import io
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from analisador_lexico import analisar_lexema
+from analisador_sintatico import Parser, Program, tokens_from_lexer
+
+
+@dataclass
+class ResultadoAnalise:
+    """Tudo que as análises léxica e sintática produzem para um arquivo."""
+    tokens: List[Any]                 # tokens do léxico
+    tabela_simbolos: Dict[str, int]
+    program: Optional[Program]
+    erros_lexicos: List[str] = field(default_factory=list)
+    erros_sintaticos: List[str] = field(default_factory=list)
+
+    @property
+    def diagnosticos(self) -> List[str]:
+        return self.erros_lexicos + self.erros_sintaticos
+
+    @property
+    def ok(self) -> bool:
+        return not self.erros_sintaticos
+
+
+def analisar_fonte(codigo: str, jobs: int = 1) -> ResultadoAnalise:
+    """
+    Roda léxico + parser sem imprimir nada: as mensagens que o léxico
+    escreve na saída padrão viram diagnósticos.
+    """
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        lista_tokens, tabela_simbolos = analisar_lexema(codigo, jobs=jobs)
+    erros_lexicos = [l for l in buf.getvalue().splitlines() if l.strip()]
+
+    program, errors = Parser(tokens_from_lexer(lista_tokens)).parse_program(jobs=jobs)
+    return ResultadoAnalise(
+        tokens=lista_tokens,
+        tabela_simbolos=tabela_simbolos,
+        program=program,
+        erros_lexicos=erros_lexicos,
+        erros_sintaticos=list(errors),
+    )
@@ -0,0 +1,542 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from analisador_sintatico import (
+    Program, Block, VarDecl, FuncDef, Assign, If, While, Return,
+    Call, Index, BinOp, Var, Num, TextLit, CharLit,
+)
+from interpretador import decodifica_texto, decodifica_char
+
+
+# -----------------------------------------------
+# Representação: código de três endereços
+# -----------------------------------------------
+
+@dataclass(frozen=True)
+class Const:
+    valor: Any
+
+    def __str__(self) -> str:
+        return repr(self.valor)
+
+
+# Operando: nome de variável/temporário (str) ou constante
+Operando = Union[str, Const]
+
+OPS_BINARIOS = {"+", "-", "*", "/", "%", "<", "<=", ">", ">=", "==", "!="}
+COMUTATIVOS = {"+", "*", "==", "!="}
+PREFIXO_TEMP = "%t"
+
+
+def eh_temp(x: Operando) -> bool:
+    return isinstance(x, str) and x.startswith(PREFIXO_TEMP)
+
+
+def nome_fonte(x: str) -> str:
+    """Nome da variável no código-fonte ('x#2' é o segundo 'x' sombreado)."""
+    return x.split("#", 1)[0]
+
+
+@dataclass
+class Instr:
+    """
+    op:
+      "="      dest = a
+      <binop>  dest = a op b
+      "index"  dest = a[b]
+      "call"   dest = f(args...)   (dest pode ser None)
+    """
+    op: str
+    dest: Optional[str]
+    args: List[Operando]
+    func: Optional[str] = None
+    line: int = 0
+    col: int = 0
+
+    def usos(self) -> List[str]:
+        return [a for a in self.args if isinstance(a, str)]
+
+    def pura(self) -> bool:
+        return self.op != "call"
+
+    def __str__(self) -> str:
+        a = [str(x) for x in self.args]
+        if self.op == "=":
+            rhs = a[0]
+        elif self.op == "index":
+            rhs = f"{a[0]}[{a[1]}]"
+        elif self.op == "call":
+            rhs = f"call {self.func}({', '.join(a)})"
+        else:
+            rhs = f"{a[0]} {self.op} {a[1]}"
+        return f"{self.dest} = {rhs}" if self.dest is not None else rhs
+
+
+@dataclass
+class Jump:
+    alvo: str
+
+    def usos(self) -> List[str]:
+        return []
+
+    def __str__(self) -> str:
+        return f"jump {self.alvo}"
+
+
+@dataclass
+class Branch:
+    cond: Operando
+    entao: str
+    senao: str
+    line: int = 0
+    col: int = 0
+
+    def usos(self) -> List[str]:
+        return [self.cond] if isinstance(self.cond, str) else []
+
+    def __str__(self) -> str:
+        return f"branch {self.cond} ? {self.entao} : {self.senao}"
+
+
+@dataclass
+class Ret:
+    valor: Optional[Operando]
+    line: int = 0
+    col: int = 0
+
+    def usos(self) -> List[str]:
+        return [self.valor] if isinstance(self.valor, str) else []
+
+    def __str__(self) -> str:
+        return "return" if self.valor is None else f"return {self.valor}"
+
+
+Terminador = Union[Jump, Branch, Ret]
+
+
+@dataclass
+class BlocoBasico:
+    rotulo: str
+    instrs: List[Instr] = field(default_factory=list)
+    term: Optional[Terminador] = None
+    # 'int x;' sem valor: (posição em instrs, nome IR). Não gera instrução,
+    # mas num laço a variável perde o valor da volta anterior (fluxo_dados)
+    declaracoes: List[Tuple[int, str]] = field(default_factory=list)
+
+    def sucessores(self) -> List[str]:
+        if isinstance(self.term, Jump):
+            return [self.term.alvo]
+        if isinstance(self.term, Branch):
+            if self.term.entao == self.term.senao:
+                return [self.term.entao]
+            return [self.term.entao, self.term.senao]
+        return []
+
+
+@dataclass
+class FuncaoIR:
+    nome: str
+    params: List[str]
+    blocos: Dict[str, BlocoBasico]   # em ordem de emissão; o primeiro é a entrada
+    line: int = 0
+    col: int = 0
+    locais: List[str] = field(default_factory=list)  # nomes IR declarados, parâmetros inclusive
+
+    @property
+    def entrada(self) -> str:
+        return next(iter(self.blocos))
+
+    def predecessores(self) -> Dict[str, List[str]]:
+        pred: Dict[str, List[str]] = {r: [] for r in self.blocos}
+        for b in self.blocos.values():
+            for s in b.sucessores():
+                pred[s].append(b.rotulo)
+        return pred
+
+    def dump(self) -> str:
+        linhas = [f"func {self.nome}({', '.join(self.params)}):"]
+        for b in self.blocos.values():
+            linhas.append(f"  {b.rotulo}:")
+            for ins in b.instrs:
+                linhas.append(f"    {ins}")
+            linhas.append(f"    {b.term}")
+        return "\n".join(linhas)
+
+
+@dataclass
+class ModuloIR:
+    funcoes: List[FuncaoIR]
+    globais: Set[str]
+
+    def dump(self) -> str:
+        cab = f"globals: {', '.join(sorted(self.globais)) or '-'}"
+        return "\n\n".join([cab] + [f.dump() for f in self.funcoes])
+
+
+# -----------------------------------------------
+# Geração: AST -> IR
+# -----------------------------------------------
+
+class _Construtor:
+    def __init__(self, nome: str, globais: Set[str]):
+        self.nome = nome
+        self.globais = globais
+        self.blocos: Dict[str, BlocoBasico] = {}
+        self.atual: BlocoBasico = self.novo_bloco()
+        self.n_temps = 0
+        self.escopos: List[Dict[str, str]] = [{}]
+        self.contagem: Dict[str, int] = {}
+        self.locais: List[str] = []
+
+    def novo_bloco(self) -> BlocoBasico:
+        b = BlocoBasico(f"B{len(self.blocos)}")
+        self.blocos[b.rotulo] = b
+        return b
+
+    def temp(self) -> str:
+        self.n_temps += 1
+        return f"{PREFIXO_TEMP}{self.n_temps}"
+
+    def emit(self, ins: Instr):
+        self.atual.instrs.append(ins)
+
+    def fecha(self, term: Terminador, proximo: Optional[BlocoBasico] = None):
+        if self.atual.term is None:
+            self.atual.term = term
+        # depois de um terminador, o código segue em outro bloco
+        self.atual = proximo if proximo is not None else self.novo_bloco()
+
+    def declara(self, nome: str) -> str:
+        n = self.contagem.get(nome, 0) + 1
+        self.contagem[nome] = n
+        ir = nome if n == 1 else f"{nome}#{n}"
+        self.escopos[-1][nome] = ir
+        self.locais.append(ir)
+        return ir
+
+    def resolve(self, nome: str) -> str:
+        for esc in reversed(self.escopos):
+            if nome in esc:
+                return esc[nome]
+        return nome  # global (ou não declarada)
+
+
+class GeradorIR:
+    def gerar(self, program: Program) -> ModuloIR:
+        globais: Set[str] = set()
+        for item in program.body:
+            if isinstance(item, VarDecl):
+                globais.add(item.name.name)
+
+        funcoes: List[FuncaoIR] = []
+        topo = [item for item in program.body if not isinstance(item, FuncDef)]
+        if topo:
+            c = _Construtor("<topo>", globais)
+            c.escopos.append({})  # globais não são renomeadas
+            for s in topo:
+                self.stmt(c, s, topo=True)
+            if c.atual.term is None:
+                c.atual.term = Ret(None)
+            funcoes.append(self._finaliza(c, [], 0, 0))
+
+        for item in program.body:
+            if isinstance(item, FuncDef):
+                c = _Construtor(item.name, globais)
+                params = [c.declara(p.name.name) for p in item.params]
+                self.stmt(c, item.body)
+                # cair no fim da função equivale a 'return;'
+                if c.atual.term is None:
+                    c.atual.term = Ret(None, item.line, item.col)
+                funcoes.append(self._finaliza(c, params, item.line, item.col))
+        return ModuloIR(funcoes, globais)
+
+    def _finaliza(self, c: _Construtor, params: List[str], line: int, col: int) -> FuncaoIR:
+        # blocos abertos depois de um 'return' ficam sem terminador
+        for b in c.blocos.values():
+            if b.term is None:
+                b.term = Ret(None)
+        return FuncaoIR(c.nome, params, c.blocos, line, col, c.locais)
+
+    # ---------- statements ----------
+    def stmt(self, c: _Construtor, s: Any, topo: bool = False):
+        if s is None:
+            return
+        if isinstance(s, Block):
+            c.escopos.append({})
+            for st in s.body:
+                self.stmt(c, st)
+            c.escopos.pop()
+        elif isinstance(s, VarDecl):
+            dest = s.name.name if topo else c.declara(s.name.name)
+            if s.init is not None:
+                self.atribui(c, dest, s.init, s.line, s.col)
+            elif topo:
+                # globais em C começam zeradas
+                c.emit(Instr("=", dest, [Const(0)], line=s.line, col=s.col))
+            else:
+                c.atual.declaracoes.append((len(c.atual.instrs), dest))
+        elif isinstance(s, Assign):
+            self.atribui(c, c.resolve(s.target.name), s.value, s.line, s.col)
+        elif isinstance(s, If):
+            entao = c.novo_bloco()
+            senao = c.novo_bloco() if s.otherwise is not None else None
+            fim = c.novo_bloco()
+            if senao is None:
+                senao = fim
+            self.cond(c, s.test, entao.rotulo, senao.rotulo)
+            c.atual = entao
+            self.stmt(c, s.then)
+            c.fecha(Jump(fim.rotulo), senao if s.otherwise is not None else fim)
+            if s.otherwise is not None:
+                self.stmt(c, s.otherwise)
+                c.fecha(Jump(fim.rotulo), fim)
+        elif isinstance(s, While):
+            teste = c.novo_bloco()
+            corpo = c.novo_bloco()
+            fim = c.novo_bloco()
+            c.fecha(Jump(teste.rotulo), teste)
+            self.cond(c, s.test, corpo.rotulo, fim.rotulo)
+            c.atual = corpo
+            self.stmt(c, s.body)
+            c.fecha(Jump(teste.rotulo), fim)
+        elif isinstance(s, Return):
+            v = self.expr(c, s.value) if s.value is not None else None
+            c.fecha(Ret(v, s.line, s.col))
+        else:
+            self.expr(c, s, descarta=True)
+
+    def atribui(self, c: _Construtor, dest: str, e: Any, line: int, col: int):
+        v = self.expr(c, e)
+        ult = c.atual.instrs[-1] if c.atual.instrs else None
+        # evita 't = ...; x = t': o resultado vai direto para o destino
+        if ult is not None and eh_temp(v) and ult.dest == v:
+            ult.dest = dest
+            ult.line, ult.col = line, col
+        else:
+            c.emit(Instr("=", dest, [v], line=line, col=col))
+
+    def cond(self, c: _Construtor, e: Any, se_v: str, se_f: str):
+        """Desvia para se_v/se_f; && e || viram desvios (curto-circuito)."""
+        if isinstance(e, BinOp) and e.op in ("&&", "||"):
+            meio = c.novo_bloco()
+            if e.op == "&&":
+                self.cond(c, e.left, meio.rotulo, se_f)
+            else:
+                self.cond(c, e.left, se_v, meio.rotulo)
+            c.atual = meio
+            self.cond(c, e.right, se_v, se_f)
+            return
+        v = self.expr(c, e)
+        # quem chama escolhe o próximo bloco; não abre um bloco novo aqui
+        c.atual.term = Branch(v, se_v, se_f, getattr(e, "line", 0), getattr(e, "col", 0))
+
+    # ---------- expressões ----------
+    def expr(self, c: _Construtor, e: Any, descarta: bool = False) -> Operando:
+        if isinstance(e, Num):
+            return Const(e.value)
+        if isinstance(e, TextLit):
+            return Const(decodifica_texto(e.value))
+        if isinstance(e, CharLit):
+            return Const(decodifica_char(e.value))
+        if isinstance(e, Var):
+            return c.resolve(e.name)
+        if isinstance(e, BinOp):
+            if e.op in ("&&", "||"):
+                t = c.temp()
+                v, f, fim = c.novo_bloco(), c.novo_bloco(), c.novo_bloco()
+                self.cond(c, e, v.rotulo, f.rotulo)
+                c.atual = v
+                c.emit(Instr("=", t, [Const(1)], line=e.line, col=e.col))
+                c.fecha(Jump(fim.rotulo), f)
+                c.emit(Instr("=", t, [Const(0)], line=e.line, col=e.col))
+                c.fecha(Jump(fim.rotulo), fim)
+                return t
+            a = self.expr(c, e.left)
+            b = self.expr(c, e.right)
+            t = c.temp()
+            c.emit(Instr(e.op, t, [a, b], line=e.line, col=e.col))
+            return t
+        if isinstance(e, Index):
+            a = self.expr(c, e.target)
+            b = self.expr(c, e.index)
+            t = c.temp()
+            c.emit(Instr("index", t, [a, b], line=e.line, col=e.col))
+            return t
+        if isinstance(e, Call):
+            nome = e.callee.name if isinstance(e.callee, Var) else "?"
+            args = [self.expr(c, a) for a in e.args]
+            t = None if descarta else c.temp()
+            c.emit(Instr("call", t, args, func=nome, line=e.line, col=e.col))
+            return t if t is not None else Const(None)
+        raise ValueError(f"expressão não suportada: {type(e).__name__}")
+
+
+def gerar_ir(program: Program) -> ModuloIR:
+    return GeradorIR().gerar(program)
+
+
+# -----------------------------------------------
+# Passos de otimização
+# Cada passo devolve a lista de alterações feitas (vazia = nada mudou)
+# -----------------------------------------------
+
+def remover_blocos_inalcancaveis(f: FuncaoIR) -> List[str]:
+    alteracoes: List[str] = []
+    # desvio sobre constante vira salto incondicional
+    for b in f.blocos.values():
+        t = b.term
+        if isinstance(t, Branch) and isinstance(t.cond, Const):
+            alvo = t.entao if t.cond.valor != 0 else t.senao
+            b.term = Jump(alvo)
+            alteracoes.append(f"{b.rotulo}: desvio constante -> jump {alvo}")
+
+    vistos: Set[str] = set()
+    pilha = [f.entrada]
+    while pilha:
+        r = pilha.pop()
+        if r in vistos:
+            continue
+        vistos.add(r)
+        pilha.extend(f.blocos[r].sucessores())
+    for r in list(f.blocos):
+        if r not in vistos:
+            del f.blocos[r]
+            alteracoes.append(f"{r}: bloco inalcançável removido")
+    return alteracoes
+
+
+def eliminar_codigo_morto(f: FuncaoIR, globais: Set[str]) -> List[str]:
+    """Remove instruções puras cujo destino nunca é lido (exceto globais)."""
+    alteracoes: List[str] = []
+    mudou = True
+    while mudou:
+        mudou = False
+        usados: Set[str] = set()
+        for b in f.blocos.values():
+            for ins in b.instrs:
+                usados.update(ins.usos())
+            usados.update(b.term.usos())
+        for b in f.blocos.values():
+            mantidas = []
+            nova_posicao = []
+            for ins in b.instrs:
+                nova_posicao.append(len(mantidas))
+                if ins.dest is not None and ins.dest not in usados and ins.dest not in globais:
+                    if ins.pura():
+                        alteracoes.append(f"{b.rotulo}: removido '{ins}'")
+                        mudou = True
+                        continue
+                    if ins.dest is not None:
+                        # chamada tem efeito colateral: só descarta o resultado
+                        alteracoes.append(f"{b.rotulo}: resultado de '{ins}' descartado")
+                        ins.dest = None
+                mantidas.append(ins)
+            nova_posicao.append(len(mantidas))
+            b.instrs = mantidas
+            b.declaracoes = [(nova_posicao[k], v) for k, v in b.declaracoes]
+    return alteracoes
+
+
+def _substitui(x: Operando, mapa: Dict[str, Operando]) -> Operando:
+    return mapa.get(x, x) if isinstance(x, str) else x
+
+
+def propagar_copias(f: FuncaoIR, globais: Set[str]) -> List[str]:
+    """Propagação local de cópias e constantes ('x = y' / 'x = 3')."""
+    alteracoes: List[str] = []
+    for b in f.blocos.values():
+        copias: Dict[str, Operando] = {}
+
+        def invalida(nome: str):
+            copias.pop(nome, None)
+            for k in [k for k, v in copias.items() if v == nome]:
+                del copias[k]
+
+        for ins in b.instrs:
+            novos = [_substitui(a, copias) for a in ins.args]
+            if novos != ins.args:
+                alteracoes.append(f"{b.rotulo}: '{ins}' -> args {', '.join(map(str, novos))}")
+                ins.args = novos
+            if ins.op == "call":
+                # a função chamada pode alterar qualquer global
+                for g in globais:
+                    invalida(g)
+            if ins.dest is not None:
+                invalida(ins.dest)
+                if ins.op == "=" and ins.args[0] != ins.dest:
+                    copias[ins.dest] = ins.args[0]
+        t = b.term
+        if isinstance(t, Branch) and isinstance(t.cond, str) and t.cond in copias:
+            alteracoes.append(f"{b.rotulo}: condição {t.cond} -> {copias[t.cond]}")
+            t.cond = copias[t.cond]
+        if isinstance(t, Ret) and isinstance(t.valor, str) and t.valor in copias:
+            alteracoes.append(f"{b.rotulo}: retorno {t.valor} -> {copias[t.valor]}")
+            t.valor = copias[t.valor]
+    return alteracoes
+
+
+def eliminar_subexpressoes_comuns(f: FuncaoIR, globais: Set[str]) -> List[str]:
+    """CSE local: reaproveita 'a op b' já calculado no mesmo bloco."""
+    alteracoes: List[str] = []
+    for b in f.blocos.values():
+        disponiveis: Dict[Tuple, str] = {}
+        for ins in b.instrs:
+            chave = None
+            if ins.op in OPS_BINARIOS or ins.op == "index":
+                args = tuple(ins.args)
+                if ins.op in COMUTATIVOS:
+                    args = tuple(sorted(args, key=lambda x: (isinstance(x, Const), str(x))))
+                chave = (ins.op, args)
+                anterior = disponiveis.get(chave)
+                if anterior is not None and anterior != ins.dest:
+                    alteracoes.append(f"{b.rotulo}: '{ins}' reaproveita {anterior}")
+                    ins.op, ins.args = "=", [anterior]
+                    chave = None
+
+            mortos: Set[str] = set()
+            if ins.dest is not None:
+                mortos.add(ins.dest)
+            if ins.op == "call":
+                mortos |= globais
+            if mortos:
+                for k in [k for k, v in disponiveis.items()
+                          if v in mortos or any(a in mortos for a in k[1])]:
+                    del disponiveis[k]
+            if chave is not None and ins.dest not in chave[1]:
+                disponiveis[chave] = ins.dest
+    return alteracoes
+
+
+@dataclass
+class RelatorioPasso:
+    funcao: str
+    passo: str
+    alteracoes: List[str]
+
+    def __str__(self) -> str:
+        cab = f"[{self.funcao}] {self.passo}: {len(self.alteracoes)} alteração(ões)"
+        return "\n".join([cab] + [f"  - {a}" for a in self.alteracoes])
+
+
+def otimizar(modulo: ModuloIR, max_rodadas: int = 10) -> List[RelatorioPasso]:
+    """Aplica os passos até nenhum mudar nada; devolve o que cada um fez."""
+    relatorios: List[RelatorioPasso] = []
+    g = modulo.globais
+    passos = [
+        ("blocos inalcançáveis", lambda f: remover_blocos_inalcancaveis(f)),
+        ("propagação de cópias", lambda f: propagar_copias(f, g)),
+        ("subexpressões comuns", lambda f: eliminar_subexpressoes_comuns(f, g)),
+        ("código morto", lambda f: eliminar_codigo_morto(f, g)),
+    ]
+    for f in modulo.funcoes:
+        for _ in range(max_rodadas):
+            mudou = False
+            for nome, passo in passos:
+                alteracoes = passo(f)
+                if alteracoes:
+                    relatorios.append(RelatorioPasso(f.nome, nome, alteracoes))
+                    mudou = True
+            if not mudou:
+                break
+    return relatorios
@@ -0,0 +1,345 @@
+from __future__ import annotations
+import sys
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from analisador_sintatico import (
+    Program, Block, VarDecl, FuncDef, Assign, If, While, Return,
+    Call, Index, BinOp, Var, Num, TextLit, CharLit,
+)
+from hash_estrutural import hash_estrutural
+from interpretador import (
+    ErroExecucao, BUILTINS, PILHA_EXCEDIDA, TIPOS_INTEIROS, TIPOS_REAIS,
+    c_div, c_mod, c_index, decodifica_texto, decodifica_char,
+)
+
+
+class ErroCompilacao(Exception):
+    """Programa que não pode ser traduzido para Python."""
+
+
+# -----------------------------------------------
+# Geração de código Python
+# -----------------------------------------------
+
+OPS_PYTHON = {"+": "+", "-": "-", "*": "*", "<": "<", "<=": "<=",
+              ">": ">", ">=": ">=", "==": "==", "!=": "!="}
+COMPARACOES = {"<", "<=", ">", ">=", "==", "!="}
+# precedência dos operadores aritméticos que saem como operador do Python
+PRECEDENCIA = {"+": 1, "-": 1, "*": 2}
+
+
+class _Funcao:
+    """Estado de geração de uma função: escopos de bloco e nomes únicos."""
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.linhas: List[str] = []
+        self.escopos: List[Dict[str, Tuple[str, str]]] = [{}]
+        self.globais_escritas: set = set()
+        self._n = 0
+
+    def declara(self, nome: str, tipo: str) -> str:
+        # C permite sombrear variáveis em blocos internos; em Python
+        # cada declaração vira um local com nome próprio
+        self._n += 1
+        py = f"v{self._n}_{nome}"
+        self.escopos[-1][nome] = (py, tipo)
+        return py
+
+    def resolve(self, nome: str) -> Optional[Tuple[str, str]]:
+        for esc in reversed(self.escopos):
+            if nome in esc:
+                return esc[nome]
+        return None
+
+
+class GeradorPython:
+    """
+    Traduz um Program em código-fonte Python: cada FuncDef vira um 'def',
+    locais viram locais do Python, While vira 'while' e chamadas
+    referenciam diretamente a função gerada.
+    """
+
+    def __init__(self):
+        self.globais: Dict[str, Tuple[str, str]] = {}
+        self.funcoes: Dict[str, FuncDef] = {}
+
+    def gerar(self, program: Program) -> str:
+        for item in program.body:
+            if isinstance(item, FuncDef):
+                if item.name in self.funcoes:
+                    raise ErroCompilacao(f"função '{item.name}' redefinida @ {item.line}:{item.col}")
+                self.funcoes[item.name] = item
+
+        partes: List[str] = []
+        init = _Funcao("<topo>")
+        for item in program.body:
+            if not isinstance(item, FuncDef):
+                self.stmt(init, item, 1, topo=True)
+        partes.append(self._def("_inicializa", [], init))
+
+        for f in self.funcoes.values():
+            fn = _Funcao(f.name)
+            params = []
+            for p in f.params:
+                py = fn.declara(p.name.name, p.vartype)
+                params.append(py)
+                if p.vartype in TIPOS_INTEIROS:
+                    fn.linhas.append(f"    {py} = _int({py})")
+                elif p.vartype in TIPOS_REAIS:
+                    fn.linhas.append(f"    {py} = _float({py})")
+            self.stmt(fn, f.body, 1)
+            partes.append(self._def(f"f_{f.name}", params, fn))
+        return "\n\n".join(partes) + "\n"
+
+    def _def(self, nome: str, params: List[str], fn: _Funcao) -> str:
+        cab = [f"def {nome}({', '.join(params)}):"]
+        if fn.globais_escritas:
+            cab.append(f"    global {', '.join(sorted(fn.globais_escritas))}")
+        corpo = fn.linhas or ["    pass"]
+        return "\n".join(cab + corpo)
+
+    # ---------- statements ----------
+    def stmt(self, fn: _Funcao, s: Any, nivel: int, topo: bool = False):
+        ind = "    " * nivel
+        if s is None:
+            return
+        if isinstance(s, Block):
+            fn.escopos.append({})
+            for st in s.body:
+                self.stmt(fn, st, nivel)
+            fn.escopos.pop()
+        elif isinstance(s, VarDecl):
+            valor = self.expr(fn, s.init) if s.init is not None else "0"
+            valor = self.converte(fn, s.vartype, s.init, valor)
+            if topo:
+                py = f"g_{s.name.name}"
+                self.globais[s.name.name] = (py, s.vartype)
+                fn.globais_escritas.add(py)
+            else:
+                py = fn.declara(s.name.name, s.vartype)
+            fn.linhas.append(f"{ind}{py} = {valor}")
+        elif isinstance(s, Assign):
+            py, tipo = self.resolve(fn, s.target)
+            valor = self.converte(fn, tipo, s.value, self.expr(fn, s.value))
+            fn.linhas.append(f"{ind}{py} = {valor}")
+        elif isinstance(s, If):
+            fn.linhas.append(f"{ind}if {self.cond(fn, s.test)}:")
+            self.corpo(fn, s.then, nivel + 1)
+            if s.otherwise is not None:
+                fn.linhas.append(f"{ind}else:")
+                self.corpo(fn, s.otherwise, nivel + 1)
+        elif isinstance(s, While):
+            fn.linhas.append(f"{ind}while {self.cond(fn, s.test)}:")
+            self.corpo(fn, s.body, nivel + 1)
+        elif isinstance(s, Return):
+            if s.value is None:
+                fn.linhas.append(f"{ind}return None")
+            else:
+                valor = self.expr(fn, s.value)
+                f = self.funcoes.get(fn.nome)
+                if f is not None:
+                    valor = self.converte(fn, f.rettype, s.value, valor)
+                fn.linhas.append(f"{ind}return {valor}")
+        else:
+            fn.linhas.append(f"{ind}{self.expr(fn, s)}")
+
+    def corpo(self, fn: _Funcao, s: Any, nivel: int):
+        antes = len(fn.linhas)
+        self.stmt(fn, s, nivel)
+        if len(fn.linhas) == antes:
+            fn.linhas.append("    " * nivel + "pass")
+
+    def resolve(self, fn: _Funcao, v: Var) -> Tuple[str, str]:
+        r = fn.resolve(v.name)
+        if r is not None:
+            return r
+        g = self.globais.get(v.name)
+        if g is None:
+            raise ErroCompilacao(f"variável '{v.name}' não declarada @ {v.line}:{v.col}")
+        fn.globais_escritas.add(g[0])
+        return g
+
+    def converte(self, fn: _Funcao, tipo: str, e: Any, valor: str) -> str:
+        """Código de 'valor' (a expressão 'e') convertido para o tipo de quem o recebe."""
+        if tipo in TIPOS_INTEIROS and not self.eh_int(fn, e):
+            return f"_int({valor})"
+        if tipo in TIPOS_REAIS and not self.eh_float(fn, e):
+            return f"_float({valor})"
+        return valor
+
+    def eh_int(self, fn: _Funcao, e: Any) -> bool:
+        """Inferência estática: a expressão produz sempre um int?"""
+        if e is None:
+            return True
+        if isinstance(e, Num):
+            return type(e.value) is int
+        if isinstance(e, CharLit):
+            return True
+        if isinstance(e, Var):
+            r = fn.resolve(e.name) or self.globais.get(e.name)
+            return r is not None and r[1] in TIPOS_INTEIROS
+        if isinstance(e, BinOp):
+            if e.op in ("+", "-", "*", "/", "%"):
+                return self.eh_int(fn, e.left) and self.eh_int(fn, e.right)
+            return True
+        if isinstance(e, Call) and isinstance(e.callee, Var):
+            f = self.funcoes.get(e.callee.name)
+            return f is not None and f.rettype in TIPOS_INTEIROS
+        return False
+
+    def eh_float(self, fn: _Funcao, e: Any) -> bool:
+        """Inferência estática: a expressão produz sempre um float?"""
+        if isinstance(e, Num):
+            return type(e.value) is float
+        if isinstance(e, Var):
+            r = fn.resolve(e.name) or self.globais.get(e.name)
+            return r is not None and r[1] in TIPOS_REAIS
+        if isinstance(e, BinOp):
+            if e.op in ("+", "-", "*", "/", "%"):
+                return self.eh_float(fn, e.left) or self.eh_float(fn, e.right)
+            return False
+        if isinstance(e, Call) and isinstance(e.callee, Var):
+            f = self.funcoes.get(e.callee.name)
+            return f is not None and f.rettype in TIPOS_REAIS
+        return False
+
+    # ---------- expressões ----------
+    @staticmethod
+    def _sem_parenteses(filho: Any, op: str, esquerdo: bool) -> bool:
+        """O código de 'filho', operando de 'op', pode perder os parênteses de fora?"""
+        if not (isinstance(filho, BinOp) and filho.op in PRECEDENCIA and op in PRECEDENCIA):
+            return False
+        if esquerdo:
+            return PRECEDENCIA[filho.op] >= PRECEDENCIA[op]
+        return PRECEDENCIA[filho.op] > PRECEDENCIA[op]
+
+    def cond(self, fn: _Funcao, e: Any) -> str:
+        """Expressão em contexto booleano (if/while): sem conversão para 0/1."""
+        if isinstance(e, BinOp):
+            if e.op in COMPARACOES:
+                return f"{self.expr(fn, e.left)} {OPS_PYTHON[e.op]} {self.expr(fn, e.right)}"
+            if e.op == "&&":
+                return f"({self.cond(fn, e.left)}) and ({self.cond(fn, e.right)})"
+            if e.op == "||":
+                return f"({self.cond(fn, e.left)}) or ({self.cond(fn, e.right)})"
+        return f"{self.expr(fn, e)} != 0"
+
+    def expr(self, fn: _Funcao, e: Any) -> str:
+        if isinstance(e, Num):
+            return repr(e.value)
+        if isinstance(e, Var):
+            r = fn.resolve(e.name) or self.globais.get(e.name)
+            if r is None:
+                raise ErroCompilacao(f"variável '{e.name}' não declarada @ {e.line}:{e.col}")
+            return r[0]
+        if isinstance(e, BinOp):
+            if e.op in COMPARACOES or e.op in ("&&", "||"):
+                return f"(1 if {self.cond(fn, e)} else 0)"
+            a = self.expr(fn, e.left)
+            b = self.expr(fn, e.right)
+            if e.op in ("/", "%"):
+                helper = "_div" if e.op == "/" else "_mod"
+                if (
+                    isinstance(e.left, (Var, Num))
+                    and isinstance(e.right, (Var, Num))
+                    and self.eh_int(fn, e)
+                ):
+                    # operandos simples e inteiros: para a >= 0 e b > 0 o
+                    # operador do Python já coincide com o de C
+                    py = "//" if e.op == "/" else "%"
+                    return f"({a} {py} {b} if {a} >= 0 and {b} > 0 else {helper}({a}, {b}))"
+                return f"{helper}({a}, {b})"
+            if e.op in OPS_PYTHON:
+                # o Python recusa mais de 200 parênteses aninhados: o lado
+                # esquerdo de mesma precedência (a + b + c) e o direito de
+                # precedência maior (a + b * c) dispensam os seus
+                if self._sem_parenteses(e.left, e.op, True):
+                    a = a[1:-1]
+                if self._sem_parenteses(e.right, e.op, False):
+                    b = b[1:-1]
+                return f"({a} {OPS_PYTHON[e.op]} {b})"
+            raise ErroCompilacao(f"operador desconhecido '{e.op}' @ {e.line}:{e.col}")
+        if isinstance(e, Call):
+            if not isinstance(e.callee, Var):
+                raise ErroCompilacao(f"chamada indireta não suportada @ {e.line}:{e.col}")
+            nome = e.callee.name
+            args = [self.expr(fn, a) for a in e.args]
+            f = self.funcoes.get(nome)
+            if f is not None:
+                if len(args) != len(f.params):
+                    raise ErroCompilacao(
+                        f"'{nome}' espera {len(f.params)} argumento(s), "
+                        f"recebeu {len(args)} @ {e.line}:{e.col}"
+                    )
+                return f"f_{nome}({', '.join(args)})"
+            if nome in BUILTINS:
+                return f"_b_{nome}(_saida, [{', '.join(args)}])"
+            raise ErroCompilacao(f"função '{nome}' não definida @ {e.line}:{e.col}")
+        if isinstance(e, Index):
+            return f"_index({self.expr(fn, e.target)}, {self.expr(fn, e.index)})"
+        if isinstance(e, TextLit):
+            return repr(decodifica_texto(e.value))
+        if isinstance(e, CharLit):
+            return repr(decodifica_char(e.value))
+        raise ErroCompilacao(f"expressão não suportada: {type(e).__name__}")
+
+
+# -----------------------------------------------
+# Compilação com cache por hash da AST
+# -----------------------------------------------
+
+class ProgramaCompilado:
+    def __init__(self, fonte: str, codigo):
+        self.fonte = fonte
+        self.codigo = codigo
+
+    def executar(self, entrada: str = "main", args: Optional[List[Any]] = None, saida=None) -> Any:
+        ns: Dict[str, Any] = {
+            "_saida": saida if saida is not None else sys.stdout,
+            "_int": int,
+            "_float": float,
+            "_div": c_div,
+            "_mod": c_mod,
+            "_index": c_index,
+        }
+        for nome, fn in BUILTINS.items():
+            ns[f"_b_{nome}"] = fn
+        exec(self.codigo, ns)
+        f = ns.get(f"f_{entrada}")
+        if f is None:
+            raise ErroExecucao(f"função '{entrada}' não definida")
+        try:
+            ns["_inicializa"]()
+            return f(*(args or []))
+        except RecursionError:
+            raise ErroExecucao(PILHA_EXCEDIDA) from None
+
+
+_CACHE: "OrderedDict[str, ProgramaCompilado]" = OrderedDict()
+TAMANHO_CACHE = 64
+
+
+def compilar(program: Program) -> ProgramaCompilado:
+    """Gera e compila o módulo Python; reaproveita o resultado para ASTs iguais."""
+    chave = hash_estrutural(program)
+    pc = _CACHE.get(chave)
+    if pc is not None:
+        _CACHE.move_to_end(chave)
+        return pc
+    try:
+        fonte = GeradorPython().gerar(program)
+        pc = ProgramaCompilado(fonte, compile(fonte, "<mini-c>", "exec"))
+    except RecursionError:
+        # tanto o gerador quanto o compile() do Python descem um nível
+        # de pilha por nível de aninhamento
+        raise ErroCompilacao(f"{PILHA_EXCEDIDA} ao compilar: programa aninhado fundo demais") from None
+    _CACHE[chave] = pc
+    if len(_CACHE) > TAMANHO_CACHE:
+        _CACHE.popitem(last=False)
+    return pc
+
+
+def executar(program: Program, entrada: str = "main", saida=None) -> Any:
+    return compilar(program).executar(entrada, saida=saida)
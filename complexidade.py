@@ -0,0 +1,290 @@
+"""
+Suíte de complexidade: entradas patológicas em tamanhos que dobram.
+
+Cada caso gera uma entrada adversária de tamanho n (linha enorme,
+identificador/literal gigante, '#' no meio da linha, comentário de um
+milhão de linhas, aninhamento profundo, cadeia longa de operadores) e
+cronometra uma fase (léxico, parser ou layout) em n, 2n, 4n, ...
+O expoente estimado (inclinação de log t contra log n, por mínimos
+quadrados sobre todos os tamanhos) deve ficar perto de 1; o caso falha
+quando passa de 1 + tolerância.
+
+Uso:
+    python complexidade.py                  # roda todos
+    python complexidade.py linha_longa ...  # roda só os casos indicados
+    python complexidade.py --tolerancia 0.5
+Sai com código 1 se algum caso crescer mais que linearmente.
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import gc
+import io
+import math
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from analisador_lexico import analisar_lexema
+from analisador_sintatico import Parser, tokens_from_lexer, _compute_layout
+from desempenho import cronometra
+
+TOLERANCIA_PADRAO = 0.35
+DOBRAS_PADRAO = 4
+REPETICOES = 5
+# abaixo disso a medição é ruído: tempos menores contam como este
+TEMPO_MINIMO = 0.002
+# o parser é descendente recursivo: aninhamento de 10k níveis pede
+# uma pilha bem maior que a padrão
+LIMITE_RECURSAO = 400_000
+PILHA_THREAD = 512 * 1024 * 1024
+
+
+# -----------------------------------------------
+# Geradores de entradas adversárias
+# -----------------------------------------------
+
+def _em_main(corpo: str) -> str:
+    return "int main(void) {\n" + corpo + "\n    return 0;\n}\n"
+
+
+def linha_longa(n: int) -> str:
+    """n atribuições numa única linha."""
+    return _em_main("    int x = 0; " + "x = x + 1; " * n)
+
+
+def identificador_enorme(n: int) -> str:
+    nome = "v" + "a1_" * (n // 3)
+    return _em_main(f"    int {nome} = 1;\n    {nome} = {nome} + 1;")
+
+
+def string_enorme(n: int) -> str:
+    texto = "abc\\n" * (n // 5)
+    return _em_main(f'    printf("{texto}");')
+
+
+def numero_enorme(n: int) -> str:
+    digitos = "7" * (n // 2)
+    return _em_main(f"    float x = {digitos}.{digitos};")
+
+
+def hash_no_meio(n: int) -> str:
+    """'#' que não inicia diretiva, todos na mesma linha."""
+    return _em_main("    int x = 0; " + "x = x # 1; " * n)
+
+
+def brancos_antes_de_hash(n: int) -> str:
+    """Muitos brancos antes de cada '#' fora do início da linha."""
+    return _em_main("    x" + (" " * 64 + "#") * (n // 65))
+
+
+def comentario_gigante(n: int) -> str:
+    """Comentário de bloco com n linhas seguido de n comentários de linha."""
+    return (
+        "/*\n" + " * linha de comentario\n" * n + " */\n"
+        + "// outro comentario\n" * n
+        + _em_main("")
+    )
+
+
+def blocos_aninhados(n: int) -> str:
+    return _em_main("    " + "{ " * n + "x = 1; " + "} " * n)
+
+
+def parenteses_aninhados(n: int) -> str:
+    return _em_main("    x = " + "(" * n + "1" + ")" * n + ";")
+
+
+def cadeia_operadores(n: int) -> str:
+    """Expressão a + b * c - ... com n operandos (BinOp com n níveis)."""
+    ops = "+-*/<>"
+    termos = [f"v{k % 10}" for k in range(n)]
+    expr = termos[0]
+    for k, t in enumerate(termos[1:]):
+        expr += f" {ops[k % len(ops)]} {t}"
+    return _em_main(f"    x = {expr};")
+
+
+# -----------------------------------------------
+# Fases cronometradas
+# -----------------------------------------------
+
+def _silencioso(fn: Callable[[], object]) -> Callable[[], object]:
+    # erros léxicos esperados (o '#' solto, por exemplo) vão para um buffer
+    def roda():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return roda
+
+
+def fase_lexico(codigo: str) -> Callable[[], object]:
+    return _silencioso(lambda: analisar_lexema(codigo))
+
+
+def fase_parser(codigo: str) -> Callable[[], object]:
+    with contextlib.redirect_stdout(io.StringIO()):
+        tokens = tokens_from_lexer(analisar_lexema(codigo)[0])
+    return lambda: Parser(tokens).parse_program()
+
+
+def fase_layout(codigo: str) -> Callable[[], object]:
+    with contextlib.redirect_stdout(io.StringIO()):
+        tokens = tokens_from_lexer(analisar_lexema(codigo)[0])
+    program, _ = Parser(tokens).parse_program()
+    return lambda: _compute_layout(program, 0.0, 0.0)
+
+
+FASES: Dict[str, Callable[[str], Callable[[], object]]] = {
+    "lexico": fase_lexico,
+    "parser": fase_parser,
+    "layout": fase_layout,
+}
+
+
+@dataclass
+class Caso:
+    nome: str
+    gerar: Callable[[int], str]
+    fases: Tuple[str, ...]
+    n_inicial: int
+
+
+CASOS: Dict[str, Caso] = {}
+
+
+def _caso(nome: str, gerar: Callable[[int], str], fases: Tuple[str, ...], n_inicial: int):
+    CASOS[nome] = Caso(nome, gerar, fases, n_inicial)
+
+
+_caso("linha_longa", linha_longa, ("lexico", "parser", "layout"), 5_000)
+_caso("identificador_enorme", identificador_enorme, ("lexico",), 500_000)
+_caso("string_enorme", string_enorme, ("lexico",), 500_000)
+_caso("numero_enorme", numero_enorme, ("lexico",), 500_000)
+_caso("hash_no_meio", hash_no_meio, ("lexico",), 5_000)
+_caso("brancos_antes_de_hash", brancos_antes_de_hash, ("lexico",), 200_000)
+_caso("comentario_gigante", comentario_gigante, ("lexico",), 62_500)  # 1M linhas no fim
+_caso("blocos_aninhados", blocos_aninhados, ("lexico", "parser", "layout"), 1_250)  # 10k no fim
+_caso("parenteses_aninhados", parenteses_aninhados, ("lexico", "parser"), 1_250)  # parênteses não viram nós
+_caso("cadeia_operadores", cadeia_operadores, ("lexico", "parser", "layout"), 2_500)
+
+
+# -----------------------------------------------
+# Medição
+# -----------------------------------------------
+
+@dataclass
+class Resultado:
+    caso: str
+    fase: str
+    tamanhos: List[int]
+    tempos: List[float]
+    tolerancia: float
+
+    @property
+    def expoente(self) -> float:
+        """Inclinação log-log (1 = linear, 2 = quadrático); um ponto fora não decide sozinho."""
+        xs = [math.log2(n) for n in self.tamanhos]
+        ys = [math.log2(max(t, TEMPO_MINIMO)) for t in self.tempos]
+        mx = sum(xs) / len(xs)
+        my = sum(ys) / len(ys)
+        return (
+            sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+            / sum((x - mx) ** 2 for x in xs)
+        )
+
+    @property
+    def ok(self) -> bool:
+        return self.expoente <= 1 + self.tolerancia
+
+
+def cronometra_sem_gc(fn: Callable[[], object]) -> float:
+    """
+    Como cronometra, mas com o coletor desligado: as varreduras do gc
+    crescem com o número de objetos vivos e mascaram a fase medida.
+    """
+    gc.collect()
+    ligado = gc.isenabled()
+    gc.disable()
+    try:
+        return cronometra(fn, REPETICOES)
+    finally:
+        if ligado:
+            gc.enable()
+
+
+def medir(caso: Caso, fase: str, dobras: int = DOBRAS_PADRAO,
+          tolerancia: float = TOLERANCIA_PADRAO) -> Resultado:
+    tamanhos = [caso.n_inicial * 2 ** k for k in range(dobras)]
+    tempos = [cronometra_sem_gc(FASES[fase](caso.gerar(n))) for n in tamanhos]
+    return Resultado(caso.nome, fase, tamanhos, tempos, tolerancia)
+
+
+def com_pilha_grande(fn: Callable[[], object]):
+    """Roda fn numa thread com pilha e limite de recursão folgados."""
+    resultado: List[object] = []
+    erro: List[BaseException] = []
+
+    def alvo():
+        try:
+            resultado.append(fn())
+        except BaseException as e:  # repassado para a thread principal
+            erro.append(e)
+
+    limite_antigo = sys.getrecursionlimit()
+    pilha_antiga = threading.stack_size(PILHA_THREAD)
+    sys.setrecursionlimit(LIMITE_RECURSAO)
+    try:
+        t = threading.Thread(target=alvo)
+        t.start()
+        t.join()
+    finally:
+        threading.stack_size(pilha_antiga)
+        sys.setrecursionlimit(limite_antigo)
+    if erro:
+        raise erro[0]
+    return resultado[0]
+
+
+def rodar(nomes: Optional[List[str]] = None, dobras: int = DOBRAS_PADRAO,
+          tolerancia: float = TOLERANCIA_PADRAO) -> List[Resultado]:
+    resultados: List[Resultado] = []
+    for nome in nomes or list(CASOS):
+        caso = CASOS[nome]
+        for fase in caso.fases:
+            r = com_pilha_grande(lambda: medir(caso, fase, dobras, tolerancia))
+            resultados.append(r)
+            tempos = "  ".join(f"{t * 1000:8.1f}" for t in r.tempos)
+            estado = "ok" if r.ok else "SUPERLINEAR"
+            print(f"{nome:<22} {fase:<7} {tempos} ms   expoente {r.expoente:4.2f}  {estado}")
+    return resultados
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Verifica crescimento linear em entradas patológicas.")
+    ap.add_argument("casos", nargs="*", help=f"casos a rodar (disponíveis: {', '.join(CASOS)})")
+    ap.add_argument("--dobras", type=int, default=DOBRAS_PADRAO, help="quantos tamanhos medir")
+    ap.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO,
+                    help="folga sobre o expoente 1 antes de falhar")
+    args = ap.parse_args(argv)
+
+    for nome in args.casos:
+        if nome not in CASOS:
+            ap.error(f"caso desconhecido: {nome} (disponíveis: {', '.join(CASOS)})")
+    if args.dobras < 2:
+        ap.error("--dobras precisa ser pelo menos 2")
+
+    print(f"{'caso':<22} {'fase':<7} tempos em n, 2n, 4n, ...")
+    resultados = rodar(args.casos, args.dobras, args.tolerancia)
+    falhas = [r for r in resultados if not r.ok]
+    if falhas:
+        print(f"\n{len(falhas)} caso(s) com crescimento acima do linear:")
+        for r in falhas:
+            print(f"  {r.caso} ({r.fase}): expoente {r.expoente:.2f} > {1 + r.tolerancia:.2f}")
+        return 1
+    print("\nTodos os casos cresceram linearmente.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,478 @@
+"""
+Consultas à AST por padrões, sobre índices por tipo de nó.
+
+Um padrão descreve nós pelo tipo e por campos, na sintaxe das próprias
+classes da AST:
+
+    Call(callee=Var(name="printf"))            chamadas de printf
+    While(test=Num | CharLit)                  laços com teste constante
+    Assign(target=Var(name=x), value=BinOp(left=Var(name=x)))
+                                               x = x <op> ...
+    FuncDef(name="main") >> Return             returns dentro de main
+    If(contem=Call(callee=Var(name="exit")))   ifs com exit() em algum lugar
+    c := Call(args=[TextLit, ...])             captura o próprio nó
+    If(contem=(c := Call(callee=Var(name="exit"))))
+
+- '_' casa qualquer coisa (inclusive None);
+- um nome em minúsculas é uma captura, e 'nome := P' captura o que
+  casar P (entre parênteses dentro de um campo); o mesmo nome em dois
+  lugares tem de casar valores iguais (nós são comparados pelo hash
+  estrutural, sem posição);
+- 'A | B' é alternativa (vale a primeira que casar);
+- uma lista casa elemento a elemento; '...' no fim aceita o resto;
+- 'A >> B' casa nós B que têm algum ancestral A; contem=P casa nós com
+  algum descendente P.
+
+Os mesmos padrões podem ser montados em Python: No("Call", callee=
+No("Var", name="printf")), Qualquer(), Captura("x"), Ou(...),
+Descendente(...); compilar(texto) faz isso a partir do texto.
+
+IndiceAST percorre o Program uma vez e guarda, para cada tipo de nó,
+os nós daquele tipo em pré-ordem, mais o pai e o intervalo de
+pré-ordem de cada nó. Uma consulta começa pelos nós do tipo da raiz do
+padrão e só olha os campos que o padrão cita; contem= e '>>' usam os
+intervalos de pré-ordem e os pais, sem percorrer subárvores inteiras.
+Com hash-consing um nó compartilhado fica só com a primeira ocorrência,
+então indexe árvores comuns.
+
+Uso:
+    python consulta_ast.py 'Call(callee=Var(name="printf"))' [ARQ.c ...]
+(sem arquivos, consulta todo .c de exemplos/)
+"""
+from __future__ import annotations
+import ast
+import bisect
+import heapq
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import analisador_sintatico
+from analisador_sintatico import children
+from hash_estrutural import digest
+
+# nome -> classe de todo nó da AST
+TIPOS_NO: Dict[str, type] = {
+    nome: getattr(analisador_sintatico, nome)
+    for nome in ("Program", "Block", "VarDecl", "FuncDef", "Assign", "If", "While", "Return",
+                 "Call", "Index", "BinOp", "Var", "Num", "TextLit", "CharLit")
+}
+
+Ligacoes = Dict[str, Any]
+
+
+class ErroConsulta(ValueError):
+    """Padrão ou texto de consulta inválido."""
+
+
+# -----------------------------------------------
+# Índice
+# -----------------------------------------------
+
+class IndiceAST:
+    """Nós de 'raiz' por tipo, com pais e intervalos de pré-ordem."""
+
+    def __init__(self, raiz: Any):
+        self.raiz = raiz
+        self.nos: List[Any] = []                          # todos, em pré-ordem
+        self._tipo: Dict[str, List[Any]] = defaultdict(list)
+        self._ordem_tipo: Dict[str, List[int]] = defaultdict(list)
+        self._entrada: Dict[int, int] = {}                # id -> posição em self.nos
+        self._saida: Dict[int, int] = {}                  # id -> fim (exclusivo) da subárvore
+        self._pai: Dict[int, Any] = {}
+        self._memo: Dict[int, bytes] = {}                 # digests, para capturas repetidas
+
+        pilha: List[Tuple[Any, Optional[Any], bool]] = [(raiz, None, False)]
+        while pilha:
+            n, pai, saindo = pilha.pop()
+            if saindo:
+                self._saida[id(n)] = len(self.nos)
+                continue
+            if id(n) in self._entrada:
+                continue  # nó compartilhado (hash-consing)
+            k = len(self.nos)
+            self._entrada[id(n)] = k
+            self.nos.append(n)
+            if pai is not None:
+                self._pai[id(n)] = pai
+            tipo = type(n).__name__
+            self._tipo[tipo].append(n)
+            self._ordem_tipo[tipo].append(k)
+            pilha.append((n, None, True))
+            pilha.extend((c, n, False) for c in reversed(children(n)) if c is not None)
+
+    def __len__(self) -> int:
+        return len(self.nos)
+
+    def do_tipo(self, tipo: str) -> List[Any]:
+        """Nós do tipo, em pré-ordem."""
+        return self._tipo.get(tipo, [])
+
+    def pai(self, no: Any) -> Optional[Any]:
+        return self._pai.get(id(no))
+
+    def ancestrais(self, no: Any) -> Iterator[Any]:
+        """Do pai até a raiz."""
+        p = self._pai.get(id(no))
+        while p is not None:
+            yield p
+            p = self._pai.get(id(p))
+
+    def descendentes(self, no: Any, tipos: Optional[Set[str]] = None) -> Iterator[Any]:
+        """Descendentes de 'no' (dos tipos dados, ou todos), em pré-ordem."""
+        ini = self._entrada.get(id(no))
+        if ini is None:
+            return iter(())
+        fim = self._saida[id(no)]
+        if tipos is None:
+            return iter(self.nos[ini + 1:fim])
+        fatias = []
+        for t in tipos:
+            ordem = self._ordem_tipo.get(t)
+            if ordem:
+                a = bisect.bisect_right(ordem, ini)
+                b = bisect.bisect_left(ordem, fim)
+                fatias.append(zip(ordem[a:b], self._tipo[t][a:b]))
+        return (n for _, n in heapq.merge(*fatias, key=lambda x: x[0]))
+
+    def candidatos(self, tipos: Optional[Set[str]]) -> Iterator[Any]:
+        """Nós dos tipos dados (ou todos), em pré-ordem."""
+        if tipos is None:
+            return iter(self.nos)
+        fatias = [zip(self._ordem_tipo[t], self._tipo[t]) for t in tipos if t in self._tipo]
+        return (n for _, n in heapq.merge(*fatias, key=lambda x: x[0]))
+
+    def iguais(self, a: Any, b: Any) -> bool:
+        """Igualdade de capturas: estrutural para nós, == para o resto."""
+        if a is b:
+            return True
+        if type(a) is not type(b):
+            return False
+        if type(a).__name__ in TIPOS_NO or isinstance(a, list):
+            return digest(a, self._memo) == digest(b, self._memo)
+        return a == b
+
+    def consultar(self, padrao: Any) -> List["Casamento"]:
+        """Casamentos de 'padrao' (Padrao ou texto), em pré-ordem."""
+        p = compilar(padrao) if isinstance(padrao, str) else _padrao(padrao)
+        out: List[Casamento] = []
+        for n in self.candidatos(p.tipos()):
+            lig = p.casar(n, {}, self)
+            if lig is not None:
+                out.append(Casamento(n, lig))
+        return out
+
+
+@dataclass
+class Casamento:
+    no: Any
+    capturas: Ligacoes = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        texto = _descreve(self.no)
+        if self.capturas:
+            texto += "  " + ", ".join(f"{k}={_descreve(v)}" for k, v in self.capturas.items())
+        return texto
+
+
+def _descreve(v: Any) -> str:
+    if type(v).__name__ in TIPOS_NO:
+        pos = f"@{v.line}:{v.col}" if hasattr(v, "line") else ""
+        return analisador_sintatico.node_label(v).replace("\n", " ") + pos
+    return repr(v)
+
+
+# -----------------------------------------------
+# Padrões
+# -----------------------------------------------
+
+class Padrao:
+    def tipos(self) -> Optional[Set[str]]:
+        """Tipos de nó que podem casar (None: qualquer coisa)."""
+        return None
+
+    def casar(self, valor: Any, lig: Ligacoes, indice: IndiceAST) -> Optional[Ligacoes]:
+        """Ligações estendidas se 'valor' casa, senão None. Não altera 'lig'."""
+        raise NotImplementedError
+
+    def __or__(self, outro: Any) -> "Ou":
+        return Ou(self, outro)
+
+    def __rshift__(self, outro: Any) -> "Descendente":
+        return Descendente(self, outro)
+
+
+class Qualquer(Padrao):
+    def casar(self, valor, lig, indice):
+        return lig
+
+    def __repr__(self):
+        return "_"
+
+
+class Literal(Padrao):
+    def __init__(self, valor: Any):
+        self.valor = valor
+
+    def casar(self, valor, lig, indice):
+        if type(valor).__name__ in TIPOS_NO or isinstance(valor, list):
+            return None
+        return lig if valor == self.valor else None
+
+    def __repr__(self):
+        return repr(self.valor)
+
+
+class Captura(Padrao):
+    """Liga 'nome' ao valor (que também tem de casar 'padrao', se houver)."""
+
+    def __init__(self, nome: str, padrao: Any = None):
+        self.nome = nome
+        self.padrao = _padrao(padrao) if padrao is not None else Qualquer()
+
+    def tipos(self):
+        return self.padrao.tipos()
+
+    def casar(self, valor, lig, indice):
+        if self.nome in lig:
+            if not indice.iguais(lig[self.nome], valor):
+                return None
+            return self.padrao.casar(valor, lig, indice)
+        lig = self.padrao.casar(valor, lig, indice)
+        if lig is None:
+            return None
+        return {**lig, self.nome: valor}
+
+    def __repr__(self):
+        return self.nome if isinstance(self.padrao, Qualquer) else f"({self.nome} := {self.padrao!r})"
+
+
+class Ou(Padrao):
+    def __init__(self, *alternativas: Any):
+        self.alternativas = [_padrao(a) for a in alternativas]
+
+    def tipos(self):
+        out: Set[str] = set()
+        for a in self.alternativas:
+            t = a.tipos()
+            if t is None:
+                return None
+            out |= t
+        return out
+
+    def casar(self, valor, lig, indice):
+        for a in self.alternativas:
+            r = a.casar(valor, lig, indice)
+            if r is not None:
+                return r
+        return None
+
+    def __repr__(self):
+        return " | ".join(map(repr, self.alternativas))
+
+
+class Lista(Padrao):
+    def __init__(self, itens: List[Any], aberta: bool = False):
+        self.itens = [_padrao(i) for i in itens]
+        self.aberta = aberta   # '...' no fim: aceita elementos a mais
+
+    def casar(self, valor, lig, indice):
+        if not isinstance(valor, list):
+            return None
+        if len(valor) < len(self.itens) or (not self.aberta and len(valor) != len(self.itens)):
+            return None
+        for p, v in zip(self.itens, valor):
+            lig = p.casar(v, lig, indice)
+            if lig is None:
+                return None
+        return lig
+
+    def __repr__(self):
+        return "[" + ", ".join([*map(repr, self.itens)] + (["..."] if self.aberta else [])) + "]"
+
+
+class No(Padrao):
+    """Nó do tipo 'tipo' cujos campos casam os padrões dados."""
+
+    def __init__(self, tipo: str, /, contem: Any = None, **campos: Any):
+        cls = TIPOS_NO.get(tipo)
+        if cls is None:
+            raise ErroConsulta(f"tipo de nó desconhecido: {tipo!r} (tipos: {', '.join(TIPOS_NO)})")
+        validos = [f.name for f in fields(cls)]
+        for c in campos:
+            if c not in validos:
+                raise ErroConsulta(f"{tipo} não tem o campo {c!r} (campos: {', '.join(validos)})")
+        self.tipo = tipo
+        self.campos = {c: _padrao(p) for c, p in campos.items()}
+        self.contem = _padrao(contem) if contem is not None else None
+
+    def tipos(self):
+        return {self.tipo}
+
+    def casar(self, valor, lig, indice):
+        if type(valor).__name__ != self.tipo:
+            return None
+        for c, p in self.campos.items():
+            lig = p.casar(getattr(valor, c), lig, indice)
+            if lig is None:
+                return None
+        if self.contem is not None:
+            for d in indice.descendentes(valor, self.contem.tipos()):
+                r = self.contem.casar(d, lig, indice)
+                if r is not None:
+                    return r
+            return None
+        return lig
+
+    def __repr__(self):
+        args = [f"{c}={p!r}" for c, p in self.campos.items()]
+        if self.contem is not None:
+            args.append(f"contem={self.contem!r}")
+        return f"{self.tipo}({', '.join(args)})" if args else self.tipo
+
+
+class Descendente(Padrao):
+    """Nós que casam 'padrao' e têm algum ancestral que casa 'ancestral'."""
+
+    def __init__(self, ancestral: Any, padrao: Any):
+        self.ancestral = _padrao(ancestral)
+        self.padrao = _padrao(padrao)
+
+    def tipos(self):
+        return self.padrao.tipos()
+
+    def casar(self, valor, lig, indice):
+        lig = self.padrao.casar(valor, lig, indice)
+        if lig is None:
+            return None
+        for a in indice.ancestrais(valor):
+            r = self.ancestral.casar(a, lig, indice)
+            if r is not None:
+                return r
+        return None
+
+    def __repr__(self):
+        return f"{self.ancestral!r} >> {self.padrao!r}"
+
+
+def _padrao(x: Any) -> Padrao:
+    """Padrao a partir de um valor Python: listas viram Lista, escalares viram Literal."""
+    if isinstance(x, Padrao):
+        return x
+    if isinstance(x, list):
+        aberta = bool(x) and x[-1] is Ellipsis
+        return Lista(x[:-1] if aberta else x, aberta)
+    if isinstance(x, type) and x.__name__ in TIPOS_NO:
+        return No(x.__name__)
+    return Literal(x)
+
+
+# -----------------------------------------------
+# Texto -> padrão
+# -----------------------------------------------
+
+def compilar(texto: str) -> Padrao:
+    """Padrão a partir do texto de uma consulta (sintaxe no topo do módulo)."""
+    texto = texto.strip()
+    try:
+        arvore = ast.parse(texto, mode="eval")
+    except SyntaxError as e:
+        try:
+            # 'c := P' no topo só é válido entre parênteses
+            arvore = ast.parse(f"({texto})", mode="eval")
+        except SyntaxError:
+            raise ErroConsulta(f"consulta inválida: {e.msg} (coluna {e.offset})") from None
+    return _converte(arvore.body)
+
+
+def _converte(n: ast.AST) -> Padrao:
+    if isinstance(n, ast.Name):
+        if n.id == "_":
+            return Qualquer()
+        if n.id[0].isupper():
+            return No(n.id)
+        return Captura(n.id)
+    if isinstance(n, ast.Call):
+        if not isinstance(n.func, ast.Name) or not n.func.id[0].isupper():
+            raise ErroConsulta(f"esperado um tipo de nó antes de '(' em {ast.unparse(n)!r}")
+        if n.args or any(k.arg is None for k in n.keywords):
+            raise ErroConsulta(f"use campo=padrão em {ast.unparse(n)!r}")
+        return No(n.func.id, **{k.arg: _converte(k.value) for k in n.keywords})
+    if isinstance(n, ast.Constant):
+        return Literal(n.value)
+    if isinstance(n, ast.UnaryOp) and isinstance(n.op, ast.USub) and isinstance(n.operand, ast.Constant):
+        v = n.operand.value
+        if not isinstance(v, (int, float)) or isinstance(v, bool):
+            raise ErroConsulta(f"'-' só vale antes de número em {ast.unparse(n)!r}")
+        return Literal(-v)
+    if isinstance(n, ast.List):
+        itens = list(n.elts)
+        aberta = bool(itens) and isinstance(itens[-1], ast.Constant) and itens[-1].value is Ellipsis
+        if aberta:
+            itens.pop()
+        return Lista([_converte(i) for i in itens], aberta)
+    if isinstance(n, ast.BinOp) and isinstance(n.op, ast.BitOr):
+        return Ou(_converte(n.left), _converte(n.right))
+    if isinstance(n, ast.BinOp) and isinstance(n.op, ast.RShift):
+        return Descendente(_converte(n.left), _converte(n.right))
+    if isinstance(n, ast.NamedExpr):
+        return Captura(n.target.id, _converte(n.value))
+    raise ErroConsulta(f"construção não suportada na consulta: {ast.unparse(n)!r}")
+
+
+# -----------------------------------------------
+# Lotes
+# -----------------------------------------------
+
+class LoteIndexado:
+    """Índices de vários arquivos; cada Program é indexado uma vez só."""
+
+    def __init__(self):
+        self.indices: Dict[str, IndiceAST] = {}
+        self.diagnosticos: Dict[str, List[str]] = {}
+
+    def adicionar(self, nome: str, program: Any):
+        self.indices[nome] = IndiceAST(program)
+
+    @classmethod
+    def de_arquivos(cls, caminhos: Iterable[str]) -> "LoteIndexado":
+        """Analisa e indexa os arquivos; os com erro entram com a AST recuperada."""
+        from analise import analisar_fonte
+
+        lote = cls()
+        for caminho in caminhos:
+            with open(caminho, encoding="utf-8") as f:
+                r = analisar_fonte(f.read())
+            if r.diagnosticos:
+                lote.diagnosticos[caminho] = r.diagnosticos
+            if r.program is not None:
+                lote.adicionar(caminho, r.program)
+        return lote
+
+    def consultar(self, padrao: Any) -> Iterator[Tuple[str, Casamento]]:
+        """(arquivo, casamento) de todos os arquivos, na ordem em que foram adicionados."""
+        p = compilar(padrao) if isinstance(padrao, str) else _padrao(padrao)
+        for nome, indice in self.indices.items():
+            for c in indice.consultar(p):
+                yield nome, c
+
+
+if __name__ == "__main__":
+    import glob
+    import os
+
+    if len(sys.argv) < 2:
+        sys.exit("uso: python consulta_ast.py CONSULTA [ARQ.c ...]")
+    try:
+        padrao = compilar(sys.argv[1])
+    except ErroConsulta as e:
+        sys.exit(str(e))
+    caminhos = sys.argv[2:] or sorted(glob.glob(os.path.join("exemplos", "**", "*.c"), recursive=True))
+    lote = LoteIndexado.de_arquivos(caminhos)
+    n = 0
+    for caminho, c in lote.consultar(padrao):
+        print(f"{caminho}: {c}")
+        n += 1
+    com_erros = f" ({len(lote.diagnosticos)} com erros, AST recuperada)" if lote.diagnosticos else ""
+    print(f"{n} casamento(s) em {len(lote.indices)} arquivo(s){com_erros} para {padrao!r}")
@@ -0,0 +1,597 @@
+"""
+Benchmarks do projeto.
+
+Uso:
+    python desempenho.py            # roda todos
+    python desempenho.py vm ...     # roda só os benchmarks indicados
+"""
+from __future__ import annotations
+import contextlib
+import io
+import sys
+import time
+from typing import Callable, Dict, List
+
+from analisador_lexico import analisar_lexema
+from analisador_sintatico import Parser, tokens_from_lexer
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {}
+
+
+def benchmark(nome: str):
+    def registra(fn: Callable[[], None]) -> Callable[[], None]:
+        BENCHMARKS[nome] = fn
+        return fn
+    return registra
+
+
+def cronometra(fn: Callable[[], object], repeticoes: int = 3) -> float:
+    """Melhor tempo (s) entre algumas repetições."""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        fn()
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor
+
+
+def parse_codigo(codigo: str):
+    lista_tokens, _ = analisar_lexema(codigo)
+    program, errors = Parser(tokens_from_lexer(lista_tokens)).parse_program()
+    if errors:
+        raise ValueError("programa de benchmark com erros:\n" + "\n".join(errors))
+    return program
+
+
+# Programa com laços e chamadas: o caso típico para um backend de execução
+PROGRAMA_LACOS = """
+int soma(int n) {
+    int i = 0;
+    int s = 0;
+    while (i < n) {
+        if (i % 3 == 0) {
+            s = s + i / 3;
+        } else {
+            s = s - 1;
+        }
+        i = i + 1;
+    }
+    return s;
+}
+
+int fib(int n) {
+    if (n < 2) {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+
+int main(void) {
+    int r = soma(N_ITER);
+    r = r + fib(N_FIB);
+    printf("%d\\n", r);
+    return 0;
+}
+"""
+
+
+def programa_lacos(n_iter: int = 200000, n_fib: int = 20) -> str:
+    return PROGRAMA_LACOS.replace("N_ITER", str(n_iter)).replace("N_FIB", str(n_fib))
+
+
+# -----------------------------------------------
+# Backends de execução
+# -----------------------------------------------
+
+CASOS_EXECUCAO = {
+    "laço": programa_lacos(200000, 1),
+    "chamadas": programa_lacos(1, 22),
+}
+
+
+@benchmark("vm")
+def bench_vm():
+    from interpretador import Interpretador
+    from maquina_virtual import compilar, MaquinaVirtual
+
+    for caso, codigo in CASOS_EXECUCAO.items():
+        program = parse_codigo(codigo)
+        modulo = compilar(program)
+        saidas: List[str] = []
+
+        def roda_interpretador():
+            buf = io.StringIO()
+            Interpretador(program, buf).executar()
+            saidas.append(buf.getvalue())
+
+        def roda_vm():
+            buf = io.StringIO()
+            MaquinaVirtual(modulo, buf).executar()
+            saidas.append(buf.getvalue())
+
+        t_arvore = cronometra(roda_interpretador)
+        t_vm = cronometra(roda_vm)
+        t_compila = cronometra(lambda: compilar(program))
+        assert len(set(saidas)) == 1, "VM e interpretador divergiram"
+
+        print(f"[{caso}]")
+        print(f"  interpretador (árvore): {t_arvore * 1000:9.1f} ms")
+        print(f"  VM de bytecode:         {t_vm * 1000:9.1f} ms  ({t_arvore / t_vm:.2f}x)")
+        print(f"  compilação:             {t_compila * 1000:9.3f} ms")
+
+
+@benchmark("python")
+def bench_python():
+    from interpretador import Interpretador
+    from maquina_virtual import compilar as compilar_vm, MaquinaVirtual
+    import compilador_python
+
+    for caso, codigo in CASOS_EXECUCAO.items():
+        program = parse_codigo(codigo)
+        modulo = compilar_vm(program)
+        compilado = compilador_python.compilar(program)
+        saidas: List[str] = []
+
+        def roda(fn):
+            def _roda():
+                buf = io.StringIO()
+                fn(buf)
+                saidas.append(buf.getvalue())
+            return _roda
+
+        t_arvore = cronometra(roda(lambda buf: Interpretador(program, buf).executar()))
+        t_vm = cronometra(roda(lambda buf: MaquinaVirtual(modulo, buf).executar()))
+        t_py = cronometra(roda(lambda buf: compilado.executar(saida=buf)))
+        assert len(set(saidas)) == 1, "backends divergiram"
+
+        def compila_do_zero():
+            compilador_python._CACHE.clear()
+            compilador_python.compilar(program)
+
+        t_frio = cronometra(compila_do_zero)
+        t_cache = cronometra(lambda: compilador_python.compilar(program))
+
+        print(f"[{caso}]")
+        print(f"  interpretador (árvore): {t_arvore * 1000:9.1f} ms")
+        print(f"  VM de bytecode:         {t_vm * 1000:9.1f} ms  ({t_arvore / t_vm:.2f}x)")
+        print(f"  Python gerado:          {t_py * 1000:9.1f} ms  ({t_arvore / t_py:.2f}x)")
+        print(f"  compilação (fria):      {t_frio * 1000:9.3f} ms")
+        print(f"  compilação (cache):     {t_cache * 1000:9.3f} ms")
+
+
+# -----------------------------------------------
+# Representação da AST
+# -----------------------------------------------
+
+def programa_repetitivo(n_stmts: int = 5000) -> str:
+    linhas = ["int main(void) {", "    int i = 0;", "    int s = 0;"]
+    for _ in range(n_stmts):
+        linhas.append("    s = s + a[i] + b[i] * (i + 1);")
+    linhas += ["    return s;", "}"]
+    return "\n".join(linhas)
+
+
+@benchmark("hashcons")
+def bench_hashcons():
+    import gc
+    import tracemalloc
+
+    tokens = tokens_from_lexer(analisar_lexema(programa_repetitivo())[0])
+    for modo in (False, True):
+        gc.collect()
+        tracemalloc.start()
+        parser = Parser(list(tokens), hash_consing=modo)
+        program, _ = parser.parse_program()
+        del parser  # a tabela de posições não entra na conta da árvore
+        gc.collect()
+        retido, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        t = cronometra(lambda: Parser(list(tokens), hash_consing=modo).parse_program())
+        nome = "hash-consing" if modo else "árvore comum"
+        print(f"{nome:<14} AST retida: {retido / 1024:9.1f} KiB   parse: {t * 1000:7.1f} ms")
+        del program
+
+
+# -----------------------------------------------
+# Serialização
+# -----------------------------------------------
+
+def programa_muitas_funcoes(n_funcs: int = 400) -> str:
+    partes = []
+    for k in range(n_funcs):
+        partes.append(
+            f"int f{k}(int n, int m) {{\n"
+            f"    int s = {k};\n"
+            f"    int i = 0;\n"
+            f"    while (i < n) {{\n"
+            f"        if (v[i] % 2 == 0) {{ s = s + v[i] * {k + 1}; }}\n"
+            f"        else {{ s = s - f{max(k - 1, 0)}(i, m); }}\n"
+            f"        i = i + 1;\n"
+            f"    }}\n"
+            f"    printf(\"%d\\n\", s);\n"
+            f"    return s / 2.5;\n"
+            f"}}"
+        )
+    return "\n\n".join(partes)
+
+
+@benchmark("serializacao")
+def bench_serializacao():
+    import pickle
+    import serializacao
+
+    program = parse_codigo(programa_muitas_funcoes())
+    dados_pickle = pickle.dumps(program, pickle.HIGHEST_PROTOCOL)
+    dados_bin = serializacao.para_bytes(program)
+    assert serializacao.carregar(dados_bin) == program
+
+    casos = [
+        ("pickle", lambda: pickle.dumps(program, pickle.HIGHEST_PROTOCOL),
+         lambda: pickle.loads(dados_pickle), len(dados_pickle)),
+        ("binário", lambda: serializacao.para_bytes(program),
+         lambda: serializacao.carregar(dados_bin), len(dados_bin)),
+    ]
+    for nome, salva, carrega, tam in casos:
+        ts = cronometra(salva)
+        tc = cronometra(carrega)
+        print(f"{nome:<8} {tam / 1024:8.1f} KiB   salvar: {ts * 1000:7.1f} ms   carregar: {tc * 1000:7.1f} ms")
+
+    def uma_funcao():
+        leitor = serializacao.LeitorAST(dados_bin)
+        f = leitor[len(leitor) // 2]
+        return f.name, len(f.params)
+
+    t = cronometra(uma_funcao)
+    print(f"leitura preguiçosa de 1 função ({uma_funcao()[0]}): {t * 1000:7.2f} ms")
+
+
+@benchmark("streaming")
+def bench_streaming():
+    import gc
+    import tracemalloc
+    import serializacao
+
+    tokens = tokens_from_lexer(analisar_lexema(programa_muitas_funcoes(1000))[0])
+
+    def inteiro(fp):
+        program, _ = Parser(tokens).parse_program()
+        serializacao.salvar(program, fp)
+
+    def por_item(fp):
+        itens = Parser(tokens).iter_top_level()
+        serializacao.salvar_itens((s for s, _ in itens if s is not None), fp)
+
+    for nome, fn in (("parse_program", inteiro), ("iter_top_level", por_item)):
+        gc.collect()
+        tracemalloc.start()
+        buf = io.BytesIO()
+        fn(buf)
+        # o arquivo gerado é igual nos dois modos; ele não entra na conta
+        tam = buf.getbuffer().nbytes
+        del buf
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        t = cronometra(lambda: fn(io.BytesIO()))
+        print(f"{nome:<15} pico: {(pico - tam) / 1024:9.1f} KiB   tempo: {t * 1000:7.1f} ms")
+
+
+# -----------------------------------------------
+# Tokens entre processos
+# -----------------------------------------------
+
+def _lexa_para_lista(codigo: str):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return analisar_lexema(codigo)[0]
+
+
+@benchmark("compartilhado")
+def bench_compartilhado():
+    from concurrent.futures import ProcessPoolExecutor
+    from tokens_compartilhados import BlocoTokens, lexar_em_bloco
+
+    codigo = programa_muitas_funcoes(3000)
+    with ProcessPoolExecutor(1) as pool:
+        pool.submit(int).result()  # sobe o processo fora da medição
+        t0 = time.perf_counter()
+        lista = pool.submit(_lexa_para_lista, codigo).result()
+        t_pickle = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        nome, _, _ = pool.submit(lexar_em_bloco, codigo).result()
+        t_bloco = time.perf_counter() - t0
+    t_lexico = cronometra(lambda: _lexa_para_lista(codigo), 1)
+    t_parse_lista = cronometra(lambda: Parser(tokens_from_lexer(lista)).parse_program(), 1)
+    with BlocoTokens.abrir(nome, dono=True) as bloco:
+        t0 = time.perf_counter()
+        Parser(bloco.tokens()).parse_program()
+        t_parse_bloco = time.perf_counter() - t0
+    print(f"{len(lista)} tokens, {len(codigo) / 1e6:.1f} MB de fonte (léxico sozinho: {t_lexico * 1000:.0f} ms)")
+    print(f"  pickle:  léxico + volta ao pai {t_pickle * 1000:7.0f} ms   conversão + parse {t_parse_lista * 1000:7.0f} ms"
+          f"   total {(t_pickle + t_parse_lista) * 1000:7.0f} ms")
+    print(f"  bloco:   léxico + volta ao pai {t_bloco * 1000:7.0f} ms   parse do bloco    {t_parse_bloco * 1000:7.0f} ms"
+          f"   total {(t_bloco + t_parse_bloco) * 1000:7.0f} ms")
+
+
+# -----------------------------------------------
+# Fluxo de dados
+# -----------------------------------------------
+
+def funcao_grande(n_stmts: int, n_vars: int = 200) -> str:
+    """Uma função com n_stmts comandos sobre n_vars locais, com ifs e laços."""
+    linhas = ["int grande(int n) {"]
+    linhas += [f"    int v{k};" for k in range(n_vars)]
+    for k in range(n_stmts):
+        a, b, c = f"v{k % n_vars}", f"v{(k * 7 + 3) % n_vars}", f"v{(k * 13 + 5) % n_vars}"
+        if k % 10 == 0:
+            linhas.append(f"    if ({b} > n) {{ {a} = {c} + 1; }} else {{ {a} = {b}; }}")
+        elif k % 25 == 0:
+            linhas.append(f"    while ({a} < n) {{ {a} = {a} + {b}; }}")
+        else:
+            linhas.append(f"    {a} = {b} * 2 + {c};")
+    linhas += ["    return v0;", "}"]
+    return "\n".join(linhas)
+
+
+@benchmark("fluxo")
+def bench_fluxo():
+    from codigo_intermediario import gerar_ir
+    import fluxo_dados
+
+    for n in (1000, 4000, 16000):
+        f = gerar_ir(parse_codigo(funcao_grande(n))).funcoes[0]
+        bits = fluxo_dados.Bits(f.locais)
+        print(f"[{n} comandos, {len(f.blocos)} blocos, {len(bits.nomes)} locais]")
+        for nome, analise in (
+            ("vivacidade", fluxo_dados.vivacidade),
+            ("atribuição definida", fluxo_dados.atribuicao_definida),
+            ("definições alcançantes", fluxo_dados.definicoes_alcancantes),
+        ):
+            sol, _ = analise(f, bits)
+            t = cronometra(lambda: analise(f, bits))
+            print(f"  {nome:<23} {t * 1000:8.1f} ms  ({sol.visitas} visitas de bloco)")
+        t = cronometra(lambda: fluxo_dados.diagnosticar_funcao(f))
+        print(f"  {'diagnósticos (tudo)':<23} {t * 1000:8.1f} ms  "
+              f"({len(fluxo_dados.diagnosticar_funcao(f))} achados)")
+
+
+# -----------------------------------------------
+# Léxico vetorizado
+# -----------------------------------------------
+
+@benchmark("lexico")
+def bench_lexico():
+    import contextlib
+    import varredura_vetorizada
+    from complexidade import comentario_gigante, identificador_enorme, string_enorme
+
+    if not varredura_vetorizada.HAVE_NUMPY:
+        print("NumPy não está instalado: só o caminho puro Python está disponível.")
+        return
+    fontes = {
+        "muitas funções": programa_muitas_funcoes(2000),
+        "função grande": funcao_grande(20000),
+        "comentários": comentario_gigante(200_000),
+        "identificador": identificador_enorme(2_000_000),
+        "string": string_enorme(2_000_000),
+    }
+    for nome, codigo in fontes.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            t_puro = cronometra(lambda: analisar_lexema(codigo, vetorizado=False))
+            t_pre = cronometra(lambda: varredura_vetorizada.pre_varredura(codigo))
+            t_vet = cronometra(lambda: analisar_lexema(codigo, vetorizado=True))
+        print(f"{nome:<15} {len(codigo) / 1e6:5.1f} MB   puro: {t_puro * 1000:7.1f} ms   "
+              f"vetorizado: {t_vet * 1000:7.1f} ms (pré-varredura {t_pre * 1000:5.1f})   "
+              f"{t_puro / t_vet:4.1f}x")
+
+
+# -----------------------------------------------
+# Parser LL(1)
+# -----------------------------------------------
+
+@benchmark("ll1")
+def bench_ll1():
+    from analisador_ll1 import ParserLL1
+
+    casos = {
+        "muitas funções": programa_muitas_funcoes(1000),
+        "um bloco longo": programa_repetitivo(),
+    }
+    for caso, codigo in casos.items():
+        tokens = tokens_from_lexer(analisar_lexema(codigo)[0])
+        assert Parser(list(tokens)).parse_program() == ParserLL1(list(tokens)).parse_program()
+        t_rd = cronometra(lambda: Parser(tokens).parse_program())
+        t_ll1 = cronometra(lambda: ParserLL1(tokens).parse_program())
+        print(f"[{caso}]")
+        print(f"  descendente recursivo: {t_rd * 1000:8.1f} ms")
+        print(f"  LL(1) por tabela:      {t_ll1 * 1000:8.1f} ms  ({t_rd / t_ll1:.2f}x)")
+
+
+
+# -----------------------------------------------
+# Índice de posições
+# -----------------------------------------------
+
+@benchmark("posicoes")
+def bench_posicoes():
+    import random
+    from analisador_sintatico import children
+    from indice_posicoes import indexar
+
+    codigo = programa_muitas_funcoes(1000)
+    tokens = tokens_from_lexer(analisar_lexema(codigo)[0])
+    program, _ = Parser(tokens).parse_program()
+    n_linhas = codigo.count("\n") + 1
+    rnd = random.Random(0)
+    consultas = [(rnd.randint(1, n_linhas), rnd.randint(1, 40)) for _ in range(50)]
+
+    def pilha_varrendo(linha, coluna):
+        # o que as ferramentas faziam: descer pela árvore a cada consulta
+        achados = []
+        pilha = [program]
+        while pilha:
+            n = pilha.pop()
+            if (getattr(n, "line", 0), getattr(n, "col", 0)) <= (linha, coluna):
+                achados.append(n)
+            pilha.extend(c for c in children(n) if c is not None)
+        return achados
+
+    t_construcao = cronometra(lambda: indexar(program, tokens))
+    indice = indexar(program, tokens)
+    t_indice = cronometra(lambda: [indice.pilha_em(l, c) for l, c in consultas])
+    t_varredura = cronometra(lambda: [pilha_varrendo(l, c) for l, c in consultas], 1)
+    print(f"{len(indice)} nós, {len(consultas)} consultas")
+    print(f"  construção do índice:  {t_construcao * 1000:9.1f} ms")
+    print(f"  consultas com índice:  {t_indice * 1000:9.2f} ms")
+    print(f"  consultas varrendo:    {t_varredura * 1000:9.1f} ms  ({t_varredura / t_indice:.0f}x)")
+
+
+# -----------------------------------------------
+# Diferença estrutural
+# -----------------------------------------------
+
+def editar_pouco(codigo: str, n_funcs: int) -> str:
+    """Três edições pequenas em programa_muitas_funcoes: operador, comando novo, função removida."""
+    meio = n_funcs // 2
+    codigo = codigo.replace(f"v[i] * {meio + 1};", f"v[i] + {meio + 1};")
+    codigo = codigo.replace(f"int s = {meio // 2};\n", f"int s = {meio // 2};\n    int t = s;\n")
+    ini = codigo.index(f"int f{n_funcs - 3}(")
+    fim = codigo.index(f"int f{n_funcs - 2}(")
+    return codigo[:ini] + codigo[fim:]
+
+
+def _iguais_sem_posicao(a, b) -> bool:
+    # comparação nó a nó, sem hash: o que se faria sem a tabela de hashes
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_iguais_sem_posicao(x, y) for x, y in zip(a, b))
+    if not hasattr(a, "__dataclass_fields__"):
+        return a == b
+    return all(
+        _iguais_sem_posicao(getattr(a, c), getattr(b, c))
+        for c in a.__dataclass_fields__ if c not in ("line", "col")
+    )
+
+
+@benchmark("diferenca")
+def bench_diferenca():
+    from hash_estrutural import diferenca, hashes
+
+    for n in (500, 2000, 8000):
+        codigo = programa_muitas_funcoes(n)
+        antigo = parse_codigo(codigo)
+        novo = parse_codigo(editar_pouco(codigo, n))
+        t_hash = cronometra(lambda: hashes(novo))
+        ma, mb = hashes(antigo), hashes(novo)
+        mudancas = diferenca(antigo, novo, ma, mb)
+        t_diff = cronometra(lambda: diferenca(antigo, novo, ma, mb))
+        print(f"[{n} funções, {len(mb)} nós] {len(mudancas)} mudança(s)")
+        print(f"  hashes (uma versão):      {t_hash * 1000:9.1f} ms")
+        print(f"  diferença com hashes:     {t_diff * 1000:9.2f} ms")
+        if n <= 2000:
+            # sem hash: cada função nova procurada entre as antigas
+            def ingenuo():
+                return [f for f in novo.body if not any(_iguais_sem_posicao(f, g) for g in antigo.body)]
+            t_ingenuo = cronometra(ingenuo, 1)
+            print(f"  busca nó a nó (O(n²)):    {t_ingenuo * 1000:9.1f} ms  "
+                  f"({t_ingenuo / (t_hash * 2 + t_diff):.0f}x hashes + diferença)")
+
+
+
+# -----------------------------------------------
+# Consultas à AST
+# -----------------------------------------------
+
+@benchmark("consultas")
+def bench_consultas():
+    from analisador_sintatico import children
+    from consulta_ast import IndiceAST, compilar
+
+    program = parse_codigo(programa_muitas_funcoes(2000) + "\nint g(void) { while (1) { x = x + 1; } }\n")
+    consultas = {
+        'While(test=Num | CharLit)': lambda n: type(n).__name__ == "While"
+        and type(n.test).__name__ in ("Num", "CharLit"),
+        'Call(callee=Var(name="printf"))': lambda n: type(n).__name__ == "Call"
+        and type(n.callee).__name__ == "Var" and n.callee.name == "printf",
+    }
+
+    def varrendo(teste):
+        # o que se escrevia à mão: percorrer a árvore inteira
+        achados = []
+        pilha = [program]
+        while pilha:
+            n = pilha.pop()
+            if teste(n):
+                achados.append(n)
+            pilha.extend(c for c in children(n) if c is not None)
+        return achados
+
+    t_indice = cronometra(lambda: IndiceAST(program))
+    indice = IndiceAST(program)
+    print(f"{len(indice)} nós; índice construído em {t_indice * 1000:.1f} ms")
+    for texto, teste in consultas.items():
+        p = compilar(texto)
+        n = len(indice.consultar(p))
+        assert n == len(varrendo(teste))
+        t_consulta = cronometra(lambda: indice.consultar(p))
+        t_varredura = cronometra(lambda: varrendo(teste), 1)
+        print(f"  {texto:<34} {n:5} casamento(s)  índice {t_consulta * 1000:7.2f} ms"
+              f"   varredura {t_varredura * 1000:7.1f} ms  ({t_varredura / t_consulta:.0f}x)")
+
+
+# -----------------------------------------------
+# Partida da CLI
+# -----------------------------------------------
+
+# dependências pesadas que só podem ser importadas quando usadas
+IMPORTACOES_ADIADAS = ("tabulate", "matplotlib", "concurrent.futures.process")
+
+
+def importacoes(comando: List[str]) -> Dict[str, int]:
+    """Roda 'comando' com -X importtime; módulo -> tempo cumulativo (µs)."""
+    import subprocess
+
+    r = subprocess.run(
+        [sys.executable, "-X", "importtime", *comando],
+        capture_output=True, text=True, check=True,
+    )
+    tempos: Dict[str, int] = {}
+    for linha in r.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, cumulativo, modulo = linha[len("import time:"):].split("|")
+        tempos[modulo.strip()] = int(cumulativo)
+    return tempos
+
+
+@benchmark("importacao")
+def bench_importacao():
+    import subprocess
+
+    casos = {
+        "import main": ["-c", "import main"],
+        # léxico + parser de exemplos/, só os erros
+        "main.py --check": ["main.py", "--check"],
+    }
+    for nome, comando in casos.items():
+        tempos = importacoes(comando)
+        adiadas = [m for m in tempos if m.split(".")[0] in IMPORTACOES_ADIADAS or m in IMPORTACOES_ADIADAS]
+        assert not adiadas, f"{nome}: importado na partida: {', '.join(adiadas)}"
+
+        def roda():
+            subprocess.run([sys.executable, *comando], capture_output=True, check=True)
+
+        t = cronometra(roda, 5)
+        # módulos que mais pesam, sem contar os que só agrupam outros
+        proprios = sorted(((us, m) for m, us in tempos.items() if m not in ("main", "__main__")), reverse=True)[:4]
+        print(f"{nome:<18} {t * 1000:6.1f} ms  "
+              + ", ".join(f"{m} {us / 1000:.1f}" for us, m in proprios) + " (ms, cumulativo)")
+
+
+if __name__ == "__main__":
+    nomes = sys.argv[1:] or list(BENCHMARKS)
+    for nome in nomes:
+        if nome not in BENCHMARKS:
+            sys.exit(f"benchmark desconhecido: {nome} (disponíveis: {', '.join(BENCHMARKS)})")
+        print(f"\n== {nome} ==")
+        BENCHMARKS[nome]()
@@ -0,0 +1,380 @@
+"""
+Análise de fluxo de dados sobre o grafo de fluxo de controle do código
+intermediário (os blocos básicos de FuncaoIR, gerados da AST).
+
+resolver() é um solver genérico por worklist para problemas gen/kill:
+out = gen | (in & ~kill), com junção por união (análises "may") ou
+interseção ("must"), para frente ou para trás. Conjuntos são bitsets
+em int: o bit k é a variável (ou definição) k, e união, interseção e
+diferença custam uma operação sobre o int inteiro.
+
+Análises:
+- vivacidade (para trás, união): atribuições a locais cujo valor nunca
+  é lido;
+- atribuição definida (para frente, interseção): leituras de locais que
+  nem todo caminho atribuiu;
+- definições alcançantes (para frente, união, com uma definição
+  "indefinida" por local na entrada): separa "nunca atribuída em
+  caminho nenhum" de "talvez não atribuída".
+
+Uma declaração sem valor ('int x;', BlocoBasico.declaracoes) também
+conta como definição indefinida no ponto onde aparece: num laço, a
+variável não herda o valor da volta anterior.
+
+Só variáveis locais entram (FuncaoIR.locais); globais e temporários
+ficam de fora. As análises rodam sobre o IR sem otimizar.
+
+Uso:
+    python fluxo_dados.py exemplos/ex1_correct.c
+"""
+from __future__ import annotations
+import heapq
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from analisador_sintatico import Program
+from codigo_intermediario import FuncaoIR, ModuloIR, gerar_ir, nome_fonte
+
+FRENTE = "frente"
+TRAS = "tras"
+
+
+# -----------------------------------------------
+# Solver genérico
+# -----------------------------------------------
+
+@dataclass
+class ProblemaFluxo:
+    direcao: str               # FRENTE ou TRAS
+    uniao: bool                # junção por união (may) ou por interseção (must)
+    gen: Dict[str, int]        # por rótulo de bloco
+    kill: Dict[str, int]
+    fronteira: int             # valor na entrada (FRENTE) ou nas saídas (TRAS)
+    universo: int              # todos os bits: ponto de partida da interseção
+
+
+@dataclass
+class SolucaoFluxo:
+    """'antes'/'depois' seguem a direção: para TRAS, 'antes' é o fim do bloco."""
+    antes: Dict[str, int]
+    depois: Dict[str, int]
+    visitas: int
+
+    def entrada(self, direcao: str) -> Dict[str, int]:
+        return self.antes if direcao == FRENTE else self.depois
+
+    def saida(self, direcao: str) -> Dict[str, int]:
+        return self.depois if direcao == FRENTE else self.antes
+
+
+def pos_ordem_reversa(f: FuncaoIR) -> List[str]:
+    """
+    Blocos alcançáveis em pós-ordem reversa, seguidos dos inalcançáveis.
+    A busca desce pelos sucessores de trás para frente: assim o corpo de
+    um laço ('branch c ? corpo : fim') vem logo depois do teste, e não
+    depois do resto da função, e cada laço converge sem refazer o resto.
+    """
+    vistos = {f.entrada}
+    ordem: List[str] = []
+    pilha: List[Tuple[str, Iterator[str]]] = [(f.entrada, reversed(f.blocos[f.entrada].sucessores()))]
+    while pilha:
+        r, it = pilha[-1]
+        for s in it:
+            if s not in vistos:
+                vistos.add(s)
+                pilha.append((s, reversed(f.blocos[s].sucessores())))
+                break
+        else:
+            pilha.pop()
+            ordem.append(r)
+    ordem.reverse()
+    return ordem + [r for r in f.blocos if r not in vistos]
+
+
+def resolver(f: FuncaoIR, p: ProblemaFluxo) -> SolucaoFluxo:
+    """
+    Ponto fixo por worklist. A fila é de prioridade pela posição na pós-ordem
+    reversa (invertida para TRAS): um bloco reenfileirado por uma aresta de
+    volta é visitado antes do resto da função, e não depois dela toda.
+    """
+    suc = {r: b.sucessores() for r, b in f.blocos.items()}
+    pred = f.predecessores()
+    ordem = pos_ordem_reversa(f)
+    if p.direcao == FRENTE:
+        fontes, destinos = pred, suc
+        borda = {f.entrada}
+    else:
+        fontes, destinos = suc, pred
+        borda = {r for r, s in suc.items() if not s}
+        ordem.reverse()
+
+    inicial = 0 if p.uniao else p.universo
+    antes = {r: inicial for r in ordem}
+    depois = {r: inicial for r in ordem}
+    gen, kill = p.gen, p.kill
+    posicao = {r: k for k, r in enumerate(ordem)}
+    fila = list(range(len(ordem)))  # já é um heap
+    na_fila = set(ordem)
+    visitas = 0
+    while fila:
+        r = ordem[heapq.heappop(fila)]
+        na_fila.discard(r)
+        visitas += 1
+        if p.uniao:
+            x = p.fronteira if r in borda else 0
+            for s in fontes[r]:
+                x |= depois[s]
+        else:
+            x = p.fronteira if r in borda else p.universo
+            for s in fontes[r]:
+                x &= depois[s]
+        antes[r] = x
+        y = gen[r] | (x & ~kill[r])
+        if y != depois[r]:
+            depois[r] = y
+            for d in destinos[r]:
+                if d not in na_fila:
+                    na_fila.add(d)
+                    heapq.heappush(fila, posicao[d])
+    return SolucaoFluxo(antes, depois, visitas)
+
+
+# -----------------------------------------------
+# Variáveis e definições como bits
+# -----------------------------------------------
+
+class Bits:
+    """Numera nomes (ou definições) e converte entre bitsets e listas."""
+
+    def __init__(self, nomes: List[str]):
+        self.nomes = list(dict.fromkeys(nomes))
+        self.bit = {n: 1 << k for k, n in enumerate(self.nomes)}
+        self.todos = (1 << len(self.nomes)) - 1
+
+    def de(self, nomes) -> int:
+        b = 0
+        for n in nomes:
+            b |= self.bit.get(n, 0)
+        return b
+
+    def lista(self, bits: int) -> List[str]:
+        out = []
+        k = 0
+        while bits:
+            if bits & 1:
+                out.append(self.nomes[k])
+            bits >>= 1
+            k += 1
+        return out
+
+
+def _passos(f: FuncaoIR, r: str) -> List[Tuple[List[str], Optional[str], int, int, bool]]:
+    """
+    (usos, destino, linha, coluna, declaração) de cada instrução do bloco,
+    terminador por último. Declarações sem valor entram como passos sem
+    usos com declaração=True: o destino perde o valor em vez de ganhar um.
+    """
+    b = f.blocos[r]
+    decl: Dict[int, List[str]] = {}
+    for k, v in b.declaracoes:
+        decl.setdefault(k, []).append(v)
+    out = []
+    for k, ins in enumerate(b.instrs):
+        out.extend(([], v, 0, 0, True) for v in decl.get(k, ()))
+        out.append((ins.usos(), ins.dest, ins.line, ins.col, False))
+    out.extend(([], v, 0, 0, True) for v in decl.get(len(b.instrs), ()))
+    t = b.term
+    out.append((t.usos(), None, getattr(t, "line", 0), getattr(t, "col", 0), False))
+    return out
+
+
+# -----------------------------------------------
+# Análises
+# -----------------------------------------------
+
+def vivacidade(f: FuncaoIR, vars_: Optional[Bits] = None) -> Tuple[SolucaoFluxo, Bits]:
+    """Locais vivas no início ('depois') e no fim ('antes') de cada bloco."""
+    vars_ = vars_ or Bits(f.locais)
+    gen: Dict[str, int] = {}
+    kill: Dict[str, int] = {}
+    for r in f.blocos:
+        g = k = 0
+        for usos, dest, _, _, _ in reversed(_passos(f, r)):
+            if dest is not None:
+                bd = vars_.bit.get(dest, 0)
+                g &= ~bd
+                k |= bd
+            g |= vars_.de(usos)
+        gen[r], kill[r] = g, k
+    p = ProblemaFluxo(TRAS, True, gen, kill, 0, vars_.todos)
+    return resolver(f, p), vars_
+
+
+def atribuicao_definida(f: FuncaoIR, vars_: Optional[Bits] = None) -> Tuple[SolucaoFluxo, Bits]:
+    """Locais atribuídas em todo caminho até o início/fim de cada bloco."""
+    vars_ = vars_ or Bits(f.locais)
+    gen: Dict[str, int] = {}
+    kill: Dict[str, int] = {}
+    for r in f.blocos:
+        g = k = 0
+        for _, dest, _, _, declaracao in _passos(f, r):
+            bd = vars_.bit.get(dest, 0)
+            if declaracao:
+                g &= ~bd
+                k |= bd
+            else:
+                g |= bd
+        gen[r], kill[r] = g, k
+    p = ProblemaFluxo(FRENTE, False, gen, kill, vars_.de(f.params), vars_.todos)
+    return resolver(f, p), vars_
+
+
+@dataclass
+class Definicoes:
+    """Definição k: (variável, bloco, índice do passo); índice -1 = 'indefinida' na entrada."""
+    lista: List[Tuple[str, str, int]]
+    por_var: Dict[str, int]      # variável -> bits de todas as suas definições
+    indefinida: Dict[str, int]   # variável -> bits das indefinidas (entrada e declarações sem valor)
+    bit_de: Dict[Tuple[str, int], int]  # (bloco, índice) -> bit da definição
+
+
+def definicoes_alcancantes(f: FuncaoIR, vars_: Optional[Bits] = None) -> Tuple[SolucaoFluxo, Definicoes]:
+    vars_ = vars_ or Bits(f.locais)
+    params = set(f.params)
+    lista: List[Tuple[str, str, int]] = []
+    por_var: Dict[str, int] = {v: 0 for v in vars_.nomes}
+    indefinida: Dict[str, int] = {}
+    # parâmetros chegam definidos: só as demais locais ganham a definição indefinida
+    fronteira = 0
+    for v in vars_.nomes:
+        if v not in params:
+            indefinida[v] = 1 << len(lista)
+            por_var[v] |= indefinida[v]
+            fronteira |= indefinida[v]
+            lista.append((v, "", -1))
+    def_de: Dict[Tuple[str, int], int] = {}
+    for r in f.blocos:
+        for k, (_, dest, _, _, declaracao) in enumerate(_passos(f, r)):
+            if dest in por_var:
+                bit = 1 << len(lista)
+                def_de[(r, k)] = bit
+                por_var[dest] |= bit
+                if declaracao:
+                    indefinida[dest] = indefinida.get(dest, 0) | bit
+                lista.append((dest, r, k))
+
+    gen: Dict[str, int] = {}
+    kill: Dict[str, int] = {}
+    for r in f.blocos:
+        g = k_ = 0
+        for k, (_, dest, _, _, _) in enumerate(_passos(f, r)):
+            if dest in por_var:
+                g = (g & ~por_var[dest]) | def_de[(r, k)]
+                k_ |= por_var[dest]
+        gen[r], kill[r] = g, k_
+    todos = (1 << len(lista)) - 1
+    p = ProblemaFluxo(FRENTE, True, gen, kill, fronteira, todos)
+    return resolver(f, p), Definicoes(lista, por_var, indefinida, def_de)
+
+
+# -----------------------------------------------
+# Diagnósticos
+# -----------------------------------------------
+
+@dataclass
+class Diagnostico:
+    funcao: str
+    linha: int
+    coluna: int
+    gravidade: str     # "erro" ou "aviso"
+    mensagem: str
+
+    def __str__(self) -> str:
+        return f"  - {self.gravidade}: {self.mensagem} [{self.funcao}] @ {self.linha}:{self.coluna}"
+
+
+def diagnosticar_funcao(f: FuncaoIR) -> List[Diagnostico]:
+    if not f.locais:
+        return []
+    vars_ = Bits(f.locais)
+    vivas, _ = vivacidade(f, vars_)
+    definidas, _ = atribuicao_definida(f, vars_)
+    alcance, defs = definicoes_alcancantes(f, vars_)
+    out: List[Diagnostico] = []
+
+    for r in f.blocos:
+        passos = _passos(f, r)
+
+        # atribuição definida + definições alcançantes: leituras sem valor
+        atribuidas = definidas.antes[r]
+        chegam = alcance.antes[r]
+        for k, (usos, dest, linha, col, declaracao) in enumerate(passos):
+            for u in usos:
+                bu = vars_.bit.get(u)
+                if bu is None or atribuidas & bu:
+                    continue
+                nome = nome_fonte(u)
+                if not chegam & defs.por_var[u] & ~defs.indefinida.get(u, 0):
+                    out.append(Diagnostico(f.nome, linha, col, "erro",
+                                           f"'{nome}' é lida sem nunca ter sido atribuída"))
+                else:
+                    out.append(Diagnostico(f.nome, linha, col, "aviso",
+                                           f"'{nome}' pode ser lida sem ter sido atribuída"))
+                atribuidas |= bu  # reporta só a primeira leitura de cada caminho
+            if dest in vars_.bit:
+                if declaracao:
+                    atribuidas &= ~vars_.bit[dest]
+                else:
+                    atribuidas |= vars_.bit[dest]
+                chegam = (chegam & ~defs.por_var[dest]) | defs.bit_de[(r, k)]
+
+        # vivacidade: atribuições que ninguém lê
+        vivas_aqui = vivas.antes[r]
+        for usos, dest, linha, col, declaracao in reversed(passos):
+            if dest is not None:
+                bd = vars_.bit.get(dest, 0)
+                if bd and not declaracao and not vivas_aqui & bd:
+                    out.append(Diagnostico(f.nome, linha, col, "aviso",
+                                           f"valor atribuído a '{nome_fonte(dest)}' nunca é lido"))
+                vivas_aqui &= ~bd
+            vivas_aqui |= vars_.de(usos)
+    out.sort(key=lambda d: (d.linha, d.coluna, d.mensagem))
+    return out
+
+
+def diagnosticar(modulo: ModuloIR) -> List[Diagnostico]:
+    out: List[Diagnostico] = []
+    for f in modulo.funcoes:
+        out.extend(diagnosticar_funcao(f))
+    return out
+
+
+def analisar_fluxo(program: Program) -> List[Diagnostico]:
+    """Diagnósticos de fluxo de dados de todas as funções de 'program'."""
+    return diagnosticar(gerar_ir(program))
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+    import sys
+    from analisador_lexico import analisar_lexema
+    from analisador_sintatico import Parser, tokens_from_lexer
+
+    if len(sys.argv) < 2:
+        sys.exit("uso: python fluxo_dados.py ARQUIVO.c ...")
+    for caminho in sys.argv[1:]:
+        with open(caminho, encoding="utf-8") as f:
+            codigo = f.read()
+        with contextlib.redirect_stdout(io.StringIO()):
+            tokens = tokens_from_lexer(analisar_lexema(codigo)[0])
+        program, errors = Parser(tokens).parse_program()
+        print(f"{caminho}:")
+        if errors:
+            print("  (erros sintáticos; análise de fluxo não executada)")
+            continue
+        diags = analisar_fluxo(program)
+        for d in diags:
+            print(d)
+        if not diags:
+            print("  nenhum problema de fluxo de dados")
@@ -0,0 +1,236 @@
+"""
+Divisão determinística de um corpus entre máquinas (--shard K/N).
+
+O shard de um arquivo é o sha1 do caminho relativo (com '/') módulo N,
+então qualquer máquina chega à mesma divisão sem coordenação. Cada shard
+grava um JSON com o manifesto (o que processou, com hash do conteúdo) e
+os resultados; 'mesclar' junta os N JSONs num relatório igual ao de uma
+rodada única (--shard 0/1), conferindo que cada arquivo do corpus foi
+processado exatamente uma vez.
+
+Uso:
+    python main.py --shard 0/3 --corpus exemplos --saida-json s0.json
+    python fragmentacao.py mesclar s0.json s1.json s2.json -o relatorio.json
+    python fragmentacao.py local 3 --corpus exemplos   # N processos lado a lado
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from analise import analisar_fonte
+
+VERSAO_FORMATO = 2
+
+
+class ErroMescla(Exception):
+    """Shards incompatíveis, faltando ou sobrepostos."""
+
+
+def le_shard(texto: str) -> Tuple[int, int]:
+    """'K/N' -> (K, N), com 0 <= K < N."""
+    try:
+        k, n = (int(x) for x in texto.split("/"))
+    except ValueError:
+        raise ValueError(f"shard inválido: {texto!r} (use K/N, ex.: 0/4)") from None
+    if n < 1 or not 0 <= k < n:
+        raise ValueError(f"shard inválido: {texto!r} (precisa de 0 <= K < N)")
+    return k, n
+
+
+def shard_de(caminho_relativo: str, n: int) -> int:
+    h = hashlib.sha1(caminho_relativo.encode("utf-8")).digest()
+    return int.from_bytes(h[:8], "big") % n
+
+
+def listar_corpus(diretorio: str) -> List[str]:
+    """Caminhos relativos (com '/') de todos os .c abaixo de 'diretorio', ordenados."""
+    out: List[str] = []
+    for raiz, dirs, arquivos in os.walk(diretorio):
+        dirs.sort()
+        for nome in arquivos:
+            if nome.lower().endswith(".c"):
+                rel = os.path.relpath(os.path.join(raiz, nome), diretorio)
+                out.append(rel.replace(os.sep, "/"))
+    return sorted(out)
+
+
+def hash_corpus(arquivos: List[str]) -> str:
+    return hashlib.sha1("\n".join(arquivos).encode("utf-8")).hexdigest()
+
+
+def analisar_shard(diretorio: str, k: int, n: int, jobs: int = 1) -> Dict[str, Any]:
+    corpus = listar_corpus(diretorio)
+    meus = [rel for rel in corpus if shard_de(rel, n) == k]
+    manifesto: Dict[str, Any] = {
+        "shard": [k, n],
+        "host": platform.node(),
+        "total_corpus": len(corpus),
+        "hash_corpus": hash_corpus(corpus),
+        "arquivos": [],
+    }
+    resultados: Dict[str, Any] = {}
+    tempos: Dict[str, float] = {}
+    t_shard = time.perf_counter()
+    for rel in meus:
+        with open(os.path.join(diretorio, *rel.split("/")), "rb") as f:
+            conteudo = f.read()
+        t0 = time.perf_counter()
+        r = analisar_fonte(conteudo.decode("utf-8"), jobs=jobs)
+        tempos[rel] = round((time.perf_counter() - t0) * 1000, 3)
+        manifesto["arquivos"].append({
+            "arquivo": rel,
+            "sha1": hashlib.sha1(conteudo).hexdigest(),
+            "bytes": len(conteudo),
+        })
+        resultados[rel] = {
+            "ok": r.ok,
+            "tokens": len(r.tokens),
+            "simbolos": dict(sorted(r.tabela_simbolos.items())),   # identificador -> ocorrências
+            "erros_lexicos": r.erros_lexicos,
+            "erros_sintaticos": [e.strip() for e in r.erros_sintaticos],
+        }
+    manifesto["tempo_total_s"] = round(time.perf_counter() - t_shard, 3)
+    return {
+        "versao": VERSAO_FORMATO,
+        "manifesto": manifesto,
+        "resultados": resultados,
+        "tempos_ms": tempos,
+    }
+
+
+def gravar_json(dados: Dict[str, Any], caminho: str):
+    # chaves ordenadas: o mesmo conteúdo gera sempre os mesmos bytes
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False, indent=1, sort_keys=True)
+        f.write("\n")
+
+
+def mesclar(shards: List[Dict[str, Any]], com_tempos: bool = True) -> Dict[str, Any]:
+    if not shards:
+        raise ErroMescla("nenhum shard informado")
+    versoes = {s.get("versao") for s in shards}
+    if versoes != {VERSAO_FORMATO}:
+        raise ErroMescla(f"versões de formato incompatíveis: {sorted(map(str, versoes))}")
+    mans = [s["manifesto"] for s in shards]
+    n = mans[0]["shard"][1]
+    for chave in ("hash_corpus", "total_corpus"):
+        if len({m[chave] for m in mans}) != 1:
+            raise ErroMescla(f"shards de corpora diferentes ({chave} não bate)")
+    if any(m["shard"][1] != n for m in mans):
+        raise ErroMescla("shards com N diferentes")
+    ks = sorted(m["shard"][0] for m in mans)
+    if ks != list(range(n)):
+        faltam = sorted(set(range(n)) - set(ks))
+        repetidos = sorted({k for k in ks if ks.count(k) > 1})
+        raise ErroMescla(f"shards faltando {faltam} ou repetidos {repetidos} (N={n})")
+
+    arquivos: Dict[str, Any] = {}
+    tempos: Dict[str, float] = {}
+    simbolos: Counter = Counter()
+    for s, m in zip(shards, mans):
+        k = m["shard"][0]
+        for entrada in m["arquivos"]:
+            rel = entrada["arquivo"]
+            if shard_de(rel, n) != k:
+                raise ErroMescla(f"{rel} não pertence ao shard {k}/{n}")
+            if rel in arquivos:
+                raise ErroMescla(f"{rel} processado por mais de um shard")
+            arquivos[rel] = dict(s["resultados"][rel], sha1=entrada["sha1"], bytes=entrada["bytes"])
+            simbolos.update(arquivos[rel]["simbolos"])
+            tempos[rel] = s["tempos_ms"][rel]
+    if len(arquivos) != mans[0]["total_corpus"]:
+        raise ErroMescla(
+            f"{len(arquivos)} arquivo(s) mesclado(s), mas o corpus tem {mans[0]['total_corpus']}"
+        )
+
+    relatorio: Dict[str, Any] = {
+        "versao": VERSAO_FORMATO,
+        "hash_corpus": mans[0]["hash_corpus"],
+        "arquivos": dict(sorted(arquivos.items())),
+        "totais": {
+            "arquivos": len(arquivos),
+            "ok": sum(1 for a in arquivos.values() if a["ok"]),
+            "tokens": sum(a["tokens"] for a in arquivos.values()),
+            "simbolos": dict(sorted(simbolos.items())),
+            "erros_lexicos": sum(len(a["erros_lexicos"]) for a in arquivos.values()),
+            "erros_sintaticos": sum(len(a["erros_sintaticos"]) for a in arquivos.values()),
+        },
+    }
+    if com_tempos:
+        # tempos variam a cada rodada; fora deles o relatório é determinístico
+        relatorio["tempos_ms"] = dict(sorted(tempos.items()))
+        relatorio["tempos_ms_total"] = round(sum(tempos.values()), 3)
+    return relatorio
+
+
+def rodar_local(corpus: str, n: int, pasta: str) -> bool:
+    """
+    Roda N shards em processos lado a lado, mescla e compara com uma
+    rodada única (sem tempos). Devolve True se os relatórios forem iguais.
+    """
+    def comando(k: int, total: int) -> List[str]:
+        saida = os.path.join(pasta, f"shard-{k}-de-{total}.json")
+        return [sys.executable, "main.py", "--shard", f"{k}/{total}",
+                "--corpus", corpus, "--saida-json", saida]
+
+    aqui = os.path.dirname(os.path.abspath(__file__))
+    procs = [subprocess.Popen(comando(k, n), cwd=aqui, stdout=subprocess.DEVNULL) for k in range(n)]
+    procs.append(subprocess.Popen(comando(0, 1), cwd=aqui, stdout=subprocess.DEVNULL))
+    if any(p.wait() != 0 for p in procs):
+        raise RuntimeError("algum shard terminou com erro")
+
+    def carrega(caminho: str) -> Dict[str, Any]:
+        with open(caminho, encoding="utf-8") as f:
+            return json.load(f)
+
+    partes = [carrega(os.path.join(pasta, f"shard-{k}-de-{n}.json")) for k in range(n)]
+    unico = carrega(os.path.join(pasta, "shard-0-de-1.json"))
+    a = mesclar(partes, com_tempos=False)
+    b = mesclar([unico], com_tempos=False)
+    for k, s in enumerate(partes):
+        print(f"shard {k}/{n}: {len(s['manifesto']['arquivos'])} arquivo(s)")
+    igual = json.dumps(a, sort_keys=True) == json.dumps(b, sort_keys=True)
+    print(f"{n} shards mesclados == rodada única: {'sim' if igual else 'NÃO'}")
+    return igual
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Mescla e testa shards do modo --shard")
+    sub = ap.add_subparsers(dest="comando", required=True)
+
+    ap_m = sub.add_parser("mesclar", help="junta os JSONs dos shards num relatório")
+    ap_m.add_argument("shards", nargs="+")
+    ap_m.add_argument("-o", "--saida", default="relatorio.json")
+    ap_m.add_argument("--sem-tempos", action="store_true",
+                      help="omite os tempos (relatório byte a byte comparável)")
+
+    ap_l = sub.add_parser("local", help="roda N shards lado a lado e confere a mescla")
+    ap_l.add_argument("n", type=int)
+    ap_l.add_argument("--corpus", default="exemplos")
+
+    args = ap.parse_args()
+    if args.comando == "mesclar":
+        dados = []
+        for caminho in args.shards:
+            with open(caminho, encoding="utf-8") as f:
+                dados.append(json.load(f))
+        try:
+            rel = mesclar(dados, com_tempos=not args.sem_tempos)
+        except ErroMescla as e:
+            sys.exit(f"erro ao mesclar: {e}")
+        gravar_json(rel, args.saida)
+        t = rel["totais"]
+        print(f"{args.saida}: {t['arquivos']} arquivo(s), {t['ok']} OK, "
+              f"{t['erros_sintaticos']} erro(s) sintático(s)")
+    else:
+        with tempfile.TemporaryDirectory() as pasta:
+            sys.exit(0 if rodar_local(args.corpus, args.n, pasta) else 1)
@@ -0,0 +1,323 @@
+"""
+Hash estrutural (Merkle) da AST e diferença estrutural entre duas versões.
+
+O hash de um nó combina o tipo, os campos escalares e os hashes dos
+filhos; posições (line/col) ficam de fora, então editar espaços ou
+comentários não muda nada. Como cada subárvore tem o seu próprio hash,
+dá para comparar funções (ou qualquer subárvore) isoladamente.
+
+Os hashes de todos os nós saem de uma passada só, de baixo para cima,
+numa tabela id(nó) -> digest (hashes()). diferenca() desce as duas
+árvores juntas e pula em O(1) toda subárvore de hash igual; numa edição
+pequena só o caminho até o que mudou é visitado. Listas (corpos de
+bloco, argumentos) são alinhadas pelos hashes dos itens: prefixo e
+sufixo iguais saem direto, e o meio vai para o difflib.
+
+Uso (mudanças entre duas versões de um arquivo):
+    python hash_estrutural.py ANTIGO.c NOVO.c
+"""
+from __future__ import annotations
+import hashlib
+import sys
+from dataclasses import dataclass, fields, is_dataclass
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Tuple
+
+from analisador_sintatico import Block, FuncDef, Program
+
+_IGNORADOS = ("line", "col")
+
+# tipo -> campos que entram no hash (None: não é nó da AST)
+_CAMPOS: Dict[type, Optional[Tuple[str, ...]]] = {}
+
+
+def _campos(tipo: type) -> Optional[Tuple[str, ...]]:
+    try:
+        return _CAMPOS[tipo]
+    except KeyError:
+        pass
+    c = tuple(f.name for f in fields(tipo) if f.name not in _IGNORADOS) if is_dataclass(tipo) else None
+    _CAMPOS[tipo] = c
+    return c
+
+
+def _composto(x: Any) -> bool:
+    return isinstance(x, list) or _campos(type(x)) is not None
+
+
+def _digest_escalar(v: Any) -> bytes:
+    # o tipo entra para 1 e 1.0 ou "1" não colidirem
+    h = hashlib.sha1()
+    h.update(type(v).__name__.encode())
+    h.update(b":")
+    h.update(repr(v).encode())
+    return h.digest()
+
+
+def digest(n: Any, memo: Optional[Dict[int, bytes]] = None) -> bytes:
+    """
+    Digest (sha1, 20 bytes) da subárvore 'n'. 'memo' guarda os digests
+    por id() e pode ser reaproveitado entre chamadas sobre a mesma
+    árvore (ou DAG, com hash-consing).
+    """
+    if memo is None:
+        memo = {}
+    d = memo.get(id(n))
+    if d is not None:
+        return d
+    if not _composto(n):
+        return _digest_escalar(n)
+    escalares: Dict[Tuple[type, Any], bytes] = {}
+    # pós-ordem iterativa: expressões longas não estouram a recursão
+    pilha: List[Tuple[Any, bool]] = [(n, False)]
+    while pilha:
+        no, expandido = pilha.pop()
+        if id(no) in memo:
+            continue
+        campos = _campos(type(no))
+        partes = no if campos is None else [getattr(no, c) for c in campos]
+        if not expandido:
+            pilha.append((no, True))
+            pilha.extend((p, False) for p in partes if _composto(p) and id(p) not in memo)
+            continue
+        h = hashlib.sha1()
+        if campos is None:
+            h.update(b"[")
+        else:
+            h.update(type(no).__name__.encode())
+            h.update(b"(")
+        for p in partes:
+            if _composto(p):
+                h.update(memo[id(p)])
+            else:
+                # escalares (ints pequenos, strings internadas) têm id()
+                # reaproveitado: vão para uma tabela própria, por valor
+                k = (type(p), p)
+                d = escalares.get(k)
+                if d is None:
+                    d = escalares[k] = _digest_escalar(p)
+                h.update(d)
+        h.update(b"]" if campos is None else b")")
+        memo[id(no)] = h.digest()
+    return memo[id(n)]
+
+
+def hashes(raiz: Any) -> Dict[int, bytes]:
+    """id(nó) -> digest de todos os nós (e listas) de 'raiz', numa passada."""
+    memo: Dict[int, bytes] = {}
+    digest(raiz, memo)
+    return memo
+
+
+def hash_estrutural(n: Any) -> str:
+    """Hash hexadecimal de um Program ou de qualquer subárvore."""
+    return digest(n).hex()
+
+
+def hashes_por_funcao(program: Program) -> Dict[str, str]:
+    """nome da função -> hash estrutural da FuncDef."""
+    memo: Dict[int, bytes] = {}
+    return {
+        n.name: digest(n, memo).hex()
+        for n in program.body
+        if isinstance(n, FuncDef)
+    }
+
+
+# -----------------------------------------------
+# Diferença estrutural
+# -----------------------------------------------
+
+def _posicao(n: Any) -> Optional[Tuple[int, int]]:
+    line = getattr(n, "line", None)
+    return None if line is None else (line, n.col)
+
+
+@dataclass
+class Mudanca:
+    """
+    Uma mudança entre as versões. 'inserido' só tem 'depois', 'removido'
+    só tem 'antes'; 'modificado' tem os dois: mudou um campo escalar do
+    nó (operador, nome, valor) ou o tipo do nó naquela posição. Mudanças
+    nos filhos de um nó aparecem como mudanças dos próprios filhos.
+    """
+    tipo: str                   # "inserido", "removido" ou "modificado"
+    antes: Any
+    depois: Any
+    caminho: str                # ex.: "main().body.body[3].value"
+    funcao: Optional[str] = None
+    comando: Any = None         # item de bloco que contém a mudança (da versão nova, se houver)
+
+    @property
+    def no(self) -> Any:
+        return self.depois if self.depois is not None else self.antes
+
+    @property
+    def posicao_antes(self) -> Optional[Tuple[int, int]]:
+        return _posicao(self.antes)
+
+    @property
+    def posicao_depois(self) -> Optional[Tuple[int, int]]:
+        return _posicao(self.depois)
+
+    def __str__(self) -> str:
+        def fmt(p):
+            return f"{p[0]}:{p[1]}" if p else "-"
+        return (
+            f"{self.tipo:<10} {type(self.no).__name__:<8} {fmt(self.posicao_antes):>7} -> "
+            f"{fmt(self.posicao_depois):<7} {self.caminho}"
+        )
+
+
+def _segmento(caminho: str, k: int, item: Any) -> str:
+    if isinstance(item, FuncDef):
+        return f"{item.name}()"
+    return f"{caminho}[{k}]"
+
+
+def _mesmo_papel(a: Any, b: Any) -> bool:
+    """Se dois itens desalinhados de uma lista são o mesmo item editado."""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, FuncDef):
+        return a.name == b.name
+    return True
+
+
+def diferenca(
+    antigo: Any,
+    novo: Any,
+    memo_antigo: Optional[Dict[int, bytes]] = None,
+    memo_novo: Optional[Dict[int, bytes]] = None,
+) -> List[Mudanca]:
+    """
+    Mudanças de 'antigo' para 'novo' (dois Program, ou duas subárvores),
+    na ordem do fonte. Os memos são os de hashes()/digest(); se vierem
+    prontos, a passada de hash não é refeita.
+    """
+    ma = memo_antigo if memo_antigo is not None else {}
+    mb = memo_novo if memo_novo is not None else {}
+    digest(antigo, ma)
+    digest(novo, mb)
+
+    def dig(x: Any, memo: Dict[int, bytes]) -> bytes:
+        return memo[id(x)] if _composto(x) else _digest_escalar(x)
+
+    saida: List[Mudanca] = []
+    # (antigo, novo, caminho, função, comando); a pilha recebe os filhos
+    # em ordem inversa para a saída sair na ordem do fonte
+    pilha: List[Tuple[Any, Any, str, Optional[str], Any]] = [(antigo, novo, "", None, None)]
+    while pilha:
+        a, b, caminho, funcao, comando = pilha.pop()
+        if a is None and b is None:
+            continue
+        if a is None or b is None:
+            tipo = "inserido" if a is None else "removido"
+            saida.append(Mudanca(tipo, a, b, caminho, funcao, comando))
+            continue
+        if _composto(a) and _composto(b) and ma[id(a)] == mb[id(b)]:
+            continue    # subárvores iguais
+
+        if isinstance(a, list) and isinstance(b, list):
+            # itens de Program.body e Block.body são comandos
+            de_comandos = caminho == "body" or caminho.endswith(".body")
+            ha = [dig(x, ma) for x in a]
+            hb = [dig(x, mb) for x in b]
+            ini = 0
+            while ini < len(a) and ini < len(b) and ha[ini] == hb[ini]:
+                ini += 1
+            fim = 0
+            while fim < len(a) - ini and fim < len(b) - ini and ha[-1 - fim] == hb[-1 - fim]:
+                fim += 1
+            blocos = SequenceMatcher(
+                None, ha[ini:len(a) - fim], hb[ini:len(b) - fim], autojunk=False
+            ).get_opcodes()
+            filhos = []
+            for tag, i1, i2, j1, j2 in blocos:
+                if tag == "equal":
+                    continue
+                i, i2, j, j2 = ini + i1, ini + i2, ini + j1, ini + j2
+                pares = []
+                # cada item antigo casa com o próximo novo de mesmo papel
+                # (editado); os novos pulados foram inseridos, e um antigo
+                # sem par foi removido
+                while i < i2 and j < j2:
+                    k = j
+                    while k < j2 and not _mesmo_papel(a[i], b[k]):
+                        k += 1
+                    if k == j2:
+                        pares.append((i, None))
+                        i += 1
+                        continue
+                    pares += [(None, jj) for jj in range(j, k)]
+                    pares.append((i, k))
+                    i, j = i + 1, k + 1
+                pares += [(ii, None) for ii in range(i, i2)]
+                pares += [(None, jj) for jj in range(j, j2)]
+                for i, j in pares:
+                    x = a[i] if i is not None else None
+                    y = b[j] if j is not None else None
+                    item = y if y is not None else x
+                    sub = _segmento(caminho, j if j is not None else i, item)
+                    fn = item.name if isinstance(item, FuncDef) else funcao
+                    filhos.append((x, y, sub, fn, item if de_comandos else comando))
+            pilha.extend(reversed(filhos))
+            continue
+
+        if type(a) is not type(b) or not _composto(a):
+            saida.append(Mudanca("modificado", a, b, caminho, funcao, comando))
+            continue
+
+        filhos = []
+        escalar_mudou = False
+        for c in _campos(type(a)):
+            va, vb = getattr(a, c), getattr(b, c)
+            if _composto(va) or _composto(vb) or va is None or vb is None:
+                filhos.append((va, vb, f"{caminho}.{c}" if caminho else c, funcao, comando))
+            elif type(va) is not type(vb) or va != vb:
+                escalar_mudou = True
+        if escalar_mudou:
+            saida.append(Mudanca("modificado", a, b, caminho, funcao, comando))
+        pilha.extend(reversed(filhos))
+    return saida
+
+
+def funcoes_alteradas(mudancas: List[Mudanca]) -> List[str]:
+    """Funções com alguma mudança (inclusive inseridas e removidas), na ordem em que aparecem."""
+    return list(dict.fromkeys(m.funcao for m in mudancas if m.funcao is not None))
+
+
+def _parse(caminho: str) -> Tuple[Program, List[str]]:
+    import contextlib
+    import io
+    from analisador_lexico import analisar_lexema
+    from analisador_sintatico import Parser, tokens_from_lexer
+
+    with open(caminho, encoding="utf-8") as f:
+        codigo = f.read()
+    with contextlib.redirect_stdout(io.StringIO()):
+        lista_tokens, _ = analisar_lexema(codigo)
+    return Parser(tokens_from_lexer(lista_tokens)).parse_program()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("uso: python hash_estrutural.py ANTIGO.c NOVO.c")
+    versoes = []
+    for caminho in sys.argv[1:]:
+        program, errors = _parse(caminho)
+        if errors:
+            print(f"aviso: {caminho} tem {len(errors)} erro(s) sintático(s); "
+                  f"a diferença usa a AST recuperada", file=sys.stderr)
+        versoes.append(program)
+    mudancas = diferenca(*versoes)
+    if not mudancas:
+        print("Nenhuma mudança estrutural.")
+        raise SystemExit(0)
+    for m in mudancas:
+        print(m)
+    fns = funcoes_alteradas(mudancas)
+    if fns:
+        print(f"\nFunções alteradas: {', '.join(fns)}")
+    comandos = {id(m.comando) for m in mudancas if m.comando is not None}
+    print(f"{len(mudancas)} mudança(s) em {len(comandos)} comando(s)")
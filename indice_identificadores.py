@@ -0,0 +1,265 @@
+"""
+Índice invertido persistente de identificadores do corpus (sqlite3).
+
+Para cada identificador guarda as ocorrências (arquivo, linha, coluna,
+papel), com papel 'declaracao' (função, variável ou parâmetro), 'uso'
+ou 'chamada' (alvo de uma Call). As ocorrências saem da AST; o nome de
+uma função vem do token ID logo após o token do tipo de retorno.
+
+A atualização é incremental: arquivos com mtime e tamanho iguais aos
+do banco nem são lidos, os com o mesmo sha1 só têm o stat atualizado,
+e apenas os alterados são reanalisados. Os que sumiram do corpus saem
+do índice. Consultas não reanalisam nada.
+
+Uso:
+    python indice_identificadores.py atualizar [--corpus exemplos]
+    python indice_identificadores.py onde printf
+    python indice_identificadores.py nunca-chamadas
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from analise import analisar_fonte
+from analisador_sintatico import Call, FuncDef, Program, Var, VarDecl, children
+from fragmentacao import listar_corpus
+
+BANCO_PADRAO = ".indice_identificadores.sqlite"
+VERSAO_ESQUEMA = 1
+
+PAPEIS = ("declaracao", "uso", "chamada")
+
+# (nome, linha, coluna, papel, tipo da declaração ou None)
+Ocorrencia = Tuple[str, int, int, str, Optional[str]]
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS arquivos (
+    id       INTEGER PRIMARY KEY,
+    caminho  TEXT NOT NULL UNIQUE,
+    sha1     TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    tamanho  INTEGER NOT NULL,
+    ok       INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ocorrencias (
+    nome    TEXT NOT NULL,
+    arquivo INTEGER NOT NULL REFERENCES arquivos(id) ON DELETE CASCADE,
+    linha   INTEGER NOT NULL,
+    coluna  INTEGER NOT NULL,
+    papel   TEXT NOT NULL,
+    tipo    TEXT
+);
+CREATE INDEX IF NOT EXISTS ocorrencias_nome ON ocorrencias (nome, papel);
+CREATE INDEX IF NOT EXISTS ocorrencias_arquivo ON ocorrencias (arquivo);
+CREATE INDEX IF NOT EXISTS ocorrencias_funcoes ON ocorrencias (nome) WHERE tipo = 'funcao';
+"""
+
+
+def ocorrencias(program: Program, tokens: List[Any]) -> Iterator[Ocorrencia]:
+    """Ocorrências de identificadores na AST ('tokens' são os do léxico)."""
+    posicao_token = {(t.linha, t.coluna): i for i, t in enumerate(tokens)}
+    pilha: List[Any] = [program]
+    while pilha:
+        n = pilha.pop()
+        if isinstance(n, FuncDef):
+            i = posicao_token.get((n.line, n.col))
+            if i is not None and i + 1 < len(tokens) and tokens[i + 1].tipo == "ID":
+                t = tokens[i + 1]
+                yield (n.name, t.linha, t.coluna, "declaracao", "funcao")
+            for p in n.params:
+                if p.name is not None:
+                    yield (p.name.name, p.name.line, p.name.col, "declaracao", "parametro")
+                if p.init is not None:
+                    pilha.append(p.init)
+            pilha.append(n.body)
+            continue
+        if isinstance(n, VarDecl):
+            if n.name is not None:
+                yield (n.name.name, n.name.line, n.name.col, "declaracao", "variavel")
+            if n.init is not None:
+                pilha.append(n.init)
+            continue
+        if isinstance(n, Call):
+            if isinstance(n.callee, Var):
+                yield (n.callee.name, n.callee.line, n.callee.col, "chamada", None)
+            else:
+                pilha.append(n.callee)
+            pilha.extend(a for a in n.args if a is not None)
+            continue
+        if isinstance(n, Var):
+            yield (n.name, n.line, n.col, "uso", None)
+            continue
+        pilha.extend(c for c in children(n) if c is not None)
+
+
+class IndiceIdentificadores:
+    """Banco sqlite com as ocorrências de cada identificador do corpus."""
+
+    def __init__(self, banco: str = BANCO_PADRAO):
+        self.banco = banco
+        self.con = sqlite3.connect(banco)
+        self.con.execute("PRAGMA foreign_keys = ON")
+        versao = self.con.execute("PRAGMA user_version").fetchone()[0]
+        if versao not in (0, VERSAO_ESQUEMA):
+            # esquema antigo: o índice é só um cache, então recomeça do zero
+            self.con.executescript("DROP TABLE IF EXISTS ocorrencias; DROP TABLE IF EXISTS arquivos;")
+        self.con.executescript(_ESQUEMA)
+        self.con.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA}")
+
+    def fechar(self):
+        self.con.close()
+
+    def __enter__(self) -> "IndiceIdentificadores":
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    # ---------- atualização ----------
+    def _registrar(self, caminho: str, conteudo: bytes, mtime_ns: int, tamanho: int) -> bool:
+        """
+        Põe 'caminho' em dia no índice. Devolve True se o arquivo foi
+        reanalisado (False quando só o stat mudou).
+        """
+        sha1 = hashlib.sha1(conteudo).hexdigest()
+        linha = self.con.execute(
+            "SELECT id, sha1 FROM arquivos WHERE caminho = ?", (caminho,)
+        ).fetchone()
+        if linha is not None and linha[1] == sha1:
+            self.con.execute(
+                "UPDATE arquivos SET mtime_ns = ?, tamanho = ? WHERE id = ?",
+                (mtime_ns, tamanho, linha[0]),
+            )
+            return False
+
+        r = analisar_fonte(conteudo.decode("utf-8"))
+        if linha is not None:
+            self.con.execute("DELETE FROM arquivos WHERE id = ?", (linha[0],))
+        cur = self.con.execute(
+            "INSERT INTO arquivos (caminho, sha1, mtime_ns, tamanho, ok) VALUES (?, ?, ?, ?, ?)",
+            (caminho, sha1, mtime_ns, tamanho, int(r.ok)),
+        )
+        arquivo_id = cur.lastrowid
+        self.con.executemany(
+            "INSERT INTO ocorrencias (nome, arquivo, linha, coluna, papel, tipo) VALUES (?, ?, ?, ?, ?, ?)",
+            ((nome, arquivo_id, l, c, papel, tipo)
+             for nome, l, c, papel, tipo in ocorrencias(r.program, r.tokens)),
+        )
+        return True
+
+    def _remover(self, caminho: str):
+        self.con.execute("DELETE FROM arquivos WHERE caminho = ?", (caminho,))
+
+    def atualizar(self, corpus: str) -> Dict[str, int]:
+        """
+        Sincroniza o índice com os .c abaixo de 'corpus' (caminhos
+        relativos com '/', como em fragmentacao). Devolve contagens de
+        arquivos reanalisados, só com stat novo, inalterados e removidos.
+        """
+        conhecidos = {
+            caminho: (mtime, tam)
+            for caminho, mtime, tam in self.con.execute(
+                "SELECT caminho, mtime_ns, tamanho FROM arquivos"
+            )
+        }
+        cont = {"reanalisados": 0, "tocados": 0, "inalterados": 0, "removidos": 0}
+        atuais = listar_corpus(corpus)
+        with self.con:
+            for rel in atuais:
+                caminho = os.path.join(corpus, *rel.split("/"))
+                try:
+                    st = os.stat(caminho)
+                    if conhecidos.get(rel) == (st.st_mtime_ns, st.st_size):
+                        cont["inalterados"] += 1
+                        continue
+                    with open(caminho, "rb") as f:
+                        conteudo = f.read()
+                except OSError:
+                    continue  # apagado durante a varredura: sai na próxima
+                if self._registrar(rel, conteudo, st.st_mtime_ns, st.st_size):
+                    cont["reanalisados"] += 1
+                else:
+                    cont["tocados"] += 1
+            for rel in sorted(set(conhecidos) - set(atuais)):
+                self._remover(rel)
+                cont["removidos"] += 1
+        return cont
+
+    # ---------- consultas ----------
+    def onde(self, nome: str, papel: Optional[str] = None) -> List[Tuple[str, int, int, str]]:
+        """(arquivo, linha, coluna, papel) de cada ocorrência de 'nome'."""
+        sql = (
+            "SELECT a.caminho, o.linha, o.coluna, o.papel FROM ocorrencias o "
+            "JOIN arquivos a ON a.id = o.arquivo WHERE o.nome = ?"
+        )
+        args: Tuple[Any, ...] = (nome,)
+        if papel is not None:
+            if papel not in PAPEIS:
+                raise ValueError(f"papel desconhecido: {papel!r} (use {', '.join(PAPEIS)})")
+            sql += " AND o.papel = ?"
+            args += (papel,)
+        return self.con.execute(sql + " ORDER BY a.caminho, o.linha, o.coluna", args).fetchall()
+
+    def nunca_chamadas(self, ignorar: Tuple[str, ...] = ("main",)) -> List[Tuple[str, str, int, int]]:
+        """Funções declaradas em algum arquivo e não chamadas em nenhum: (nome, arquivo, linha, coluna)."""
+        marcadores = ", ".join("?" for _ in ignorar) or "NULL"
+        return self.con.execute(
+            "SELECT o.nome, a.caminho, o.linha, o.coluna FROM ocorrencias o "
+            "JOIN arquivos a ON a.id = o.arquivo "
+            "WHERE o.tipo = 'funcao' "
+            f"AND o.nome NOT IN ({marcadores}) "
+            "AND NOT EXISTS (SELECT 1 FROM ocorrencias c "
+            "                WHERE c.nome = o.nome AND c.papel = 'chamada') "
+            "ORDER BY o.nome, a.caminho",
+            ignorar,
+        ).fetchall()
+
+    def estatisticas(self) -> Tuple[int, int, int]:
+        """(arquivos, ocorrências, identificadores distintos)."""
+        arquivos = self.con.execute("SELECT COUNT(*) FROM arquivos").fetchone()[0]
+        occ, nomes = self.con.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT nome) FROM ocorrencias"
+        ).fetchone()
+        return arquivos, occ, nomes
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Índice persistente de identificadores do corpus")
+    ap.add_argument("--banco", default=BANCO_PADRAO, help=f"arquivo sqlite (padrão: {BANCO_PADRAO})")
+    sub = ap.add_subparsers(dest="comando", required=True)
+
+    ap_a = sub.add_parser("atualizar", help="reanalisa só os arquivos alterados do corpus")
+    ap_a.add_argument("--corpus", default="exemplos")
+
+    ap_o = sub.add_parser("onde", help="ocorrências de um identificador")
+    ap_o.add_argument("nome")
+    ap_o.add_argument("--papel", choices=PAPEIS)
+
+    sub.add_parser("nunca-chamadas", help="funções declaradas que ninguém chama (exceto main)")
+
+    args = ap.parse_args()
+    with IndiceIdentificadores(args.banco) as indice:
+        t0 = time.perf_counter()
+        if args.comando == "atualizar":
+            cont = indice.atualizar(args.corpus)
+            arquivos, occ, nomes = indice.estatisticas()
+            print(", ".join(f"{v} {k}" for k, v in cont.items()))
+            print(f"{args.banco}: {arquivos} arquivo(s), {occ} ocorrência(s), {nomes} identificador(es)")
+        elif args.comando == "onde":
+            linhas = indice.onde(args.nome, args.papel)
+            if not linhas:
+                print(f"'{args.nome}' não aparece no índice.")
+            for caminho, l, c, papel in linhas:
+                print(f"{caminho}:{l}:{c}  {papel}")
+        else:
+            linhas = indice.nunca_chamadas()
+            if not linhas:
+                print("Toda função declarada é chamada em algum lugar.")
+            for nome, caminho, l, c in linhas:
+                print(f"{nome}  ({caminho}:{l}:{c})")
+        print(f"({(time.perf_counter() - t0) * 1000:.1f} ms)", file=sys.stderr)
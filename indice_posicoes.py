@@ -0,0 +1,225 @@
+"""
+Índice de posições: de (linha, coluna) do fonte para os nós da AST.
+
+Cada nó ganha um intervalo [início, fim) no fonte, calculado uma vez a
+partir dos tokens: o token âncora do nó (o do seu line/col), os
+intervalos dos filhos e os delimitadores que o parser consumiu e que
+não viram nó (o '{' de um Block, o ')' de uma Call, o ']' de um Index).
+O intervalo de um nó sempre contém os dos filhos, então os nós que
+contêm uma posição formam um caminho a partir da raiz.
+
+As consultas usam arrays ordenados de inícios e bisect:
+- pilha_em(linha, col): da raiz ao nó mais interno, O(profundidade · log g),
+  com g o número de filhos em cada nível;
+- sobrepostos(inicio, fim): todos os nós que tocam o trecho,
+  O(profundidade · log g + log n + k) para k resultados.
+
+Nós vêm de id(); com hash-consing um nó compartilhado fica só com o
+intervalo da primeira ocorrência, então indexe árvores comuns.
+
+Uso:
+    python indice_posicoes.py exemplos/ex1_correct.c 12:9 [3:1-5:1 ...]
+"""
+from __future__ import annotations
+import bisect
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from analisador_sintatico import Token, children
+
+Pos = Tuple[int, int]                # (linha, coluna), ambos a partir de 1
+Intervalo = Tuple[Pos, Pos]          # [início, fim)
+
+_ABRE = {"LPAREN": "RPAREN", "LBRACK": "RBRACK", "LBRACE": "RBRACE"}
+
+
+def _pares(tokens: List[Token]) -> Dict[int, int]:
+    """Índice do delimitador que fecha/abre cada ( [ { ) ] } casado."""
+    pares: Dict[int, int] = {}
+    pilha: List[int] = []
+    fecha = {v: k for k, v in _ABRE.items()}
+    for i, t in enumerate(tokens):
+        if t.type in _ABRE:
+            pilha.append(i)
+        elif t.type in fecha:
+            # recua até o abre do mesmo tipo; os de tipo errado ficam sem par
+            while pilha and tokens[pilha[-1]].type != fecha[t.type]:
+                pilha.pop()
+            if pilha:
+                j = pilha.pop()
+                pares[i] = j
+                pares[j] = i
+    return pares
+
+
+def _fim_token(t: Token) -> Pos:
+    # literal não terminado leva o '\n' no lexema
+    quebras = t.lex.count("\n")
+    if not quebras:
+        return (t.line, t.col + max(len(t.lex), 1))
+    return (t.line + quebras, len(t.lex) - t.lex.rfind("\n"))
+
+
+class IndicePosicoes:
+    """Intervalos de cada nó de 'raiz' e consultas por posição."""
+
+    def __init__(self, raiz: Any, tokens: List[Token]):
+        self.raiz = raiz
+        self.tokens = tokens
+        self._intervalos: Dict[int, Intervalo] = {}
+        # filhos com intervalo, em ordem de início, e os inícios para bisect
+        self._filhos: Dict[int, Tuple[List[Pos], List[Any]]] = {}
+        self._calcular()
+
+        # todos os nós em pré-ordem (= ordem de início) para sobrepostos()
+        self._nos: List[Any] = []
+        if id(raiz) in self._intervalos:
+            pilha = [raiz]
+            while pilha:
+                n = pilha.pop()
+                self._nos.append(n)
+                pilha.extend(reversed(self._filhos[id(n)][1]))
+        self._inicios: List[Pos] = [self._intervalos[id(n)][0] for n in self._nos]
+
+    # ---------- construção ----------
+    def _calcular(self):
+        tokens = self.tokens
+        ancora = {(t.line, t.col): i for i, t in enumerate(tokens)}
+        pares = _pares(tokens)
+        faixas: Dict[int, Tuple[int, int]] = {}   # id -> [i, j] em índices de token
+        filhos_de: Dict[int, List[Any]] = {}
+
+        pilha: List[Tuple[Any, bool]] = [(self.raiz, False)]
+        while pilha:
+            n, visitado = pilha.pop()
+            if not visitado:
+                if id(n) in filhos_de:
+                    continue  # nó compartilhado (hash-consing): já calculado
+                ch = [c for c in children(n) if c is not None]
+                filhos_de[id(n)] = ch
+                pilha.append((n, True))
+                pilha.extend((c, False) for c in ch)
+                continue
+
+            ch = [c for c in filhos_de[id(n)] if id(c) in faixas]
+            k = ancora.get((getattr(n, "line", None), getattr(n, "col", None)))
+            i = j = k
+            for c in ch:
+                a, b = faixas[id(c)]
+                if i is None or a < i:
+                    i = a
+                if j is None or b > j:
+                    j = b
+            if i is None:
+                continue  # nó sem posição conhecida (ex.: recuperação de erro)
+
+            tipo = type(n).__name__
+            if tipo == "Block" and k is not None and tokens[k].type == "RBRACE":
+                i = min(i, pares.get(k, i))
+            elif tipo in ("Call", "Index") and ch:
+                # pula os ')' que fecham parênteses em volta do alvo
+                abre = faixas[id(ch[0])][1] + 1
+                while abre < len(tokens) and tokens[abre].type == "RPAREN":
+                    abre += 1
+                esperado = "LPAREN" if tipo == "Call" else "LBRACK"
+                if abre < len(tokens) and tokens[abre].type == esperado and abre in pares:
+                    j = max(j, pares[abre])
+            faixas[id(n)] = (i, j)
+            self._filhos[id(n)] = ([], ch)
+
+        for chave, (i, j) in faixas.items():
+            t = tokens[i]
+            self._intervalos[chave] = ((t.line, t.col), _fim_token(tokens[j]))
+        intervalos = self._intervalos
+        for chave, (_, ch) in self._filhos.items():
+            inicios = [intervalos[id(c)][0] for c in ch]
+            if any(x > y for x, y in zip(inicios, inicios[1:])):
+                # children() já vem em ordem de fonte; isto é só por garantia
+                ch.sort(key=lambda c: intervalos[id(c)][0])
+                inicios.sort()
+            self._filhos[chave] = (inicios, ch)
+
+    # ---------- consultas ----------
+    def __len__(self) -> int:
+        return len(self._nos)
+
+    def intervalo(self, no: Any) -> Optional[Intervalo]:
+        """[início, fim) de 'no' no fonte, ou None se ele não tem posição."""
+        return self._intervalos.get(id(no))
+
+    def pilha_em(self, linha: int, coluna: int) -> List[Any]:
+        """Nós que contêm (linha, coluna), da raiz ao mais interno."""
+        p = (linha, coluna)
+        out: List[Any] = []
+        n = self.raiz
+        iv = self._intervalos.get(id(n))
+        if iv is None or not (iv[0] <= p < iv[1]):
+            return out
+        while True:
+            out.append(n)
+            inicios, filhos = self._filhos[id(n)]
+            k = bisect.bisect_right(inicios, p) - 1
+            # irmãos não se sobrepõem: só o último que começa antes de p pode conter p
+            if k < 0 or not p < self._intervalos[id(filhos[k])][1]:
+                return out
+            n = filhos[k]
+
+    def no_em(self, linha: int, coluna: int) -> Optional[Any]:
+        """Nó mais interno que contém (linha, coluna)."""
+        pilha = self.pilha_em(linha, coluna)
+        return pilha[-1] if pilha else None
+
+    def sobrepostos(self, inicio: Pos, fim: Pos) -> List[Any]:
+        """Nós cujo intervalo toca [inicio, fim), em pré-ordem."""
+        if not inicio < fim:
+            return []
+        # quem começa antes de 'inicio' e toca o trecho contém 'inicio'
+        antes = [n for n in self.pilha_em(*inicio) if self._intervalos[id(n)][0] < inicio]
+        a = bisect.bisect_left(self._inicios, inicio)
+        b = bisect.bisect_left(self._inicios, fim)
+        return antes + self._nos[a:b]
+
+
+def indexar(raiz: Any, tokens: List[Token]) -> IndicePosicoes:
+    return IndicePosicoes(raiz, tokens)
+
+
+def _le_pos(texto: str) -> Pos:
+    linha, coluna = texto.split(":")
+    return int(linha), int(coluna)
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+    from analisador_lexico import analisar_lexema
+    from analisador_sintatico import Parser, tokens_from_lexer, node_label
+
+    if len(sys.argv) < 3:
+        sys.exit("uso: python indice_posicoes.py ARQUIVO.c LINHA:COL[-LINHA:COL] ...")
+    with open(sys.argv[1], encoding="utf-8") as f:
+        codigo = f.read()
+    with contextlib.redirect_stdout(io.StringIO()):
+        tokens = tokens_from_lexer(analisar_lexema(codigo)[0])
+    program, errors = Parser(tokens).parse_program()
+    for e in errors:
+        print(e)
+    indice = indexar(program, tokens)
+
+    def descreve(n: Any) -> str:
+        (l0, c0), (l1, c1) = indice.intervalo(n)
+        return f"{node_label(n)} [{l0}:{c0}-{l1}:{c1})"
+
+    for consulta in sys.argv[2:]:
+        try:
+            if "-" in consulta:
+                a, b = consulta.split("-")
+                nos = indice.sobrepostos(_le_pos(a), _le_pos(b))
+            else:
+                nos = indice.pilha_em(*_le_pos(consulta))
+        except ValueError:
+            sys.exit(f"posição inválida: {consulta} (use LINHA:COL ou LINHA:COL-LINHA:COL)")
+        print(f"\n{consulta}:")
+        for profundidade, n in enumerate(nos):
+            recuo = "  " * profundidade if "-" not in consulta else "  "
+            print(f"{recuo}{descreve(n)}")
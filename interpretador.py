@@ -0,0 +1,309 @@
+from __future__ import annotations
+import math
+import re
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+from analisador_sintatico import (
+    Program, Block, VarDecl, FuncDef, Assign, If, While, Return,
+    Call, Index, BinOp, Var, Num, TextLit, CharLit,
+)
+
+
+class ErroExecucao(Exception):
+    """Erro em tempo de execução de um programa mini-C."""
+
+
+# chamadas do mini-C viram chamadas do Python nos três backends: recursão
+# funda demais sai como este erro, não como RecursionError
+PILHA_EXCEDIDA = "pilha de chamadas excedida"
+
+
+# -----------------------------------------------
+# Semântica de valores compartilhada pelos backends
+# -----------------------------------------------
+
+# tipos cujo armazenamento trunca o valor para inteiro (como em C)
+TIPOS_INTEIROS = {"int", "char"}
+# tipos cujo armazenamento converte o valor para float ('7' vira 7.0)
+TIPOS_REAIS = {"float", "double"}
+
+
+def converte(tipo: str, v: Any) -> Any:
+    """
+    Valor guardado numa variável, parâmetro ou retorno do tipo 'tipo'.
+    Constantes do parser já vêm como int ('7') ou float ('7.0'); o tipo
+    de quem recebe o valor decide o resto, para que '/' e '%' sigam a
+    semântica de C.
+    """
+    if tipo in TIPOS_INTEIROS:
+        return int(v)
+    if tipo in TIPOS_REAIS:
+        return float(v)
+    return v
+
+
+def c_div(a: Any, b: Any) -> Any:
+    """Divisão de C: entre inteiros trunca em direção ao zero."""
+    if type(a) is int and type(b) is int:
+        if b == 0:
+            raise ErroExecucao("divisão inteira por zero")
+        q = abs(a) // abs(b)
+        return q if (a >= 0) == (b >= 0) else -q
+    if b == 0:
+        raise ErroExecucao("divisão por zero")
+    return a / b
+
+
+def c_mod(a: Any, b: Any) -> Any:
+    """Resto de C: tem o sinal do dividendo."""
+    if type(a) is int and type(b) is int:
+        if b == 0:
+            raise ErroExecucao("resto de divisão por zero")
+        return a - b * c_div(a, b)
+    if b == 0:
+        raise ErroExecucao("resto de divisão por zero")
+    return math.fmod(a, b)
+
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "0": "\0", "\\": "\\", '"': '"', "'": "'"}
+
+
+def _decodifica_escapes(s: str) -> str:
+    out: List[str] = []
+    i = 0
+    while i < len(s):
+        ch = s[i]
+        if ch == "\\" and i + 1 < len(s):
+            out.append(_ESCAPES.get(s[i + 1], s[i + 1]))
+            i += 2
+            continue
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def decodifica_texto(lexema: str) -> str:
+    """Converte o lexema de TextLit ("...") no texto que ele representa."""
+    return _decodifica_escapes(lexema[1:-1])
+
+
+def decodifica_char(lexema: str) -> int:
+    """Converte o lexema de CharLit ('a', '\\n') no código do caractere."""
+    s = _decodifica_escapes(lexema[1:-1])
+    return ord(s[0]) if s else 0
+
+
+def verdadeiro(v: Any) -> bool:
+    return v != 0
+
+
+def c_index(alvo: Any, idx: Any) -> Any:
+    if isinstance(alvo, str):
+        i = int(idx)
+        # como em C, o índice logo após o fim lê o terminador '\0'
+        return ord(alvo[i]) if 0 <= i < len(alvo) else 0
+    try:
+        return alvo[int(idx)]
+    except (TypeError, IndexError):
+        raise ErroExecucao(f"indexação inválida: {alvo!r}[{idx!r}]")
+
+
+# ----------------------------------------
+# Builtins (printf & cia.)
+# ----------------------------------------
+
+_MODIFICADORES = re.compile(r"%([-+ #0]*\d*(?:\.\d+)?)[hlLqjzt]*([diouxXeEfgGcs%])")
+
+
+def c_printf(saida, args: List[Any]) -> int:
+    if not args:
+        raise ErroExecucao("printf sem formato")
+    fmt = _MODIFICADORES.sub(r"%\1\2", args[0])
+    try:
+        texto = fmt % tuple(args[1:])
+    except (TypeError, ValueError) as e:
+        raise ErroExecucao(f"printf: formato incompatível ({e})")
+    saida.write(texto)
+    return len(texto)
+
+
+def c_puts(saida, args: List[Any]) -> int:
+    saida.write(f"{args[0]}\n")
+    return 0
+
+
+def c_putchar(saida, args: List[Any]) -> int:
+    saida.write(chr(int(args[0])))
+    return int(args[0])
+
+
+BUILTINS: Dict[str, Callable[[Any, List[Any]], Any]] = {
+    "printf": c_printf,
+    "puts": c_puts,
+    "putchar": c_putchar,
+}
+
+
+# -----------------------------------------------
+# Interpretador direto sobre a AST (referência)
+# -----------------------------------------------
+
+class _Retorno(Exception):
+    def __init__(self, valor: Any):
+        self.valor = valor
+
+
+class _Escopo:
+    """Variáveis de um bloco (com os tipos delas), ligado ao bloco de fora."""
+
+    __slots__ = ("valores", "tipos", "pai")
+
+    def __init__(self, pai: Optional["_Escopo"] = None):
+        self.valores: Dict[str, Any] = {}
+        self.tipos: Dict[str, str] = {}
+        self.pai = pai
+
+    def declara(self, nome: str, tipo: str, v: Any):
+        self.tipos[nome] = tipo
+        self.valores[nome] = converte(tipo, v)
+
+    def procura(self, nome: str) -> Optional["_Escopo"]:
+        """Escopo mais interno que declara 'nome' (ou None)."""
+        e = self
+        while e is not None:
+            if nome in e.valores:
+                return e
+            e = e.pai
+        return None
+
+
+class Interpretador:
+    """
+    Interpretador ingênuo que caminha pela AST a cada execução.
+    Serve de referência semântica e de linha de base nos benchmarks.
+    Cada bloco abre um escopo (como em C), encadeado até o global.
+    """
+
+    def __init__(self, program: Program, saida=None):
+        self.saida = saida if saida is not None else sys.stdout
+        self.funcs: Dict[str, FuncDef] = {}
+        self.globais = _Escopo()
+        self.program = program
+        for item in program.body:
+            if isinstance(item, FuncDef):
+                self.funcs[item.name] = item
+
+    def executar(self, entrada: str = "main", args: Optional[List[Any]] = None) -> Any:
+        try:
+            for item in self.program.body:
+                if not isinstance(item, FuncDef):
+                    self.exec_stmt(item, self.globais)
+            return self.chamar(entrada, list(args or []))
+        except RecursionError:
+            raise ErroExecucao(PILHA_EXCEDIDA) from None
+
+    def chamar(self, nome: str, args: List[Any]) -> Any:
+        f = self.funcs.get(nome)
+        if f is None:
+            if nome in BUILTINS:
+                return BUILTINS[nome](self.saida, args)
+            raise ErroExecucao(f"função '{nome}' não definida")
+        if len(args) != len(f.params):
+            raise ErroExecucao(
+                f"'{nome}' espera {len(f.params)} argumento(s), recebeu {len(args)}"
+            )
+        # parâmetros num escopo próprio; o corpo (um Block) abre outro
+        env = _Escopo(self.globais)
+        for p, v in zip(f.params, args):
+            env.declara(p.name.name, p.vartype, v)
+        try:
+            self.exec_stmt(f.body, env)
+        except _Retorno as r:
+            if r.valor is not None:
+                return converte(f.rettype, r.valor)
+            return r.valor
+        return None
+
+    # ---------- statements ----------
+    def exec_stmt(self, s: Any, env: _Escopo):
+        if s is None:
+            return
+        if isinstance(s, Block):
+            interno = _Escopo(env)
+            for st in s.body:
+                self.exec_stmt(st, interno)
+        elif isinstance(s, VarDecl):
+            v = self.eval(s.init, env) if s.init is not None else 0
+            env.declara(s.name.name, s.vartype, v)
+        elif isinstance(s, Assign):
+            nome = s.target.name
+            v = self.eval(s.value, env)
+            alvo = env.procura(nome)
+            if alvo is None:
+                raise ErroExecucao(f"variável '{nome}' não declarada @ {s.line}:{s.col}")
+            alvo.valores[nome] = converte(alvo.tipos[nome], v)
+        elif isinstance(s, If):
+            if verdadeiro(self.eval(s.test, env)):
+                self.exec_stmt(s.then, env)
+            elif s.otherwise is not None:
+                self.exec_stmt(s.otherwise, env)
+        elif isinstance(s, While):
+            while verdadeiro(self.eval(s.test, env)):
+                self.exec_stmt(s.body, env)
+        elif isinstance(s, Return):
+            raise _Retorno(self.eval(s.value, env) if s.value is not None else None)
+        else:
+            self.eval(s, env)
+
+    # ---------- expressões ----------
+    def eval(self, e: Any, env: _Escopo) -> Any:
+        if isinstance(e, Num):
+            return e.value
+        if isinstance(e, Var):
+            escopo = env.procura(e.name)
+            if escopo is not None:
+                return escopo.valores[e.name]
+            raise ErroExecucao(f"variável '{e.name}' não declarada @ {e.line}:{e.col}")
+        if isinstance(e, BinOp):
+            op = e.op
+            if op == "&&":
+                return 1 if verdadeiro(self.eval(e.left, env)) and verdadeiro(self.eval(e.right, env)) else 0
+            if op == "||":
+                return 1 if verdadeiro(self.eval(e.left, env)) or verdadeiro(self.eval(e.right, env)) else 0
+            a = self.eval(e.left, env)
+            b = self.eval(e.right, env)
+            if op == "+":
+                return a + b
+            if op == "-":
+                return a - b
+            if op == "*":
+                return a * b
+            if op == "/":
+                return c_div(a, b)
+            if op == "%":
+                return c_mod(a, b)
+            if op == "<":
+                return 1 if a < b else 0
+            if op == "<=":
+                return 1 if a <= b else 0
+            if op == ">":
+                return 1 if a > b else 0
+            if op == ">=":
+                return 1 if a >= b else 0
+            if op == "==":
+                return 1 if a == b else 0
+            if op == "!=":
+                return 1 if a != b else 0
+            raise ErroExecucao(f"operador desconhecido '{op}'")
+        if isinstance(e, Call):
+            if not isinstance(e.callee, Var):
+                raise ErroExecucao(f"chamada indireta não suportada @ {e.line}:{e.col}")
+            return self.chamar(e.callee.name, [self.eval(a, env) for a in e.args])
+        if isinstance(e, Index):
+            return c_index(self.eval(e.target, env), self.eval(e.index, env))
+        if isinstance(e, TextLit):
+            return decodifica_texto(e.value)
+        if isinstance(e, CharLit):
+            return decodifica_char(e.value)
+        raise ErroExecucao(f"expressão não suportada: {type(e).__name__}")
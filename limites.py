@@ -0,0 +1,165 @@
+"""
+Modo de latência limitada: limites de trabalho por arquivo.
+
+Um arquivo malformado ou enorme não pode segurar o lote inteiro (um
+synchronize() que varre até o EOF de novo a cada erro, um render que
+leva minutos). Cada arquivo tem, opcionalmente:
+
+- tempo:  segundos de relógio desde o início do léxico;
+- tokens: tokens produzidos pelo léxico;
+- nos:    nós da AST;
+- render: nós que iriam para o desenho.
+
+Os limites são conferidos em pontos de parada do trabalho: fim do
+léxico, cada item de topo e cada recuperação de erro do parser, fim do
+parse, antes do layout e antes de cada imagem. Passar de um deles
+levanta LimiteExcedido; quem processa o lote reporta "orçamento
+excedido" para o arquivo e segue para o próximo. O tempo é conferido
+só nesses pontos, então um arquivo pode passar um pouco do prazo (até
+o próximo ponto) antes de parar; um desenho já começado não é
+interrompido, por isso o limite de render é em nós.
+
+No parse paralelo (jobs > 1) os processos não conferem o prazo: ele é
+conferido quando os grupos voltam.
+
+Um Prazo com 'memoria' (um memoria.MedidorMemoria com orçamentos)
+confere também o orçamento de memória da fase em andamento a cada
+verificar(), nos mesmos pontos de parada.
+
+Uso:
+    limites = LimitesArquivo(tempo=2.0, nos=50_000)
+    prazo = limites.iniciar()
+    ...
+    prazo.conferir("tokens", len(lista_tokens))
+    prazo.verificar()            # só o tempo
+"""
+from __future__ import annotations
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from memoria import contar_nos
+
+LIMITES = ("tempo", "tokens", "nos", "render")
+
+_DESCRICOES = {
+    "tempo": "tempo",
+    "tokens": "tokens",
+    "nos": "nós da AST",
+    "render": "nós no desenho",
+}
+
+
+class LimiteExcedido(Exception):
+    """Um arquivo passou de um limite de trabalho configurado."""
+
+    def __init__(self, limite: str, usado: float, maximo: float):
+        super().__init__(
+            f"orçamento excedido: {_DESCRICOES[limite]} {_fmt(limite, usado)} "
+            f"(limite {_fmt(limite, maximo)})"
+        )
+        self.limite = limite
+        self.usado = usado
+        self.maximo = maximo
+
+
+def _fmt(limite: str, valor: float) -> str:
+    if limite == "tempo":
+        return f"{valor:.2f} s"
+    return f"{int(valor):,}"
+
+
+@dataclass(frozen=True)
+class LimitesArquivo:
+    """Limites de um lote; None desliga o limite. Pode ir para outros processos."""
+    tempo: Optional[float] = None
+    tokens: Optional[int] = None
+    nos: Optional[int] = None
+    render: Optional[int] = None
+
+    @property
+    def ativos(self) -> bool:
+        return any(getattr(self, nome) is not None for nome in LIMITES)
+
+    def iniciar(self, gasto: float = 0.0, memoria: Any = None) -> "Prazo":
+        """
+        Começa a contar um arquivo; 'gasto' é o tempo já usado em outro
+        processo e 'memoria', um MedidorMemoria a conferir junto.
+        """
+        return Prazo(self, gasto, memoria)
+
+
+class Prazo:
+    """Contagem de um arquivo contra os seus LimitesArquivo."""
+
+    __slots__ = ("limites", "inicio", "nos", "memoria")
+
+    def __init__(self, limites: LimitesArquivo, gasto: float = 0.0, memoria: Any = None):
+        self.limites = limites
+        self.inicio = time.monotonic() - gasto
+        self.nos = 0   # nós dos itens de topo já conferidos
+        self.memoria = memoria
+
+    def decorrido(self) -> float:
+        return time.monotonic() - self.inicio
+
+    def verificar(self):
+        """
+        Levanta LimiteExcedido se o prazo do arquivo já passou (e
+        memoria.OrcamentoExcedido se a fase passou do orçamento).
+        """
+        if self.memoria is not None:
+            self.memoria.conferir()
+        if self.limites.tempo is not None:
+            t = self.decorrido()
+            if t > self.limites.tempo:
+                raise LimiteExcedido("tempo", t, self.limites.tempo)
+
+    def conferir(self, limite: str, usado: int):
+        maximo = getattr(self.limites, limite)
+        if maximo is not None and usado > maximo:
+            raise LimiteExcedido(limite, usado, maximo)
+
+    def conferir_item(self, item: Any):
+        """Parser: mais um item de topo pronto."""
+        self.verificar()
+        if self.limites.nos is not None and item is not None:
+            self.nos += contar_nos(item)
+            self.conferir("nos", self.nos)
+
+    def conferir_ast(self, program: Any):
+        """Fim do parse. Se nenhum item foi conferido antes, conta a AST inteira."""
+        self.verificar()
+        if self.limites.nos is not None and self.nos == 0:
+            self.conferir("nos", contar_nos(program))
+
+
+def le_limite(texto: str) -> Dict[str, float]:
+    """'tempo=2,nos=50000' -> {'tempo': 2.0, 'nos': 50000}; tempo em segundos."""
+    out: Dict[str, float] = {}
+    for parte in texto.split(","):
+        nome, sep, valor = parte.partition("=")
+        if not sep:
+            raise ValueError(f"limite inválido: {parte!r} (use nome=valor)")
+        nome = nome.strip()
+        if nome not in LIMITES:
+            raise ValueError(f"limite desconhecido: {nome!r} (limites: {', '.join(LIMITES)})")
+        try:
+            v = float(valor) if nome == "tempo" else int(valor)
+        except ValueError:
+            raise ValueError(f"valor inválido para {nome}: {valor.strip()!r}") from None
+        if v <= 0:
+            raise ValueError(f"o limite de {nome} tem de ser positivo")
+        out[nome] = v
+    return out
+
+
+def resumo_estouros(estouros: Counter, limites: LimitesArquivo) -> str:
+    """Uma linha por limite ligado: quantos arquivos pararam nele."""
+    linhas = []
+    for nome in LIMITES:
+        maximo = getattr(limites, nome)
+        if maximo is not None:
+            linhas.append(f"  {nome:<7} (limite {_fmt(nome, maximo)}): {estouros[nome]} arquivo(s)")
+    return "\n".join(linhas)
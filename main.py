@@ -1,12 +1,32 @@
+import argparse
+import functools
 import os
-from analisador_sintatico import Parser, tokens_from_lexer, draw_tree, HAVE_MPL
+from collections import Counter
+import saidas
+from analisador_sintatico import Parser, tokens_from_lexer, _compute_layout
 from analisador_lexico import analisar_lexema, imprimir_tokens, imprimir_simbolos
+from memoria import MedidorMemoria, OrcamentoExcedido, contar_nos, le_orcamento
+from limites import LimiteExcedido, LimitesArquivo, le_limite, resumo_estouros
 
 EXEMPLOS_DIR = "exemplos"
 TREES_DIR = "trees"
 
 
-def processar_arquivo(nome_arquivo: str):
+def processar_arquivo(
+    nome_arquivo: str,
+    jobs: int = 1,
+    ll1: bool = False,
+    opcoes_render=None,
+    memoria: bool = False,
+    orcamentos=None,
+    limites=None,
+    tabela="github",
+    desenhar: bool = True,
+):
+    """
+    Analisa (e desenha) um arquivo; devolve o limite estourado, ou None.
+    tabela=None não imprime as tabelas de tokens e de símbolos.
+    """
     caminho = os.path.join(EXEMPLOS_DIR, nome_arquivo)
     with open(caminho, encoding="utf-8") as f:
         codigo = f.read()
@@ -14,21 +34,90 @@ def processar_arquivo(nome_arquivo: str):
     print("\n" + "=" * 80)
     print(f"Analisando arquivo: {caminho}")
 
-    # --- 1) Análise léxica ---
-    lista_tokens, tabela_simbolos = analisar_lexema(codigo)
+    medidor = MedidorMemoria(ativo=memoria, orcamentos=orcamentos)
+    prazo = None
+    if medidor.orcamentos:
+        # os pontos de parada do prazo também conferem os orçamentos
+        prazo = (limites or LimitesArquivo()).iniciar(memoria=medidor)
+    elif limites is not None and limites.ativos:
+        prazo = limites.iniciar()
+    estouro = None
+    try:
+        _processar(nome_arquivo, codigo, jobs, ll1, opcoes_render, medidor, prazo, tabela, desenhar)
+    except OrcamentoExcedido as e:
+        print(f"\nArquivo abortado: {e}")
+    except LimiteExcedido as e:
+        print(f"\nArquivo abortado: {e}")
+        estouro = e.limite
+    if medidor.ativo:
+        print("\nMemória por fase:")
+        print(medidor.relatorio())
+    return estouro
+
+
+def _processar(nome_arquivo, codigo, jobs, ll1, opcoes_render, medidor, prazo=None,
+               tabela="github", desenhar=True):
+    program, errors = analisar_e_relatar(codigo, jobs, ll1, medidor, prazo, tabela)
+    if not errors and desenhar:
+        salvar_arvore(nome_arquivo, program, opcoes_render, medidor, prazo)
+
+
+def analisar_e_relatar(codigo: str, jobs: int = 1, ll1: bool = False, medidor=None, prazo=None,
+                       tabela="github"):
+    """
+    Léxico + parser, imprimindo tabelas e erros; devolve (program, errors).
+    Com um limites.Prazo, levanta LimiteExcedido ao passar de um limite.
+    """
+    medidor = medidor or MedidorMemoria(ativo=False)
+    lista_tokens = relatar_lexico(codigo, jobs, medidor, prazo, tabela)
+
+    # --- converte tokens léxicos -> tokens do parser (sem rodar léxico de novo) ---
+    with medidor.fase("conversao") as m:
+        tokens = tokens_from_lexer(lista_tokens)
+        m.unidades, m.unidade = len(tokens), "token"
+
+    return relatar_sintatico(tokens, jobs, ll1, medidor, prazo)
+
+
+def relatar_lexico(codigo: str, jobs: int = 1, medidor=None, prazo=None, tabela="github"):
+    """
+    Análise léxica imprimindo tokens e tabela de símbolos no formato
+    'tabela' (saidas.py; None só deixa as mensagens de erro); devolve os
+    tokens do léxico.
+    """
+    medidor = medidor or MedidorMemoria(ativo=False)
+    with medidor.fase("lexico") as m:
+        lista_tokens, tabela_simbolos = analisar_lexema(codigo, jobs=jobs)
+        m.unidades, m.unidade = len(lista_tokens), "token"
+    if prazo is not None:
+        prazo.conferir("tokens", len(lista_tokens))
+        prazo.verificar()
+    if tabela is None:
+        return lista_tokens
 
     print("\nTokens encontrados:")
-    imprimir_tokens(lista_tokens)
+    imprimir_tokens(lista_tokens, tabela)
 
     print("\nTabela de símbolos:")
-    imprimir_simbolos(tabela_simbolos)
+    imprimir_simbolos(tabela_simbolos, tabela)
+    return lista_tokens
 
-    # --- converte tokens léxicos -> tokens do parser (sem rodar léxico de novo) ---
-    tokens = tokens_from_lexer(lista_tokens)
 
-    # --- 2) Análise sintática ---
-    parser = Parser(tokens)
-    program, errors = parser.parse_program()
+def relatar_sintatico(tokens, jobs: int = 1, ll1: bool = False, medidor=None, prazo=None):
+    """Análise sintática dos tokens do parser, imprimindo os erros; devolve (program, errors)."""
+    medidor = medidor or MedidorMemoria(ativo=False)
+    with medidor.fase("parser") as m:
+        if ll1:
+            from analisador_ll1 import ParserLL1
+            parser = ParserLL1(tokens, prazo=prazo)
+        else:
+            parser = Parser(tokens, prazo=prazo)
+        program, errors = parser.parse_program(jobs=jobs)
+        del parser  # o que fica retido é a AST, não o estado do parser
+        if prazo is not None:
+            prazo.conferir_ast(program)
+        if medidor.ativo:
+            m.unidades, m.unidade = contar_nos(program), "nó"
 
     if errors:
         print("\nErros sintáticos encontrados:")
@@ -36,23 +125,231 @@ def processar_arquivo(nome_arquivo: str):
             print(e)
     else:
         print("\nParse OK, AST construída!")
-        if HAVE_MPL:
-            os.makedirs(TREES_DIR, exist_ok=True)
-            base, _ = os.path.splitext(nome_arquivo)
-            out_png = os.path.join(TREES_DIR, f"{base}.png")
-            draw_tree(program, out_png)
+    return program, errors
+
+
+def salvar_arvore(nome_arquivo: str, program, opcoes=None, medidor=None, prazo=None):
+    formato = opcoes.formato if opcoes is not None else "png"
+    backend = saidas.arvore(formato)
+    if not backend.disponivel():
+        print(f"{backend.dependencia} não encontrado — AST não salva em {formato.upper()}.")
+        return
+    from renderizacao import renderizar, chave_render, render_em_dia, grava_chave
+    medidor = medidor or MedidorMemoria(ativo=False)
+    base, _ = os.path.splitext(nome_arquivo)
+    if opcoes is None or opcoes.simples:
+        os.makedirs(TREES_DIR, exist_ok=True)
+        saida = os.path.join(TREES_DIR, f"{base}.{backend.extensao}")
+        # AST igual à da última imagem (ex.: só mudaram espaços ou comentários)
+        chave = chave_render(program)
+        if render_em_dia(saida, chave):
+            print(f"AST inalterada — {saida} mantido")
+            return
+        if prazo is not None:
+            prazo.conferir("render", contar_nos(program))
+            prazo.verificar()
+        pos = None
+        if backend.usa_layout:
+            with medidor.fase("layout") as m:
+                pos, _ = _compute_layout(program, 0.0, 0.0)
+                m.unidades, m.unidade = len(pos), "nó"
+            if prazo is not None:
+                prazo.verificar()
+        with medidor.fase("render"):
+            backend.carregar()(program, saida, pos=pos)
+        grava_chave(saida, chave)
+        print(f"AST salva em {saida}")
+        return
+    # layout e desenho acontecem juntos (e talvez em outros processos)
+    with medidor.fase("render"):
+        imagens = renderizar(program, TREES_DIR, base, opcoes, prazo=prazo)
+    for out_png, gerado in imagens:
+        if gerado:
             print(f"AST salva em {out_png}")
         else:
-            print("matplotlib não encontrado — AST não salva em PNG.")
+            print(f"AST inalterada — {out_png} mantido")
+
+
+def _orcamento_arg(texto: str):
+    try:
+        return le_orcamento(texto)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _limite_arg(texto: str):
+    try:
+        return le_limite(texto)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _salvar_se_ok(nome_arquivo: str, resultado, opcoes=None):
+    if resultado.ok:
+        salvar_arvore(nome_arquivo, resultado.program, opcoes)
 
 
 if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Analisador léxico/sintático de mini-C")
+    ap.add_argument(
+        "--jobs", type=int, default=1,
+        help="processos para as análises léxica e sintática de arquivos grandes (padrão: 1)",
+    )
+    ap.add_argument(
+        "--watch", action="store_true",
+        help="fica observando 'exemplos/' e reanalisa só os arquivos alterados",
+    )
+    ap.add_argument(
+        "--ll1", action="store_true",
+        help="usa o parser LL(1) gerado da gramática (aceita também for e do-while; "
+             "a recuperação de erros difere da do parser padrão, ver analisador_ll1.py)",
+    )
+    ap.add_argument(
+        "--por-funcao", action="store_true",
+        help="gera uma imagem da AST por função (trees/<arquivo>.<função>.png)",
+    )
+    ap.add_argument(
+        "--profundidade-max", type=int, metavar="N",
+        help="resume as subárvores a partir da profundidade N",
+    )
+    ap.add_argument(
+        "--tamanho-max", type=int, metavar="N",
+        help="resume comandos/expressões com mais de N nós",
+    )
+    ap.add_argument(
+        "--max-nos", type=int, metavar="N",
+        help="no máximo N nós por imagem (padrão com --por-funcao: 150)",
+    )
+    ap.add_argument(
+        "--memoria", action="store_true",
+        help="mostra pico e memória retida de cada fase (tracemalloc; mais lento)",
+    )
+    ap.add_argument(
+        "--orcamento", type=_orcamento_arg, action="append", default=[], metavar="FASE=MiB",
+        help="aborta o arquivo se a fase passar do limite (fases: lexico, "
+             "conversao, parser, layout, render); pode repetir",
+    )
+    ap.add_argument(
+        "--limite", type=_limite_arg, action="append", default=[], metavar="NOME=VALOR",
+        help="para o arquivo (\"orçamento excedido\") e segue o lote ao passar do limite: "
+             "tempo (segundos), tokens, nos (nós da AST) ou render (nós no desenho); "
+             "pode repetir ou separar por vírgula",
+    )
+    ap.add_argument(
+        "--tabela", choices=saidas.nomes("tabela"), default="github",
+        help="formato das tabelas de tokens e de símbolos (padrão: github)",
+    )
+    ap.add_argument(
+        "--arvore", choices=saidas.nomes("arvore"), default="png",
+        help="formato do arquivo da AST em trees/ (padrão: png)",
+    )
+    ap.add_argument(
+        "--check", action="store_true",
+        help="só léxico e parser: mostra os erros, sem tabelas nem AST",
+    )
+    ap.add_argument(
+        "--pipeline", action="store_true",
+        help="lote em pipeline assíncrono: leitura, análise (--jobs processos) e "
+             "render (--jobs-render processos) se sobrepõem; a saída mantém a ordem",
+    )
+    ap.add_argument(
+        "--jobs-render", type=int, default=1, metavar="N",
+        help="processos de render no modo --pipeline (padrão: 1)",
+    )
+    ap.add_argument(
+        "--jobs-lexico", type=int, default=0, metavar="N",
+        help="no modo --pipeline, roda o léxico num estágio próprio com N processos; "
+             "os tokens passam à análise por memória compartilhada (padrão: 0, léxico "
+             "junto da análise)",
+    )
+    ap.add_argument(
+        "--mostrar-filas", action="store_true",
+        help="no modo --pipeline, mostra a ocupação das filas em stderr",
+    )
+    ap.add_argument(
+        "--shard", metavar="K/N",
+        help="analisa só o shard K de N (0 <= K < N) do corpus, escolhido pelo "
+             "hash do caminho, e grava o resultado em JSON (ver fragmentacao.py)",
+    )
+    ap.add_argument(
+        "--corpus", default=EXEMPLOS_DIR, metavar="DIR",
+        help="diretório do corpus no modo --shard (recursivo; padrão: exemplos)",
+    )
+    ap.add_argument(
+        "--saida-json", metavar="ARQ",
+        help="arquivo do resultado no modo --shard (padrão: shard-K-de-N.json)",
+    )
+    args = ap.parse_args()
+    if args.pipeline and (args.memoria or args.orcamento or args.watch):
+        ap.error("--pipeline não combina com --memoria, --orcamento ou --watch")
+    if args.check and (args.pipeline or args.watch or args.shard):
+        ap.error("--check vale só para o lote serial")
+    tabela = saidas.obter("tabela", args.tabela)
+    if not args.check and not tabela.disponivel():
+        ap.error(f"--tabela {args.tabela} precisa de {tabela.dependencia}; use --tabela texto")
+    if args.limite and (args.watch or args.shard):
+        ap.error("--limite vale só para o lote (serial ou --pipeline)")
+    orcamentos = {}
+    for o in args.orcamento:
+        orcamentos.update(o)
+    valores_limite = {}
+    for lim in args.limite:
+        valores_limite.update(lim)
+    limites = LimitesArquivo(**valores_limite)
+
+    from renderizacao import OpcoesRender
+    opcoes_render = OpcoesRender(
+        por_funcao=args.por_funcao,
+        profundidade_max=args.profundidade_max,
+        tamanho_max=args.tamanho_max,
+        max_nos=args.max_nos,
+        jobs=args.jobs,
+        formato=args.arvore,
+    )
+
+    if args.shard:
+        from fragmentacao import le_shard, analisar_shard, gravar_json
+        try:
+            k, n = le_shard(args.shard)
+        except ValueError as e:
+            ap.error(str(e))
+        dados = analisar_shard(args.corpus, k, n, jobs=args.jobs)
+        saida = args.saida_json or f"shard-{k}-de-{n}.json"
+        gravar_json(dados, saida)
+        print(f"shard {k}/{n}: {len(dados['resultados'])} de "
+              f"{dados['manifesto']['total_corpus']} arquivo(s) -> {saida}")
+        raise SystemExit(0)
+
+    if args.watch:
+        from observador import Observador
+        ao_analisar = functools.partial(_salvar_se_ok, opcoes=opcoes_render)
+        Observador(EXEMPLOS_DIR, ao_analisar=ao_analisar, jobs=args.jobs).rodar()
+        raise SystemExit(0)
+
     arquivos = [
         f for f in os.listdir(EXEMPLOS_DIR)
         if f.lower().endswith(".c")
     ]
     if not arquivos:
         print("Nenhum arquivo .c encontrado em 'exemplos/'.")
+    elif args.pipeline:
+        from pipeline_async import rodar_pipeline
+        rodar_pipeline(
+            EXEMPLOS_DIR, sorted(arquivos),
+            jobs_analise=args.jobs, jobs_render=args.jobs_render, jobs_lexico=args.jobs_lexico,
+            ll1=args.ll1, opcoes_render=opcoes_render, mostrar_filas=args.mostrar_filas,
+            limites=limites, tabela=args.tabela,
+        )
     else:
+        estouros = Counter()
         for nome in sorted(arquivos):
-            processar_arquivo(nome)
\ No newline at end of file
+            estouro = processar_arquivo(
+                nome, jobs=args.jobs, ll1=args.ll1, opcoes_render=opcoes_render,
+                memoria=args.memoria, orcamentos=orcamentos, limites=limites,
+                tabela=None if args.check else args.tabela, desenhar=not args.check,
+            )
+            if estouro is not None:
+                estouros[estouro] += 1
+        if limites.ativos:
+            print(f"\nOrçamentos excedidos ({sum(estouros.values())} de {len(arquivos)} arquivo(s)):")
+            print(resumo_estouros(estouros, limites))
\ No newline at end of file
@@ -0,0 +1,679 @@
+from __future__ import annotations
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from analisador_sintatico import (
+    Program, Block, VarDecl, FuncDef, Assign, If, While, Return,
+    Call, Index, BinOp, Var, Num, TextLit, CharLit,
+)
+from interpretador import (
+    ErroExecucao, BUILTINS, PILHA_EXCEDIDA, TIPOS_INTEIROS, TIPOS_REAIS,
+    c_div, c_mod, c_index, decodifica_texto, decodifica_char,
+)
+
+
+class ErroCompilacao(Exception):
+    """Programa que não pode ser traduzido para bytecode."""
+
+
+# -----------------------------------------------
+# Conjunto de instruções
+# Cada instrução ocupa 2 posições no array: (opcode, argumento)
+# -----------------------------------------------
+NOMES_OPCODES = [
+    "LOAD_CONST", "LOAD_LOCAL", "STORE_LOCAL", "LOAD_GLOBAL", "STORE_GLOBAL",
+    "ADD", "SUB", "MUL", "DIV", "MOD",
+    "LT", "LE", "GT", "GE", "EQ", "NE",
+    "JUMP", "JUMP_IF_FALSE", "JUMP_IF_TRUE",
+    "CALL", "CALL_BUILTIN", "RETURN", "RETURN_NONE",
+    "POP", "INDEX", "TO_INT", "TO_FLOAT",
+    # saltos condicionais com comparação embutida: desvia se 'a OP b'
+    "JUMP_LT", "JUMP_LE", "JUMP_GT", "JUMP_GE", "JUMP_EQ", "JUMP_NE",
+    # superinstruções geradas para os padrões mais comuns em laços
+    "LOAD_LOCAL_CONST", "LOAD_LOCAL_LOCAL", "INC_LOCAL",
+]
+(
+    LOAD_CONST, LOAD_LOCAL, STORE_LOCAL, LOAD_GLOBAL, STORE_GLOBAL,
+    ADD, SUB, MUL, DIV, MOD,
+    LT, LE, GT, GE, EQ, NE,
+    JUMP, JUMP_IF_FALSE, JUMP_IF_TRUE,
+    CALL, CALL_BUILTIN, RETURN, RETURN_NONE,
+    POP, INDEX, TO_INT, TO_FLOAT,
+    JUMP_LT, JUMP_LE, JUMP_GT, JUMP_GE, JUMP_EQ, JUMP_NE,
+    LOAD_LOCAL_CONST, LOAD_LOCAL_LOCAL, INC_LOCAL,
+) = range(len(NOMES_OPCODES))
+
+OPS_BINARIOS = {
+    "+": ADD, "-": SUB, "*": MUL, "/": DIV, "%": MOD,
+    "<": LT, "<=": LE, ">": GT, ">=": GE, "==": EQ, "!=": NE,
+}
+SALTOS_COMPARACAO = {
+    "<": JUMP_LT, "<=": JUMP_LE, ">": JUMP_GT,
+    ">=": JUMP_GE, "==": JUMP_EQ, "!=": JUMP_NE,
+}
+NEGACAO = {"<": ">=", ">=": "<", ">": "<=", "<=": ">", "==": "!=", "!=": "=="}
+SALTOS = {
+    JUMP, JUMP_IF_FALSE, JUMP_IF_TRUE,
+    JUMP_LT, JUMP_LE, JUMP_GT, JUMP_GE, JUMP_EQ, JUMP_NE,
+}
+
+NOMES_BUILTINS = sorted(BUILTINS)
+FUNCS_BUILTINS = [BUILTINS[n] for n in NOMES_BUILTINS]
+
+# argumentos empacotados (superinstruções e CALL_BUILTIN) usam 16 bits por campo
+_BITS = 16
+_MASCARA = (1 << _BITS) - 1
+
+
+@dataclass
+class CodigoObjeto:
+    nome: str
+    codigo: array                # pares (opcode, argumento)
+    constantes: List[Any]
+    nparams: int
+    nlocais: int
+    tipos_params: List[str] = field(default_factory=list)
+    int_retorno: bool = False    # trunca o valor de retorno (função int/char)
+    float_retorno: bool = False  # converte o valor de retorno (função float/double)
+
+    def __post_init__(self):
+        # pré-calculados para o custo de entrada numa chamada ser mínimo
+        self.params_int = [i for i, t in enumerate(self.tipos_params) if t in TIPOS_INTEIROS]
+        self.params_float = [i for i, t in enumerate(self.tipos_params) if t in TIPOS_REAIS]
+        self.locais_extras = [0] * (self.nlocais - self.nparams)
+
+
+@dataclass
+class ModuloBytecode:
+    funcoes: List[CodigoObjeto]
+    indice_funcoes: Dict[str, int]
+    inicializacao: CodigoObjeto  # declarações/statements de topo
+    nomes_globais: List[str]
+
+
+def desmontar(co: CodigoObjeto) -> str:
+    """Listagem textual do bytecode (útil para depurar o compilador)."""
+    linhas = [f"{co.nome}: {co.nparams} param(s), {co.nlocais} local(is)"]
+    for pc in range(0, len(co.codigo), 2):
+        op, arg = co.codigo[pc], co.codigo[pc + 1]
+        extra = ""
+        if op == LOAD_CONST:
+            extra = f" ({co.constantes[arg]!r})"
+        linhas.append(f"  {pc:5d} {NOMES_OPCODES[op]:<18} {arg}{extra}")
+    return "\n".join(linhas)
+
+
+# -----------------------------------------------
+# Compilador AST -> bytecode
+# -----------------------------------------------
+
+class _Emissor:
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.codigo = array("q")
+        self.constantes: List[Any] = []
+        self._idx_const: Dict[Tuple[type, Any], int] = {}
+        self.nlocais = 0
+        # pilha de escopos de bloco: nome -> (slot, tipo)
+        self.escopos: List[Dict[str, Tuple[int, str]]] = [{}]
+
+    def emit(self, op: int, arg: int = 0) -> int:
+        pos = len(self.codigo)
+        self.codigo.append(op)
+        self.codigo.append(arg)
+        return pos
+
+    def patch(self, pos: int, alvo: int):
+        self.codigo[pos + 1] = alvo
+
+    def patch_todos(self, posicoes: List[int], alvo: int):
+        for pos in posicoes:
+            self.codigo[pos + 1] = alvo
+
+    def aqui(self) -> int:
+        return len(self.codigo)
+
+    def const(self, v: Any) -> int:
+        chave = (type(v), v)
+        k = self._idx_const.get(chave)
+        if k is None:
+            k = len(self.constantes)
+            self.constantes.append(v)
+            self._idx_const[chave] = k
+        return k
+
+    def declara(self, nome: str, tipo: str) -> int:
+        slot = self.nlocais
+        self.nlocais += 1
+        self.escopos[-1][nome] = (slot, tipo)
+        return slot
+
+    def resolve(self, nome: str) -> Optional[Tuple[int, str]]:
+        for esc in reversed(self.escopos):
+            if nome in esc:
+                return esc[nome]
+        return None
+
+
+class CompiladorBytecode:
+    """
+    Traduz um Program em ModuloBytecode. Nomes de variáveis são resolvidos
+    aqui (slot local ou global) e chamadas já apontam para o índice da
+    função, então a VM nunca consulta dicionários durante a execução.
+    """
+
+    def __init__(self):
+        self.globais: Dict[str, Tuple[int, str]] = {}
+        self.indice_funcoes: Dict[str, int] = {}
+        self.aridades: List[int] = []
+        self.int_retorno: set = set()
+        self.float_retorno: set = set()
+
+    def compilar(self, program: Program) -> ModuloBytecode:
+        funcs = [item for item in program.body if isinstance(item, FuncDef)]
+        for f in funcs:
+            if f.name in self.indice_funcoes:
+                raise ErroCompilacao(f"função '{f.name}' redefinida @ {f.line}:{f.col}")
+            self.indice_funcoes[f.name] = len(self.aridades)
+            self.aridades.append(len(f.params))
+            if f.rettype in TIPOS_INTEIROS:
+                self.int_retorno.add(f.name)
+            elif f.rettype in TIPOS_REAIS:
+                self.float_retorno.add(f.name)
+
+        # statements de topo rodam antes de main, no escopo global
+        init = _Emissor("<topo>")
+        for item in program.body:
+            if not isinstance(item, FuncDef):
+                self.stmt(init, item, topo=True)
+        init.emit(RETURN_NONE)
+
+        compiladas = [self.funcao(f) for f in funcs]
+        nomes_globais = [n for n, _ in sorted(self.globais.items(), key=lambda kv: kv[1][0])]
+        return ModuloBytecode(
+            funcoes=compiladas,
+            indice_funcoes=dict(self.indice_funcoes),
+            inicializacao=self._fecha(init, 0, [], ""),
+            nomes_globais=nomes_globais,
+        )
+
+    def _fecha(self, em: _Emissor, nparams: int, tipos: List[str], rettype: str) -> CodigoObjeto:
+        return CodigoObjeto(
+            nome=em.nome,
+            codigo=_otimiza(em.codigo),
+            constantes=em.constantes,
+            nparams=nparams,
+            nlocais=em.nlocais,
+            tipos_params=tipos,
+            int_retorno=rettype in TIPOS_INTEIROS,
+            float_retorno=rettype in TIPOS_REAIS,
+        )
+
+    def funcao(self, f: FuncDef) -> CodigoObjeto:
+        em = _Emissor(f.name)
+        for p in f.params:
+            em.declara(p.name.name, p.vartype)
+        self.stmt(em, f.body)
+        # cair no fim da função equivale a 'return;'
+        em.emit(RETURN_NONE)
+        return self._fecha(em, len(f.params), [p.vartype for p in f.params], f.rettype)
+
+    # ---------- statements ----------
+    def stmt(self, em: _Emissor, s: Any, topo: bool = False):
+        if s is None:
+            return
+        if isinstance(s, Block):
+            em.escopos.append({})
+            for st in s.body:
+                self.stmt(em, st)
+            em.escopos.pop()
+        elif isinstance(s, VarDecl):
+            if s.init is not None:
+                self.expr(em, s.init)
+            else:
+                em.emit(LOAD_CONST, em.const(0))
+            self.converte(em, s.vartype, s.init)
+            if topo:
+                slot = len(self.globais)
+                self.globais[s.name.name] = (slot, s.vartype)
+                em.emit(STORE_GLOBAL, slot)
+            else:
+                em.emit(STORE_LOCAL, em.declara(s.name.name, s.vartype))
+        elif isinstance(s, Assign):
+            if not self.incremento(em, s):
+                self.expr(em, s.value)
+                self.store(em, s.target, s.value)
+        elif isinstance(s, If):
+            saltos_else = self.cond(em, s.test, False)
+            self.stmt(em, s.then)
+            if s.otherwise is not None:
+                salto_fim = em.emit(JUMP)
+                em.patch_todos(saltos_else, em.aqui())
+                self.stmt(em, s.otherwise)
+                em.patch(salto_fim, em.aqui())
+            else:
+                em.patch_todos(saltos_else, em.aqui())
+        elif isinstance(s, While):
+            # teste no fim do laço: um único salto condicional por iteração
+            salto_teste = em.emit(JUMP)
+            inicio = em.aqui()
+            self.stmt(em, s.body)
+            em.patch(salto_teste, em.aqui())
+            em.patch_todos(self.cond(em, s.test, True), inicio)
+        elif isinstance(s, Return):
+            if s.value is None:
+                em.emit(RETURN_NONE)
+            else:
+                self.expr(em, s.value)
+                em.emit(RETURN)
+        else:
+            self.expr(em, s)
+            em.emit(POP)
+
+    def converte(self, em: _Emissor, tipo: str, valor: Any):
+        """Converte o valor de 'valor' (já na pilha) para o tipo de quem o recebe."""
+        if tipo in TIPOS_INTEIROS and not self.eh_int(em, valor):
+            em.emit(TO_INT)
+        elif tipo in TIPOS_REAIS and not self.eh_float(em, valor):
+            em.emit(TO_FLOAT)
+
+    def store(self, em: _Emissor, alvo: Var, valor: Any):
+        r = em.resolve(alvo.name)
+        if r is not None:
+            slot, tipo = r
+            self.converte(em, tipo, valor)
+            em.emit(STORE_LOCAL, slot)
+            return
+        g = self.globais.get(alvo.name)
+        if g is None:
+            raise ErroCompilacao(f"variável '{alvo.name}' não declarada @ {alvo.line}:{alvo.col}")
+        self.converte(em, g[1], valor)
+        em.emit(STORE_GLOBAL, g[0])
+
+    def incremento(self, em: _Emissor, s: Assign) -> bool:
+        """'x = x + k' / 'x = x - k' com x local vira um único INC_LOCAL."""
+        v = s.value
+        if not (
+            isinstance(v, BinOp)
+            and v.op in ("+", "-")
+            and isinstance(v.left, Var)
+            and v.left.name == s.target.name
+            and isinstance(v.right, Num)
+        ):
+            return False
+        r = em.resolve(s.target.name)
+        if r is None:
+            return False
+        slot, tipo = r
+        k = v.right.value
+        if tipo in TIPOS_INTEIROS and type(k) is not int:
+            return False
+        k_idx = em.const(k if v.op == "+" else -k)
+        if slot > _MASCARA or k_idx > _MASCARA:
+            return False
+        em.emit(INC_LOCAL, (slot << _BITS) | k_idx)
+        return True
+
+    def eh_int(self, em: _Emissor, e: Any) -> bool:
+        """Inferência estática: a expressão produz sempre um int?"""
+        if e is None:
+            return True
+        if isinstance(e, Num):
+            return type(e.value) is int
+        if isinstance(e, CharLit):
+            return True
+        if isinstance(e, Var):
+            r = em.resolve(e.name) or self.globais.get(e.name)
+            return r is not None and r[1] in TIPOS_INTEIROS
+        if isinstance(e, BinOp):
+            if e.op in OPS_BINARIOS and OPS_BINARIOS[e.op] in (ADD, SUB, MUL, DIV, MOD):
+                return self.eh_int(em, e.left) and self.eh_int(em, e.right)
+            return True  # comparações e lógicos produzem 0/1
+        if isinstance(e, Call) and isinstance(e.callee, Var):
+            return e.callee.name in self.int_retorno
+        return False
+
+    def eh_float(self, em: _Emissor, e: Any) -> bool:
+        """Inferência estática: a expressão produz sempre um float?"""
+        if isinstance(e, Num):
+            return type(e.value) is float
+        if isinstance(e, Var):
+            r = em.resolve(e.name) or self.globais.get(e.name)
+            return r is not None and r[1] in TIPOS_REAIS
+        if isinstance(e, BinOp):
+            if e.op in OPS_BINARIOS and OPS_BINARIOS[e.op] in (ADD, SUB, MUL, DIV, MOD):
+                return self.eh_float(em, e.left) or self.eh_float(em, e.right)
+            return False
+        if isinstance(e, Call) and isinstance(e.callee, Var):
+            return e.callee.name in self.float_retorno
+        return False
+
+    # ---------- condições ----------
+    def cond(self, em: _Emissor, e: Any, quando: bool) -> List[int]:
+        """
+        Emite 'e' como fluxo de controle: os saltos devolvidos desviam
+        quando o valor verdade de 'e' for igual a 'quando' (o chamador
+        corrige o destino). && e || viram cadeias de saltos, sem 0/1.
+        """
+        if isinstance(e, BinOp) and e.op in SALTOS_COMPARACAO:
+            self.expr(em, e.left)
+            self.expr(em, e.right)
+            op = e.op if quando else NEGACAO[e.op]
+            return [em.emit(SALTOS_COMPARACAO[op])]
+        if isinstance(e, BinOp) and e.op in ("&&", "||"):
+            # '&&' desvia direto quando o lado esquerdo é falso; '||' quando é verdadeiro
+            curto = e.op == "||"
+            if quando == curto:
+                return self.cond(em, e.left, quando) + self.cond(em, e.right, quando)
+            pula = self.cond(em, e.left, curto)
+            saltos = self.cond(em, e.right, quando)
+            em.patch_todos(pula, em.aqui())
+            return saltos
+        self.expr(em, e)
+        return [em.emit(JUMP_IF_TRUE if quando else JUMP_IF_FALSE)]
+
+    # ---------- expressões ----------
+    def expr(self, em: _Emissor, e: Any):
+        if isinstance(e, Num):
+            em.emit(LOAD_CONST, em.const(e.value))
+        elif isinstance(e, Var):
+            r = em.resolve(e.name)
+            if r is not None:
+                em.emit(LOAD_LOCAL, r[0])
+                return
+            g = self.globais.get(e.name)
+            if g is None:
+                raise ErroCompilacao(f"variável '{e.name}' não declarada @ {e.line}:{e.col}")
+            em.emit(LOAD_GLOBAL, g[0])
+        elif isinstance(e, BinOp):
+            if e.op in ("&&", "||"):
+                self.curto_circuito(em, e)
+                return
+            op = OPS_BINARIOS.get(e.op)
+            if op is None:
+                raise ErroCompilacao(f"operador desconhecido '{e.op}' @ {e.line}:{e.col}")
+            self.expr(em, e.left)
+            self.expr(em, e.right)
+            em.emit(op)
+        elif isinstance(e, Call):
+            if not isinstance(e.callee, Var):
+                raise ErroCompilacao(f"chamada indireta não suportada @ {e.line}:{e.col}")
+            nome = e.callee.name
+            for a in e.args:
+                self.expr(em, a)
+            idx = self.indice_funcoes.get(nome)
+            if idx is not None:
+                if len(e.args) != self.aridades[idx]:
+                    raise ErroCompilacao(
+                        f"'{nome}' espera {self.aridades[idx]} argumento(s), "
+                        f"recebeu {len(e.args)} @ {e.line}:{e.col}"
+                    )
+                em.emit(CALL, idx)
+            elif nome in BUILTINS:
+                em.emit(CALL_BUILTIN, (NOMES_BUILTINS.index(nome) << _BITS) | len(e.args))
+            else:
+                raise ErroCompilacao(f"função '{nome}' não definida @ {e.line}:{e.col}")
+        elif isinstance(e, Index):
+            self.expr(em, e.target)
+            self.expr(em, e.index)
+            em.emit(INDEX)
+        elif isinstance(e, TextLit):
+            em.emit(LOAD_CONST, em.const(decodifica_texto(e.value)))
+        elif isinstance(e, CharLit):
+            em.emit(LOAD_CONST, em.const(decodifica_char(e.value)))
+        else:
+            raise ErroCompilacao(f"expressão não suportada: {type(e).__name__}")
+
+    def curto_circuito(self, em: _Emissor, e: BinOp):
+        # valor 0/1 de '&&'/'||' usado como expressão
+        saltos_falso = self.cond(em, e, False)
+        em.emit(LOAD_CONST, em.const(1))
+        s_fim = em.emit(JUMP)
+        em.patch_todos(saltos_falso, em.aqui())
+        em.emit(LOAD_CONST, em.const(0))
+        em.patch(s_fim, em.aqui())
+
+
+def _otimiza(codigo: array) -> array:
+    """
+    Peephole: funde LOAD_LOCAL seguido de LOAD_CONST/LOAD_LOCAL numa
+    superinstrução. Os alvos de salto são remapeados; um par cujo
+    segundo elemento é alvo de salto não é fundido.
+    """
+    n = len(codigo)
+    alvos = set()
+    for pc in range(0, n, 2):
+        if codigo[pc] in SALTOS:
+            alvos.add(codigo[pc + 1])
+
+    novo = array("q")
+    mapa: Dict[int, int] = {}
+    pc = 0
+    while pc < n:
+        mapa[pc] = len(novo)
+        op, arg = codigo[pc], codigo[pc + 1]
+        if (
+            op == LOAD_LOCAL
+            and pc + 2 < n
+            and pc + 2 not in alvos
+            and codigo[pc + 2] in (LOAD_CONST, LOAD_LOCAL)
+            and arg <= _MASCARA
+            and codigo[pc + 3] <= _MASCARA
+        ):
+            fundido = LOAD_LOCAL_CONST if codigo[pc + 2] == LOAD_CONST else LOAD_LOCAL_LOCAL
+            novo.append(fundido)
+            novo.append((arg << _BITS) | codigo[pc + 3])
+            pc += 4
+            continue
+        novo.append(op)
+        novo.append(arg)
+        pc += 2
+    mapa[n] = len(novo)
+
+    for pc in range(0, len(novo), 2):
+        if novo[pc] in SALTOS:
+            novo[pc + 1] = mapa[novo[pc + 1]]
+    return novo
+
+
+def compilar(program: Program) -> ModuloBytecode:
+    try:
+        return CompiladorBytecode().compilar(program)
+    except RecursionError:
+        # o gerador desce um nível de Python por nível da AST
+        raise ErroCompilacao(f"{PILHA_EXCEDIDA} ao compilar: programa aninhado fundo demais") from None
+
+
+# -----------------------------------------------
+# Máquina virtual de pilha
+# -----------------------------------------------
+
+class MaquinaVirtual:
+    def __init__(self, modulo: ModuloBytecode, saida=None):
+        self.modulo = modulo
+        self.saida = saida if saida is not None else sys.stdout
+        self.globais: List[Any] = [0] * len(modulo.nomes_globais)
+
+    def executar(self, entrada: str = "main", args: Optional[List[Any]] = None) -> Any:
+        try:
+            self._rodar(self.modulo.inicializacao, [])
+            idx = self.modulo.indice_funcoes.get(entrada)
+            if idx is None:
+                raise ErroExecucao(f"função '{entrada}' não definida")
+            co = self.modulo.funcoes[idx]
+            args = list(args or [])
+            if len(args) != co.nparams:
+                raise ErroExecucao(f"'{entrada}' espera {co.nparams} argumento(s), recebeu {len(args)}")
+            return self._rodar(co, args)
+        except RecursionError:
+            raise ErroExecucao(PILHA_EXCEDIDA) from None
+
+    def _rodar(self, co: CodigoObjeto, args: List[Any]) -> Any:
+        # tudo que o laço usa vira variável local do Python
+        codigo = co.codigo
+        consts = co.constantes
+        globais = self.globais
+        funcoes = self.modulo.funcoes
+        saida = self.saida
+        rodar = self._rodar
+        bits = _BITS
+        mascara = _MASCARA
+
+        int_retorno = co.int_retorno
+        float_retorno = co.float_retorno
+        for i in co.params_int:
+            if type(args[i]) is not int:
+                args[i] = int(args[i])
+        for i in co.params_float:
+            if type(args[i]) is not float:
+                args[i] = float(args[i])
+        locais = args + co.locais_extras if co.locais_extras else args
+        pilha: List[Any] = []
+        push = pilha.append
+        pop = pilha.pop
+        pc = 0
+
+        # cadeia de if ordenada pela frequência das instruções em laços
+        while True:
+            op = codigo[pc]
+            arg = codigo[pc + 1]
+            pc += 2
+            if op == LOAD_LOCAL_CONST:
+                push(locais[arg >> bits])
+                push(consts[arg & mascara])
+            elif op == LOAD_LOCAL:
+                push(locais[arg])
+            elif op == INC_LOCAL:
+                locais[arg >> bits] += consts[arg & mascara]
+            elif op == STORE_LOCAL:
+                locais[arg] = pop()
+            elif op == LOAD_LOCAL_LOCAL:
+                push(locais[arg >> bits])
+                push(locais[arg & mascara])
+            elif op == LOAD_CONST:
+                push(consts[arg])
+            elif op == JUMP_LT:
+                b = pop()
+                if pop() < b:
+                    pc = arg
+            elif op == JUMP_NE:
+                b = pop()
+                if pop() != b:
+                    pc = arg
+            elif op == JUMP_EQ:
+                b = pop()
+                if pop() == b:
+                    pc = arg
+            elif op == JUMP_GE:
+                b = pop()
+                if pop() >= b:
+                    pc = arg
+            elif op == JUMP_LE:
+                b = pop()
+                if pop() <= b:
+                    pc = arg
+            elif op == JUMP_GT:
+                b = pop()
+                if pop() > b:
+                    pc = arg
+            elif op == ADD:
+                b = pop()
+                pilha[-1] += b
+            elif op == SUB:
+                b = pop()
+                pilha[-1] -= b
+            elif op == MOD:
+                b = pop()
+                a = pilha[-1]
+                if type(a) is int and type(b) is int and a >= 0 and b > 0:
+                    pilha[-1] = a % b
+                else:
+                    pilha[-1] = c_mod(a, b)
+            elif op == DIV:
+                b = pop()
+                a = pilha[-1]
+                if type(a) is int and type(b) is int and a >= 0 and b > 0:
+                    pilha[-1] = a // b
+                else:
+                    pilha[-1] = c_div(a, b)
+            elif op == MUL:
+                b = pop()
+                pilha[-1] *= b
+            elif op == JUMP:
+                pc = arg
+            elif op == JUMP_IF_FALSE:
+                if pop() == 0:
+                    pc = arg
+            elif op == JUMP_IF_TRUE:
+                if pop() != 0:
+                    pc = arg
+            elif op == CALL:
+                alvo = funcoes[arg]
+                n = alvo.nparams
+                if n:
+                    a = pilha[-n:]
+                    del pilha[-n:]
+                else:
+                    a = []
+                push(rodar(alvo, a))
+            elif op == RETURN:
+                v = pop()
+                if int_retorno and type(v) is not int:
+                    v = int(v)
+                elif float_retorno and type(v) is not float:
+                    v = float(v)
+                return v
+            elif op == RETURN_NONE:
+                return None
+            elif op == TO_INT:
+                v = pilha[-1]
+                if type(v) is not int:
+                    pilha[-1] = int(v)
+            elif op == TO_FLOAT:
+                v = pilha[-1]
+                if type(v) is not float:
+                    pilha[-1] = float(v)
+            elif op == LT:
+                b = pop()
+                pilha[-1] = 1 if pilha[-1] < b else 0
+            elif op == EQ:
+                b = pop()
+                pilha[-1] = 1 if pilha[-1] == b else 0
+            elif op == NE:
+                b = pop()
+                pilha[-1] = 1 if pilha[-1] != b else 0
+            elif op == LE:
+                b = pop()
+                pilha[-1] = 1 if pilha[-1] <= b else 0
+            elif op == GT:
+                b = pop()
+                pilha[-1] = 1 if pilha[-1] > b else 0
+            elif op == GE:
+                b = pop()
+                pilha[-1] = 1 if pilha[-1] >= b else 0
+            elif op == LOAD_GLOBAL:
+                push(globais[arg])
+            elif op == STORE_GLOBAL:
+                globais[arg] = pop()
+            elif op == POP:
+                pop()
+            elif op == CALL_BUILTIN:
+                n = arg & mascara
+                if n:
+                    a = pilha[-n:]
+                    del pilha[-n:]
+                else:
+                    a = []
+                push(FUNCS_BUILTINS[arg >> bits](saida, a))
+            elif op == INDEX:
+                i = pop()
+                pilha[-1] = c_index(pilha[-1], i)
+            else:
+                raise ErroExecucao(f"opcode inválido {op} em {co.nome}@{pc - 2}")
+
+
+def executar(program: Program, entrada: str = "main", saida=None) -> Any:
+    """Compila e executa um Program; devolve o valor de retorno de 'entrada'."""
+    return MaquinaVirtual(compilar(program), saida).executar(entrada)
@@ -0,0 +1,158 @@
+"""
+Contabilidade de memória por fase (léxico, conversão de tokens, parser,
+layout, render) com tracemalloc, e orçamentos por fase.
+
+Um orçamento é conferido pelo pico medido na fase: ao fim dela e, no
+meio, a cada conferir(). Quem processa um arquivo liga conferir() aos
+pontos de parada de limites.Prazo (cada item de topo e cada recuperação
+de erro do parser, antes de cada imagem), então uma fase que estoura o
+orçamento para ali, sem chegar ao fim (nem ao OOM killer, cujo SIGKILL
+não vira exceção nenhuma). O léxico não tem pontos de parada e só é
+conferido ao fim. Um MemoryError dentro da fase também vira
+OrcamentoExcedido. Medir tem custo (tracemalloc deixa tudo umas 2-3x
+mais lento), por isso o medidor só liga o rastreamento quando está
+ativo.
+"""
+from __future__ import annotations
+import contextlib
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from analisador_sintatico import children
+
+FASES = ("lexico", "conversao", "parser", "layout", "render")
+
+
+class OrcamentoExcedido(Exception):
+    """Uma fase passou do limite de memória configurado."""
+
+    def __init__(self, fase: str, usado: int, limite: int):
+        super().__init__(
+            f"fase '{fase}' usou {_mib(usado)} (limite {_mib(limite)})"
+        )
+        self.fase = fase
+        self.usado = usado
+        self.limite = limite
+
+
+def _mib(n: float) -> str:
+    if n < 1024 * 1024:
+        return f"{n / 1024:.1f} KiB"
+    return f"{n / (1024 * 1024):.2f} MiB"
+
+
+@dataclass
+class MedicaoFase:
+    fase: str
+    pico: int = 0          # bytes acima do início da fase, no pior momento
+    retido: int = 0        # bytes que continuam alocados ao fim da fase
+    unidades: int = 0      # tokens ou nós produzidos na fase
+    unidade: str = ""
+
+    @property
+    def por_unidade(self) -> Optional[float]:
+        if not self.unidades:
+            return None
+        return self.retido / self.unidades
+
+
+class MedidorMemoria:
+    """
+    Uso:
+        med = MedidorMemoria(orcamentos={"parser": 64 * 2**20})
+        with med.fase("parser") as m:
+            program, errors = parser.parse_program()
+            m.unidades, m.unidade = contar_nos(program), "nó"
+    """
+
+    def __init__(self, ativo: bool = True, orcamentos: Optional[Dict[str, int]] = None):
+        self.orcamentos = dict(orcamentos or {})
+        desconhecidas = set(self.orcamentos) - set(FASES)
+        if desconhecidas:
+            raise ValueError(f"fase(s) desconhecida(s): {', '.join(sorted(desconhecidas))}")
+        # orçamento sem medição não faz sentido: liga o rastreamento
+        self.ativo = ativo or bool(self.orcamentos)
+        self.medicoes: List[MedicaoFase] = []
+        self._atual: Optional[Tuple[str, int]] = None   # (fase, memória no início)
+
+    @contextlib.contextmanager
+    def fase(self, nome: str) -> Iterator[MedicaoFase]:
+        m = MedicaoFase(nome)
+        if not self.ativo:
+            yield m
+            return
+        iniciou = not tracemalloc.is_tracing()
+        if iniciou:
+            tracemalloc.start()
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self._atual = (nome, base)
+        try:
+            yield m
+        except MemoryError:
+            limite = self.orcamentos.get(nome, 0)
+            _, pico = tracemalloc.get_traced_memory()
+            raise OrcamentoExcedido(nome, pico - base, limite) from None
+        finally:
+            self._atual = None
+            atual, pico = tracemalloc.get_traced_memory()
+            m.pico = max(0, pico - base)
+            m.retido = max(0, atual - base)
+            self.medicoes.append(m)
+            if iniciou:
+                tracemalloc.stop()
+        limite = self.orcamentos.get(nome)
+        if limite is not None and m.pico > limite:
+            raise OrcamentoExcedido(nome, m.pico, limite)
+
+    def conferir(self):
+        """
+        Ponto de parada dentro de uma fase: levanta OrcamentoExcedido se
+        o pico da fase em andamento já passou do orçamento dela.
+        """
+        if self._atual is None:
+            return
+        nome, base = self._atual
+        limite = self.orcamentos.get(nome)
+        if limite is None:
+            return
+        _, pico = tracemalloc.get_traced_memory()
+        if pico - base > limite:
+            raise OrcamentoExcedido(nome, pico - base, limite)
+
+    def relatorio(self) -> str:
+        linhas = [f"{'fase':<10} {'pico':>12} {'retido':>12}  por unidade"]
+        for m in self.medicoes:
+            extra = ""
+            if m.por_unidade is not None:
+                extra = f"{m.por_unidade:,.0f} B/{m.unidade} ({m.unidades} {m.unidade}s)"
+            limite = self.orcamentos.get(m.fase)
+            if limite is not None:
+                extra += f"  [limite {_mib(limite)}]"
+            linhas.append(f"{m.fase:<10} {_mib(m.pico):>12} {_mib(m.retido):>12}  {extra}")
+        return "\n".join(linhas)
+
+
+def contar_nos(raiz: Any) -> int:
+    n = 0
+    pilha = [raiz]
+    while pilha:
+        no = pilha.pop()
+        n += 1
+        pilha.extend(c for c in children(no) if c is not None)
+    return n
+
+
+def le_orcamento(texto: str) -> Dict[str, int]:
+    """'parser=64' -> {'parser': 64 MiB}; aceita vários separados por vírgula."""
+    out: Dict[str, int] = {}
+    for parte in texto.split(","):
+        fase, sep, valor = parte.partition("=")
+        if not sep:
+            raise ValueError(f"orçamento inválido: {parte!r} (use fase=MiB)")
+        fase = fase.strip()
+        if fase not in FASES:
+            raise ValueError(f"fase desconhecida: {fase!r} (fases: {', '.join(FASES)})")
+        out[fase] = int(float(valor) * 1024 * 1024)
+    return out
@@ -0,0 +1,172 @@
+from __future__ import annotations
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from analise import ResultadoAnalise, analisar_fonte
+
+# inotify é opcional: sem ele, o modo watch faz polling de mtime/tamanho
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+    HAVE_INOTIFY = True
+except Exception:
+    HAVE_INOTIFY = False
+
+
+@dataclass
+class EstadoArquivo:
+    mtime_ns: int
+    tamanho: int
+    hash: str
+    resultado: ResultadoAnalise
+
+
+def _sem_marcador(diag: str) -> str:
+    # erros do parser vêm como "  - msg"; aqui o marcador é +/-
+    d = diag.strip()
+    return d[2:] if d.startswith("- ") else d
+
+
+def _hash_conteudo(conteudo: bytes) -> str:
+    return hashlib.sha1(conteudo).hexdigest()
+
+
+class Observador:
+    """
+    Modo watch: mantém em memória tokens, AST e diagnósticos de cada
+    arquivo .c do diretório e só reanalisa os que mudaram de conteúdo.
+    Rajadas de gravações são agrupadas (debounce) e a saída mostra só
+    os diagnósticos que surgiram ou sumiram.
+    """
+
+    def __init__(
+        self,
+        diretorio: str,
+        intervalo: float = 0.1,
+        debounce: float = 0.2,
+        ao_analisar: Optional[Callable[[str, ResultadoAnalise], None]] = None,
+        jobs: int = 1,
+    ):
+        self.diretorio = diretorio
+        self.jobs = jobs
+        self.intervalo = intervalo
+        self.debounce = debounce
+        self.ao_analisar = ao_analisar
+        self.estado: Dict[str, EstadoArquivo] = {}
+        self._inotify = None
+        if HAVE_INOTIFY:
+            try:
+                self._inotify = INotify()
+                self._inotify.add_watch(
+                    diretorio,
+                    inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO
+                    | inotify_flags.CREATE | inotify_flags.DELETE
+                    | inotify_flags.MOVED_FROM | inotify_flags.MODIFY,
+                )
+            except OSError:
+                self._inotify = None
+
+    # ---------- detecção ----------
+    def _stats(self) -> Dict[str, Tuple[int, int]]:
+        out: Dict[str, Tuple[int, int]] = {}
+        with os.scandir(self.diretorio) as it:
+            for e in it:
+                if e.is_file() and e.name.lower().endswith(".c"):
+                    st = e.stat()
+                    out[e.name] = (st.st_mtime_ns, st.st_size)
+        return out
+
+    def _candidatos(self, stats: Dict[str, Tuple[int, int]]) -> Tuple[List[str], List[str]]:
+        alterados = [
+            nome for nome, (mt, tam) in stats.items()
+            if nome not in self.estado
+            or self.estado[nome].mtime_ns != mt
+            or self.estado[nome].tamanho != tam
+        ]
+        removidos = [nome for nome in self.estado if nome not in stats]
+        return sorted(alterados), sorted(removidos)
+
+    def _espera(self, timeout: float):
+        if self._inotify is not None:
+            # acorda no primeiro evento (ou no timeout) e descarta o lote
+            self._inotify.read(timeout=int(timeout * 1000))
+        else:
+            time.sleep(timeout)
+
+    # ---------- processamento ----------
+    def processar(self, nomes: List[str], removidos: List[str], stats: Dict[str, Tuple[int, int]]):
+        for nome in removidos:
+            del self.estado[nome]
+            print(f"[{nome}] removido")
+
+        for nome in nomes:
+            caminho = os.path.join(self.diretorio, nome)
+            try:
+                with open(caminho, "rb") as f:
+                    conteudo = f.read()
+            except OSError:
+                continue  # apagado entre o stat e a leitura
+            mtime, tamanho = stats[nome]
+            h = _hash_conteudo(conteudo)
+            antigo = self.estado.get(nome)
+            if antigo is not None and antigo.hash == h:
+                # só o mtime mudou (touch, salvar sem editar)
+                antigo.mtime_ns, antigo.tamanho = mtime, tamanho
+                continue
+
+            t0 = time.perf_counter()
+            resultado = analisar_fonte(conteudo.decode("utf-8"), jobs=self.jobs)
+            dt = (time.perf_counter() - t0) * 1000
+            self.estado[nome] = EstadoArquivo(mtime, tamanho, h, resultado)
+            self._relata(nome, antigo.resultado if antigo else None, resultado, dt)
+            if self.ao_analisar is not None:
+                self.ao_analisar(nome, resultado)
+
+    def _relata(
+        self,
+        nome: str,
+        antes: Optional[ResultadoAnalise],
+        depois: ResultadoAnalise,
+        ms: float,
+    ):
+        anteriores = set(antes.diagnosticos) if antes is not None else set()
+        atuais = depois.diagnosticos
+        novos = [d for d in atuais if d not in anteriores]
+        resolvidos = [d for d in (antes.diagnosticos if antes else []) if d not in set(atuais)]
+        status = "OK" if depois.ok else f"{len(depois.erros_sintaticos)} erro(s) sintático(s)"
+        print(f"[{nome}] {status} ({ms:.1f} ms)")
+        for d in resolvidos:
+            print(f"  - {_sem_marcador(d)}")
+        for d in novos:
+            print(f"  + {_sem_marcador(d)}")
+
+    def passo(self) -> bool:
+        """Uma varredura; devolve True se algo foi reanalisado."""
+        stats = self._stats()
+        alterados, removidos = self._candidatos(stats)
+        if not alterados and not removidos:
+            return False
+        # debounce: espera o diretório ficar quieto antes de analisar
+        while True:
+            time.sleep(self.debounce)
+            novos_stats = self._stats()
+            if novos_stats == stats:
+                break
+            stats = novos_stats
+        alterados, removidos = self._candidatos(stats)
+        self.processar(alterados, removidos, stats)
+        return True
+
+    def rodar(self):
+        modo = "inotify" if self._inotify is not None else "polling"
+        print(f"Observando '{self.diretorio}' ({modo}); Ctrl+C para sair.")
+        stats = self._stats()
+        self.processar(sorted(stats), [], stats)
+        try:
+            while True:
+                if not self.passo():
+                    self._espera(self.intervalo)
+        except KeyboardInterrupt:
+            print("\nModo watch encerrado.")
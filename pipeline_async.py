@@ -0,0 +1,376 @@
+"""
+Modo lote em pipeline (asyncio):
+
+    leitura --fila--> análise --fila--> render --fila--> saída
+    (threads)         (processos)       (processos)      (em ordem)
+
+Cada fila é limitada: quando um estágio fica para trás, quem está antes
+dele espera no put() (backpressure), então no máximo umas poucas ASTs
+ficam em memória. Análise e render usam pools separados, e um render
+lento não segura a análise dos próximos arquivos até a fila encher. A
+saída sai na ordem dos arquivos de entrada, não na ordem de conclusão;
+para o buffer de reordenação também ser limitado, a leitura só começa
+um arquivo quando há menos de max_em_voo arquivos lidos e ainda não
+impressos (um arquivo lento no início do lote não acumula os seguintes).
+
+Com jobs_lexico > 0 o léxico vira um estágio próprio, entre a leitura e
+a análise. Os tokens passam de um processo ao outro num bloco de
+memória compartilhada (tokens_compartilhados): pela fila só vai o nome
+do bloco, e o parser lê os tokens direto dele, sem pickle. O estágio de
+análise assume e remove cada bloco; os que sobrarem se o pipeline for
+interrompido são removidos no fim de rodar().
+
+Com limites (limites.LimitesArquivo), um arquivo que passa de um deles
+sai com "orçamento excedido" no relatório e não segue para os estágios
+seguintes; o lote continua. O prazo conta o tempo de trabalho do arquivo
+em cada estágio, não a espera nas filas. Qualquer outra exceção no
+trabalho de um arquivo (ex.: RecursionError numa árvore funda demais)
+vira "erro interno" no relatório dele, também sem parar o lote.
+"""
+from __future__ import annotations
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from limites import LimiteExcedido, LimitesArquivo, resumo_estouros
+
+TAMANHO_FILA = 4
+
+
+@dataclass
+class ItemPipeline:
+    seq: int
+    nome: str
+    codigo: Optional[str] = None
+    bloco: Optional[str] = None      # nome do bloco de tokens (tokens_compartilhados)
+    relatorio: str = ""
+    ast: Optional[bytes] = None      # AST serializada (serializacao.py)
+    render: str = ""
+    gasto: float = 0.0               # segundos de trabalho já usados (limites)
+    estouro: Optional[str] = None    # limite excedido, se algum
+    falha: Optional[str] = None      # exceção que abortou o arquivo, se alguma
+
+
+# ---------- trabalho dos processos ----------
+
+# Cada um devolve também (segundos gastos, limite excedido ou None).
+
+def _prazo(limites: Optional[LimitesArquivo], gasto: float):
+    return limites.iniciar(gasto) if limites is not None and limites.ativos else None
+
+
+def _gasto(prazo, gasto: float) -> float:
+    return prazo.decorrido() if prazo is not None else gasto
+
+
+def _analisa(codigo: str, ll1: bool, limites=None, tabela="github"):
+    from main import analisar_e_relatar
+    from serializacao import para_bytes
+
+    buf = io.StringIO()
+    prazo = _prazo(limites, 0.0)
+    try:
+        with contextlib.redirect_stdout(buf):
+            program, errors = analisar_e_relatar(codigo, ll1=ll1, prazo=prazo, tabela=tabela)
+    except LimiteExcedido as e:
+        buf.write(f"\nArquivo abortado: {e}\n")
+        return buf.getvalue(), None, _gasto(prazo, 0.0), e.limite
+    # o formato binário é bem menor que o pickle da árvore (ver serializacao)
+    return buf.getvalue(), None if errors else para_bytes(program), _gasto(prazo, 0.0), None
+
+
+def _lexa(codigo: str, limites=None, tabela="github"):
+    from main import relatar_lexico
+    from tokens_compartilhados import BlocoTokens
+
+    buf = io.StringIO()
+    prazo = _prazo(limites, 0.0)
+    try:
+        with contextlib.redirect_stdout(buf):
+            lista_tokens = relatar_lexico(codigo, prazo=prazo, tabela=tabela)
+    except LimiteExcedido as e:
+        buf.write(f"\nArquivo abortado: {e}\n")
+        return buf.getvalue(), None, _gasto(prazo, 0.0), e.limite
+    bloco = BlocoTokens.criar(lista_tokens, codigo).entregar()
+    return buf.getvalue(), bloco, _gasto(prazo, 0.0), None
+
+
+def _analisa_bloco(bloco: str, ll1: bool, limites=None, gasto: float = 0.0):
+    from main import relatar_sintatico
+    from serializacao import para_bytes
+    from tokens_compartilhados import BlocoTokens
+
+    buf = io.StringIO()
+    prazo = _prazo(limites, gasto)
+    try:
+        with BlocoTokens.abrir(bloco, dono=True) as b, contextlib.redirect_stdout(buf):
+            program, errors = relatar_sintatico(b.tokens(), ll1=ll1, prazo=prazo)
+    except LimiteExcedido as e:
+        buf.write(f"\nArquivo abortado: {e}\n")
+        return buf.getvalue(), None, _gasto(prazo, gasto), e.limite
+    return buf.getvalue(), None if errors else para_bytes(program), _gasto(prazo, gasto), None
+
+
+def _renderiza(nome: str, ast: bytes, opcoes, limites=None, gasto: float = 0.0):
+    from main import salvar_arvore
+    from serializacao import carregar
+
+    buf = io.StringIO()
+    prazo = _prazo(limites, gasto)
+    try:
+        with contextlib.redirect_stdout(buf):
+            salvar_arvore(nome, carregar(ast), opcoes, prazo=prazo)
+    except LimiteExcedido as e:
+        buf.write(f"\nArquivo abortado: {e}\n")
+        return buf.getvalue(), _gasto(prazo, gasto), e.limite
+    return buf.getvalue(), _gasto(prazo, gasto), None
+
+
+def _le(caminho: str) -> str:
+    with open(caminho, encoding="utf-8") as f:
+        return f.read()
+
+
+# ---------- pipeline ----------
+
+@dataclass
+class EstatisticaFila:
+    capacidade: int
+    amostras: List[int] = field(default_factory=list)
+
+    def resumo(self) -> str:
+        if not self.amostras:
+            return f"vazia (cap. {self.capacidade})"
+        media = sum(self.amostras) / len(self.amostras)
+        return f"máx {max(self.amostras)}/{self.capacidade}, média {media:.1f}"
+
+
+class PipelineAsync:
+    def __init__(
+        self,
+        diretorio: str,
+        nomes: List[str],
+        jobs_analise: int = 2,
+        jobs_render: int = 1,
+        jobs_lexico: int = 0,
+        tamanho_fila: int = TAMANHO_FILA,
+        ll1: bool = False,
+        opcoes_render=None,
+        mostrar_filas: bool = False,
+        intervalo_monitor: float = 0.25,
+        limites: Optional[LimitesArquivo] = None,
+        tabela: str = "github",
+        max_em_voo: Optional[int] = None,
+    ):
+        self.diretorio = diretorio
+        self.nomes = nomes
+        self.jobs_analise = max(1, jobs_analise)
+        self.jobs_render = max(1, jobs_render)
+        self.jobs_lexico = max(0, jobs_lexico)
+        self.tamanho_fila = tamanho_fila
+        self.ll1 = ll1
+        self.opcoes_render = opcoes_render
+        self.mostrar_filas = mostrar_filas
+        self.intervalo_monitor = intervalo_monitor
+        self.limites = limites
+        self.tabela = tabela               # formato das tabelas do léxico (saidas.py)
+        # arquivos lidos e ainda não impressos; o padrão deixa cada fila e
+        # cada trabalhador com um arquivo
+        self.max_em_voo = max_em_voo or (
+            tamanho_fila + self.jobs_lexico + self.jobs_analise + self.jobs_render)
+        self.max_pendentes = 0             # maior ocupação do buffer de reordenação
+        self._vagas: Optional[asyncio.Semaphore] = None
+        self.estouros: Counter = Counter()   # limite -> arquivos que pararam nele
+        self.falhas: Counter = Counter()     # exceção -> arquivos abortados por ela
+        self.estatisticas: Dict[str, EstatisticaFila] = {}
+        # blocos de tokens entregues pelo léxico e ainda não assumidos pela análise
+        self._blocos_pendentes: Set[str] = set()
+
+    async def _leitor(self, saida: asyncio.Queue):
+        for seq, nome in enumerate(self.nomes):
+            await self._vagas.acquire()   # devolvida pelo impressor
+            codigo = await asyncio.to_thread(_le, os.path.join(self.diretorio, nome))
+            await saida.put(ItemPipeline(seq, nome, codigo))
+
+    async def _executa(self, pool, item: ItemPipeline, funcao, *args):
+        """
+        funcao(*args) num processo do pool. Se ela levantar, o erro vai
+        para o relatório do item e a resposta é None: o item não segue
+        para os próximos estágios, mas o trabalhador continua no lote.
+        """
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, funcao, *args)
+        except Exception as e:
+            item.relatorio += f"\nArquivo abortado: erro interno ({type(e).__name__}: {e})\n"
+            item.falha = type(e).__name__
+            return None
+
+    async def _lexico(self, pool, entrada: asyncio.Queue, saida: asyncio.Queue):
+        while True:
+            item = await entrada.get()
+            if item is None:
+                return
+            r = await self._executa(pool, item, _lexa, item.codigo, self.limites, self.tabela)
+            if r is not None:
+                item.relatorio, item.bloco, item.gasto, item.estouro = r
+            if item.bloco is not None:
+                self._blocos_pendentes.add(item.bloco)
+            item.codigo = None
+            await saida.put(item)
+
+    async def _analisador(self, pool, entrada: asyncio.Queue, render: asyncio.Queue, saida: asyncio.Queue):
+        while True:
+            item = await entrada.get()
+            if item is None:
+                return
+            if item.estouro is not None or item.falha is not None:
+                pass   # parou no léxico
+            elif item.bloco is not None:
+                r = await self._executa(
+                    pool, item, _analisa_bloco, item.bloco, self.ll1, self.limites, item.gasto)
+                if r is not None:
+                    relatorio, item.ast, item.gasto, item.estouro = r
+                    item.relatorio += relatorio
+                    # se a análise falhou, o bloco fica para _descartar_blocos
+                    self._blocos_pendentes.discard(item.bloco)
+                item.bloco = None
+            else:
+                r = await self._executa(
+                    pool, item, _analisa, item.codigo, self.ll1, self.limites, self.tabela)
+                if r is not None:
+                    item.relatorio, item.ast, item.gasto, item.estouro = r
+            item.codigo = None
+            await (render if item.ast is not None else saida).put(item)
+
+    async def _renderizador(self, pool, entrada: asyncio.Queue, saida: asyncio.Queue):
+        while True:
+            item = await entrada.get()
+            if item is None:
+                return
+            r = await self._executa(
+                pool, item, _renderiza, item.nome, item.ast, self.opcoes_render, self.limites, item.gasto)
+            if r is not None:
+                item.render, item.gasto, item.estouro = r
+            item.ast = None
+            await saida.put(item)
+
+    async def _impressor(self, entrada: asyncio.Queue):
+        # buffer de reordenação: o arquivo k só sai depois de 0..k-1
+        pendentes: Dict[int, ItemPipeline] = {}
+        proximo = 0
+        while True:
+            item = await entrada.get()
+            if item is None:
+                return
+            pendentes[item.seq] = item
+            self.max_pendentes = max(self.max_pendentes, len(pendentes))
+            while proximo in pendentes:
+                it = pendentes.pop(proximo)
+                if it.estouro is not None:
+                    self.estouros[it.estouro] += 1
+                if it.falha is not None:
+                    self.falhas[it.falha] += 1
+                print("\n" + "=" * 80)
+                print(f"Analisando arquivo: {os.path.join(self.diretorio, it.nome)}")
+                sys.stdout.write(it.relatorio + it.render)
+                proximo += 1
+                self._vagas.release()
+
+    async def _monitor(self, filas: Dict[str, asyncio.Queue]):
+        for nome, q in filas.items():
+            self.estatisticas[nome] = EstatisticaFila(q.maxsize)
+        while True:
+            for nome, q in filas.items():
+                self.estatisticas[nome].amostras.append(q.qsize())
+            if self.mostrar_filas:
+                estado = " | ".join(f"{nome} {q.qsize()}/{q.maxsize}" for nome, q in filas.items())
+                print(f"[filas] {estado}", file=sys.stderr)
+            await asyncio.sleep(self.intervalo_monitor)
+
+    async def rodar(self) -> float:
+        t0 = time.perf_counter()
+        self._vagas = asyncio.Semaphore(self.max_em_voo)
+        q_lexico: asyncio.Queue = asyncio.Queue(self.tamanho_fila)
+        q_analise: asyncio.Queue = asyncio.Queue(self.tamanho_fila)
+        q_render: asyncio.Queue = asyncio.Queue(self.tamanho_fila)
+        q_saida: asyncio.Queue = asyncio.Queue(self.tamanho_fila)
+        filas = {"leitura→análise": q_analise}
+        if self.jobs_lexico:
+            filas = {"leitura→léxico": q_lexico, "léxico→análise": q_analise}
+        monitor = asyncio.create_task(self._monitor({
+            **filas,
+            "análise→render": q_render,
+            "→saída": q_saida,
+        }))
+
+        with contextlib.ExitStack() as pilha:
+            pool_a = pilha.enter_context(ProcessPoolExecutor(self.jobs_analise))
+            pool_r = pilha.enter_context(ProcessPoolExecutor(self.jobs_render))
+            pool_l = pilha.enter_context(ProcessPoolExecutor(self.jobs_lexico)) if self.jobs_lexico else None
+            pilha.callback(self._descartar_blocos)
+            impressor = asyncio.create_task(self._impressor(q_saida))
+            lexicos = [
+                asyncio.create_task(self._lexico(pool_l, q_lexico, q_analise))
+                for _ in range(self.jobs_lexico)
+            ]
+            analisadores = [
+                asyncio.create_task(self._analisador(pool_a, q_analise, q_render, q_saida))
+                for _ in range(self.jobs_analise)
+            ]
+            renderizadores = [
+                asyncio.create_task(self._renderizador(pool_r, q_render, q_saida))
+                for _ in range(self.jobs_render)
+            ]
+            # encerramento em cascata: um None por trabalhador de cada estágio
+            if lexicos:
+                await self._leitor(q_lexico)
+                for _ in lexicos:
+                    await q_lexico.put(None)
+                await asyncio.gather(*lexicos)
+            else:
+                await self._leitor(q_analise)
+            for _ in analisadores:
+                await q_analise.put(None)
+            await asyncio.gather(*analisadores)
+            for _ in renderizadores:
+                await q_render.put(None)
+            await asyncio.gather(*renderizadores)
+            await q_saida.put(None)
+            await impressor
+
+        monitor.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await monitor
+        return time.perf_counter() - t0
+
+    def _descartar_blocos(self):
+        from tokens_compartilhados import descartar
+        for nome in self._blocos_pendentes:
+            descartar(nome)
+        self._blocos_pendentes.clear()
+
+    def resumo_filas(self) -> str:
+        return "\n".join(f"  {nome:<16} {est.resumo()}" for nome, est in self.estatisticas.items())
+
+
+def rodar_pipeline(diretorio: str, nomes: List[str], **kwargs) -> PipelineAsync:
+    p = PipelineAsync(diretorio, nomes, **kwargs)
+    dt = asyncio.run(p.rodar())
+    print(f"\nPipeline: {len(nomes)} arquivo(s) em {dt:.2f} s")
+    print("Profundidade das filas:")
+    print(p.resumo_filas())
+    if p.limites is not None and p.limites.ativos:
+        print(f"Orçamentos excedidos ({sum(p.estouros.values())} de {len(nomes)} arquivo(s)):")
+        print(resumo_estouros(p.estouros, p.limites))
+    if p.falhas:
+        print(f"Erros internos ({sum(p.falhas.values())} de {len(nomes)} arquivo(s)):")
+        for nome, n in sorted(p.falhas.items()):
+            print(f"  {nome}: {n} arquivo(s)")
+    return p
@@ -0,0 +1,281 @@
+"""
+Renderização da AST em partes: uma imagem por FuncDef, subárvores
+colapsadas em nós-resumo (por profundidade ou tamanho) e um teto de nós
+por imagem. As imagens saem em paralelo, uma por processo.
+"""
+from __future__ import annotations
+import hashlib
+import os
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import saidas
+from analisador_sintatico import FuncDef, Program, children, node_label, _compute_layout
+from hash_estrutural import digest
+
+MAX_NOS_PADRAO = 150
+MAX_PIXELS = 8_000_000  # o tempo do savefig cresce com a área em pixels
+VERSAO_RENDER = 1       # mude quando o desenho mudar, para invalidar o cache
+
+
+class NoVisao:
+    """
+    Nó da árvore que vai para o desenho. Um resumo (resumo=True)
+    representa nós escondidos: o rótulo diz quantos.
+    """
+
+    __slots__ = ("rotulo", "filhos", "resumo")
+
+    def __init__(self, rotulo: str, filhos: Optional[List["NoVisao"]] = None, resumo: bool = False):
+        self.rotulo = rotulo
+        self.filhos = filhos if filhos is not None else []
+        self.resumo = resumo
+
+
+@dataclass
+class OpcoesRender:
+    por_funcao: bool = False
+    profundidade_max: Optional[int] = None   # nós nessa profundidade viram resumo
+    tamanho_max: Optional[int] = None        # subárvores maiores viram resumo
+    max_nos: Optional[int] = None            # teto de nós por imagem
+    jobs: int = 1
+    formato: str = "png"                     # backend de árvore (saidas.py)
+
+    @property
+    def simples(self) -> bool:
+        """True quando nada muda em relação a draw_tree(program)."""
+        return (
+            not self.por_funcao
+            and self.profundidade_max is None
+            and self.tamanho_max is None
+            and self.max_nos is None
+        )
+
+
+def tamanhos(raiz: Any) -> Dict[int, int]:
+    """Número de nós de cada subárvore, por id()."""
+    out: Dict[int, int] = {}
+    # pós-ordem iterativa: blocos longos não estouram a recursão
+    pilha: List[Tuple[Any, bool]] = [(raiz, False)]
+    while pilha:
+        n, visitado = pilha.pop()
+        filhos = [c for c in children(n) if c is not None]
+        if visitado:
+            out[id(n)] = 1 + sum(out[id(c)] for c in filhos)
+        else:
+            pilha.append((n, True))
+            pilha.extend((c, False) for c in filhos)
+    return out
+
+
+def colapsar(
+    raiz: Any,
+    profundidade_max: Optional[int] = None,
+    tamanho_max: Optional[int] = None,
+    max_nos: Optional[int] = None,
+) -> NoVisao:
+    """
+    Monta a árvore de visão em largura a partir de 'raiz':
+
+    - nós na profundidade profundidade_max aparecem sem os descendentes;
+    - a partir da profundidade 2 (comandos, se a raiz é uma função),
+      subárvores com mais de tamanho_max nós aparecem sem os descendentes;
+    - com max_nos, os filhos que não cabem são agrupados num único
+      resumo, e nós sem espaço para filhos viram resumo de si mesmos.
+    """
+    tam = tamanhos(raiz)
+
+    def resumo_de(n: Any) -> NoVisao:
+        escondidos = tam[id(n)] - 1
+        if escondidos == 0:
+            return NoVisao(node_label(n))
+        return NoVisao(f"{node_label(n)}\n⋯ +{escondidos}", resumo=True)
+
+    raiz_v = NoVisao(node_label(raiz))
+    if profundidade_max == 0:
+        return resumo_de(raiz)
+    usados = 1
+    fila = deque([(raiz, raiz_v, 0)])
+    while fila:
+        n, v, prof = fila.popleft()
+        filhos = [c for c in children(n) if c is not None]
+        if not filhos:
+            continue
+        cabem = len(filhos)
+        if max_nos is not None and usados + len(filhos) > max_nos:
+            cabem = max_nos - usados - 1  # uma vaga fica para o resumo
+            if cabem < 0:
+                # nem o resumo cabe: o próprio nó passa a resumir a subárvore
+                v.rotulo = f"{v.rotulo}\n⋯ +{tam[id(n)] - 1}"
+                v.resumo = True
+                continue
+
+        p = prof + 1
+        for c in filhos[:cabem]:
+            usados += 1
+            if (
+                (profundidade_max is not None and p >= profundidade_max)
+                or (tamanho_max is not None and p >= 2 and tam[id(c)] > tamanho_max)
+            ):
+                v.filhos.append(resumo_de(c))
+            else:
+                cv = NoVisao(node_label(c))
+                v.filhos.append(cv)
+                fila.append((c, cv, p))
+
+        resto = filhos[cabem:]
+        if resto:
+            usados += 1
+            ocultos = sum(tam[id(c)] for c in resto)
+            v.filhos.append(NoVisao(f"⋯ +{ocultos} nós", resumo=True))
+    return raiz_v
+
+
+def particionar(program: Program) -> List[Tuple[str, Any]]:
+    """
+    (sufixo, raiz) de cada imagem: uma por FuncDef e, se houver, uma com
+    os itens de topo que não são funções.
+    """
+    partes: List[Tuple[str, Any]] = []
+    globais = [n for n in program.body if not isinstance(n, FuncDef)]
+    if globais:
+        partes.append(("globais", Program(globais)))
+    for n in program.body:
+        if isinstance(n, FuncDef):
+            partes.append((n.name, n))
+    return partes
+
+
+def tamanho_figura(raiz: Any, pos: Optional[Dict[int, Tuple[float, float]]] = None) -> Tuple[float, float]:
+    # cresce com a árvore, dentro de limites que o matplotlib aguenta
+    if pos is None:
+        pos, _ = _compute_layout(raiz, 0.0, 0.0)
+    xs = [x for x, _ in pos.values()]
+    ys = [y for _, y in pos.values()]
+    largura = (max(xs) - min(xs)) * 0.5 + 3
+    altura = (max(ys) - min(ys)) * 0.5 + 2
+    return (min(max(largura, 6.0), 80.0), min(max(altura, 4.0), 40.0))
+
+
+# -----------------------------------------------
+# Cache de imagens: '<imagem>.hash' guarda a chave de quem a gerou
+# -----------------------------------------------
+
+def chave_render(
+    raiz: Any,
+    opcoes: Optional[OpcoesRender] = None,
+    dpi: int = 160,
+    memo: Optional[Dict[int, bytes]] = None,
+) -> str:
+    """Hash estrutural da raiz + tudo que muda o desenho (posições não)."""
+    h = hashlib.sha1(digest(raiz, memo))
+    if opcoes is not None and not opcoes.simples:
+        h.update(repr((opcoes.profundidade_max, opcoes.tamanho_max, opcoes.max_nos)).encode())
+    else:
+        h.update(b"inteira")
+    h.update(f"|{dpi}|{VERSAO_RENDER}".encode())
+    return h.hexdigest()
+
+
+def _arquivo_chave(caminho: str) -> str:
+    return caminho + ".hash"
+
+
+def render_em_dia(caminho: str, chave: str) -> bool:
+    """True se 'caminho' existe e foi gerado a partir da mesma chave."""
+    try:
+        with open(_arquivo_chave(caminho), encoding="ascii") as f:
+            return f.read().strip() == chave and os.path.exists(caminho)
+    except OSError:
+        return False
+
+
+def grava_chave(caminho: str, chave: str):
+    with open(_arquivo_chave(caminho), "w", encoding="ascii") as f:
+        f.write(chave + "\n")
+
+
+def _conta_visao(raiz: NoVisao) -> int:
+    n = 0
+    pilha = [raiz]
+    while pilha:
+        no = pilha.pop()
+        n += 1
+        pilha.extend(no.filhos)
+    return n
+
+
+def _renderiza_um(tarefa: Tuple[NoVisao, str, int, str]) -> str:
+    raiz, caminho, dpi, formato = tarefa
+    backend = saidas.arvore(formato)
+    opcoes: Dict[str, Any] = {}
+    if backend.usa_layout:
+        # um layout só, para o tamanho da figura e para o desenho
+        opcoes["pos"], _ = _compute_layout(raiz, 0.0, 0.0)
+    if formato == "png":
+        largura, altura = tamanho_figura(raiz, opcoes["pos"])
+        opcoes["figsize"] = (largura, altura)
+        opcoes["dpi"] = min(dpi, int((MAX_PIXELS / (largura * altura)) ** 0.5))
+    backend.carregar()(raiz, caminho, **opcoes)
+    return caminho
+
+
+def renderizar(
+    program: Program,
+    diretorio: str,
+    base: str,
+    opcoes: Optional[OpcoesRender] = None,
+    dpi: int = 160,
+    prazo=None,
+) -> List[Tuple[str, bool]]:
+    """
+    Gera as imagens de 'program' em 'diretorio' e devolve (caminho,
+    gerado) de cada uma; gerado=False quando a imagem já existia para a
+    mesma árvore e as mesmas opções. Com por_funcao, os nomes são
+    '<base>.<função>.<extensão>' e só as funções alteradas são redesenhadas.
+    Com um limites.Prazo, o total de nós a desenhar é conferido antes do
+    primeiro desenho e o prazo antes de cada um.
+    """
+    opcoes = opcoes or OpcoesRender()
+    backend = saidas.arvore(opcoes.formato)
+    if not backend.disponivel():
+        return []
+    os.makedirs(diretorio, exist_ok=True)
+
+    partes = particionar(program) if opcoes.por_funcao else [("", program)]
+    max_nos = opcoes.max_nos
+    if max_nos is None and opcoes.por_funcao:
+        max_nos = MAX_NOS_PADRAO  # uma função enorme não trava as outras
+    memo: Dict[int, bytes] = {}
+    saida: List[Tuple[str, bool]] = []
+    tarefas = []
+    chaves: Dict[str, str] = {}
+    for sufixo, raiz in partes:
+        nome = f"{base}.{sufixo}.{backend.extensao}" if sufixo else f"{base}.{backend.extensao}"
+        caminho = os.path.join(diretorio, nome)
+        chave = chave_render(raiz, opcoes, dpi, memo)
+        if render_em_dia(caminho, chave):
+            saida.append((caminho, False))
+            continue
+        chaves[caminho] = chave
+        visao = colapsar(raiz, opcoes.profundidade_max, opcoes.tamanho_max, max_nos)
+        tarefas.append((visao, caminho, dpi, opcoes.formato))
+
+    if prazo is not None:
+        prazo.conferir("render", sum(_conta_visao(v) for v, *_ in tarefas))
+        prazo.verificar()
+    if opcoes.jobs > 1 and len(tarefas) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(opcoes.jobs, len(tarefas))) as ex:
+            feitos = list(ex.map(_renderiza_um, tarefas))
+    else:
+        feitos = []
+        for t in tarefas:
+            if prazo is not None:
+                prazo.verificar()
+            feitos.append(_renderiza_um(t))
+    for caminho in feitos:
+        grava_chave(caminho, chaves[caminho])
+        saida.append((caminho, True))
+    return saida
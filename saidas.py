@@ -0,0 +1,193 @@
+"""
+Backends de saída: tabelas (tokens, símbolos) e a AST em arquivo.
+
+Cada backend é registrado pelo nome com o módulo e a função que o
+implementam, como texto ("modulo:funcao"). O módulo, e a dependência
+pesada dele (tabulate, matplotlib), só é importado na primeira vez que
+o backend é usado: importar este módulo não importa nenhum backend, e
+disponivel() só procura a dependência (importlib.util.find_spec), sem
+carregá-la.
+
+Tabelas: tabela(nome)(linhas, cabecalho) -> str
+    github  tabulate, formato github (o padrão)
+    texto   colunas alinhadas, sem dependências
+    json    uma lista de objetos, um por linha da tabela
+Árvores: arvore(nome).carregar()(raiz, caminho, **opcoes) grava o arquivo
+    png     matplotlib (analisador_sintatico.draw_tree)
+    svg     SVG escrito direto, sem dependências
+    json    serializacao.para_json
+Os backends de árvore recebem opções que podem ignorar: pos (layout já
+calculado), figsize e dpi.
+
+Outros backends entram com registrar().
+"""
+from __future__ import annotations
+import importlib
+import importlib.util
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+TIPOS = ("tabela", "arvore")
+
+
+class ErroBackend(ValueError):
+    """Backend desconhecido, ou com a dependência ausente."""
+
+
+@dataclass
+class Backend:
+    tipo: str                         # "tabela" ou "arvore"
+    nome: str
+    alvo: str                         # "modulo:funcao"
+    dependencia: Optional[str] = None
+    extensao: str = ""                # árvores: extensão do arquivo gerado
+    usa_layout: bool = False          # árvores: aproveita pos= de _compute_layout
+    _funcao: Optional[Callable] = field(default=None, repr=False)
+
+    def disponivel(self) -> bool:
+        return self.dependencia is None or importlib.util.find_spec(self.dependencia) is not None
+
+    def carregar(self) -> Callable:
+        """Importa a implementação (na primeira chamada) e a devolve."""
+        if self._funcao is None:
+            if not self.disponivel():
+                raise ErroBackend(
+                    f"{self.tipo} '{self.nome}' precisa de {self.dependencia}, que não está instalado"
+                )
+            modulo, _, nome = self.alvo.partition(":")
+            self._funcao = getattr(importlib.import_module(modulo), nome)
+        return self._funcao
+
+
+_BACKENDS: Dict[str, Dict[str, Backend]] = {t: {} for t in TIPOS}
+
+
+def registrar(tipo: str, nome: str, alvo: str, dependencia: Optional[str] = None,
+              extensao: str = "", usa_layout: bool = False) -> Backend:
+    if tipo not in TIPOS:
+        raise ValueError(f"tipo de backend desconhecido: {tipo!r}")
+    b = Backend(tipo, nome, alvo, dependencia, extensao or nome, usa_layout)
+    _BACKENDS[tipo][nome] = b
+    return b
+
+
+def nomes(tipo: str) -> List[str]:
+    return list(_BACKENDS[tipo])
+
+
+def obter(tipo: str, nome: str) -> Backend:
+    b = _BACKENDS[tipo].get(nome)
+    if b is None:
+        raise ErroBackend(f"{tipo} desconhecida: {nome!r} (opções: {', '.join(_BACKENDS[tipo])})")
+    return b
+
+
+def tabela(nome: str) -> Callable[[Sequence[Sequence[Any]], Sequence[str]], str]:
+    return obter("tabela", nome).carregar()
+
+
+def arvore(nome: str) -> Backend:
+    return obter("arvore", nome)
+
+
+# -----------------------------------------------
+# Tabelas
+# -----------------------------------------------
+
+def tabela_github(linhas, cabecalho) -> str:
+    from tabulate import tabulate
+    return tabulate(linhas, headers=cabecalho, tablefmt="github")
+
+
+def tabela_texto(linhas, cabecalho) -> str:
+    celulas = [[str(c) for c in cabecalho]] + [["" if v is None else str(v) for v in l] for l in linhas]
+    larguras = [max(len(l[k]) for l in celulas) for k in range(len(cabecalho))]
+    # números à direita, como o tabulate
+    direita = [
+        all(isinstance(l[k], (int, float)) for l in linhas if l[k] is not None)
+        for k in range(len(cabecalho))
+    ]
+    saida = []
+    for i, l in enumerate(celulas):
+        saida.append("  ".join(
+            c.rjust(w) if d else c.ljust(w) for c, w, d in zip(l, larguras, direita)
+        ).rstrip())
+        if i == 0:
+            saida.append("  ".join("-" * w for w in larguras))
+    return "\n".join(saida)
+
+
+def tabela_json(linhas, cabecalho) -> str:
+    import json
+    return json.dumps([dict(zip(cabecalho, l)) for l in linhas], ensure_ascii=False, indent=2)
+
+
+# -----------------------------------------------
+# Árvores
+# -----------------------------------------------
+
+_ESCALA_X = 60     # pixels por unidade do layout
+_ESCALA_Y = 45
+_MARGEM = 40
+
+
+def arvore_svg(raiz: Any, caminho: str, pos=None, **_):
+    from xml.sax.saxutils import escape
+    from analisador_sintatico import _compute_layout, children, node_label
+
+    if pos is None:
+        pos, _ = _compute_layout(raiz, 0.0, 0.0)
+    xs = [x for x, _ in pos.values()]
+    ys = [y for _, y in pos.values()]
+    x0, y1 = min(xs), max(ys)
+
+    def px(no):
+        x, y = pos[id(no)]
+        return _MARGEM + (x - x0) * _ESCALA_X, _MARGEM + (y1 - y) * _ESCALA_Y
+
+    largura = (max(xs) - x0) * _ESCALA_X + 2 * _MARGEM
+    altura = (y1 - min(ys)) * _ESCALA_Y + 2 * _MARGEM
+    arestas: List[str] = []
+    nos: List[str] = []
+    pilha = [raiz]
+    while pilha:
+        n = pilha.pop()
+        x, y = px(n)
+        for c in children(n):
+            if c is None:
+                continue
+            xc, yc = px(c)
+            arestas.append(f'<line x1="{x:.1f}" y1="{y:.1f}" x2="{xc:.1f}" y2="{yc:.1f}"/>')
+            pilha.append(c)
+        classe = ' class="resumo"' if getattr(n, "resumo", False) else ""
+        nos.append(f'<text x="{x:.1f}" y="{y:.1f}"{classe}>{escape(node_label(n))}</text>')
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{largura:.0f}" height="{altura:.0f}">\n'
+            "<style>line{stroke:#555} text{font:12px sans-serif;text-anchor:middle;"
+            "dominant-baseline:middle;paint-order:stroke;stroke:white;stroke-width:4px}"
+            " .resumo{fill:gray;font-style:italic}</style>\n"
+            + "\n".join(arestas) + "\n" + "\n".join(nos) + "\n</svg>\n"
+        )
+
+
+def _visao_json(n: Any) -> Any:
+    # renderizacao.NoVisao (árvore colapsada) não é nó da AST
+    return {"rotulo": n.rotulo, "resumo": n.resumo, "filhos": [_visao_json(c) for c in n.filhos]}
+
+
+def arvore_json(raiz: Any, caminho: str, **_):
+    import json
+    from serializacao import para_json
+
+    dados = _visao_json(raiz) if type(raiz).__name__ == "NoVisao" else para_json(raiz)
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False, indent=2)
+
+
+registrar("tabela", "github", "saidas:tabela_github", dependencia="tabulate")
+registrar("tabela", "texto", "saidas:tabela_texto")
+registrar("tabela", "json", "saidas:tabela_json")
+registrar("arvore", "png", "analisador_sintatico:draw_tree", dependencia="matplotlib", usa_layout=True)
+registrar("arvore", "svg", "saidas:arvore_svg", usa_layout=True)
+registrar("arvore", "json", "saidas:arvore_json")
@@ -0,0 +1,504 @@
+"""
+Serialização da AST.
+
+Formato binário (versão 2):
+
+    cabeçalho   b"MCAST" + versão (1 byte)
+    itens       um nó por item de topo do Program, em ordem
+    strings     tabela de strings: n, depois (tamanho, utf-8) de cada uma
+    índice      n, depois o offset de cada item de topo
+    rodapé      offset das strings e do índice (2 x uint64 LE) + b"MCA!"
+
+Cada nó é: tipo (1 byte), tamanho do payload (varint) e o payload com
+os campos na ordem da dataclass. Posições e índices de string são
+varints; o tamanho no início permite pular uma subárvore inteira sem
+decodificá-la, que é o que o leitor preguiçoso faz. Números são
+1 byte de tipo e o valor: 0 e um varint (int) ou 1 e um double (float);
+a versão 1 gravava float integral como varint e não distinguia '7' de
+'7.0'.
+"""
+from __future__ import annotations
+import json
+import struct
+from dataclasses import fields
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from analisador_sintatico import (
+    Program, Block, VarDecl, FuncDef, Assign, If, While, Return,
+    Call, Index, BinOp, Var, Num, TextLit, CharLit,
+)
+
+MAGICO = b"MCAST"
+VERSAO = 2
+FIM = b"MCA!"
+_RODAPE = struct.Struct("<QQ")
+
+
+class ErroFormato(Exception):
+    """Arquivo que não está no formato binário esperado."""
+
+
+# Tipos de campo
+STR, POS, NUM, NO, LISTA = range(5)
+
+# tipo 0 é reservado para None
+CLASSES = [
+    None, Block, VarDecl, FuncDef, Assign, If, While, Return,
+    Call, Index, BinOp, Var, Num, TextLit, CharLit,
+]
+CODIGO_CLASSE = {c: k for k, c in enumerate(CLASSES) if c is not None}
+
+_TIPO_CAMPO: Dict[Tuple[type, str], int] = {
+    (Block, "body"): LISTA,
+    (VarDecl, "vartype"): STR, (VarDecl, "name"): NO, (VarDecl, "init"): NO,
+    (FuncDef, "rettype"): STR, (FuncDef, "name"): STR,
+    (FuncDef, "params"): LISTA, (FuncDef, "body"): NO,
+    (Assign, "target"): NO, (Assign, "value"): NO,
+    (If, "test"): NO, (If, "then"): NO, (If, "otherwise"): NO,
+    (While, "test"): NO, (While, "body"): NO,
+    (Return, "value"): NO,
+    (Call, "callee"): NO, (Call, "args"): LISTA,
+    (Index, "target"): NO, (Index, "index"): NO,
+    (BinOp, "left"): NO, (BinOp, "op"): STR, (BinOp, "right"): NO,
+    (Var, "name"): STR,
+    (Num, "value"): NUM,
+    (TextLit, "value"): STR,
+    (CharLit, "value"): STR,
+}
+
+# esquema: para cada código de classe, [(nome do campo, tipo do campo)]
+ESQUEMA: List[List[Tuple[str, int]]] = [[]]
+for _c in CLASSES[1:]:
+    ESQUEMA.append([
+        (f.name, POS if f.name in ("line", "col") else _TIPO_CAMPO[(_c, f.name)])
+        for f in fields(_c)
+    ])
+
+
+# -----------------------------------------------
+# varints
+# -----------------------------------------------
+
+def _tam_varint(v: int) -> int:
+    n = 1
+    while v >= 0x80:
+        v >>= 7
+        n += 1
+    return n
+
+
+def _escreve_varint(out: bytearray, v: int):
+    while v >= 0x80:
+        out.append((v & 0x7F) | 0x80)
+        v >>= 7
+    out.append(v)
+
+
+def _le_varint(buf, p: int) -> Tuple[int, int]:
+    b = buf[p]
+    if b < 0x80:
+        return b, p + 1
+    v = b & 0x7F
+    desloc = 7
+    p += 1
+    while True:
+        b = buf[p]
+        p += 1
+        v |= (b & 0x7F) << desloc
+        if b < 0x80:
+            return v, p
+        desloc += 7
+
+
+def _zigzag(v: int) -> int:
+    return (v << 1) if v >= 0 else ((-v << 1) - 1)
+
+
+def _unzigzag(v: int) -> int:
+    return (v >> 1) if not (v & 1) else -((v + 1) >> 1)
+
+
+# -----------------------------------------------
+# Escrita (streaming por item de topo)
+# -----------------------------------------------
+
+def _passos(n: Any) -> Iterator[Tuple[int, Any]]:
+    """
+    Campos de 'n' na ordem do formato, como (tipo, valor); uma lista vira
+    (LISTA, tamanho) seguido de (NO, elemento) para cada elemento.
+    """
+    for nome, tipo in ESQUEMA[CODIGO_CLASSE[type(n)]]:
+        v = getattr(n, nome)
+        if tipo == LISTA:
+            yield LISTA, len(v)
+            for x in v:
+                yield NO, x
+        else:
+            yield tipo, v
+
+
+class EscritorAST:
+    """
+    Escreve os itens de topo à medida que chegam; só a tabela de strings
+    e o índice ficam em memória até fechar().
+    """
+
+    def __init__(self, fp: BinaryIO):
+        self.fp = fp
+        self.strings: Dict[str, int] = {}
+        self.offsets: List[int] = []
+        self.pos = 0
+        self._grava(MAGICO + bytes([VERSAO]))
+
+    def _grava(self, dados: bytes):
+        self.fp.write(dados)
+        self.pos += len(dados)
+
+    def _str(self, s: str) -> int:
+        k = self.strings.get(s)
+        if k is None:
+            k = len(self.strings)
+            self.strings[s] = k
+        return k
+
+    # primeira passada: tamanho de cada payload (linear, sem copiar bytes)
+    # As duas passadas são iterativas, com pilha explícita: uma cadeia
+    # longa de BinOp estouraria a recursão do Python.
+    def _tam_no(self, n: Any, tams: Dict[int, int]) -> int:
+        if n is None:
+            return 1
+        pilha: List[list] = [[n, _passos(n), 0]]
+        while True:
+            f = pilha[-1]
+            for tipo, v in f[1]:
+                if tipo == NO:
+                    if v is None:
+                        f[2] += 1
+                    else:
+                        pilha.append([v, _passos(v), 0])
+                        break
+                elif tipo == POS:
+                    f[2] += _tam_varint(v)
+                elif tipo == STR:
+                    f[2] += _tam_varint(self._str(v))
+                elif tipo == NUM:
+                    f[2] += 1 + (_tam_varint(_zigzag(v)) if type(v) is int else 8)
+                else:
+                    f[2] += _tam_varint(v)
+            else:
+                no, _, total = pilha.pop()
+                tams[id(no)] = total
+                tam = 1 + _tam_varint(total) + total
+                if not pilha:
+                    return tam
+                pilha[-1][2] += tam
+
+    def _escreve_no(self, out: bytearray, n: Any, tams: Dict[int, int]):
+        if n is None:
+            out.append(0)
+            return
+        pilha = [self._abre(out, n, tams)]
+        while pilha:
+            for tipo, v in pilha[-1]:
+                if tipo == NO:
+                    if v is None:
+                        out.append(0)
+                    else:
+                        pilha.append(self._abre(out, v, tams))
+                        break
+                elif tipo == POS:
+                    _escreve_varint(out, v)
+                elif tipo == STR:
+                    _escreve_varint(out, self.strings[v])
+                elif tipo == NUM:
+                    if type(v) is int:
+                        out.append(0)
+                        _escreve_varint(out, _zigzag(v))
+                    else:
+                        out.append(1)
+                        out += struct.pack("<d", v)
+                else:
+                    _escreve_varint(out, v)
+            else:
+                pilha.pop()
+
+    @staticmethod
+    def _abre(out: bytearray, n: Any, tams: Dict[int, int]) -> Iterator[Tuple[int, Any]]:
+        """Grava o cabeçalho de 'n' e devolve os passos do seu payload."""
+        out.append(CODIGO_CLASSE[type(n)])
+        _escreve_varint(out, tams[id(n)])
+        return _passos(n)
+
+    def escrever(self, item: Any):
+        tams: Dict[int, int] = {}
+        self._tam_no(item, tams)
+        out = bytearray()
+        self._escreve_no(out, item, tams)
+        self.offsets.append(self.pos)
+        self._grava(bytes(out))
+
+    def fechar(self):
+        out = bytearray()
+        off_strings = self.pos
+        _escreve_varint(out, len(self.strings))
+        for s in self.strings:  # dicts preservam a ordem de inserção = índice
+            b = s.encode("utf-8")
+            _escreve_varint(out, len(b))
+            out += b
+        off_indice = off_strings + len(out)
+        _escreve_varint(out, len(self.offsets))
+        for o in self.offsets:
+            _escreve_varint(out, o)
+        out += _RODAPE.pack(off_strings, off_indice) + FIM
+        self._grava(bytes(out))
+
+
+def salvar(program: Program, fp: BinaryIO):
+    salvar_itens(program.body, fp)
+
+
+def salvar_itens(itens: Iterable[Any], fp: BinaryIO):
+    """
+    Grava itens de topo vindos de qualquer iterável, por exemplo de
+    Parser.iter_top_level(), sem montar o Program inteiro.
+    """
+    w = EscritorAST(fp)
+    for item in itens:
+        w.escrever(item)
+    w.fechar()
+
+
+def para_bytes(program: Program) -> bytes:
+    import io
+    buf = io.BytesIO()
+    salvar(program, buf)
+    return buf.getvalue()
+
+
+# -----------------------------------------------
+# Leitura
+# -----------------------------------------------
+
+class LeitorAST:
+    """
+    Acesso aos itens de topo sem decodificar o arquivo inteiro:
+    leitor[k] devolve um NoPreguicoso; carregar() materializa tudo.
+    """
+
+    def __init__(self, dados):
+        buf = memoryview(dados)
+        if bytes(buf[:len(MAGICO)]) != MAGICO or bytes(buf[-len(FIM):]) != FIM:
+            raise ErroFormato("não é uma AST serializada")
+        versao = buf[len(MAGICO)]
+        if versao != VERSAO:
+            raise ErroFormato(f"versão {versao} não suportada (esperado {VERSAO})")
+        self.buf = buf
+        off_strings, off_indice = _RODAPE.unpack_from(buf, len(buf) - len(FIM) - _RODAPE.size)
+
+        n, p = _le_varint(buf, off_strings)
+        self.strings: List[str] = []
+        for _ in range(n):
+            tam, p = _le_varint(buf, p)
+            self.strings.append(str(buf[p:p + tam], "utf-8"))
+            p += tam
+
+        n, p = _le_varint(buf, off_indice)
+        self.offsets: List[int] = []
+        for _ in range(n):
+            o, p = _le_varint(buf, p)
+            self.offsets.append(o)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, k: int) -> "NoPreguicoso":
+        return NoPreguicoso(self, self.offsets[k])
+
+    def __iter__(self) -> Iterator["NoPreguicoso"]:
+        for o in self.offsets:
+            yield NoPreguicoso(self, o)
+
+    # ---------- decodificação completa ----------
+    def carregar(self) -> Program:
+        return Program([self.no(o)[0] for o in self.offsets])
+
+    def no(self, p: int) -> Tuple[Any, int]:
+        """Decodifica o nó em p; devolve (nó, posição seguinte)."""
+        buf = self.buf
+        if buf[p] == 0:
+            return None, p + 1
+        # iterativo, como a escrita: cada quadro é [classe, campo atual,
+        # valores já lidos, elementos que faltam da lista aberta, lista]
+        pilha: List[list] = []
+
+        def abre(p: int) -> int:
+            _, q = _le_varint(buf, p + 1)
+            pilha.append([buf[p], 0, [], 0, None])
+            return q
+
+        p = abre(p)
+        while True:
+            f = pilha[-1]
+            if f[4] is not None:
+                if f[3] == 0:
+                    f[2].append(f[4])
+                    f[4] = None
+                    f[1] += 1
+                elif buf[p] == 0:
+                    f[4].append(None)
+                    f[3] -= 1
+                    p += 1
+                else:
+                    p = abre(p)
+                continue
+            esquema = ESQUEMA[f[0]]
+            if f[1] == len(esquema):
+                no = CLASSES[f[0]](*f[2])
+                pilha.pop()
+                if not pilha:
+                    return no, p
+                pai = pilha[-1]
+                if pai[4] is not None:
+                    pai[4].append(no)
+                    pai[3] -= 1
+                else:
+                    pai[2].append(no)
+                    pai[1] += 1
+                continue
+            tipo = esquema[f[1]][1]
+            if tipo == NO:
+                if buf[p] != 0:
+                    p = abre(p)
+                    continue
+                v, p = None, p + 1
+            elif tipo == LISTA:
+                f[3], p = _le_varint(buf, p)
+                f[4] = []
+                continue
+            elif tipo == POS:
+                v, p = _le_varint(buf, p)
+            elif tipo == STR:
+                i, p = _le_varint(buf, p)
+                v = self.strings[i]
+            else:
+                v, p = self._num(p)
+            f[2].append(v)
+            f[1] += 1
+
+    def _num(self, p: int) -> Tuple[Any, int]:
+        if self.buf[p] == 0:
+            v, p = _le_varint(self.buf, p + 1)
+            return _unzigzag(v), p
+        return struct.unpack_from("<d", self.buf, p + 1)[0], p + 9
+
+    def pula(self, p: int) -> int:
+        """Posição logo depois do nó em p, sem decodificá-lo."""
+        if self.buf[p] == 0:
+            return p + 1
+        tam, q = _le_varint(self.buf, p + 1)
+        return q + tam
+
+
+class NoPreguicoso:
+    """
+    Vista de um nó serializado. Os campos só são decodificados no
+    primeiro acesso, e filhos viram outros NoPreguicoso (subárvores que
+    ninguém visita nunca são lidas).
+    """
+
+    __slots__ = ("_leitor", "_pos", "_campos")
+
+    def __init__(self, leitor: LeitorAST, pos: int):
+        self._leitor = leitor
+        self._pos = pos
+        self._campos: Optional[Dict[str, Any]] = None
+
+    @property
+    def tipo(self) -> str:
+        return CLASSES[self._leitor.buf[self._pos]].__name__
+
+    def _decodifica(self) -> Dict[str, Any]:
+        lt = self._leitor
+        buf = lt.buf
+        k = buf[self._pos]
+        _, p = _le_varint(buf, self._pos + 1)
+        campos: Dict[str, Any] = {}
+        for nome, tipo in ESQUEMA[k]:
+            if tipo == POS:
+                v, p = _le_varint(buf, p)
+            elif tipo == STR:
+                i, p = _le_varint(buf, p)
+                v = lt.strings[i]
+            elif tipo == NO:
+                v = None if buf[p] == 0 else NoPreguicoso(lt, p)
+                p = lt.pula(p)
+            elif tipo == LISTA:
+                n, p = _le_varint(buf, p)
+                v = []
+                for _ in range(n):
+                    v.append(None if buf[p] == 0 else NoPreguicoso(lt, p))
+                    p = lt.pula(p)
+            else:
+                v, p = lt._num(p)
+            campos[nome] = v
+        self._campos = campos
+        return campos
+
+    def __getattr__(self, nome: str) -> Any:
+        campos = self._campos if self._campos is not None else self._decodifica()
+        try:
+            return campos[nome]
+        except KeyError:
+            raise AttributeError(nome) from None
+
+    def materializar(self) -> Any:
+        return self._leitor.no(self._pos)[0]
+
+    def __repr__(self) -> str:
+        return f"<{self.tipo} preguiçoso @ {self._pos}>"
+
+
+def carregar(dados) -> Program:
+    return LeitorAST(dados).carregar()
+
+
+# -----------------------------------------------
+# JSON (depuração)
+# -----------------------------------------------
+
+def para_json(n: Any) -> Any:
+    if n is None:
+        return None
+    raiz: List[Any] = [None]
+    # pré-ordem iterativa: cada dict é criado com os campos na ordem da
+    # dataclass e os filhos preenchem depois o lugar reservado a eles
+    pilha: List[Tuple[Any, Any, Any]] = [(n, raiz, 0)]
+    while pilha:
+        no, destino, chave = pilha.pop()
+        if no is None:
+            continue
+        if isinstance(no, Program):
+            out: Dict[str, Any] = {"kind": "Program", "body": [None] * len(no.body)}
+            pilha.extend((x, out["body"], i) for i, x in enumerate(no.body))
+            destino[chave] = out
+            continue
+        k = CODIGO_CLASSE.get(type(no))
+        if k is None:
+            raise TypeError(f"nó desconhecido: {type(no).__name__}")
+        out = {"kind": type(no).__name__}
+        for nome, tipo in ESQUEMA[k]:
+            v = getattr(no, nome)
+            if tipo == NO:
+                out[nome] = None
+                pilha.append((v, out, nome))
+            elif tipo == LISTA:
+                out[nome] = [None] * len(v)
+                pilha.extend((x, out[nome], i) for i, x in enumerate(v))
+            else:
+                out[nome] = v
+        destino[chave] = out
+    return raiz[0]
+
+
+def exportar_json(program: Program, fp, indent: Optional[int] = 2):
+    json.dump(para_json(program), fp, ensure_ascii=False, indent=indent)
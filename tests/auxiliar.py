@@ -0,0 +1,65 @@
+"""Funções comuns aos testes."""
+from __future__ import annotations
+import contextlib
+import glob
+import io
+import os
+
+from analisador_lexico import analisar_lexema
+from analisador_sintatico import Parser, tokens_from_lexer
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXEMPLOS = os.path.join(RAIZ, "exemplos")
+
+
+def exemplos(sufixo: str = "") -> list:
+    """Caminhos de exemplos/*<sufixo>.c, em ordem."""
+    return sorted(glob.glob(os.path.join(EXEMPLOS, f"*{sufixo}.c")))
+
+
+def le(caminho: str) -> str:
+    with open(caminho, encoding="utf-8") as f:
+        return f.read()
+
+
+def lexa(codigo: str):
+    """(tokens, tabela de símbolos) do léxico serial, sem as mensagens de erro."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return analisar_lexema(codigo)
+
+
+def parse(codigo: str, **opcoes):
+    """(Program, erros) do parser serial."""
+    lista_tokens, _ = lexa(codigo)
+    return Parser(tokens_from_lexer(lista_tokens), **opcoes).parse_program()
+
+
+def parse_ok(codigo: str):
+    program, errors = parse(codigo)
+    assert not errors, errors
+    return program
+
+
+def como_tuplas(lista_tokens) -> list:
+    return [(t.tipo, t.lexema, t.linha, t.coluna, t.atributo) for t in lista_tokens]
+
+
+def lexa_com_mensagens(codigo: str, **opcoes):
+    """(tokens como tuplas, tabela de símbolos, mensagens impressas) do léxico."""
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        lista_tokens, tabela = analisar_lexema(codigo, **opcoes)
+    return como_tuplas(lista_tokens), tabela, buf.getvalue()
+
+
+def fontes_variadas() -> dict:
+    """Fontes que exercitam os casos difíceis do léxico: exemplos, bordas e aleatórias."""
+    from complexidade import CASOS
+    from varredura_vetorizada import ENTRADAS_GERADAS, fontes_aleatorias
+
+    fontes = {os.path.basename(c): le(c) for c in exemplos()}
+    fontes.update(ENTRADAS_GERADAS)
+    fontes.update(fontes_aleatorias(10, 400))
+    for nome, caso in CASOS.items():
+        fontes[nome] = caso.gerar(caso.n_inicial)
+    return fontes
@@ -0,0 +1,228 @@
+"""IR de três endereços: os passos de otimizar() não mudam o resultado."""
+import copy
+import io
+import operator
+import os
+
+import pytest
+
+from codigo_intermediario import Branch, Const, Jump, gerar_ir, otimizar
+from interpretador import BUILTINS, Interpretador, c_div, c_index, c_mod
+from tests.auxiliar import exemplos, le, parse_ok
+
+_OPS = {
+    "+": operator.add, "-": operator.sub, "*": operator.mul, "/": c_div, "%": c_mod,
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+    "==": operator.eq, "!=": operator.ne,
+}
+
+
+def roda_ir(modulo, entrada="main"):
+    """
+    Executa o IR direto, sem tipos (int e float não são convertidos na
+    atribuição); devolve (valor de 'entrada', texto impresso).
+    """
+    funcoes = {f.nome: f for f in modulo.funcoes}
+    globais = {g: 0 for g in modulo.globais}
+    saida = io.StringIO()
+
+    def chama(nome, args):
+        f = funcoes.get(nome)
+        if f is None:
+            return BUILTINS[nome](saida, args)
+        locais = set(f.locais)
+        env = dict(zip(f.params, args))
+
+        def valor(x):
+            if isinstance(x, Const):
+                return x.valor
+            if x in env:
+                return env[x]
+            return 0 if x in locais else globais[x]
+
+        bloco = f.blocos[f.entrada]
+        while True:
+            for ins in bloco.instrs:
+                a = [valor(x) for x in ins.args]
+                if ins.op == "=":
+                    v = a[0]
+                elif ins.op == "call":
+                    v = chama(ins.func, a)
+                elif ins.op == "index":
+                    v = c_index(*a)
+                else:
+                    v = _OPS[ins.op](*a)
+                    if type(v) is bool:
+                        v = int(v)
+                if ins.dest is None:
+                    continue
+                if ins.dest in globais and ins.dest not in locais:
+                    globais[ins.dest] = v
+                else:
+                    env[ins.dest] = v
+            t = bloco.term
+            if isinstance(t, Jump):
+                bloco = f.blocos[t.alvo]
+            elif isinstance(t, Branch):
+                bloco = f.blocos[t.entao if valor(t.cond) != 0 else t.senao]
+            else:
+                return None if t.valor is None else valor(t.valor)
+
+    if "<topo>" in funcoes:
+        chama("<topo>", [])
+    return chama(entrada, []), saida.getvalue()
+
+
+def antes_e_depois(codigo):
+    """(IR gerado, IR otimizado, relatórios de otimizar)."""
+    modulo = gerar_ir(parse_ok(codigo))
+    otimizado = copy.deepcopy(modulo)
+    return modulo, otimizado, otimizar(otimizado)
+
+
+def alteracoes(relatorios, passo):
+    return [a for r in relatorios if r.passo == passo for a in r.alteracoes]
+
+
+def instrucoes(modulo, funcao="main"):
+    f = next(f for f in modulo.funcoes if f.nome == funcao)
+    return [str(ins) for b in f.blocos.values() for ins in b.instrs]
+
+
+# ---------- cada passo ----------
+
+def test_copia_de_global_invalidada_por_chamada():
+    codigo = """
+        int g = 1;
+        int muda(void) { g = 5; return 0; }
+        int main(void) { int x = g; muda(); return x + g; }
+    """
+    modulo, otimizado, _ = antes_e_depois(codigo)
+    # 'x' guarda o g de antes da chamada: não pode virar 'g' depois dela
+    assert "%t1 = x + g" in instrucoes(otimizado)
+    assert roda_ir(otimizado) == roda_ir(modulo) == (6, "")
+
+
+def test_copia_local_propagada():
+    modulo, otimizado, relatorios = antes_e_depois(
+        "int main(void) { int a = 4; int b = a; return b * 2; }")
+    assert alteracoes(relatorios, "propagação de cópias")
+    # não há dobra de aritmética: só as cópias somem
+    assert instrucoes(otimizado) == ["%t1 = 4 * 2"]
+    assert roda_ir(otimizado) == roda_ir(modulo) == (8, "")
+
+
+def test_subexpressao_comum_comutativa():
+    codigo = "int main(void) { int x = 3; int y = 4; printf(\"%d\", x + y); return y + x; }"
+    modulo, otimizado, relatorios = antes_e_depois(codigo)
+    assert any("reaproveita" in a for a in alteracoes(relatorios, "subexpressões comuns"))
+    assert sum(" + " in i for i in instrucoes(otimizado)) == 1
+    assert roda_ir(otimizado) == roda_ir(modulo) == (7, "7")
+
+
+def test_subexpressao_nao_comutativa_nao_reaproveita():
+    codigo = "int main(void) { int x = 3; int y = 4; printf(\"%d\", x - y); return y - x; }"
+    modulo, otimizado, relatorios = antes_e_depois(codigo)
+    assert not alteracoes(relatorios, "subexpressões comuns")
+    assert roda_ir(otimizado) == roda_ir(modulo) == (1, "-1")
+
+
+def test_desvio_constante_dobrado():
+    codigo = "int main(void) { int c = 0; if (c) { return 1; } else { return 2; } }"
+    modulo, otimizado, relatorios = antes_e_depois(codigo)
+    assert any("desvio constante" in a for a in alteracoes(relatorios, "blocos inalcançáveis"))
+    assert any("inalcançável removido" in a for a in alteracoes(relatorios, "blocos inalcançáveis"))
+    main = next(f for f in otimizado.funcoes if f.nome == "main")
+    assert not any(isinstance(b.term, Branch) for b in main.blocos.values())
+    assert roda_ir(otimizado) == roda_ir(modulo) == (2, "")
+
+
+def test_codigo_morto_mantem_chamadas():
+    codigo = """
+        int n = 0;
+        int conta(void) { n = n + 1; return n; }
+        int main(void) { int t = conta(); int u = 2 * 3; conta(); return n; }
+    """
+    modulo, otimizado, relatorios = antes_e_depois(codigo)
+    morto = alteracoes(relatorios, "código morto")
+    assert any("descartado" in a for a in morto)
+    assert instrucoes(otimizado).count("call conta()") == 2
+    assert "u = 2 * 3" in instrucoes(modulo)
+    assert "u = 2 * 3" not in instrucoes(otimizado)
+    assert roda_ir(otimizado) == roda_ir(modulo) == (2, "")
+
+
+def test_codigo_morto_mantem_globais():
+    modulo, otimizado, _ = antes_e_depois("int g; int main(void) { g = 7; return 0; }")
+    assert "g = 7" in instrucoes(otimizado)
+
+
+def test_declaracoes_sem_valor_acompanham_o_codigo_morto():
+    codigo = "int um(void) { return 1; } int main(void) { int u = 2 * 3; int w; w = um(); return w; }"
+    modulo, otimizado, _ = antes_e_depois(codigo)
+    antes = modulo.funcoes[1].blocos["B0"]
+    depois = otimizado.funcoes[1].blocos["B0"]
+    assert antes.declaracoes == [(1, "w")] and str(antes.instrs[1]) == "w = call um()"
+    # 'u = 2 * 3' saiu: a declaração continua antes da chamada
+    assert depois.declaracoes == [(0, "w")] and str(depois.instrs[0]) == "w = call um()"
+
+
+def test_nomes_sombreados_nao_se_misturam():
+    codigo = """
+        int main(void) {
+            int x = 1;
+            int s = 0;
+            if (s == 0) { int x = 2; s = x + 10; x = x + 1; s = s + x; }
+            return x * 100 + s;
+        }
+    """
+    modulo, otimizado, _ = antes_e_depois(codigo)
+    assert "x#2" in modulo.funcoes[0].locais
+    assert roda_ir(otimizado) == roda_ir(modulo) == (115, "")
+    program = parse_ok(codigo)
+    assert Interpretador(program, io.StringIO()).executar("main") == 115
+
+
+# ---------- o resultado não muda ----------
+
+PROGRAMAS = {
+    "laco": """
+        int main(void) {
+            int s = 0; int i = 0;
+            while (i < 10) { if (i % 3 == 0 || i == 7) { s = s + i * i; } i = i + 1; }
+            return s;
+        }
+    """,
+    "recursao": """
+        int fib(int n) { if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); }
+        int main(void) { return fib(12); }
+    """,
+    "globais": """
+        int total = 0;
+        int soma(int k) { total = total + k; return total; }
+        int main(void) { int a = soma(2); int b = soma(3); int c = a + b; printf("%d %d\\n", a + b, c); return total; }
+    """,
+    "divisao": "int main(void) { int a = 0 - 7; int b = 2; return (a / b) * 10 + a % b; }",
+    "curto_circuito": """
+        int n = 0;
+        int marca(void) { n = n + 1; return 1; }
+        int main(void) { int z = 0; if (z && marca()) { n = 100; } if (1 || marca()) { n = n + 10; } return n; }
+    """,
+}
+
+
+@pytest.mark.parametrize("nome", list(PROGRAMAS))
+def test_otimizado_igual_ao_interpretador(nome):
+    codigo = PROGRAMAS[nome]
+    modulo, otimizado, _ = antes_e_depois(codigo)
+    saida = io.StringIO()
+    esperado = Interpretador(parse_ok(codigo), saida).executar("main"), saida.getvalue()
+    assert roda_ir(modulo) == esperado
+    assert roda_ir(otimizado) == esperado
+
+
+@pytest.mark.parametrize("caminho", exemplos("_correct"), ids=os.path.basename)
+def test_exemplos_antes_e_depois(caminho):
+    modulo, otimizado, _ = antes_e_depois(le(caminho))
+    assert roda_ir(otimizado) == roda_ir(modulo)
+    assert otimizar(otimizado) == []   # já está no ponto fixo
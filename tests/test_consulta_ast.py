@@ -0,0 +1,148 @@
+"""Consultas por padrão contra a AST de programas pequenos."""
+import pytest
+
+from analisador_sintatico import children
+from consulta_ast import Captura, ErroConsulta, IndiceAST, Literal, LoteIndexado, No, compilar
+from tests.auxiliar import exemplos, le, parse_ok
+
+CODIGO = """
+int g;
+int dobro(int a) { return a + a; }
+int main(void) {
+    int x = 1;
+    x = x + 1;
+    x = g * x;
+    printf("%d\\n", x);
+    printf("fim");
+    while (1) { if (x) { exit(0); } x = x - 1; }
+    if (g) { return dobro(x); }
+    return 0;
+}
+"""
+
+
+@pytest.fixture(scope="module")
+def indice():
+    return IndiceAST(parse_ok(CODIGO))
+
+
+def rotulos(casamentos) -> list:
+    return [str(c).split("  ")[0] for c in casamentos]
+
+
+def test_captura_repetida_exige_valores_iguais(indice):
+    # x = x + 1 e x = x - 1 casam; x = g * x não (o lado esquerdo de '*' é g)
+    cs = indice.consultar("Assign(target=Var(name=v), value=BinOp(left=Var(name=v)))")
+    assert [(c.capturas["v"], c.no.value.op) for c in cs] == [("x", "+"), ("x", "-")]
+
+
+def test_captura_repetida_compara_nos_pela_estrutura(indice):
+    # a + a: os dois lados são nós distintos, iguais sem contar a posição
+    cs = indice.consultar("BinOp(left=e, right=e)")
+    assert len(cs) == 1
+    assert cs[0].no.left is not cs[0].no.right
+    assert cs[0].capturas["e"].name == "a"
+
+
+def test_alternativa(indice):
+    testes = [c.no.test for c in indice.consultar("While(test=Num | CharLit)")]
+    assert [t.value for t in testes] == [1]
+    assert not indice.consultar("While(test=Var | CharLit)")
+    # a primeira alternativa que casa é a que liga as capturas
+    cs = indice.consultar("Return(value=(n := Num) | (c := Call))")
+    assert [sorted(c.capturas) for c in cs] == [["c"], ["n"]]
+
+
+def test_descendente(indice):
+    dentro_de_main = indice.consultar('FuncDef(name="main") >> Return')
+    assert len(dentro_de_main) == 2
+    assert len(indice.consultar("Return")) == 3
+    assert not indice.consultar('FuncDef(name="dobro") >> Call')
+
+
+def test_contem(indice):
+    cs = indice.consultar('If(contem=Call(callee=Var(name="exit")))')
+    assert len(cs) == 1 and cs[0].no.test.name == "x"
+    # a captura dentro de contem= sai no casamento
+    c, = indice.consultar('If(contem=(c := Call(callee=Var(name="dobro"))))')
+    assert c.capturas["c"].args[0].name == "x"
+    assert not indice.consultar('While(contem=Call(callee=Var(name="dobro")))')
+
+
+def test_listas_abertas_e_fechadas(indice):
+    exatas = indice.consultar("Call(args=[TextLit])")
+    abertas = indice.consultar("Call(args=[TextLit, ...])")
+    assert [c.no.args[0].value for c in exatas] == ['"fim"']
+    assert [len(c.no.args) for c in abertas] == [2, 1]
+    assert len(indice.consultar("Call(args=[...])")) == len(indice.consultar("Call"))
+    assert len(indice.consultar("Call(args=[])")) == 0
+
+
+def test_texto_e_python_dao_o_mesmo(indice):
+    python = No("Assign", target=No("Var", name=Captura("v")),
+                value=No("BinOp", left=No("Var", name=Captura("v"))))
+    texto = "Assign(target=Var(name=v), value=BinOp(left=Var(name=v)))"
+    assert rotulos(indice.consultar(python)) == rotulos(indice.consultar(texto))
+    assert repr(compilar(texto)) == repr(python)
+    assert rotulos(indice.consultar(No("Call") >> No("TextLit"))) == rotulos(indice.consultar("Call >> TextLit"))
+
+
+def test_consulta_igual_a_percorrer_tudo(indice):
+    todos, pilha = [], [indice.raiz]
+    while pilha:
+        n = pilha.pop()
+        todos.append(n)
+        pilha.extend(reversed(children(n)))
+    esperado = [n for n in todos if type(n).__name__ == "Var" and n.name == "x"]
+    assert [c.no for c in indice.consultar('Var(name="x")')] == esperado
+
+
+@pytest.mark.parametrize("texto", [
+    "-1", "-2.5", "Num(value=-3)",
+])
+def test_numero_negativo(texto):
+    assert isinstance(compilar(texto), (Literal, No))
+
+
+@pytest.mark.parametrize("texto", [
+    'Num(value=-"a")',
+    "Num(value=-None)",
+    "Num(value=-True)",
+    "Nada",
+    "Var(tipo=x)",
+    "var(name=x)",
+    "Call(Var)",
+    "Call(",
+    "x + y",
+])
+def test_consulta_invalida(texto):
+    with pytest.raises(ErroConsulta):
+        compilar(texto)
+
+
+def test_lote_indexado(tmp_path):
+    arquivos = {
+        "a.c": 'int main(void) { printf("a"); return 0; }',
+        "b.c": "int main(void) { return 1; }",
+        # erro de sintaxe: entra com a AST recuperada
+        "c.c": 'int main(void) { printf("c"); x = ; printf("%d", 2); return 0; }',
+    }
+    caminhos = []
+    for nome, codigo in arquivos.items():
+        (tmp_path / nome).write_text(codigo, encoding="utf-8")
+        caminhos.append(str(tmp_path / nome))
+    lote = LoteIndexado.de_arquivos(caminhos)
+    assert list(lote.indices) == caminhos
+    assert list(lote.diagnosticos) == [caminhos[2]]
+    achados = [(nome[-3:], c.no.args[0].value) for nome, c in lote.consultar('Call(callee=Var(name="printf"))')]
+    assert achados == [("a.c", '"a"'), ("c.c", '"c"'), ("c.c", '"%d"')]
+    # o mesmo padrão, já compilado, dá o mesmo resultado
+    assert len(list(lote.consultar(compilar("Return")))) == 3
+
+
+def test_lote_nos_exemplos():
+    lote = LoteIndexado()
+    for caminho in exemplos("_correct"):
+        lote.adicionar(caminho, parse_ok(le(caminho)))
+    por_arquivo = {nome: IndiceAST(indice.raiz).consultar("FuncDef") for nome, indice in lote.indices.items()}
+    assert [c.no for _, c in lote.consultar("FuncDef")] == [c.no for cs in por_arquivo.values() for c in cs]
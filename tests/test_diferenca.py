@@ -0,0 +1,114 @@
+"""Diferença estrutural entre duas versões de um programa."""
+import os
+
+import pytest
+
+from hash_estrutural import diferenca, funcoes_alteradas, hash_estrutural, hashes
+from tests.auxiliar import exemplos, le, parse_ok
+
+A = """int soma(int a, int b) {
+    int s = a + b;
+    return s;
+}
+int main(void) {
+    int x = soma(1, 2);
+    if (x > 2) { x = x - 1; }
+    return x;
+}
+"""
+
+
+def mudancas(antigo: str, novo: str) -> list:
+    return [(m.tipo, type(m.no).__name__, m.caminho, m.funcao)
+            for m in diferenca(parse_ok(antigo), parse_ok(novo))]
+
+
+def test_sem_mudancas():
+    assert mudancas(A, A) == []
+    # espaços, quebras e comentários não contam
+    assert mudancas(A, "/* v2 */\n" + A.replace("    ", "\t").replace("a + b", "a+b")) == []
+
+
+@pytest.mark.parametrize("novo, esperado", [
+    (A.replace("a + b", "a * b"),
+     [("modificado", "BinOp", "soma().body.body[0].init", "soma")]),
+    (A.replace("return s;", "return a;"),
+     [("modificado", "Var", "soma().body.body[1].value", "soma")]),
+    (A.replace("return s;", "return 1;"),      # outro tipo de nó no mesmo lugar
+     [("modificado", "Num", "soma().body.body[1].value", "soma")]),
+    (A.replace("    int s = a + b;\n", ""),
+     [("removido", "VarDecl", "soma().body.body[0]", "soma")]),
+    (A.replace("    return x;\n}", "    printf(\"%d\", x);\n    return x;\n}"),
+     [("inserido", "Call", "main().body.body[2]", "main")]),
+    (A.replace("{ x = x - 1; }", "{ x = x - 1; } else { x = 0; }"),
+     [("inserido", "Block", "main().body.body[1].otherwise", "main")]),
+    (A + "int extra(void) { return 0; }\n",
+     [("inserido", "FuncDef", "extra()", "extra")]),
+])
+def test_mudanca_unica(novo, esperado):
+    assert mudancas(A, novo) == esperado
+
+
+def test_funcao_renomeada():
+    novo = A.replace("int soma", "int sub").replace("soma(1", "sub(1")
+    assert mudancas(A, novo) == [
+        ("removido", "FuncDef", "soma()", "soma"),
+        ("inserido", "FuncDef", "sub()", "sub"),
+        ("modificado", "Var", "main().body.body[0].init.callee", "main"),
+    ]
+    assert funcoes_alteradas(diferenca(parse_ok(A), parse_ok(novo))) == ["soma", "sub", "main"]
+
+
+def test_comando_que_contem_a_mudanca():
+    novo = A.replace("x = x - 1;", "x = x - 2;")
+    m, = diferenca(parse_ok(A), parse_ok(novo))
+    assert type(m.no).__name__ == "Num" and m.caminho == "main().body.body[1].then.body[0].value.right"
+    # o comando é o item de bloco mais interno, da versão nova
+    assert type(m.comando).__name__ == "Assign" and m.comando.value.right.value == 2
+    assert (m.posicao_antes, m.posicao_depois) == ((7, 26), (7, 26))
+
+
+def test_varias_mudancas_em_ordem_do_fonte():
+    novo = (A.replace("a + b", "a - b")
+             .replace("    int x = soma(1, 2);\n", "    int y = 0;\n    int x = soma(1, 2);\n")
+             .replace("return x;", "return x + y;"))
+    assert mudancas(A, novo) == [
+        ("modificado", "BinOp", "soma().body.body[0].init", "soma"),
+        ("inserido", "VarDecl", "main().body.body[0]", "main"),
+        ("modificado", "BinOp", "main().body.body[3].value", "main"),   # Var virou BinOp
+    ]
+
+
+def test_memos_prontos_dao_o_mesmo():
+    antigo, novo = parse_ok(A), parse_ok(A.replace("a + b", "a * b"))
+    ma, mb = hashes(antigo), hashes(novo)
+    tamanhos = (len(ma), len(mb))
+    assert diferenca(antigo, novo, ma, mb) == diferenca(antigo, novo)
+    assert (len(ma), len(mb)) == tamanhos   # nada foi recalculado
+
+
+def variantes(codigo: str) -> list:
+    """Edições pequenas, cada uma num lugar diferente do fonte."""
+    trocas = [("+", "-"), ("<", ">="), ("return", "return 1 +"), ("= 0", "= 7"), ("1", "2")]
+    out = []
+    for velho, novo in trocas:
+        k = codigo.find(velho)
+        if k >= 0:
+            out.append(codigo[:k] + novo + codigo[k + len(velho):])
+    return out
+
+
+@pytest.mark.parametrize("caminho", exemplos("_correct"), ids=os.path.basename)
+def test_exemplos(caminho):
+    codigo = le(caminho)
+    antigo = parse_ok(codigo)
+    assert diferenca(antigo, parse_ok(codigo)) == []
+    for variante in variantes(codigo):
+        novo = parse_ok(variante)
+        ida = diferenca(antigo, novo)
+        # vazia exatamente quando os hashes batem
+        assert (ida == []) == (hash_estrutural(antigo) == hash_estrutural(novo))
+        # ao contrário: inserido <-> removido, e os mesmos nós
+        volta = diferenca(novo, antigo)
+        troca = {"inserido": "removido", "removido": "inserido", "modificado": "modificado"}
+        assert [(troca[m.tipo], m.caminho) for m in ida] == [(m.tipo, m.caminho) for m in volta]
@@ -0,0 +1,144 @@
+import io
+import os
+
+import pytest
+
+import compilador_python
+import interpretador
+import maquina_virtual
+from tests.auxiliar import exemplos, le, parse_ok
+
+
+def roda_interpretador(program, entrada):
+    saida = io.StringIO()
+    return interpretador.Interpretador(program, saida).executar(entrada), saida.getvalue()
+
+
+def roda_vm(program, entrada):
+    saida = io.StringIO()
+    return maquina_virtual.executar(program, entrada, saida), saida.getvalue()
+
+
+def roda_python(program, entrada):
+    saida = io.StringIO()
+    return compilador_python.executar(program, entrada, saida), saida.getvalue()
+
+
+BACKENDS = {
+    "interpretador": roda_interpretador,
+    "vm": roda_vm,
+    "python": roda_python,
+}
+
+
+@pytest.fixture(params=list(BACKENDS))
+def roda(request):
+    return BACKENDS[request.param]
+
+
+def _resultado(roda, codigo, entrada="h"):
+    valor, _ = roda(parse_ok(codigo), entrada)
+    return valor
+
+
+@pytest.mark.parametrize("codigo", [
+    "float h(void) { float f = 7.0; return f / 2; }",
+    "float h(void) { float f = 7; return f / 2; }",
+    "float h(void) { float f; f = 7; return f / 2; }",
+    "double h(void) { return 7.0 / 2; }",
+    "float g(float a) { return a / 2; } float h(void) { return g(7); }",
+    "float f = 7; float h(void) { return f / 2; }",
+])
+def test_float_guarda_float(roda, codigo):
+    v = _resultado(roda, codigo)
+    assert v == 3.5 and type(v) is float
+
+
+def test_retorno_float_de_expressao_inteira(roda):
+    # 7 / 2 é divisão inteira; só o retorno vira float
+    v = _resultado(roda, "double h(void) { return 7 / 2; }")
+    assert v == 3.0 and type(v) is float
+
+
+def test_int_trunca(roda):
+    assert _resultado(roda, "int h(void) { float f = 7.5; int i = f; return i * 2; }") == 14
+    assert _resultado(roda, "int h(void) { return 7.0 / 2; }") == 3
+
+
+def test_gerado_sem_divisao_inteira_para_float():
+    fonte = compilador_python.GeradorPython().gerar(
+        parse_ok("float h(void) { float f = 7.0; return f / 2; }")
+    )
+    assert "//" not in fonte
+
+
+def soma_longa(termos: int) -> str:
+    return "int h(void) { int x = 1; return " + " + ".join(["x"] * termos) + "; }"
+
+
+@pytest.mark.parametrize("codigo, esperado", [
+    ("int h(void) { int a = 7; int b = 3; int c = 2; return a - (b - c) * 2 + (a + b) * c"
+     " - a * b * c - (a - b - c) + a - b + c * (a - b); }", -7),
+    ("int h(void) { int a = 7; int b = 3; return a - b - 1 - (a - (b - 1)); }", -2),
+    ("int h(void) { int a = 7; int b = 3; return (a + b) * (a - b) * 2; }", 80),
+])
+def test_precedencia(roda, codigo, esperado):
+    assert _resultado(roda, codigo) == esperado
+
+
+def test_gerado_sem_parenteses_em_cadeia():
+    # o parser do Python recusa mais de 200 parênteses aninhados
+    fonte = compilador_python.GeradorPython().gerar(parse_ok(soma_longa(400)))
+    assert "((" not in fonte
+    assert roda_python(parse_ok(soma_longa(400)), "h") == (400, "")
+
+
+def test_compilacao_funda_demais_vira_erro_de_compilacao():
+    with pytest.raises(compilador_python.ErroCompilacao, match="pilha de chamadas excedida"):
+        compilador_python.compilar(parse_ok(soma_longa(3000)))
+
+
+@pytest.mark.parametrize("codigo, esperado", [
+    ("int h(void) { int x = 1; if (1) { int x = 2; } return x; }", 1),
+    ("int h(void) { int x = 1; if (1) { int x = 2; x = x + 5; } return x; }", 1),
+    ("int h(void) { int x = 1; if (1) { x = 2; } return x; }", 2),
+    ("int x = 10; int h(void) { int x = 1; return x; }", 1),
+    ("int x = 10; int g(void) { return x; } int h(void) { int x = 1; return g(); }", 10),
+    ("int h(void) { int s = 0; int i = 0; while (i < 3) { int t = i * 2; s = s + t; i = i + 1; } return s; }", 6),
+    ("float h(void) { float x = 1.5; if (1) { int x = 2; } return x; }", 1.5),
+])
+def test_escopo_de_bloco(roda, codigo, esperado):
+    assert _resultado(roda, codigo) == esperado
+
+
+def test_variavel_do_bloco_nao_vaza(roda):
+    codigo = "int h(void) { if (1) { int y = 2; } return y; }"
+    with pytest.raises(Exception, match="'y' não declarada"):
+        _resultado(roda, codigo)
+
+
+@pytest.mark.parametrize("caminho", exemplos("_correct"), ids=os.path.basename)
+def test_exemplos_iguais_ao_interpretador(caminho):
+    program = parse_ok(le(caminho))
+    esperado = roda_interpretador(program, "main")
+    assert roda_vm(program, "main") == esperado
+    assert roda_python(program, "main") == esperado
+
+
+# os compiladores descobrem a expressão funda demais antes de rodar
+ERROS_PILHA = (interpretador.ErroExecucao, maquina_virtual.ErroCompilacao,
+               compilador_python.ErroCompilacao)
+
+
+@pytest.mark.parametrize("codigo", [
+    "int f(int n) { return f(n + 1); } int h(void) { return f(0); }",
+    soma_longa(3000),
+], ids=["chamadas", "expressao"])
+def test_recursao_funda_vira_erro_de_execucao(roda, codigo):
+    with pytest.raises(ERROS_PILHA, match="pilha de chamadas excedida"):
+        roda(parse_ok(codigo), "h")
+
+
+def test_recursao_rasa_continua_funcionando(roda):
+    codigo = "int f(int n) { if (n == 0) { return 0; } return 1 + f(n - 1); } int h(void) { return f(50); }"
+    assert _resultado(roda, codigo) == 50
@@ -0,0 +1,56 @@
+"""Diagnósticos de fluxo_dados em programas pequenos."""
+import pytest
+
+from fluxo_dados import analisar_fluxo
+from tests.auxiliar import exemplos, le, parse_ok
+
+
+def diagnosticos(codigo: str) -> list:
+    return [(d.funcao, d.gravidade, d.mensagem) for d in analisar_fluxo(parse_ok(codigo))]
+
+
+def test_atribuicao_morta():
+    codigo = "int main() { int x; x = 1; x = 2; return x; }"
+    assert diagnosticos(codigo) == [("main", "aviso", "valor atribuído a 'x' nunca é lido")]
+
+
+def test_leitura_possivelmente_sem_atribuicao():
+    codigo = "int main() { int x; int c; c = 1; if (c) { x = 1; } return x; }"
+    assert diagnosticos(codigo) == [("main", "aviso", "'x' pode ser lida sem ter sido atribuída")]
+
+
+def test_local_nunca_atribuida():
+    codigo = "int main() { int x; return x; }"
+    assert diagnosticos(codigo) == [("main", "erro", "'x' é lida sem nunca ter sido atribuída")]
+
+
+def test_declaracao_sem_valor_no_laco():
+    # cada volta declara 'w' de novo: o valor da volta anterior não conta
+    codigo = "int main() { int c; c = 3; while (c) { int w; w = w + 1; c = c - 1; } return 0; }"
+    assert ("main", "erro", "'w' é lida sem nunca ter sido atribuída") in diagnosticos(codigo)
+
+
+def test_declaracao_fora_do_laco():
+    codigo = "int main() { int c; c = 3; int w; while (c) { w = w + 1; c = c - 1; } return 0; }"
+    assert diagnosticos(codigo) == [("main", "aviso", "'w' pode ser lida sem ter sido atribuída")]
+
+
+def test_posicao_do_diagnostico():
+    d, = analisar_fluxo(parse_ok("int main() {\n    int x;\n    return x;\n}"))
+    assert d.linha == 3
+
+
+@pytest.mark.parametrize("codigo", [
+    "int main() { int x; x = 1; return x; }",
+    "int g; int main() { g = 1; return g; }",
+    "int f(int a) { int s; s = 0; while (a > 0) { s = s + a; a = a - 1; } return s; }",
+    "int f(int a) { int y; if (a) { y = 1; } else { y = 2; } return y; }",
+    "int f(int a) { while (a) { int w; w = a; a = w - 1; } return a; }",
+])
+def test_programa_limpo(codigo):
+    assert diagnosticos(codigo) == []
+
+
+@pytest.mark.parametrize("caminho", exemplos("_correct"))
+def test_exemplos_sem_erros(caminho):
+    assert not [d for d in analisar_fluxo(parse_ok(le(caminho))) if d.gravidade == "erro"]
@@ -0,0 +1,98 @@
+"""Shards K/N mesclados contra uma rodada única (0/1)."""
+import json
+import os
+import shutil
+from collections import Counter
+
+import pytest
+
+from fragmentacao import (ErroMescla, analisar_shard, gravar_json, le_shard,
+                          listar_corpus, mesclar, shard_de)
+from analise import analisar_fonte
+from tests.auxiliar import exemplos, le
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """Os exemplos copiados em duas pastas, para o caminho relativo ter '/'."""
+    for sub in ("a", "b/c"):
+        destino = tmp_path / "corpus" / sub
+        destino.mkdir(parents=True)
+        for caminho in exemplos():
+            shutil.copy(caminho, destino)
+    return str(tmp_path / "corpus")
+
+
+def canonico(relatorio) -> str:
+    return json.dumps(relatorio, sort_keys=True)
+
+
+@pytest.mark.parametrize("n", [2, 3, 7])
+def test_shards_mesclados_iguais_a_rodada_unica(corpus, n):
+    partes = [analisar_shard(corpus, k, n) for k in range(n)]
+    unico = mesclar([analisar_shard(corpus, 0, 1)], com_tempos=False)
+    assert canonico(mesclar(partes, com_tempos=False)) == canonico(unico)
+    assert unico["totais"]["arquivos"] == len(listar_corpus(corpus))
+
+
+def test_tabela_de_simbolos_somada(corpus):
+    relatorio = mesclar([analisar_shard(corpus, k, 3) for k in range(3)], com_tempos=False)
+    esperado = Counter()
+    for caminho in exemplos():
+        esperado.update(analisar_fonte(le(caminho)).tabela_simbolos)
+    # cada exemplo aparece duas vezes no corpus (a/ e b/c/)
+    assert relatorio["totais"]["simbolos"] == {nome: 2 * n for nome, n in sorted(esperado.items())}
+    nome = os.path.basename(exemplos()[0])
+    por_arquivo = relatorio["arquivos"][f"a/{nome}"]["simbolos"]
+    assert por_arquivo == dict(analisar_fonte(le(exemplos()[0])).tabela_simbolos)
+
+
+def test_versao_antiga_recusada(corpus):
+    s = analisar_shard(corpus, 0, 1)
+    s["versao"] = 1
+    with pytest.raises(ErroMescla):
+        mesclar([s])
+
+
+def test_shards_pelo_json(corpus, tmp_path):
+    n = 3
+    partes = []
+    for k in range(n):
+        caminho = os.path.join(tmp_path, f"shard-{k}-de-{n}.json")
+        gravar_json(analisar_shard(corpus, k, n), caminho)
+        with open(caminho, encoding="utf-8") as f:
+            partes.append(json.load(f))
+    unico = mesclar([analisar_shard(corpus, 0, 1)], com_tempos=False)
+    assert canonico(mesclar(partes, com_tempos=False)) == canonico(unico)
+
+
+def test_divisao_cobre_o_corpus_uma_vez(corpus):
+    n = 4
+    arquivos = listar_corpus(corpus)
+    por_shard = [[rel for rel in arquivos if shard_de(rel, n) == k] for k in range(n)]
+    assert sorted(rel for parte in por_shard for rel in parte) == arquivos
+
+
+def test_shard_faltando(corpus):
+    with pytest.raises(ErroMescla):
+        mesclar([analisar_shard(corpus, 0, 3), analisar_shard(corpus, 2, 3)])
+
+
+def test_shard_repetido(corpus):
+    s = analisar_shard(corpus, 0, 2)
+    with pytest.raises(ErroMescla):
+        mesclar([s, s])
+
+
+def test_corpora_diferentes(corpus, tmp_path):
+    outro = tmp_path / "outro"
+    outro.mkdir()
+    shutil.copy(exemplos()[0], outro)
+    with pytest.raises(ErroMescla):
+        mesclar([analisar_shard(corpus, 0, 2), analisar_shard(str(outro), 1, 2)])
+
+
+@pytest.mark.parametrize("texto", ["3/3", "-1/2", "0/0", "1", "a/b"])
+def test_le_shard_invalido(texto):
+    with pytest.raises(ValueError):
+        le_shard(texto)
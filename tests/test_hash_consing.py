@@ -0,0 +1,51 @@
+import gc
+
+from analisador_sintatico import Parser, tokens_from_lexer
+from hash_estrutural import hash_estrutural
+from tests.auxiliar import lexa, parse
+
+A = "int f(void) {\n    int a = 1;\n    return a + zz;\n}\n"
+B = "int g(void) { return zz; }\n"
+
+
+def test_mesma_estrutura_da_arvore_comum():
+    comum, _ = parse(A + B)
+    dag, _ = parse(A + B, hash_consing=True)
+    assert hash_estrutural(dag) == hash_estrutural(comum)
+
+
+def test_compartilha_dentro_do_arquivo():
+    program, _ = parse("int f(void) { x = y + 1; z = y + 1; }", hash_consing=True)
+    a, b = program.body[0].body.body
+    assert a.value is b.value
+
+
+def test_nao_compartilha_entre_arquivos():
+    # um nó canônico de outro arquivo traria o line/col de lá
+    pa, _ = parse(A, hash_consing=True)
+    pb, _ = parse(B, hash_consing=True)
+    va = pa.body[0].body.body[1].value.right
+    vb = pb.body[0].body.body[0].value
+    assert va is not vb
+    assert (vb.line, vb.col) == (1, 22)
+
+
+def test_posicoes_de_todas_as_ocorrencias():
+    codigo = "int f(void) {\n  x = y + 1;\n  z = y + 1;\n}"
+    parser = Parser(tokens_from_lexer(lexa(codigo)[0]), hash_consing=True)
+    program, _ = parser.parse_program()
+    a, b = program.body[0].body.body
+    assert parser.posicoes[id(a.value)] == [(2, 7), (3, 7)]
+
+
+def test_posicoes_sem_nos_mortos():
+    # itens descartados levam os canônicos junto; o id de um nó morto pode
+    # voltar num nó novo e não pode herdar as posições do antigo
+    codigo = "".join(f"int f{i}(void) {{ return a{i % 3} + {i}; }}\n" for i in range(200))
+    parser = Parser(tokens_from_lexer(lexa(codigo)[0]), hash_consing=True)
+    for item, _ in parser.iter_top_level():
+        del item
+    gc.collect()
+    vivos = {id(n) for n in parser.tabela_intern.values()}
+    assert set(parser.posicoes) <= vivos
+    assert len(parser.posicoes) == len(vivos)
@@ -0,0 +1,38 @@
+"""A partida da CLI não importa as dependências pesadas dos backends."""
+import subprocess
+import sys
+
+import pytest
+
+from desempenho import IMPORTACOES_ADIADAS, importacoes
+from tests.auxiliar import RAIZ
+
+
+def modulos_apos(codigo: str) -> set:
+    """Módulos em sys.modules depois de rodar 'codigo' num interpretador novo."""
+    r = subprocess.run(
+        [sys.executable, "-c", codigo + "\nimport sys\nprint('\\n'.join(sys.modules))"],
+        cwd=RAIZ, capture_output=True, text=True, check=True,
+    )
+    return set(r.stdout.split())
+
+
+def adiadas(modulos) -> list:
+    return sorted(m for m in modulos if m in IMPORTACOES_ADIADAS or m.split(".")[0] in IMPORTACOES_ADIADAS)
+
+
+def test_import_main_nao_carrega_backends():
+    assert adiadas(modulos_apos("import main")) == []
+
+
+def test_check_nao_carrega_backends():
+    assert adiadas(importacoes(["main.py", "--check"])) == []
+
+
+def test_backend_carrega_a_dependencia_quando_usado():
+    pytest.importorskip("tabulate")
+    codigo = "import saidas\nsaidas.tabela('github')([[1, 2]], ['a', 'b'])"
+    assert "tabulate" in modulos_apos(codigo)
+    # consultar e carregar o backend não importa a dependência; só usá-lo
+    codigo = "import saidas\nsaidas.arvore('png').disponivel()\nsaidas.tabela('github')"
+    assert adiadas(modulos_apos(codigo)) == []
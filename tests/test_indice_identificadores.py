@@ -0,0 +1,111 @@
+"""Índice de identificadores: contagens da atualização incremental e consultas."""
+import os
+import sqlite3
+
+import pytest
+
+import indice_identificadores
+from indice_identificadores import IndiceIdentificadores
+
+ARQUIVOS = {
+    "a.c": "int soma(int x, int y) { return x + y; }\nint main(void) { return soma(1, 2); }\n",
+    "b.c": "int orfa(void) { return 0; }\n",
+    "sub/c.c": "int g;\nint usa(void) { g = soma(g, 1); return g; }\n",
+}
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    raiz = tmp_path / "corpus"
+    for rel, codigo in ARQUIVOS.items():
+        (raiz / rel).parent.mkdir(parents=True, exist_ok=True)
+        (raiz / rel).write_text(codigo, encoding="utf-8")
+    return raiz
+
+
+@pytest.fixture
+def analises(monkeypatch):
+    """Arquivos que passaram pelo analisador, em ordem."""
+    feitas = []
+    original = indice_identificadores.analisar_fonte
+
+    def conta(codigo, *args, **kwargs):
+        feitas.append(codigo)
+        return original(codigo, *args, **kwargs)
+    monkeypatch.setattr(indice_identificadores, "analisar_fonte", conta)
+    return feitas
+
+
+def banco(tmp_path):
+    return IndiceIdentificadores(str(tmp_path / "indice.sqlite"))
+
+
+def contagens(reanalisados=0, tocados=0, inalterados=0, removidos=0):
+    return {"reanalisados": reanalisados, "tocados": tocados,
+            "inalterados": inalterados, "removidos": removidos}
+
+
+def test_contagens_incrementais(corpus, tmp_path, analises):
+    with banco(tmp_path) as indice:
+        assert indice.atualizar(str(corpus)) == contagens(reanalisados=3)
+        assert len(analises) == 3
+        assert indice.atualizar(str(corpus)) == contagens(inalterados=3)
+        assert len(analises) == 3
+
+        # só o mtime muda: relido, mas não reanalisado
+        st = os.stat(corpus / "b.c")
+        os.utime(corpus / "b.c", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert indice.atualizar(str(corpus)) == contagens(tocados=1, inalterados=2)
+        assert len(analises) == 3
+        assert indice.atualizar(str(corpus)) == contagens(inalterados=3)
+
+        # conteúdo novo (e tamanho novo): reanalisado
+        (corpus / "b.c").write_text("int orfa(void) { return usa(); }\n", encoding="utf-8")
+        os.remove(corpus / "sub" / "c.c")
+        assert indice.atualizar(str(corpus)) == contagens(reanalisados=1, inalterados=1, removidos=1)
+        assert analises[-1].startswith("int orfa(void) { return usa")
+
+
+def test_persistente_entre_aberturas(corpus, tmp_path, analises):
+    with banco(tmp_path) as indice:
+        indice.atualizar(str(corpus))
+        antes = indice.estatisticas()
+    with banco(tmp_path) as indice:
+        assert indice.estatisticas() == antes
+        assert indice.atualizar(str(corpus)) == contagens(inalterados=3)
+    assert len(analises) == 3
+
+
+def test_ocorrencias_seguem_o_corpus(corpus, tmp_path):
+    with banco(tmp_path) as indice:
+        indice.atualizar(str(corpus))
+        assert indice.onde("soma", "chamada") == [("a.c", 2, 25, "chamada"), ("sub/c.c", 2, 21, "chamada")]
+        assert indice.onde("soma", "declaracao") == [("a.c", 1, 5, "declaracao")]
+        assert [n for n, *_ in indice.nunca_chamadas()] == ["orfa", "usa"]
+
+        os.remove(corpus / "sub" / "c.c")
+        (corpus / "b.c").write_text("int orfa(void) { return 0; }\nint w;\n", encoding="utf-8")
+        indice.atualizar(str(corpus))
+        # as ocorrências do arquivo removido saem junto (ON DELETE CASCADE)
+        assert indice.onde("g") == []
+        assert [c for c, *_ in indice.onde("soma")] == ["a.c", "a.c"]
+        assert indice.onde("w", "declaracao") == [("b.c", 2, 5, "declaracao")]
+        assert [n for n, *_ in indice.nunca_chamadas()] == ["orfa"]
+
+
+def test_papel_invalido(corpus, tmp_path):
+    with banco(tmp_path) as indice:
+        with pytest.raises(ValueError):
+            indice.onde("soma", "leitura")
+
+
+def test_esquema_antigo_recomeca(corpus, tmp_path):
+    with banco(tmp_path) as indice:
+        indice.atualizar(str(corpus))
+    con = sqlite3.connect(str(tmp_path / "indice.sqlite"))
+    con.execute("PRAGMA user_version = 999")
+    con.commit()
+    con.close()
+    with banco(tmp_path) as indice:
+        assert indice.estatisticas() == (0, 0, 0)
+        assert indice.atualizar(str(corpus)) == contagens(reanalisados=3)
@@ -0,0 +1,102 @@
+"""IndicePosicoes contra uma busca exaustiva por todos os nós."""
+import os
+
+import pytest
+
+from analisador_sintatico import Parser, children, tokens_from_lexer
+from indice_posicoes import IndicePosicoes
+from tests.auxiliar import exemplos, le, lexa
+
+CASOS = {
+    "chamadas": "int f(int a) { return (g)(a, h(a + 1))[2] + (v)[a]; }\n",
+    "blocos": "int main(void) {\n  { int x = 1; { x = x + 1; } }\n  while (x < 3) { x = x + 1; }\n  return x;\n}\n",
+    "topo": "int g = 2;\ng = g * (g + 1);\nint main(void) { return g; }\n",
+    "texto": 'int main(void) {\n  printf("a\\n%d", 1);\n  return \'x\';\n}\n',
+}
+CASOS.update({os.path.basename(c): le(c) for c in exemplos()})
+
+
+def monta(codigo):
+    tokens = tokens_from_lexer(lexa(codigo)[0])
+    program, _ = Parser(tokens).parse_program()
+    return IndicePosicoes(program, tokens), codigo
+
+
+def pre_ordem(indice):
+    """Nós com intervalo, em pré-ordem pela AST."""
+    out, pilha = [], [indice.raiz]
+    while pilha:
+        n = pilha.pop()
+        if indice.intervalo(n) is not None:
+            out.append(n)
+        pilha.extend(reversed([c for c in children(n) if c is not None]))
+    return out
+
+
+def posicoes(codigo):
+    linhas = codigo.split("\n")
+    for l, texto in enumerate(linhas, 1):
+        for c in range(1, len(texto) + 2):
+            yield (l, c)
+
+
+@pytest.fixture(params=list(CASOS))
+def caso(request):
+    return monta(CASOS[request.param])
+
+
+def test_intervalos_aninhados(caso):
+    indice, _ = caso
+    for n in pre_ordem(indice):
+        ini, fim = indice.intervalo(n)
+        assert ini < fim
+        if hasattr(n, "line"):
+            assert ini <= (n.line, n.col) < fim
+        filhos = [indice.intervalo(c) for c in children(n) if c is not None and indice.intervalo(c)]
+        for a, b in filhos:
+            assert ini <= a and b <= fim
+        # irmãos não se sobrepõem
+        for (_, b), (a, _) in zip(filhos, filhos[1:]):
+            assert b <= a
+
+
+def test_pilha_em_igual_a_busca_exaustiva(caso):
+    indice, codigo = caso
+    nos = pre_ordem(indice)
+    assert len(indice) == len(nos)
+    for p in posicoes(codigo):
+        esperado = [n for n in nos if indice.intervalo(n)[0] <= p < indice.intervalo(n)[1]]
+        assert indice.pilha_em(*p) == esperado, p
+        assert indice.no_em(*p) is (esperado[-1] if esperado else None)
+
+
+def test_sobrepostos_igual_a_busca_exaustiva(caso):
+    indice, codigo = caso
+    nos = pre_ordem(indice)
+    todas = list(posicoes(codigo))
+    passo = max(1, len(todas) // 40)
+    amostra = todas[::passo]
+    for i, a in enumerate(amostra):
+        for b in amostra[i + 1:i + 9]:
+            esperado = [n for n in nos if indice.intervalo(n)[0] < b and a < indice.intervalo(n)[1]]
+            assert indice.sobrepostos(a, b) == esperado, (a, b)
+
+
+def test_delimitadores_entram_no_intervalo():
+    indice, _ = monta(CASOS["chamadas"])
+    f = indice.raiz.body[0]
+    soma = f.body.body[0].value
+    index, index_v = soma.left, soma.right
+    call = index.target
+    assert indice.intervalo(f.body) == ((1, 14), (1, 54))          # do '{' ao '}'
+    assert indice.intervalo(index) == ((1, 24), (1, 42))           # até o ']'
+    assert indice.intervalo(call) == ((1, 24), (1, 39))            # até o ')', depois de '(g)'
+    assert indice.intervalo(call.args[1]) == ((1, 30), (1, 38))    # h(a + 1)
+    assert indice.intervalo(index_v) == ((1, 46), (1, 51))         # (v)[a]
+
+
+def test_fora_do_fonte():
+    indice, _ = monta(CASOS["topo"])
+    assert indice.pilha_em(0, 1) == []
+    assert indice.pilha_em(99, 1) == []
+    assert indice.sobrepostos((2, 5), (2, 5)) == []
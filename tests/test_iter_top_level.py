@@ -0,0 +1,69 @@
+"""Parser.iter_top_level contra parse_program."""
+import pytest
+
+from analisador_sintatico import FuncDef, Parser, VarDecl, tokens_from_lexer
+from hash_estrutural import hash_estrutural
+from limites import LimiteExcedido, LimitesArquivo, Prazo
+from tests.auxiliar import fontes_variadas, lexa
+
+FONTES = fontes_variadas()
+# o Parser desce um nível por parêntese: RecursionError nos dois caminhos
+del FONTES["parenteses_aninhados"]
+FONTES.update({
+    "diretivas": "#include <stdio.h>\nint g = 1;\n#define N 3\nint main(void) { return g; }\n",
+    "erros_no_meio": "int a(void) { return 1; }\nint b(void) { x = ; y = 2; }\nint c(void) { return 3; }\n",
+    "statements_soltos": "x = 1; y = x + 2; if (x) { y = 3; }\n",
+    "vazio": "",
+})
+
+
+def tokens(codigo):
+    return tokens_from_lexer(lexa(codigo)[0])
+
+
+@pytest.mark.parametrize("nome", list(FONTES))
+def test_mesmos_itens_e_erros_que_parse_program(nome):
+    codigo = FONTES[nome]
+    program, erros = Parser(tokens(codigo)).parse_program()
+    parser = Parser(tokens(codigo))
+    pares = list(parser.iter_top_level())
+    itens = [s for s, _ in pares if s is not None]
+    assert len(itens) == len(program.body)
+    assert [hash_estrutural(s) for s in itens] == [hash_estrutural(s) for s in program.body]
+    # cada erro sai uma vez, junto do item em que foi reportado
+    assert [e for _, es in pares for e in es] == erros == parser.errors
+
+
+def test_erros_saem_com_o_item():
+    pares = list(Parser(tokens(FONTES["erros_no_meio"])).iter_top_level())
+    assert [(s.name, len(es)) for s, es in pares] == [("a", 0), ("b", 1), ("c", 0)]
+    assert pares[1][1][0].endswith("@ 2:19")
+
+
+def test_diretivas_ignoradas_e_statements_soltos():
+    itens = [s for s, _ in Parser(tokens(FONTES["diretivas"])).iter_top_level()]
+    assert [type(s) for s in itens] == [VarDecl, FuncDef]
+    pares = list(Parser(tokens(FONTES["statements_soltos"])).iter_top_level())
+    assert len(pares) == 3 and all(s is not None and not es for s, es in pares)
+
+
+def test_itens_saem_antes_do_fim_do_arquivo():
+    codigo = "".join(f"int f{i}(void) {{ return {i}; }}\n" for i in range(50))
+    parser = Parser(tokens(codigo))
+    it = parser.iter_top_level()
+    primeiro, _ = next(it)
+    assert primeiro.name == "f0"
+    # só os tokens do primeiro item foram consumidos
+    assert parser.i == len(tokens("int f0(void) { return 0; }")) - 1   # sem o EOF
+    assert sum(1 for _ in it) == 49
+
+
+def test_prazo_conferido_a_cada_item():
+    pequeno = "int f(void) { return 1; }\n"
+    grande = "int g(void) { return " + " + ".join(["1"] * 200) + "; }\n"
+    prazo = Prazo(LimitesArquivo(nos=100))
+    parser = Parser(tokens(pequeno + grande + pequeno), prazo=prazo)
+    it = parser.iter_top_level()
+    assert next(it)[0].name == "f"
+    with pytest.raises(LimiteExcedido):
+        next(it)
@@ -0,0 +1,27 @@
+import pytest
+
+import analisador_lexico
+from tests.auxiliar import fontes_variadas, lexa_com_mensagens
+
+FONTES = fontes_variadas()
+
+
+@pytest.fixture
+def sem_minimo(monkeypatch):
+    # fontes pequenas também vão para os trechos
+    monkeypatch.setattr(analisador_lexico, "TAMANHO_MINIMO_PARALELO", 0)
+
+
+@pytest.mark.parametrize("nome", list(FONTES))
+def test_trechos_iguais_ao_serial(sem_minimo, nome):
+    codigo = FONTES[nome] * 3
+    assert lexa_com_mensagens(codigo, jobs=2) == lexa_com_mensagens(codigo)
+
+
+def test_cortes_caem_em_quebras_seguras():
+    codigo = 'int x; /* a\nb */ s = "c\\\nd";\n// e\n' * 50
+    cortes = analisador_lexico.pontos_de_corte(codigo, 4)
+    seguras = set(q + 1 for q in analisador_lexico.quebras_seguras(codigo))
+    assert cortes[0] == 0 and cortes[-1] == len(codigo)
+    assert len(cortes) > 2
+    assert all(c in seguras for c in cortes[1:-1])
@@ -0,0 +1,164 @@
+import io
+import os
+
+import pytest
+
+import compilador_python
+import maquina_virtual
+from analisador_ll1 import ParserLL1
+from analisador_sintatico import Parser, Program, tokens_from_lexer
+from desempenho import programa_muitas_funcoes, programa_repetitivo
+from hash_estrutural import hash_estrutural
+from interpretador import Interpretador
+from memoria import contar_nos
+from tests.auxiliar import EXEMPLOS, exemplos, le, lexa
+
+CASOS = {
+    "muitas_funcoes": programa_muitas_funcoes(50),
+    "bloco_longo": programa_repetitivo(200),
+    "controle": """
+        int x = 1;
+        float y;
+        x = x + 2;
+        int f(int a, float b) {
+            if (a < b) { a = a + 1; } else if (a == 0) { return 0; } else { b = b * 2.5; }
+            while (a > 0 && b != 1 || a) { int z = a % 3; a = a - 1; }
+            g(a, b[a + 1], "s", 'c');
+            return a;
+        }
+        void h(void) { return; }
+        int main() { return f(1, 2); }
+    """,
+}
+CASOS.update({os.path.basename(c): le(c) for c in exemplos("_correct")})
+
+
+def _parses(codigo):
+    tokens = tokens_from_lexer(lexa(codigo)[0])
+    return Parser(list(tokens)).parse_program(), ParserLL1(list(tokens)).parse_program()
+
+
+@pytest.mark.parametrize("nome", list(CASOS))
+def test_mesma_ast_do_parser(nome):
+    (esperado, erros), (obtido, erros_ll1) = _parses(CASOS[nome])
+    assert not erros
+    assert erros_ll1 == erros
+    assert obtido == esperado
+
+
+# Diagnósticos do ParserLL1 nos exemplos com erro; as diferenças para o
+# Parser estão documentadas em analisador_ll1.py.
+_EXPRESSAO = "Esperado número, identificador, string, char ou '('"
+ERROS_LL1 = {
+    "ex1_wrong.c": [
+        f"  - {_EXPRESSAO} (encontrado '\"teste;      // ERRO: string não terminada\n') @ 8:16",
+    ],
+    "ex2_wrong.c": [
+        f"  - {_EXPRESSAO} (encontrado '3,14') @ 5:16",
+        "  - Esperado identificador (encontrado '2x') @ 6:9",
+        f"  - {_EXPRESSAO} (encontrado '2x') @ 8:9",
+        "  - Esperado ')' (encontrado '}') @ 10:5",
+    ],
+    # ')' inserido: o bloco do if fica, e não há o 2º erro do Parser no '}'
+    "ex3_wrong.c": ["  - Esperado ')' (encontrado '{') @ 7:15"],
+    "ex4_wrong.c": ["  - Esperado comando ou '}' (encontrado '') @ 17:54"],
+    "ex5_wrong.c": ["  - Esperado ';' (encontrado '@') @ 8:11"],
+}
+
+
+def _posicao(erro: str) -> str:
+    return erro.rsplit("@", 1)[1]
+
+
+@pytest.mark.parametrize("caminho", exemplos("_wrong"), ids=os.path.basename)
+def test_diagnosticos_nos_exemplos_com_erro(caminho):
+    (_, erros), (_, erros_ll1) = _parses(le(caminho))
+    assert erros_ll1 == ERROS_LL1[os.path.basename(caminho)]
+    assert _posicao(erros_ll1[0]) == _posicao(erros[0])
+
+
+def test_recuperacao_insere_terminal():
+    _, (program, _) = _parses(le(os.path.join(EXEMPLOS, "ex3_wrong.c")))
+    se = program.body[0].body.body[1]
+    assert [type(s).__name__ for s in se.then.body] == ["Call"]
+    assert type(program.body[0].body.body[2]).__name__ == "Return"
+
+
+@pytest.mark.parametrize("laco, equivalente", [
+    ("for (i = 0; i < 3; i = i + 1) { s = s + i; }",
+     "if (1) { i = 0; while (i < 3) { s = s + i; i = i + 1; } }"),
+    ("for (; i < 3; ) s = s + i;", "while (i < 3) { s = s + i; }"),
+    ("do { s = s + 1; } while (s < 3);",
+     "if (1) { int __primeira_volta = 1; while (__primeira_volta || s < 3) "
+     "{ __primeira_volta = 0; if (1) { s = s + 1; } } }"),
+])
+def test_lacos_viram_while(laco, equivalente):
+    # só o ParserLL1 aceita for e do-while; blocos soltos não existem na
+    # gramática, então o bloco equivalente vem do 'then' de um if
+    tokens = tokens_from_lexer(lexa(f"int main(void) {{ {laco} }}")[0])
+    obtido, erros = ParserLL1(tokens).parse_program()
+    assert not erros
+    (esperado, _), _ = _parses(f"int main(void) {{ {equivalente} }}")
+    item = esperado.body[0].body.body[0]
+    if equivalente.startswith("if"):
+        item = item.then
+    if laco.startswith("do"):
+        # o corpo do do-while é o bloco em si, sem o 'if (1)' em volta
+        corpo = item.body[1].body.body
+        corpo[1] = corpo[1].then
+    assert hash_estrutural(obtido.body[0].body.body[0]) == hash_estrutural(item)
+
+
+def _parse_ll1(codigo):
+    program, erros = ParserLL1(tokens_from_lexer(lexa(codigo)[0])).parse_program()
+    assert not erros, erros
+    return program
+
+
+def test_faca_aninhado_cresce_linear():
+    def nos(n):
+        codigo = ("int main(void) { int s = 0; " + "do { " * n + "s = s + 1;"
+                  + " } while (s < 0);" * n + " return s; }")
+        return contar_nos(_parse_ll1(codigo))
+    # cada nível acrescenta o mesmo número de nós (a cópia do corpo dobrava)
+    assert nos(30) - nos(20) == nos(20) - nos(10)
+    assert nos(200) < 20 * nos(10)
+
+
+@pytest.mark.parametrize("codigo, esperado", [
+    # o corpo roda uma vez mesmo com a condição falsa
+    ("int main(void) { int s = 0; do { s = s + 1; } while (s < 0); return s; }", 1),
+    ("int main(void) { int s = 0; do { s = s + 1; } while (s < 5); return s; }", 5),
+    # o 's' do corpo não é o da condição
+    ("int main(void) { int s = 0; int k = 0; do { int s = 5; k = k + 1; } "
+     "while (s < 3 && k < 10); return k; }", 10),
+    ("int main(void) { int n = 0; int i = 0; do { int j = 0; do { n = n + 1; j = j + 1; } "
+     "while (j < 3); i = i + 1; } while (i < 4); return n; }", 12),
+    ("int s = 0; do { s = s + 2; } while (s < 7); int main(void) { return s; }", 8),
+])
+def test_faca_executa(codigo, esperado):
+    program = _parse_ll1(codigo)
+    assert Interpretador(program, io.StringIO()).executar("main") == esperado
+    assert maquina_virtual.executar(program, "main", io.StringIO()) == esperado
+    assert compilador_python.executar(program, "main", io.StringIO()) == esperado
+
+
+@pytest.mark.parametrize("codigo", list(CASOS.values()) + [le(c) for c in exemplos("_wrong")],
+                         ids=list(CASOS) + [os.path.basename(c) for c in exemplos("_wrong")])
+def test_itens_um_a_um(codigo):
+    tokens = tokens_from_lexer(lexa(codigo)[0])
+    program, erros = ParserLL1(list(tokens)).parse_program()
+    pares = list(ParserLL1(list(tokens)).iter_top_level())
+    itens = [s for s, _ in pares if s is not None]
+    assert hash_estrutural(Program(itens)) == hash_estrutural(program)
+    assert [e for _, es in pares for e in es] == erros
+
+
+def test_itens_saem_antes_do_fim_do_arquivo():
+    tokens = tokens_from_lexer(lexa(programa_muitas_funcoes(50))[0])
+    parser = ParserLL1(tokens)
+    itens = parser.iter_top_level()
+    primeiro, erros = next(itens)
+    assert primeiro.name == "f0" and not erros
+    assert parser.i < len(tokens) // 10
+    assert sum(1 for _ in itens) == 49
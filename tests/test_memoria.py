@@ -0,0 +1,36 @@
+import pytest
+
+from analisador_sintatico import Parser, tokens_from_lexer
+from limites import LimitesArquivo
+from memoria import MedidorMemoria, OrcamentoExcedido
+from tests.auxiliar import lexa
+
+CODIGO = "".join(f"int f{i}(int a) {{ int x = a * {i}; return x + 1; }}\n" for i in range(2000))
+
+
+def _parse(medidor, prazo=None):
+    tokens = tokens_from_lexer(lexa(CODIGO)[0])
+    with medidor.fase("parser"):
+        return Parser(tokens, prazo=prazo).parse_program()
+
+
+def test_orcamento_para_a_fase_no_meio():
+    completo = MedidorMemoria()
+    _parse(completo)
+    pico = completo.medicoes[-1].pico
+
+    limite = pico // 10
+    med = MedidorMemoria(orcamentos={"parser": limite})
+    with pytest.raises(OrcamentoExcedido):
+        _parse(med, LimitesArquivo().iniciar(memoria=med))
+    # parou num ponto de parada, bem antes do fim do parse
+    assert limite < med.medicoes[-1].pico < pico // 2
+
+
+def test_sem_pontos_de_parada_confere_no_fim():
+    completo = MedidorMemoria()
+    _parse(completo)
+    med = MedidorMemoria(orcamentos={"parser": completo.medicoes[-1].pico // 10})
+    with pytest.raises(OrcamentoExcedido):
+        _parse(med)
+    assert med.medicoes[-1].pico > completo.medicoes[-1].pico // 2
@@ -0,0 +1,112 @@
+"""Modo watch: debounce de rajadas e diff dos diagnósticos."""
+import os
+
+import pytest
+
+import observador
+from observador import Observador
+
+OK = "int main(void) { return 0; }"
+ERRO_A = "int main(void) { x = ; return 0; }"           # erro @ 1:22
+ERRO_B = "int main(void) { x = 1; y = ; return 0; }"    # erro @ 1:29
+
+
+@pytest.fixture
+def pasta(tmp_path, monkeypatch):
+    # sem inotify: o teste controla quando o diretório "fica quieto"
+    monkeypatch.setattr(observador, "HAVE_INOTIFY", False)
+    return tmp_path
+
+
+def grava(pasta, nome, codigo):
+    (pasta / nome).write_text(codigo, encoding="utf-8")
+
+
+def novo(pasta):
+    analisados = []
+    obs = Observador(str(pasta), debounce=0, ao_analisar=lambda nome, r: analisados.append((nome, r)))
+    return obs, analisados
+
+
+def inicia(obs):
+    stats = obs._stats()
+    obs.processar(sorted(stats), [], stats)
+
+
+def test_rajada_analisada_uma_vez(pasta, monkeypatch):
+    grava(pasta, "a.c", OK)
+    obs, analisados = novo(pasta)
+    inicia(obs)
+    analisados.clear()
+
+    # três gravações seguidas: as duas últimas caem dentro do debounce
+    rajada = [ERRO_A + " ", ERRO_B]
+    esperas = []
+
+    def dorme(segundos):
+        esperas.append(segundos)
+        if rajada:
+            grava(pasta, "a.c", rajada.pop(0))
+    monkeypatch.setattr(observador.time, "sleep", dorme)
+
+    grava(pasta, "a.c", ERRO_A)
+    assert obs.passo()
+    # uma espera por gravação da rajada, mais a que encontra o diretório quieto
+    assert len(esperas) == 3
+    assert [(nome, r.diagnosticos) for nome, r in analisados] == [
+        ("a.c", ["  - Esperado número, identificador, string, char ou '(' (encontrado ';') @ 1:29"])]
+    assert not obs.passo()
+
+
+def test_diff_dos_diagnosticos(pasta, capsys):
+    grava(pasta, "a.c", ERRO_A)
+    obs, _ = novo(pasta)
+    inicia(obs)
+    saida = capsys.readouterr().out
+    assert "[a.c] 1 erro(s) sintático(s)" in saida
+    assert "  + Esperado número, identificador, string, char ou '(' (encontrado ';') @ 1:22" in saida
+
+    # um erro some e outro aparece
+    grava(pasta, "a.c", ERRO_B)
+    assert obs.passo()
+    linhas = [l for l in capsys.readouterr().out.splitlines() if l.startswith("  ")]
+    assert linhas == [
+        "  - Esperado número, identificador, string, char ou '(' (encontrado ';') @ 1:22",
+        "  + Esperado número, identificador, string, char ou '(' (encontrado ';') @ 1:29",
+    ]
+
+    grava(pasta, "a.c", OK)
+    assert obs.passo()
+    saida = capsys.readouterr().out
+    assert saida.startswith("[a.c] OK")
+    assert [l for l in saida.splitlines() if l.startswith("  ")] == [
+        "  - Esperado número, identificador, string, char ou '(' (encontrado ';') @ 1:29"]
+
+
+def test_mesmo_conteudo_nao_reanalisa(pasta, capsys):
+    grava(pasta, "a.c", ERRO_A)
+    obs, analisados = novo(pasta)
+    inicia(obs)
+    analisados.clear()
+    capsys.readouterr()
+    st = os.stat(pasta / "a.c")
+    os.utime(pasta / "a.c", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert obs.passo()
+    assert analisados == [] and capsys.readouterr().out == ""
+    assert obs.estado["a.c"].mtime_ns == st.st_mtime_ns + 10**9
+    assert not obs.passo()
+
+
+def test_so_o_arquivo_alterado_e_reanalisado(pasta, capsys):
+    for nome in ("a.c", "b.c", "c.c"):
+        grava(pasta, nome, OK)
+    obs, analisados = novo(pasta)
+    inicia(obs)
+    assert [nome for nome, _ in analisados] == ["a.c", "b.c", "c.c"]
+    analisados.clear()
+    grava(pasta, "b.c", ERRO_A)
+    os.remove(pasta / "c.c")
+    assert obs.passo()
+    assert [nome for nome, _ in analisados] == ["b.c"]
+    assert "[c.c] removido" in capsys.readouterr().out
+    assert sorted(obs.estado) == ["a.c", "b.c"]
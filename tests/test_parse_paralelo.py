@@ -0,0 +1,40 @@
+import pytest
+
+from analisador_sintatico import MIN_TOKENS_PARALELO, Parser, tokens_from_lexer
+from tests.auxiliar import lexa
+
+
+def _tokens(codigo):
+    tokens = tokens_from_lexer(lexa(codigo)[0])
+    assert len(tokens) >= MIN_TOKENS_PARALELO
+    return tokens
+
+
+def _compara(codigo, jobs=2):
+    tokens = _tokens(codigo)
+    serial = Parser(list(tokens)).parse_program()
+    paralelo = Parser(list(tokens)).parse_program(jobs=jobs)
+    assert paralelo[1] == serial[1]
+    assert paralelo[0] == serial[0]
+    return serial
+
+
+def test_sem_erros():
+    codigo = "".join(f"int f{i}(int a) {{ int x = a * {i}; return x + 1; }}\n" for i in range(1500))
+    program, errors = _compara(codigo)
+    assert not errors and len(program.body) == 1500
+
+
+def test_erros_em_todos_os_grupos():
+    # o modo pânico consome o '}' de bad e segue pela função seguinte
+    codigo = "".join(f"int bad{i}() {{ x = (1 }}\nint g{i}() {{ y = 2; }}\n" for i in range(1500))
+    program, errors = _compara(codigo)
+    assert len(program.body) == 750 and len(errors) == 3750
+
+
+@pytest.mark.parametrize("onde", [0, 1500, 2999])
+def test_um_erro(onde):
+    funcoes = [f"int g{i}() {{ y = {i}; }}\n" for i in range(3000)]
+    funcoes[onde] = "int bad() { x = (1 }\n"
+    _, errors = _compara("".join(funcoes))
+    assert errors
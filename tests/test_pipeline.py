@@ -0,0 +1,141 @@
+"""Modo --pipeline: um arquivo com problema não para o lote."""
+import os
+import re
+from collections import Counter
+
+import pytest
+
+from limites import LimitesArquivo
+from memoria import contar_nos
+from pipeline_async import rodar_pipeline
+from renderizacao import OpcoesRender
+from tests.auxiliar import lexa, parse_ok
+
+BOM = "int main(void) { int x = 1; return x + 2; }"
+# o Parser desce um nível por parêntese: RecursionError na análise
+PARENTESES = "int main(void) { return " + "(" * 3000 + "1" + ")" * 3000 + "; }"
+# analisa e serializa, mas o json.dump da árvore estoura a recursão no render
+CADEIA = "int main(void) { int x = 1; return " + " + ".join(["x"] * 1000) + "; }"
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    """Grava {nome: código} num diretório e devolve o diretório; trees/ vai para tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    diretorio = tmp_path / "corpus"
+    diretorio.mkdir()
+
+    def grava(arquivos):
+        for nome, codigo in arquivos.items():
+            (diretorio / nome).write_text(codigo, encoding="utf-8")
+        return str(diretorio)
+    return grava
+
+
+def roda(diretorio, nomes, **opcoes):
+    opcoes.setdefault("tabela", "texto")
+    opcoes.setdefault("opcoes_render", OpcoesRender(formato="json"))
+    return rodar_pipeline(diretorio, nomes, **opcoes)
+
+
+def relatorios(saida: str) -> dict:
+    """Nome do arquivo -> texto do seu relatório, na ordem da saída."""
+    partes = re.split(r"^Analisando arquivo: (.*)$", saida, flags=re.M)[1:]
+    out = {}
+    for caminho, texto in zip(partes[::2], partes[1::2]):
+        out[os.path.basename(caminho)] = texto.split("\nPipeline:")[0]
+    return out
+
+
+@pytest.mark.parametrize("jobs_lexico", [0, 1])
+def test_arquivo_ruim_nao_para_o_lote(corpus, capsys, jobs_lexico):
+    nomes = ["a.c", "b.c", "c.c", "d.c"]
+    diretorio = corpus({"a.c": BOM, "b.c": PARENTESES, "c.c": CADEIA, "d.c": BOM})
+    roda(diretorio, nomes, jobs_lexico=jobs_lexico)
+    r = relatorios(capsys.readouterr().out)
+    assert list(r) == nomes
+    assert "erro interno (RecursionError" in r["b.c"]
+    assert "Parse OK" in r["c.c"] and "erro interno (RecursionError" in r["c.c"]
+    for nome in ("a.c", "d.c"):
+        assert "erro interno" not in r[nome]
+        assert "AST salva em" in r[nome]
+    assert os.path.exists(os.path.join("trees", "d.json"))
+
+
+# ---------- limites por arquivo (--limite) ----------
+
+PEQUENO = "int main(void) { return 1; }"
+GRANDE = "".join(f"int f{i}(int a) {{ int b = a * {i}; return b + a; }}\n" for i in range(40))
+
+
+def medidas(codigo: str) -> dict:
+    program = parse_ok(codigo)
+    return {"tokens": len(lexa(codigo)[0]), "nos": contar_nos(program), "render": contar_nos(program)}
+
+
+@pytest.mark.parametrize("limite", ["tokens", "nos", "render"])
+@pytest.mark.parametrize("jobs_lexico", [0, 1])
+def test_limite_para_so_o_arquivo_grande(corpus, capsys, limite, jobs_lexico):
+    pequeno, grande = medidas(PEQUENO)[limite], medidas(GRANDE)[limite]
+    assert pequeno < grande
+    limites = LimitesArquivo(**{limite: (pequeno + grande) // 2})
+    nomes = ["a.c", "b.c", "c.c"]
+    diretorio = corpus({"a.c": GRANDE, "b.c": PEQUENO, "c.c": GRANDE})
+    p = roda(diretorio, nomes, limites=limites, jobs_lexico=jobs_lexico)
+    saida = capsys.readouterr().out
+    r = relatorios(saida)
+    assert p.estouros == Counter({limite: 2})
+    for nome in ("a.c", "c.c"):
+        assert "Arquivo abortado: orçamento excedido" in r[nome]
+        assert "AST salva em" not in r[nome]
+    assert "orçamento excedido" not in r["b.c"] and "AST salva em" in r["b.c"]
+    assert "Orçamentos excedidos (2 de 3 arquivo(s)):" in saida
+    assert f"  {limite:<7} (limite {getattr(limites, limite):,}): 2 arquivo(s)" in saida
+
+
+def test_limite_de_tempo(corpus, capsys):
+    nomes = ["a.c", "b.c"]
+    diretorio = corpus({"a.c": PEQUENO, "b.c": GRANDE})
+    p = roda(diretorio, nomes, limites=LimitesArquivo(tempo=1e-9))
+    saida = capsys.readouterr().out
+    assert p.estouros == Counter({"tempo": 2})
+    assert all("orçamento excedido: tempo" in t for t in relatorios(saida).values())
+    assert "  tempo   (limite 0.00 s): 2 arquivo(s)" in saida
+
+
+def test_resumo_conta_limites_e_erros_internos(corpus, capsys):
+    nomes = ["a.c", "b.c", "c.c", "d.c"]
+    diretorio = corpus({"a.c": GRANDE, "b.c": PARENTESES, "c.c": PEQUENO, "d.c": PARENTESES})
+    limites = LimitesArquivo(nos=medidas(PEQUENO)["nos"])
+    p = roda(diretorio, nomes, limites=limites)
+    saida = capsys.readouterr().out
+    assert p.estouros == Counter({"nos": 1})
+    assert p.falhas == Counter({"RecursionError": 2})
+    assert "Orçamentos excedidos (1 de 4 arquivo(s)):" in saida
+    assert "Erros internos (2 de 4 arquivo(s)):\n  RecursionError: 2 arquivo(s)" in saida
+
+
+def test_sem_limites_nem_erros_o_resumo_nao_muda(corpus, capsys):
+    diretorio = corpus({"a.c": PEQUENO})
+    p = roda(diretorio, ["a.c"])
+    saida = capsys.readouterr().out
+    assert not p.estouros and not p.falhas
+    assert "Orçamentos excedidos" not in saida and "Erros internos" not in saida
+
+
+# ---------- ordem da saída e buffer de reordenação ----------
+
+LENTO = "".join(f"int f{i}(int a) {{ int b = a * {i}; return b + a; }}\n" for i in range(3000))
+
+
+@pytest.mark.parametrize("max_em_voo", [None, 3])
+def test_saida_em_ordem_com_buffer_limitado(corpus, capsys, max_em_voo):
+    # o primeiro arquivo demora; os outros terminam antes dele no 2º processo
+    arquivos = {"000.c": LENTO}
+    arquivos.update({f"{k:03}.c": PEQUENO for k in range(1, 40)})
+    nomes = sorted(arquivos)
+    p = roda(corpus(arquivos), nomes, jobs_analise=2, tamanho_fila=2,
+             tabela=None, max_em_voo=max_em_voo)
+    assert list(relatorios(capsys.readouterr().out)) == nomes
+    assert p.max_em_voo == (max_em_voo or 2 + 2 + 1)
+    assert p.max_pendentes <= p.max_em_voo
@@ -0,0 +1,242 @@
+"""Visão colapsada da AST, partes por função e teto de nós por imagem."""
+import json
+import os
+import re
+
+import pytest
+
+import analisador_sintatico
+import main
+import renderizacao
+import saidas
+from analisador_sintatico import FuncDef, Program, children, node_label
+from memoria import contar_nos
+from renderizacao import (MAX_NOS_PADRAO, OpcoesRender, colapsar, particionar,
+                          render_em_dia, renderizar, tamanhos)
+from tests.auxiliar import exemplos, le, parse_ok
+
+GRANDE = "int g = 1;\n" + "".join(
+    f"int f{i}(int a) {{ int b = a * {i}; while (b > a) {{ if (b % 2 == 0) {{ b = b - 1; }} "
+    f"else {{ b = b - {i + 1}; }} printf(\"%d\", b); }} return b + a; }}\n"
+    for i in range(12)
+) + "g = g + 1;\n"
+
+
+def nos_visao(v):
+    pilha, out = [v], []
+    while pilha:
+        n = pilha.pop()
+        out.append(n)
+        pilha.extend(n.filhos)
+    return out
+
+
+def representados(v) -> int:
+    """Nós da AST que a visão mostra ou resume."""
+    total = 0
+    for n in nos_visao(v):
+        m = re.search(r"⋯ \+(\d+)", n.rotulo)
+        if m is None:
+            total += 1
+        elif n.rotulo.startswith("⋯"):
+            total += int(m.group(1))       # grupo de irmãos que não couberam
+        else:
+            total += 1 + int(m.group(1))   # o nó e os descendentes escondidos
+    return total
+
+
+def profundidade(v) -> int:
+    return 1 + max((profundidade(c) for c in v.filhos), default=0)
+
+
+@pytest.fixture(scope="module")
+def program():
+    return parse_ok(GRANDE)
+
+
+def test_sem_opcoes_mostra_tudo(program):
+    v = colapsar(program)
+    assert len(nos_visao(v)) == contar_nos(program) == tamanhos(program)[id(program)]
+    assert not any(n.resumo for n in nos_visao(v))
+
+    # mesma forma e mesmos rótulos que a AST, em pré-ordem
+    def forma(n, eh_visao):
+        filhos = n.filhos if eh_visao else [c for c in children(n) if c is not None]
+        return (n.rotulo if eh_visao else node_label(n), [forma(c, eh_visao) for c in filhos])
+    assert forma(v, True) == forma(program, False)
+
+
+@pytest.mark.parametrize("max_nos", [1, 2, 5, 17, 60, 150, 400])
+def test_teto_de_nos(program, max_nos):
+    v = colapsar(program, max_nos=max_nos)
+    assert len(nos_visao(v)) <= max_nos
+    assert representados(v) == contar_nos(program)
+
+
+@pytest.mark.parametrize("prof", [0, 1, 2, 4])
+def test_profundidade_maxima(program, prof):
+    v = colapsar(program, profundidade_max=prof)
+    assert profundidade(v) == prof + 1
+    assert representados(v) == contar_nos(program)
+
+
+@pytest.mark.parametrize("tamanho", [1, 5, 20])
+def test_tamanho_maximo(tamanho):
+    f = parse_ok(GRANDE).body[1]
+    v = colapsar(f, tamanho_max=tamanho)
+    assert representados(v) == contar_nos(f)
+    # nada abaixo dos comandos fica aberto com mais de 'tamanho' nós
+    fila = [(v, 0)]
+    while fila:
+        n, p = fila.pop()
+        if p >= 2 and not n.resumo:
+            assert representados(n) <= tamanho
+        fila.extend((c, p + 1) for c in n.filhos)
+
+
+def test_opcoes_juntas(program):
+    v = colapsar(program, profundidade_max=3, tamanho_max=8, max_nos=40)
+    assert len(nos_visao(v)) <= 40
+    assert representados(v) == contar_nos(program)
+
+
+def test_particionar(program):
+    partes = particionar(program)
+    assert [s for s, _ in partes] == ["globais"] + [f"f{i}" for i in range(12)]
+    globais = partes[0][1]
+    assert isinstance(globais, Program) and len(globais.body) == 2
+    assert all(isinstance(r, FuncDef) for _, r in partes[1:])
+    assert sum(contar_nos(r) for _, r in partes) == contar_nos(program)
+
+
+def test_particionar_sem_globais():
+    program = parse_ok("int f(void) { return 1; } int main(void) { return f(); }")
+    assert [s for s, _ in particionar(program)] == ["f", "main"]
+
+
+def test_por_funcao_usa_o_teto_padrao(tmp_path):
+    # uma função com bem mais de MAX_NOS_PADRAO nós
+    corpo = " ".join(f"x = x + {i};" for i in range(100))
+    program = parse_ok(f"int main(void) {{ int x = 0; {corpo} return x; }}")
+    assert contar_nos(program) > MAX_NOS_PADRAO
+    feitos = renderizar(program, str(tmp_path), "p", OpcoesRender(por_funcao=True, formato="json"))
+    (caminho, gerado), = feitos
+    assert gerado and os.path.basename(caminho) == "p.main.json"
+    with open(caminho, encoding="utf-8") as f:
+        dados = json.load(f)
+    pilha, n = [dados], 0
+    while pilha:
+        d = pilha.pop()
+        n += 1
+        pilha.extend(d["filhos"])
+    assert n <= MAX_NOS_PADRAO
+
+
+@pytest.mark.parametrize("caminho", exemplos("_correct"), ids=os.path.basename)
+def test_exemplos_conservam_os_nos(caminho):
+    program = parse_ok(le(caminho))
+    for sufixo, raiz in particionar(program):
+        v = colapsar(raiz, profundidade_max=4, tamanho_max=10, max_nos=30)
+        assert representados(v) == contar_nos(raiz), sufixo
+
+
+# ---------- cache: '<imagem>.hash' ----------
+
+DUAS = "int f(int a) { return a + 1; }\nint g(int b) { return b * 2; }\n"
+
+
+def gerados(feitos) -> dict:
+    return {os.path.basename(c): g for c, g in feitos}
+
+
+def test_imagem_em_dia_nao_e_refeita(tmp_path):
+    opcoes = OpcoesRender(por_funcao=True, formato="json")
+    primeira = renderizar(parse_ok(DUAS), str(tmp_path), "p", opcoes)
+    assert gerados(primeira) == {"p.f.json": True, "p.g.json": True}
+    assert all(os.path.exists(c + ".hash") for c, _ in primeira)
+
+    # só espaços e posições mudaram: nada é refeito
+    deslocado = "\n\n  " + DUAS.replace("(int a)", "( int a )")
+    assert gerados(renderizar(parse_ok(deslocado), str(tmp_path), "p", opcoes)) == {
+        "p.f.json": False, "p.g.json": False}
+
+    # só a função alterada é refeita
+    alterado = DUAS.replace("b * 2", "b * 3")
+    assert gerados(renderizar(parse_ok(alterado), str(tmp_path), "p", opcoes)) == {
+        "p.f.json": False, "p.g.json": True}
+
+    # opções de colapso diferentes mudam o desenho
+    outras = OpcoesRender(por_funcao=True, formato="json", profundidade_max=2)
+    assert set(gerados(renderizar(parse_ok(alterado), str(tmp_path), "p", outras)).values()) == {True}
+
+
+def test_chave_sem_imagem_ou_corrompida(tmp_path):
+    opcoes = OpcoesRender(por_funcao=True, formato="json")
+    program = parse_ok(DUAS)
+    renderizar(program, str(tmp_path), "p", opcoes)
+    os.remove(tmp_path / "p.f.json")
+    (tmp_path / "p.g.json.hash").write_text("outra\n", encoding="ascii")
+    assert gerados(renderizar(program, str(tmp_path), "p", opcoes)) == {"p.f.json": True, "p.g.json": True}
+    assert not render_em_dia(str(tmp_path / "nada.json"), "x")
+
+
+def test_salvar_arvore_pula_ast_inalterada(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    opcoes = OpcoesRender(formato="json")
+    main.salvar_arvore("a.c", parse_ok(DUAS), opcoes)
+    main.salvar_arvore("a.c", parse_ok("  " + DUAS), opcoes)
+    main.salvar_arvore("a.c", parse_ok(DUAS.replace("a + 1", "a + 2")), opcoes)
+    saida = capsys.readouterr().out.splitlines()
+    caminho = os.path.join("trees", "a.json")
+    assert saida == [f"AST salva em {caminho}", f"AST inalterada — {caminho} mantido",
+                     f"AST salva em {caminho}"]
+
+
+# ---------- um layout por imagem ----------
+
+@pytest.fixture
+def conta_layouts(monkeypatch):
+    chamadas = []
+    original = analisador_sintatico._compute_layout
+
+    def conta(raiz, *args):
+        chamadas.append(raiz)
+        return original(raiz, *args)
+    for modulo in (analisador_sintatico, renderizacao, main):
+        monkeypatch.setattr(modulo, "_compute_layout", conta)
+    return chamadas
+
+
+@pytest.fixture
+def png_falso(monkeypatch):
+    """O backend png sem matplotlib: um desenho que, como draw_tree, faz o layout se não receber pos."""
+    desenhos = []
+
+    def desenha(raiz, caminho, pos=None, **opcoes):
+        if pos is None:
+            pos, _ = analisador_sintatico._compute_layout(raiz, 0.0, 0.0)
+        desenhos.append(dict(opcoes, pos=pos))
+        with open(caminho, "w", encoding="utf-8") as f:
+            f.write("png")
+    backend = saidas.arvore("png")
+    monkeypatch.setattr(backend, "dependencia", None)
+    monkeypatch.setattr(backend, "_funcao", desenha)
+    return desenhos
+
+
+@pytest.mark.parametrize("formato", ["png", "svg"])
+def test_renderizar_calcula_o_layout_uma_vez(tmp_path, conta_layouts, png_falso, formato):
+    opcoes = OpcoesRender(por_funcao=True, formato=formato)
+    feitos = renderizar(parse_ok(DUAS), str(tmp_path), "p", opcoes)
+    assert len(feitos) == 2
+    assert len(conta_layouts) == 2
+    if formato == "png":
+        assert all("figsize" in d and "dpi" in d for d in png_falso)
+
+
+def test_salvar_arvore_png_calcula_o_layout_uma_vez(tmp_path, monkeypatch, conta_layouts, png_falso):
+    monkeypatch.chdir(tmp_path)
+    main.salvar_arvore("a.c", parse_ok(DUAS))
+    main.salvar_arvore("b.c", parse_ok(DUAS), OpcoesRender(por_funcao=True))
+    assert len(png_falso) == 3
+    assert len(conta_layouts) == 3
@@ -0,0 +1,76 @@
+import io
+import os
+
+import pytest
+
+import serializacao
+from analisador_sintatico import Parser, tokens_from_lexer
+from hash_estrutural import hash_estrutural
+from tests.auxiliar import exemplos, lexa, le, parse
+
+CASOS = {
+    "numeros": "int f(void) { float a = 7.0; int b = 7; double c = 0.25; return -3; }",
+    "grande": "int f(void) { return 123456789012345678901234567890; }",
+    "textos": 'int main(void) { printf("á\\n%d", \'x\'); s = "π"; return 0; }',
+    "aninhado": "int g(int a, int b) { while (a < b) { if (a % 2 == 0) { a = a + 1; } else { b = b - 1; } } return a[b]; }",
+    "topo": "int x = 1; x = x + 2; int main(void) { return x; }",
+}
+CASOS.update({os.path.basename(c): le(c) for c in exemplos()})
+
+
+@pytest.mark.parametrize("nome", list(CASOS))
+def test_ida_e_volta(nome):
+    program, _ = parse(CASOS[nome])
+    volta = serializacao.carregar(serializacao.para_bytes(program))
+    assert volta == program
+    # int e float continuam distintos ('7' e '7.0')
+    assert repr(volta) == repr(program)
+
+
+def test_itens_em_streaming():
+    codigo = CASOS["topo"] + CASOS["aninhado"]
+    parser = Parser(tokens_from_lexer(lexa(codigo)[0]))
+    buf = io.BytesIO()
+    serializacao.salvar_itens((s for s, _ in parser.iter_top_level() if s is not None), buf)
+    assert serializacao.carregar(buf.getvalue()) == parse(codigo)[0]
+
+
+def test_leitura_preguicosa():
+    program, _ = parse(CASOS["aninhado"] + CASOS["numeros"])
+    leitor = serializacao.LeitorAST(serializacao.para_bytes(program))
+    assert len(leitor) == len(program.body)
+    g = leitor[0]
+    assert g.tipo == "FuncDef" and g.name == "g"
+    assert g.body.body[0].test.op == "<"
+    assert [p.materializar() for p in g.params] == program.body[0].params
+    assert leitor[1].materializar() == program.body[1]
+
+
+def test_formato_invalido():
+    with pytest.raises(serializacao.ErroFormato):
+        serializacao.carregar(b"nada disso")
+    dados = bytearray(serializacao.para_bytes(parse(CASOS["topo"])[0]))
+    dados[len(serializacao.MAGICO)] = 1   # versão antiga
+    with pytest.raises(serializacao.ErroFormato, match="versão 1"):
+        serializacao.carregar(bytes(dados))
+
+
+def expressao_longa(termos: int) -> str:
+    return "int main(void) { int x = 1; return " + " + ".join(["x"] * termos) + "; }"
+
+
+@pytest.mark.parametrize("termos", [1000, 5000])
+def test_cadeia_funda(termos):
+    # == e repr de dataclass são recursivos: compara pelo hash estrutural
+    program, _ = parse(expressao_longa(termos))
+    dados = serializacao.para_bytes(program)
+    volta = serializacao.carregar(dados)
+    assert hash_estrutural(volta) == hash_estrutural(program)
+    leitor = serializacao.LeitorAST(dados)
+    assert hash_estrutural(leitor[0].materializar()) == hash_estrutural(program.body[0])
+    corpo = serializacao.para_json(program)["body"][0]["body"]["body"]
+    no = corpo[1]["value"]
+    for _ in range(termos - 1):
+        assert no["kind"] == "BinOp" and no["right"]["name"] == "x"
+        no = no["left"]
+    assert no == {"kind": "Var", "line": 1, "col": no["col"], "name": "x"}
@@ -0,0 +1,41 @@
+import pytest
+
+from analisador_sintatico import MIN_TOKENS_PARALELO, Parser, tokens_from_lexer
+from tests.auxiliar import fontes_variadas, lexa
+from tokens_compartilhados import BlocoTokens, lexar_em_bloco
+
+FONTES = fontes_variadas()
+
+
+def _campos(tokens):
+    return [(t.type, t.lex, t.line, t.col, t.attr) for t in tokens]
+
+
+@pytest.mark.parametrize("nome", list(FONTES))
+def test_bloco_igual_a_lista(nome):
+    codigo = FONTES[nome]
+    lista_tokens, _ = lexa(codigo)
+    with BlocoTokens.criar(lista_tokens, codigo) as bloco:
+        compartilhados = bloco.tokens()
+        assert _campos(compartilhados) == _campos(tokens_from_lexer(lista_tokens))
+
+
+def test_lexar_em_bloco():
+    codigo = FONTES["ex1_wrong.c"]
+    lista_tokens, tabela = lexa(codigo)
+    nome, tabela_bloco, mensagens = lexar_em_bloco(codigo)
+    with BlocoTokens.abrir(nome, dono=True) as bloco:
+        assert _campos(bloco.tokens()) == _campos(tokens_from_lexer(lista_tokens))
+    assert tabela_bloco == tabela
+    assert "Erro léxico" in mensagens
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_parse_dos_tokens_compartilhados(jobs):
+    codigo = "".join(f"int f{i}(int a) {{ x = a * {i}; return x + 1.5; }}\n" for i in range(1500))
+    codigo += "int bad() { x = (1 }\nint g() { return 0; }\n"
+    lista_tokens, _ = lexa(codigo)
+    assert len(lista_tokens) >= MIN_TOKENS_PARALELO
+    esperado = Parser(tokens_from_lexer(lista_tokens)).parse_program()
+    with BlocoTokens.criar(lista_tokens, codigo) as bloco:
+        assert Parser(bloco.tokens()).parse_program(jobs=jobs) == esperado
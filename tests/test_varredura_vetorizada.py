@@ -0,0 +1,15 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from tests.auxiliar import fontes_variadas, lexa_com_mensagens
+from varredura_vetorizada import fontes_aleatorias
+
+FONTES = fontes_variadas()
+FONTES.update(fontes_aleatorias(100, 400, semente=1))
+
+
+@pytest.mark.parametrize("nome", list(FONTES))
+def test_pre_varredura_igual_ao_caminho_puro(nome):
+    codigo = FONTES[nome]
+    assert lexa_com_mensagens(codigo, vetorizado=True) == lexa_com_mensagens(codigo, vetorizado=False)
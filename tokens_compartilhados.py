@@ -0,0 +1,245 @@
+"""
+Tokens em memória compartilhada, para passar a saída do léxico a outro
+processo sem pickle.
+
+Um bloco (multiprocessing.shared_memory) guarda:
+- cabeçalho: assinatura, versão, número de tokens e tamanhos das seções;
+- a tabela de tipos de token (nomes separados por '\\n');
+- um registro de largura fixa por token: (tipo, início, fim, linha,
+  coluna), cinco uint32;
+- os bytes UTF-8 do fonte, seguidos dos lexemas que não são um trecho
+  dele (o ERROR "/*...EOF" de comentário não fechado).
+
+início/fim são offsets em bytes nessa última seção. O atributo de um
+NUM não vai para o bloco: sai do lexema como no léxico (float se tem
+'.', senão int).
+
+Quem lê não desserializa nada: TokensCompartilhados é uma sequência
+sobre o bloco e monta o Token do parser só quando a posição é lida
+(e guarda o que já montou). Parser e ParserLL1 aceitam essa sequência
+no lugar da lista; no parse paralelo cada processo abre o bloco pelo
+nome e lê só os tokens do seu grupo.
+
+Ciclo de vida: o dono do bloco o remove (unlink) ao fechar. Um processo
+que cria o bloco para outro usa entregar(), que fecha o mapeamento sem
+remover; quem recebe o nome o abre com dono=True. Nomes entregues que
+ninguém abriu são removidos com descartar(). Tokens já lidos continuam
+válidos depois de fechar o bloco.
+"""
+from __future__ import annotations
+import os
+import struct
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from analisador_lexico import analisar_lexema, mapa, mapa2, palavras_reservadas
+from analisador_sintatico import Token
+
+ASSINATURA = b"TOKS"
+VERSAO = 1
+_CABECALHO = struct.Struct("<4sIIII")   # assinatura, versão, n tokens, bytes dos tipos, bytes do fonte
+CAMPOS = 5                              # tipo, início, fim, linha, coluna
+TAMANHO_REGISTRO = CAMPOS * 4
+
+# todo tipo que o léxico produz
+TIPOS: Tuple[str, ...] = tuple(dict.fromkeys(
+    list(palavras_reservadas.values()) + list(mapa.values()) + list(mapa2.values())
+    + ["ID", "NUM", "TEXTO", "CHAR_LITERAL", "PP_DIRECTIVE", "ELLIPSIS", "ERROR", "EOF"]
+))
+
+
+def _alinha(n: int) -> int:
+    return (n + 3) & ~3
+
+
+def _inicios_de_linha(codigo: str) -> List[int]:
+    inicios = [0]
+    k = codigo.find("\n")
+    while k >= 0:
+        inicios.append(k + 1)
+        k = codigo.find("\n", k + 1)
+    return inicios
+
+
+def codificar(lista_tokens: List[Any], codigo: str) -> bytes:
+    """Conteúdo do bloco para os tokens do léxico de 'codigo'."""
+    indice_tipo = {t: k for k, t in enumerate(TIPOS)}
+    fonte = codigo.encode("utf-8")
+    linhas = _inicios_de_linha(codigo)
+    ascii_puro = len(fonte) == len(codigo)
+    if not ascii_puro:
+        # offset em bytes de cada início de linha
+        linhas_b = [len(codigo[:linhas[0]].encode("utf-8"))]
+        for a, b in zip(linhas, linhas[1:]):
+            linhas_b.append(linhas_b[-1] + len(codigo[a:b].encode("utf-8")))
+
+    extras: List[bytes] = []
+    tam_extras = 0
+    registros = array("I")
+    for t in lista_tokens:
+        tipo = indice_tipo.get(t.tipo)
+        if tipo is None:
+            raise ValueError(f"tipo de token desconhecido para o bloco: {t.tipo!r}")
+        inicio = None
+        if t.linha - 1 < len(linhas):
+            p = linhas[t.linha - 1] + t.coluna - 1
+            if codigo.startswith(t.lexema, p):
+                if ascii_puro:
+                    inicio = p
+                    fim = p + len(t.lexema)
+                else:
+                    l = t.linha - 1
+                    inicio = linhas_b[l] + len(codigo[linhas[l]:p].encode("utf-8"))
+                    fim = inicio + len(t.lexema.encode("utf-8"))
+        if inicio is None:
+            lex = t.lexema.encode("utf-8")
+            inicio = len(fonte) + tam_extras
+            fim = inicio + len(lex)
+            extras.append(lex)
+            tam_extras += len(lex)
+        registros.extend((tipo, inicio, fim, t.linha, t.coluna))
+
+    tipos = "\n".join(TIPOS).encode("utf-8")
+    corpo_fonte = fonte + b"".join(extras)
+    if len(corpo_fonte) >= 2 ** 32:
+        raise ValueError("fonte grande demais para offsets de 32 bits")
+    partes = [
+        _CABECALHO.pack(ASSINATURA, VERSAO, len(lista_tokens), len(tipos), len(corpo_fonte)),
+        tipos.ljust(_alinha(len(tipos)), b"\0"),
+        registros.tobytes(),
+        corpo_fonte,
+    ]
+    return b"".join(partes)
+
+
+class TokensCompartilhados(Sequence):
+    """Sequência de Token (do parser) lida direto de um BlocoTokens."""
+
+    def __init__(self, buf: memoryview, nome_bloco: Optional[str] = None):
+        self.nome_bloco = nome_bloco   # parse_paralelo passa o nome aos processos
+        assinatura, versao, n, tam_tipos, tam_fonte = _CABECALHO.unpack_from(buf, 0)
+        if assinatura != ASSINATURA or versao != VERSAO:
+            raise ValueError("bloco de tokens inválido ou de outra versão")
+        off = _CABECALHO.size
+        self._tipos = bytes(buf[off:off + tam_tipos]).decode("utf-8").split("\n")
+        off += _alinha(tam_tipos)
+        self._n = n
+        self._registros = buf[off:off + n * TAMANHO_REGISTRO].cast("I")
+        off += n * TAMANHO_REGISTRO
+        self._fonte = buf[off:off + tam_fonte]
+        self._cache: List[Optional[Token]] = [None] * n
+
+    def _liberar(self):
+        self._registros.release()
+        self._fonte.release()
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i):
+        # o parser lê o mesmo token várias vezes: o caminho comum é só o cache
+        t = self._cache[i]
+        if t is None or t.__class__ is list:
+            return self._ler(i)
+        return t
+
+    def _ler(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(self._n))]
+        if i < 0:
+            i += self._n
+        r = self._registros
+        k = CAMPOS * i
+        tipo = self._tipos[r[k]]
+        lex = str(self._fonte[r[k + 1]:r[k + 2]], "utf-8")
+        attr = None
+        if tipo == "NUM":
+            attr = float(lex) if "." in lex else int(lex)
+        t = self._cache[i] = Token(tipo, lex, r[k + 3], r[k + 4], attr)
+        return t
+
+
+class BlocoTokens:
+    """Um bloco de memória compartilhada com tokens; use com 'with'."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, dono: bool):
+        self._shm: Optional[shared_memory.SharedMemory] = shm
+        self.dono = dono
+        self.nome = shm.name
+        self._tokens: Optional[TokensCompartilhados] = None
+
+    @classmethod
+    def criar(cls, lista_tokens: List[Any], codigo: str) -> "BlocoTokens":
+        """Grava os tokens do léxico (e o fonte) num bloco novo; quem cria é o dono."""
+        dados = codificar(lista_tokens, codigo)
+        shm = shared_memory.SharedMemory(create=True, size=max(len(dados), 1))
+        shm.buf[:len(dados)] = dados
+        return cls(shm, dono=True)
+
+    @classmethod
+    def abrir(cls, nome: str, dono: bool = False) -> "BlocoTokens":
+        return cls(shared_memory.SharedMemory(name=nome), dono)
+
+    def tokens(self) -> TokensCompartilhados:
+        if self._shm is None:
+            raise ValueError("bloco de tokens já fechado")
+        if self._tokens is None:
+            self._tokens = TokensCompartilhados(self._shm.buf, self.nome)
+        return self._tokens
+
+    def _desmapear(self):
+        if self._tokens is not None:
+            # o mmap só fecha sem memoryviews vivas sobre ele
+            self._tokens._liberar()
+            self._tokens = None
+        self._shm.close()
+
+    def entregar(self) -> str:
+        """Fecha o mapeamento sem remover o bloco e devolve o nome para outro processo assumir."""
+        if self._shm is None:
+            raise ValueError("bloco de tokens já fechado")
+        self._desmapear()
+        if os.name == "posix":
+            # o rastreador de recursos deste processo removeria o bloco quando
+            # ele terminasse; quem o abrir com dono=True passa a responder por ele
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        self._shm = None
+        return self.nome
+
+    def fechar(self):
+        if self._shm is None:
+            return
+        self._desmapear()
+        if self.dono:
+            self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self) -> "BlocoTokens":
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+def descartar(nome: str):
+    """Remove um bloco entregue que ninguém vai abrir (ex.: pipeline interrompido)."""
+    try:
+        BlocoTokens.abrir(nome, dono=True).fechar()
+    except FileNotFoundError:
+        pass
+
+
+def lexar_em_bloco(codigo: str, jobs: int = 1) -> Tuple[str, Dict[str, int], str]:
+    """
+    Roda o léxico neste processo e entrega os tokens num bloco.
+    Devolve (nome do bloco, tabela de símbolos, mensagens do léxico);
+    quem recebe abre o bloco com dono=True.
+    """
+    import contextlib
+    import io
+
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        lista_tokens, tabela = analisar_lexema(codigo, jobs=jobs)
+    return BlocoTokens.criar(lista_tokens, codigo).entregar(), tabela, buf.getvalue()
@@ -0,0 +1,243 @@
+"""
+Pré-varredura vetorizada (NumPy) para o léxico.
+
+O fonte vira um array uint8 de classes de caractere por uma tabela de
+consulta; com diferenças vetorizadas saem o início e o fim de cada
+sequência de brancos, de caracteres de identificador e de dígitos, e de
+uma vez só as posições de todo '\\n', de todo '*/' e dos '"' e '\\n' que
+terminam uma string (os não escapados: antes deles vem um número par
+de '\\\\'). O léxico (analisador_lexico) usa esses limites para pular uma
+sequência inteira de uma vez em vez de andar caractere a caractere.
+
+As sequências vão num dict início -> fim, só as que não são curtas
+(MINIMO_SEQUENCIA); o que não está no dict (sequência curta, ou começada
+no meio por outro token) segue no laço de sempre do léxico.
+
+Em código típico os tokens são curtos e o ganho é pequeno; ele aparece
+nas sequências longas (comentários, strings, identificadores e recuos
+grandes), que deixam de custar uma volta do laço por caractere.
+
+As classes reproduzem exatamente str.isspace, str.isalnum e str.isdigit
+(que é o que o léxico puro usa): os 128 caracteres ASCII vêm de uma
+tabela montada com esses métodos, e os não ASCII distintos do fonte são
+classificados um a um pelos mesmos métodos.
+
+Sem NumPy, HAVE_NUMPY é False e o léxico fica no caminho puro Python.
+
+Uso (teste diferencial dos dois caminhos do léxico):
+    python varredura_vetorizada.py               # exemplos/ e entradas geradas
+    python varredura_vetorizada.py ARQ.c ...
+Sai com código 1 se algum fonte der tokens, tabela ou mensagens diferentes.
+"""
+from __future__ import annotations
+import bisect
+import sys
+from typing import Dict, List, Tuple
+
+try:
+    import numpy as np
+    HAVE_NUMPY = True
+except ImportError:
+    HAVE_NUMPY = False
+
+# identificadores e números mais curtos ficam fora dos dicts: o laço do
+# léxico os percorre mais rápido do que custa criar a entrada. Brancos
+# entram a partir de 2, porque o léxico puro volta ao laço principal a
+# cada caractere branco.
+MINIMO_SEQUENCIA = 4
+
+# bits de classe
+BRANCO = 1      # isspace()
+PALAVRA = 2     # isalnum() ou '_': continua um identificador
+DIGITO = 4      # isdigit()
+
+
+def classe_de(ch: str) -> int:
+    c = 0
+    if ch.isspace():
+        c |= BRANCO
+    if ch.isalnum() or ch == "_":
+        c |= PALAVRA
+    if ch.isdigit():
+        c |= DIGITO
+    return c
+
+
+if HAVE_NUMPY:
+    _TABELA_ASCII = np.array([classe_de(chr(k)) for k in range(128)], dtype=np.uint8)
+
+
+class Limites:
+    """
+    Limites pré-calculados de um fonte (posições são índices na str).
+    branco/palavra/digitos: início -> fim das sequências não curtas da classe.
+    """
+    __slots__ = ("n", "branco", "palavra", "digitos", "quebras", "paradas_string", "fechas_comentario")
+
+    def __init__(self, n: int, branco: Dict[int, int], palavra: Dict[int, int], digitos: Dict[int, int],
+                 quebras: List[int], paradas_string: List[int], fechas_comentario: List[int]):
+        self.n = n
+        self.branco = branco
+        self.palavra = palavra
+        self.digitos = digitos
+        self.quebras = quebras
+        self.paradas_string = paradas_string
+        self.fechas_comentario = fechas_comentario
+
+    def _proxima(self, posicoes: List[int], i: int) -> int:
+        k = bisect.bisect_left(posicoes, i)
+        return posicoes[k] if k < len(posicoes) else self.n
+
+    def fim_linha(self, i: int) -> int:
+        """Primeiro '\\n' a partir de i (ou n)."""
+        return self._proxima(self.quebras, i)
+
+    def parada_string(self, i: int) -> int:
+        """Primeiro '"' ou '\\n' não escapado a partir de i (ou n)."""
+        return self._proxima(self.paradas_string, i)
+
+    def fecha_comentario(self, i: int) -> int:
+        """Início do primeiro '*/' a partir de i (ou n)."""
+        return self._proxima(self.fechas_comentario, i)
+
+
+def _bordas(mascara: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """Inícios e fins (exclusivos) das sequências de True."""
+    mudancas = np.flatnonzero(mascara[1:] != mascara[:-1]) + 1
+    bordas = np.concatenate(([0] if mascara[0] else [], mudancas, [len(mascara)] if mascara[-1] else []))
+    return bordas[0::2].astype(np.int64), bordas[1::2].astype(np.int64)
+
+
+def _sequencias(mascara: "np.ndarray", minimo: int) -> Dict[int, int]:
+    inicios, fins = _bordas(mascara)
+    longas = fins - inicios >= minimo
+    return dict(zip(inicios[longas].tolist(), fins[longas].tolist()))
+
+
+def _paradas_string(cps: "np.ndarray", quebra: "np.ndarray") -> "np.ndarray":
+    """'"' e '\\n' não escapados: a sequência de '\\' logo antes tem tamanho par."""
+    candidatas = np.flatnonzero(quebra | (cps == 34))
+    barra = cps == 92
+    if not barra.any():
+        return candidatas
+    inicios, fins = _bordas(barra)
+    # a sequência de '\\' que termina logo antes de c, se houver, tem fim == c
+    k = np.minimum(np.searchsorted(fins, candidatas), len(fins) - 1)
+    colada = fins[k] == candidatas
+    impar = colada & ((fins[k] - inicios[k]) % 2 == 1)
+    return candidatas[~impar]
+
+
+def pre_varredura(codigo_fonte: str) -> Limites:
+    """Calcula os Limites de 'codigo_fonte' (requer NumPy)."""
+    n = len(codigo_fonte)
+    if n == 0:
+        return Limites(0, {}, {}, {}, [], [], [])
+    if codigo_fonte.isascii():
+        cps = np.frombuffer(codigo_fonte.encode("ascii"), dtype=np.uint8)
+        classes = _TABELA_ASCII[cps]
+    else:
+        cps = np.frombuffer(codigo_fonte.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+        classes = _TABELA_ASCII[np.minimum(cps, 127)]
+        fora = cps >= 128
+        unicos, inverso = np.unique(cps[fora], return_inverse=True)
+        tabela = np.array([classe_de(chr(c)) for c in unicos.tolist()], dtype=np.uint8)
+        classes[fora] = tabela[inverso]
+
+    quebra = cps == 10
+    fecha = np.zeros(n, dtype=bool)
+    fecha[:-1] = (cps[:-1] == 42) & (cps[1:] == 47)   # '*' seguido de '/'
+    return Limites(
+        n,
+        _sequencias((classes & BRANCO) != 0, 2),
+        _sequencias((classes & PALAVRA) != 0, MINIMO_SEQUENCIA),
+        _sequencias((classes & DIGITO) != 0, MINIMO_SEQUENCIA),
+        np.flatnonzero(quebra).tolist(),
+        _paradas_string(cps, quebra).tolist(),
+        np.flatnonzero(fecha).tolist(),
+    )
+
+
+# -----------------------------------------------
+# Teste diferencial
+# -----------------------------------------------
+
+def _roda(codigo_fonte: str, vetorizado: bool):
+    import contextlib
+    import io
+    from analisador_lexico import analisar_lexema
+
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        tokens, tabela = analisar_lexema(codigo_fonte, vetorizado=vetorizado)
+    return [(t.tipo, t.lexema, t.linha, t.coluna, t.atributo) for t in tokens], tabela, buf.getvalue()
+
+
+def divergencia(codigo_fonte: str) -> str:
+    """'' se os dois caminhos do léxico concordam, senão a primeira diferença."""
+    puro = _roda(codigo_fonte, False)
+    vetor = _roda(codigo_fonte, True)
+    if puro == vetor:
+        return ""
+    for a, b in zip(puro[0], vetor[0]):
+        if a != b:
+            return f"token {a} (puro) != {b} (vetorizado)"
+    if len(puro[0]) != len(vetor[0]):
+        return f"{len(puro[0])} tokens (puro) != {len(vetor[0])} (vetorizado)"
+    return "tabela de símbolos diferente" if puro[1] != vetor[1] else "mensagens de erro diferentes"
+
+
+# fontes que exercitam cada salto, inclusive os casos não terminados
+ENTRADAS_GERADAS = {
+    "brancos_variados": "int\t x =  1;\r\n\x0b\x0c  \n\n   x = x + 1; \n",
+    "nao_ascii": "int café = 1; int x² = 2; float π = 3.14; int ½ = 0; a b;\n",
+    "numeros": "x = 12abc + 3.5e3 + 4. + 5,25 + 1_0 + 00 + 7.x + ٣٤;\n",
+    "strings": 'printf("a\\"b\\\\", "x\\\n", "nao fecha\n"); s = "fim',
+    "chars": "c = 'a'; d = '\\n'; e = '\\''; f = 'ab'; g = '",
+    "comentarios": "/**/ /*/ */ a /* x \n * y */ b // z\n#include <x>\n  # define y\n c # d\n/* sem fim",
+    "diretiva_no_fim": "int x;\n#pragma",
+    "barra_no_fim": 'x = "abc\\',
+    "branco_comecado_em_string": 'x = "abc\n    y; z = \'  \n  w;',
+    "barras_em_sequencia": 'a = "x\\\\" b "y\\\\\\" c" "\\\\\\\\\n" "z\\\\\\\n" d;\n',
+    "vazio": "",
+}
+
+# alfabeto das fontes aleatórias: um pouco de tudo que muda o caminho do léxico
+_ALFABETO = list("ab_Z09 \t\n\"'\\/*#.,;(){}=+-<>!&|") + ["é", "²", "\x0b", "٣", "\u2028"]
+
+
+def fontes_aleatorias(qtd: int, tamanho: int, semente: int = 0) -> Dict[str, str]:
+    import random
+    rnd = random.Random(semente)
+    return {
+        f"aleatoria_{k}": "".join(rnd.choice(_ALFABETO) for _ in range(tamanho))
+        for k in range(qtd)
+    }
+
+
+if __name__ == "__main__":
+    if not HAVE_NUMPY:
+        sys.exit("NumPy não está instalado: só o caminho puro Python está disponível.")
+    import glob
+    import os
+
+    fontes = {}
+    caminhos = sys.argv[1:] or sorted(glob.glob(os.path.join("exemplos", "**", "*.c"), recursive=True))
+    for caminho in caminhos:
+        with open(caminho, encoding="utf-8") as f:
+            fontes[caminho] = f.read()
+    if not sys.argv[1:]:
+        from complexidade import CASOS
+        fontes.update(ENTRADAS_GERADAS)
+        fontes.update(fontes_aleatorias(200, 400))
+        for nome, caso in CASOS.items():
+            fontes[nome] = caso.gerar(caso.n_inicial)
+
+    falhas = 0
+    for nome, codigo in fontes.items():
+        d = divergencia(codigo)
+        if d:
+            falhas += 1
+            print(f"DIVERGE  {nome}: {d}")
+    print(f"{len(fontes) - falhas}/{len(fontes)} fontes com resultado idêntico nos dois caminhos.")
+    sys.exit(1 if falhas else 0)